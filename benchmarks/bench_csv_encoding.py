@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+open_csv_file_with_fallback の文字コード判定の比較
+
+変更前はファイルを UTF-8 (BOM付き) で開いて読み進め、途中でデコードに失敗すると
+Shift_JIS で最初から読み直していた (Shift_JIS の文字がファイルの後ろにあるほど解析が2回分かかる)。
+変更後は読み込み前に BOM と先頭のバイト列から文字コードを判定し、mmap したファイル全体を1回でデコードする。
+同梱の Y_spec_data.csv と、先頭は ASCII のみで末尾に日本語を含む合成した Shift_JIS の定義書を、
+csv.reader で全行を読み込むまでの時間で比較する。
+
+使用例:
+    python benchmarks/bench_csv_encoding.py
+    python benchmarks/bench_csv_encoding.py --rows 500000 --repeat 5
+"""
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+
+from synthetic_data import REPO_DIR
+
+from constants import DEFAULT_ENCODING, FALLBACK_ENCODING, YSPEC_CSV_FILE
+from utils import open_csv_file_with_fallback
+
+
+def read_rows_legacy(filepath):
+    """変更前の読み込み方法 (UTF-8 で読み進め、失敗したら Shift_JIS で読み直す)"""
+    for encoding in (DEFAULT_ENCODING, FALLBACK_ENCODING):
+        try:
+            with open(filepath, 'r', encoding=encoding, newline='') as f:
+                first_line = f.readline()
+                f.seek(0)
+                delimiter = '\t' if '\t' in first_line and ',' not in first_line else ','
+                return list(csv.reader(f, delimiter=delimiter)), encoding
+        except UnicodeDecodeError:
+            if encoding == FALLBACK_ENCODING:
+                raise
+
+
+def read_rows_current(filepath):
+    with open_csv_file_with_fallback(filepath) as (f, delimiter, encoding):
+        return list(csv.reader(f, delimiter=delimiter)), encoding
+
+
+def generate_late_shift_jis_file(path, rows):
+    """先頭は ASCII のみで、最後の行だけ日本語を含む Shift_JIS の CSV を作る"""
+    with open(path, "w", encoding="shift_jis", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "path_name", "spec_id", "spec_value_name"])
+        for index in range(rows):
+            writer.writerow([str(index), f"item{index}", f"furniture:table:{index % 500}", str(index % 97), "wood"])
+        writer.writerow([str(rows), "テーブル", "家具:テーブル", "0", "木製"])
+
+
+def measure(func, filepath, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(filepath)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV の文字コード判定の比較")
+    parser.add_argument("--rows", type=int, default=200000, help="合成する定義書の行数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        synthetic_path = os.path.join(temp_dir, "late_shift_jis.csv")
+        generate_late_shift_jis_file(synthetic_path, args.rows)
+        targets = [(YSPEC_CSV_FILE, os.path.join(REPO_DIR, YSPEC_CSV_FILE)),
+                   (f"合成 {args.rows:,}行", synthetic_path)]
+        all_match, slowest_ratio = True, None
+        for label, filepath in targets:
+            if not os.path.exists(filepath):
+                print(f"{label}: ファイルが無いため省略")
+                continue
+            legacy_time, legacy_result = measure(read_rows_legacy, filepath, args.repeat)
+            current_time, current_result = measure(read_rows_current, filepath, args.repeat)
+            match = legacy_result == current_result
+            all_match = all_match and match
+            ratio = legacy_time / current_time
+            slowest_ratio = ratio if slowest_ratio is None else min(slowest_ratio, ratio)
+            print(f"{label} ({current_result[1]}): 変更前 {legacy_time * 1000:7.1f}ミリ秒 / "
+                  f"変更後 {current_time * 1000:7.1f}ミリ秒 ({ratio:.1f}倍){'' if match else ' 結果不一致'}")
+    finally:
+        shutil.rmtree(temp_dir)
+
+    if not all_match:
+        print("結果不一致")
+        return 1
+    print(f"結果一致 / 速度比 {slowest_ratio:.1f}倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+product_app モジュールの読み込み時間 (python -X importtime) の比較
+
+変更前は監視・互換性チェック用のモジュール (disk_monitor, memory_manager, network_monitor,
+system_compatibility) と requests を product_app の読み込み時にまとめてインポートしていた。
+変更前の状態は product_app の読み込みに続けてそれらをインポートすることで再現し、
+現在の product_app だけを読み込む場合と、別プロセスで -X importtime の合計時間を比較する。
+
+使用例:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --repeat 10 --top 15
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+from synthetic_data import REPO_DIR
+
+# 変更後は起動時に読み込まれなくなったモジュール
+DEFERRED_MODULES = [
+    "requests",
+    "src.utils.disk_monitor",
+    "src.utils.memory_manager",
+    "src.utils.network_monitor",
+    "src.utils.system_compatibility",
+]
+
+
+def import_time(statement):
+    """別プロセスで statement を -X importtime 付きで実行し、(合計マイクロ秒, {モジュール名: 累積マイクロ秒}) を返す"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=REPO_DIR, env=env,
+                               stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True)
+    total, modules = 0, {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative_us)
+        if not name.startswith("  "):  # 最上位のインポートの累積時間を合計する
+            total += int(cumulative_us)
+    return total, modules
+
+
+def measure(statement, repeat):
+    return min((import_time(statement) for _ in range(repeat)), key=lambda r: r[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="product_app の読み込み時間の比較")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    parser.add_argument("--top", type=int, default=10, help="変更前に時間のかかっていたモジュールの表示数")
+    args = parser.parse_args()
+
+    legacy_statement = "import product_app" + "".join(f"; import {name}" for name in DEFERRED_MODULES)
+    legacy_total, legacy_modules = measure(legacy_statement, args.repeat)
+    current_total, current_modules = measure("import product_app", args.repeat)
+
+    print(f"変更前  {legacy_total / 1000:7.1f}ミリ秒")
+    print(f"変更後  {current_total / 1000:7.1f}ミリ秒")
+    print("起動時に読み込まれなくなったモジュール (変更前の累積時間):")
+    skipped = sorted((name for name in legacy_modules if name not in current_modules),
+                     key=lambda name: legacy_modules[name], reverse=True)
+    for name in skipped[:args.top]:
+        print(f"  {name:40s} {legacy_modules[name] / 1000:7.1f}ミリ秒")
+    # 変更後に新しく読み込まれるようになったモジュールが無いことを確認する
+    added = sorted(name for name in current_modules if name not in legacy_modules)
+    if added:
+        print(f"変更後にだけ読み込まれるモジュールがあります: {', '.join(added)}")
+        return 1
+    print(f"結果一致 / 速度比 {legacy_total / current_total:.1f}倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+起動時のマスター読み込みをスレッドプールとプロセスプールで実行した場合の所要時間の比較
+
+ProductApp._load_initial_data と同じローダーを同じ並列度で実行する (キャッシュは使わない)。
+プロセスプールは spawn で子プロセスを起動するため、子プロセスの起動時間も計測に含まれる。
+CSV 解析は GIL に縛られるため、複数コアの環境でのみプロセスプールが速くなる。
+
+使用例:
+    python benchmarks/bench_loader_pool.py
+    python benchmarks/bench_loader_pool.py --workers 4 --repeat 5
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import multiprocessing
+import concurrent.futures
+
+from synthetic_data import REPO_DIR
+
+from constants import (
+    CATEGORY_FILE_NAME, MATERIAL_SPEC_MASTER_FILE_NAME, R_GENRE_MASTER_FILE, Y_CATEGORY_MASTER_FILE,
+    YA_CATEGORY_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_HIERARCHY_COLUMN_DEFAULT,
+    MASTER_NAME_COLUMN_R_GENRE, MASTER_NAME_COLUMN_Y_CATEGORY, MASTER_NAME_COLUMN_YA_CATEGORY, MAX_WORKER_THREADS
+)
+from loaders import (
+    YSpecDefinitionLoader, RakutenAttributeDefinitionLoader, load_categories_from_csv,
+    load_material_spec_master, load_id_master_data, load_explanation_mark_icons, init_loader_process
+)
+
+TASKS = [
+    (load_categories_from_csv, (os.path.join(REPO_DIR, CATEGORY_FILE_NAME), None)),
+    (RakutenAttributeDefinitionLoader, (REPO_DIR, None)),
+    (load_id_master_data, (os.path.join(REPO_DIR, R_GENRE_MASTER_FILE), MASTER_ID_COLUMN_DEFAULT,
+                           MASTER_NAME_COLUMN_R_GENRE, MASTER_HIERARCHY_COLUMN_DEFAULT, None)),
+    (load_id_master_data, (os.path.join(REPO_DIR, Y_CATEGORY_MASTER_FILE), MASTER_ID_COLUMN_DEFAULT,
+                           MASTER_NAME_COLUMN_Y_CATEGORY, MASTER_HIERARCHY_COLUMN_DEFAULT, None)),
+    (load_id_master_data, (os.path.join(REPO_DIR, YA_CATEGORY_MASTER_FILE), MASTER_ID_COLUMN_DEFAULT,
+                           MASTER_NAME_COLUMN_YA_CATEGORY, MASTER_HIERARCHY_COLUMN_DEFAULT, None)),
+    (YSpecDefinitionLoader, (REPO_DIR, None)),
+    (load_material_spec_master, (os.path.join(REPO_DIR, MATERIAL_SPEC_MASTER_FILE_NAME), None)),
+    (load_explanation_mark_icons, (REPO_DIR, None)),
+]
+
+
+def comparable(result):
+    """ローダーのオブジェクトは読み込んだデータだけを比較する"""
+    if isinstance(result, YSpecDefinitionLoader):
+        return result.spec_definitions
+    if isinstance(result, RakutenAttributeDefinitionLoader):
+        return result.genre_definitions, result.recommended_values_map
+    return result
+
+
+def run(executor):
+    start = time.perf_counter()
+    with executor:
+        futures = [executor.submit(func, *args) for func, args in TASKS]
+        results = [comparable(f.result()) for f in futures]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="マスター読み込みのスレッドプールとプロセスプールの比較")
+    parser.add_argument("--workers", type=int, default=min(MAX_WORKER_THREADS, os.cpu_count() or 1),
+                        help="プロセスプールの子プロセス数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    mp_context = multiprocessing.get_context("spawn")
+    log_queue = mp_context.Queue()
+    print(f"CPU {os.cpu_count()}コア / 子プロセス {args.workers}")
+    expected, thread_time = min(
+        (run(concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS)) for _ in range(args.repeat)),
+        key=lambda r: r[1])
+    actual, process_time = min(
+        (run(concurrent.futures.ProcessPoolExecutor(max_workers=args.workers, mp_context=mp_context,
+                                                    initializer=init_loader_process,
+                                                    initargs=(log_queue, logging.WARNING)))
+         for _ in range(args.repeat)),
+        key=lambda r: r[1])
+    print(f"スレッドプール  {thread_time:7.3f}秒")
+    print(f"プロセスプール  {process_time:7.3f}秒")
+    if actual != expected:
+        print("結果が一致しません")
+        return 1
+    print(f"結果一致 / 速度比 {thread_time / process_time:.1f}倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+マスターCSVの解析とキャッシュ (master_cache) からの読み込みの速度比較
+
+起動時に読み込む Yahoo!スペック定義・楽天属性定義・IDマスター・カテゴリ・材質マスターを
+リポジトリ同梱の CSV から読み込む時間と、キャッシュから読み込む時間を計測する。
+
+使用例:
+    python benchmarks/bench_master_cache.py
+    python benchmarks/bench_master_cache.py --repeat 5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+
+from synthetic_data import REPO_DIR
+
+from constants import (
+    CATEGORY_FILE_NAME, MATERIAL_SPEC_MASTER_FILE_NAME, R_GENRE_MASTER_FILE, Y_CATEGORY_MASTER_FILE,
+    YA_CATEGORY_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_HIERARCHY_COLUMN_DEFAULT,
+    MASTER_NAME_COLUMN_R_GENRE, MASTER_NAME_COLUMN_Y_CATEGORY, MASTER_NAME_COLUMN_YA_CATEGORY
+)
+from loaders import (
+    YSpecDefinitionLoader, RakutenAttributeDefinitionLoader, load_categories_from_csv,
+    load_material_spec_master, load_id_master_data
+)
+
+
+def load_all(cache_dir):
+    """起動時と同じマスターを読み込み、比較用に解析結果をまとめて返す"""
+    start = time.perf_counter()
+    y_spec = YSpecDefinitionLoader(REPO_DIR, cache_dir=cache_dir)
+    rakuten = RakutenAttributeDefinitionLoader(REPO_DIR, cache_dir=cache_dir)
+    id_masters = [
+        load_id_master_data(os.path.join(REPO_DIR, file_name), MASTER_ID_COLUMN_DEFAULT, name_col,
+                            MASTER_HIERARCHY_COLUMN_DEFAULT, cache_dir=cache_dir)
+        for file_name, name_col in ((R_GENRE_MASTER_FILE, MASTER_NAME_COLUMN_R_GENRE),
+                                    (Y_CATEGORY_MASTER_FILE, MASTER_NAME_COLUMN_Y_CATEGORY),
+                                    (YA_CATEGORY_MASTER_FILE, MASTER_NAME_COLUMN_YA_CATEGORY))
+    ]
+    categories = load_categories_from_csv(os.path.join(REPO_DIR, CATEGORY_FILE_NAME), cache_dir=cache_dir)
+    material = load_material_spec_master(os.path.join(REPO_DIR, MATERIAL_SPEC_MASTER_FILE_NAME), cache_dir=cache_dir)
+    elapsed = time.perf_counter() - start
+    state = (y_spec.spec_definitions, rakuten.genre_definitions, rakuten.recommended_values_map,
+             id_masters, categories, material)
+    return state, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="マスターCSVの解析とキャッシュ読み込みの速度比較")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        expected, csv_time = min((load_all(None) for _ in range(args.repeat)), key=lambda r: r[1])
+        _state, first_time = load_all(cache_dir)  # 初回は CSV を解析してキャッシュを作成する
+        actual, cache_time = min((load_all(cache_dir) for _ in range(args.repeat)), key=lambda r: r[1])
+        print(f"CSV解析              {csv_time:7.3f}秒")
+        print(f"初回 (キャッシュ作成) {first_time:7.3f}秒")
+        print(f"キャッシュから読込   {cache_time:7.3f}秒")
+        if actual != expected:
+            print("結果が一致しません")
+            return 1
+        print(f"結果一致 / 速度比 {csv_time / cache_time:.1f}倍")
+        return 0
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
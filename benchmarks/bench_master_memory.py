@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+読み込んだマスターデータのメモリ使用量 (tracemalloc) の比較
+
+変更前は Yahoo!スペック定義の各スペック・選択肢、楽天属性定義、IDマスターの各行を dict で持ち、
+同じ文字列 (スペック名・選択肢名・入力方式など) も行ごとに別のオブジェクトだった。
+変更後はレコード (master_records) で持ち、文字列と同じ内容の選択肢・選択肢の並びを共有する。
+リポジトリ同梱のマスターを読み込み、読み込み後も保持されているメモリ量を比較する。
+
+使用例:
+    python benchmarks/bench_master_memory.py
+"""
+import os
+import gc
+import sys
+import csv
+import argparse
+import logging
+import tracemalloc
+
+from synthetic_data import REPO_DIR
+
+from constants import (
+    R_GENRE_MASTER_FILE, Y_CATEGORY_MASTER_FILE, YA_CATEGORY_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT,
+    MASTER_HIERARCHY_COLUMN_DEFAULT, MASTER_NAME_COLUMN_R_GENRE, MASTER_NAME_COLUMN_Y_CATEGORY,
+    MASTER_NAME_COLUMN_YA_CATEGORY, COL_GENRE_ID, COL_ITEM_NAME_JP, COL_ORDER, COL_UNIT_EXISTS,
+    COL_RECOMMENDED_UNIT_SOURCE, COL_INPUT_METHOD, COL_DEFINITION_GROUP, COL_MULTIPLE_SELECT_ENABLED,
+    COL_REQUIRED_OPTIONAL, EXCEPTIONALLY_MULTIPLE_FIELDS_COMMA_DELIMITED
+)
+from loaders import YSpecDefinitionLoader, RakutenAttributeDefinitionLoader, load_id_master_data
+from utils import open_csv_file_with_fallback, normalize_wave_dash
+
+ID_MASTERS = ((R_GENRE_MASTER_FILE, MASTER_NAME_COLUMN_R_GENRE),
+              (Y_CATEGORY_MASTER_FILE, MASTER_NAME_COLUMN_Y_CATEGORY),
+              (YA_CATEGORY_MASTER_FILE, MASTER_NAME_COLUMN_YA_CATEGORY))
+
+
+class LegacyYSpecLoader(YSpecDefinitionLoader):
+    """変更前の dict のスペック定義を作る比較用ローダー"""
+
+    def _build_spec_definitions(self, numbered_rows):
+        specs = {}  # {(category_id, spec_id): dict}
+        seen_value_ids = {}
+        for _row_num, row_dict_raw in numbered_rows:
+            row = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row_dict_raw.items()}
+            category_id, spec_id, spec_name = row.get("id"), row.get("spec_id"), row.get("spec_name")
+            try:
+                selection_type, data_type = int(row.get("selection_type")), int(row.get("data_type"))
+            except (TypeError, ValueError):
+                continue
+            if not category_id or not spec_id or not spec_name:
+                continue
+            key = (category_id, spec_id)
+            if key not in specs:
+                specs[key] = {"spec_id": spec_id, "spec_name": spec_name, "selection_type": selection_type,
+                              "data_type": data_type, "options": []}
+                seen_value_ids[key] = set()
+            value_id, value_name = row.get("spec_value_id"), row.get("spec_value_name")
+            if data_type == 1 and value_name and value_id and value_id not in seen_value_ids[key]:
+                seen_value_ids[key].add(value_id)
+                specs[key]["options"].append({"value_id": value_id, "value_name": value_name})
+        spec_definitions = {}
+        for (category_id, _), spec in specs.items():
+            spec_definitions.setdefault(category_id, []).append(spec)
+        for category_specs in spec_definitions.values():
+            category_specs.sort(key=lambda x: int(x["spec_id"]) if x["spec_id"].isdigit() else float('inf'))
+        return spec_definitions
+
+
+class LegacyRakutenLoader(RakutenAttributeDefinitionLoader):
+    """変更前の dict の属性定義を作る比較用ローダー"""
+
+    def _process_definition_row(self, row_data, source_info):
+        genre_id = row_data.get(COL_GENRE_ID, "")
+        item_name = row_data.get(COL_ITEM_NAME_JP, "")
+        order_str = row_data.get(COL_ORDER, "")
+        if not genre_id or not item_name or not order_str or not order_str.lstrip("-").isdigit():
+            return
+        unit_options_str = row_data.get(COL_RECOMMENDED_UNIT_SOURCE, "")
+        is_exceptionally_multiple = item_name in EXCEPTIONALLY_MULTIPLE_FIELDS_COMMA_DELIMITED
+        self.genre_definitions.setdefault(genre_id, []).append({
+            "name": item_name,
+            "order": int(order_str),
+            "unit_exists_raw": row_data.get(COL_UNIT_EXISTS, ""),
+            "unit_options_list": [opt.strip() for opt in unit_options_str.split('|') if opt.strip()] if unit_options_str else [],
+            "input_method": row_data.get(COL_INPUT_METHOD, ""),
+            "definition_group": row_data.get(COL_DEFINITION_GROUP, ""),
+            "options": [],
+            "is_multiple_select": row_data.get(COL_MULTIPLE_SELECT_ENABLED, "不可").strip() == "可",
+            "is_required": row_data.get(COL_REQUIRED_OPTIONAL, "任意").strip() == "必須",
+            "is_exceptionally_multiple": is_exceptionally_multiple,
+            "exception_delimiter": ',' if is_exceptionally_multiple else '|'
+        })
+
+
+def legacy_load_id_master_data(filepath, id_col_header, name_col_header, hierarchy_col_header):
+    entries = []
+    with open_csv_file_with_fallback(filepath) as (f, delimiter, _encoding_name):
+        for row in csv.DictReader(f, delimiter=delimiter):
+            item_id = row.get(id_col_header, "").strip()
+            item_hierarchy = normalize_wave_dash(row.get(hierarchy_col_header, "")).strip()
+            item_name = normalize_wave_dash(row.get(name_col_header, "")).strip() if name_col_header else ""
+            if item_id and item_hierarchy:
+                entries.append({'id': item_id, 'name': item_name, 'hierarchy': item_hierarchy})
+    return entries
+
+
+def load_legacy():
+    return {
+        "Yahoo!スペック定義": LegacyYSpecLoader(REPO_DIR).spec_definitions,
+        "楽天属性定義": LegacyRakutenLoader(REPO_DIR).genre_definitions,
+        "IDマスター": [legacy_load_id_master_data(os.path.join(REPO_DIR, file_name), MASTER_ID_COLUMN_DEFAULT,
+                                                  name_col, MASTER_HIERARCHY_COLUMN_DEFAULT)
+                       for file_name, name_col in ID_MASTERS],
+    }
+
+
+def load_current():
+    rakuten = RakutenAttributeDefinitionLoader(REPO_DIR)
+    return {
+        "Yahoo!スペック定義": YSpecDefinitionLoader(REPO_DIR).spec_definitions,
+        # ローダーが保持する共有用のプールも含めて計測する
+        "楽天属性定義": (rakuten.genre_definitions, rakuten._record_pool),
+        "IDマスター": [load_id_master_data(os.path.join(REPO_DIR, file_name), MASTER_ID_COLUMN_DEFAULT,
+                                           name_col, MASTER_HIERARCHY_COLUMN_DEFAULT)
+                       for file_name, name_col in ID_MASTERS],
+    }
+
+
+def as_plain(value):
+    """比較用にレコードを dict に、タプルをリストに変換する"""
+    if hasattr(value, "_asdict"):
+        return {key: as_plain(item) for key, item in value._asdict().items()}
+    if isinstance(value, dict):
+        return {key: as_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [as_plain(item) for item in value]
+    return value
+
+
+def retained_bytes(loader, name):
+    """loader() の結果のうち name の部分だけを保持した状態で、増えたメモリ量を返す"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = loader()[name]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="読み込んだマスターデータのメモリ使用量の比較")
+    parser.add_argument("--repeat", type=int, default=1, help="計測回数 (メモリ量は毎回ほぼ同じ)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    all_match, legacy_total, current_total = True, 0, 0
+    for name in ("Yahoo!スペック定義", "楽天属性定義", "IDマスター"):
+        legacy_size, legacy_data = min((retained_bytes(load_legacy, name) for _ in range(args.repeat)), key=lambda r: r[0])
+        current_size, current_data = min((retained_bytes(load_current, name) for _ in range(args.repeat)), key=lambda r: r[0])
+        if name == "楽天属性定義":
+            current_data = current_data[0]
+        match = as_plain(legacy_data) == as_plain(current_data)
+        all_match = all_match and match
+        legacy_total += legacy_size
+        current_total += current_size
+        print(f"{name:12s} 変更前 {legacy_size / 1024:8.0f} KiB / 変更後 {current_size / 1024:8.0f} KiB "
+              f"({current_size / legacy_size:.0%}){'' if match else ' 結果不一致'}")
+        del legacy_data, current_data
+
+    print(f"{'合計':12s} 変更前 {legacy_total / 1024:8.0f} KiB / 変更後 {current_total / 1024:8.0f} KiB")
+    if not all_match:
+        print("結果不一致")
+        return 1
+    print(f"結果一致 / 削減率 {1 - current_total / legacy_total:.0%} (使用量比 {legacy_total / current_total:.1f}倍)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
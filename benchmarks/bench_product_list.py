@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+商品リスト (画面左の商品一覧) の作成・再読み込み・絞り込み・商品コード参照の速度比較
+
+変更前は QListWidget に商品ごとの QListWidgetItem を追加し、再読み込みでは全項目を作り直していた。
+絞り込みは1文字入力するたびに全項目の表示文字列を normalize_text で正規化して setHidden し、
+商品コードは表示文字列 "[n] 商品コード - 商品名" を分割して取り出していた。
+変更後は ProductListView (ProductListModel + ProductListFilterModel) で、再読み込みは変わった行だけを更新し、
+絞り込みは行ごとに保存した正規化済みの表示文字列と比較し、商品コードはロールと対応表から引く。
+合成した一覧で、表示される商品・商品コードが一致することと時間を比較する。
+
+使用例:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_product_list.py              # 20,000商品
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_product_list.py --products 5000 --repeat 5
+"""
+import sys
+import time
+import argparse
+import functools
+import unicodedata
+
+from synthetic_data import product_code
+
+from PyQt5.QtWidgets import QApplication, QListWidget, QListWidgetItem
+
+from models import product_list_text, PRODUCT_LIST_CODE_ROLE
+from widgets import ProductListView
+
+QUERIES = ["てすと商品1234", "ﾀﾞｲﾆﾝｸﾞ", f"{product_code(4321)}", "[p] 10", "存在しない"]
+FRAME_SECONDS = 1 / 60
+
+
+@functools.lru_cache(maxsize=1000)
+def normalize_text_before(text):
+    """変更前の normalize_text (呼び出しごとに変換表を作る)"""
+    if text is None:
+        return ""
+    text_str = unicodedata.normalize('NFKC', str(text)).upper()
+    hiragana_to_katakana = str.maketrans(
+        'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん'
+        'ぁぃぅぇぉゃゅょっ',
+        'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン'
+        'ァィゥェォャュョッ'
+    )
+    return text_str.translate(hiragana_to_katakana)
+
+
+class ListWidgetBefore:
+    """変更前の商品リスト (QListWidget)"""
+
+    def __init__(self):
+        self.product_list = QListWidget()
+
+    def load(self, entries):
+        self.product_list.clear()
+        for code, name, control in entries:
+            self.product_list.addItem(QListWidgetItem(product_list_text(code, name, control)))
+
+    def filter(self, text):
+        norm_txt = normalize_text_before(text)
+        for i in range(self.product_list.count()):
+            item = self.product_list.item(i)
+            item.setHidden(norm_txt not in normalize_text_before(item.text()))
+
+    def find_row(self, code):
+        for i in range(self.product_list.count()):
+            item_txt = self.product_list.item(i).text()
+            if item_txt.split('] ')[1].split(" - ")[0].strip() == code:
+                return i
+        return -1
+
+    def visible_codes(self):
+        return [self.product_list.item(i).text().split('] ')[1].split(" - ")[0]
+                for i in range(self.product_list.count()) if not self.product_list.item(i).isHidden()]
+
+
+class ListViewAfter:
+    """変更後の商品リスト (ProductListView)"""
+
+    def __init__(self):
+        self.product_list = ProductListView()
+
+    def load(self, entries):
+        self.product_list.set_entries(entries)
+
+    def filter(self, text):
+        self.product_list.set_filter_text(text)
+
+    def find_row(self, code):
+        return self.product_list.list_model.row_of(code)
+
+    def visible_codes(self):
+        model = self.product_list.filter_model
+        return [model.mapToSource(model.index(i, 0)).data(PRODUCT_LIST_CODE_ROLE) for i in range(model.rowCount())]
+
+
+def timed(func, repeat=1):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def type_query(filter_func, query):
+    """検索語を1文字ずつ入力して消し、1文字あたりの最大時間と合計時間を返す"""
+    steps = [query[:i] for i in range(1, len(query) + 1)] + [query[:i] for i in range(len(query) - 1, -1, -1)]
+    worst, total = 0.0, 0.0
+    for step in steps:
+        start = time.perf_counter()
+        filter_func(step)
+        elapsed = time.perf_counter() - start
+        worst = max(worst, elapsed)
+        total += elapsed
+    return worst, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="商品リストの速度比較")
+    parser.add_argument("--products", type=int, default=20000, help="合成する商品数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    entries = [(product_code(i), f"テスト商品{i} 木製ダイニングチェア", "n" if i % 2 == 0 else "p") for i in range(args.products)]
+    # 保存後の再読み込み: 1商品の名前が変わり、1商品が追加された一覧
+    reloaded = list(entries)
+    reloaded[args.products // 2] = (reloaded[args.products // 2][0], "名前を変えた商品", "n")
+    reloaded.append((product_code(args.products), "追加した商品", "n"))
+
+    before, after = ListWidgetBefore(), ListViewAfter()
+    all_match = True
+    before_time = timed(lambda: before.load(entries))
+    after_time = timed(lambda: after.load(entries))
+    print(f"一覧の作成   {args.products}商品  変更前 {before_time * 1000:8.1f}ms / 変更後 {after_time * 1000:8.1f}ms")
+    before_reload = timed(lambda: (before.load(entries), before.load(reloaded)), args.repeat)
+    after_reload = timed(lambda: (after.load(entries), after.load(reloaded)), args.repeat)
+    print(f"再読み込み (1件変更・1件追加)x2  変更前 {before_reload * 1000:8.1f}ms / 変更後 {after_reload * 1000:8.1f}ms")
+
+    lookup_codes = [product_code(i) for i in range(0, args.products, max(1, args.products // 20))]
+    before_rows, after_rows = [], []
+    before_lookup = timed(lambda: before_rows.extend(before.find_row(code) for code in lookup_codes))
+    after_lookup = timed(lambda: after_rows.extend(after.find_row(code) for code in lookup_codes))
+    match = before_rows == after_rows
+    all_match = all_match and match
+    print(f"商品コードの参照 {len(lookup_codes)}件  変更前 {before_lookup * 1000:8.1f}ms / 変更後 {after_lookup * 1000:8.1f}ms"
+          f"{'' if match else ' 結果不一致'}")
+
+    before_total, after_total, after_worst = 0.0, 0.0, 0.0
+    for query in QUERIES:
+        for _ in range(args.repeat):
+            b_worst, b_total = type_query(before.filter, query)
+            a_worst, a_total = type_query(after.filter, query)
+            before_total += b_total
+            after_total += a_total
+            after_worst = max(after_worst, a_worst)
+        # 最後に検索語を入力した状態の表示商品を比較する
+        before.filter(query)
+        after.filter(query)
+        before_codes, after_codes = before.visible_codes(), after.visible_codes()
+        match = before_codes == after_codes
+        all_match = all_match and match
+        print(f"絞り込み {query:16s} {len(after_codes):6d}件  変更前 最大{b_worst * 1000:7.1f}ms / 変更後 最大{a_worst * 1000:7.1f}ms"
+              f"{'' if match else ' 結果不一致'}")
+    app.processEvents()
+    if not all_match:
+        print("結果不一致")
+        return 1
+    print(f"変更後の絞り込み1文字あたりの最大時間 {after_worst * 1000:.1f}ms (1フレーム {FRAME_SECONDS * 1000:.1f}ms)")
+    print(f"結果一致 / 速度比 (再読み込み) {before_reload / after_reload:.1f}倍 / (絞り込み) {before_total / after_total:.1f}倍")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
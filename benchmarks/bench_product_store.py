@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite サイドカーストア (product_store) からの読み込みと管理ファイルの解析の速度比較
+
+使用例:
+    python benchmarks/bench_product_store.py                  # 10,000商品 x 3SKU
+    python benchmarks/bench_product_store.py --products 2000 --repeat 5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from synthetic_data import generate_manage_file
+
+from product_repository import ProductRepository
+from product_store import ProductStore
+
+
+def load(path, store_path=None):
+    store = ProductStore(store_path) if store_path else None
+    repo = ProductRepository(path, store=store)
+    start = time.perf_counter()
+    repo.refresh()
+    elapsed = time.perf_counter() - start
+    state = (repo.main_table(), repo.sku_table())
+    repo.close_store()
+    return state, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="商品ストアと管理ファイルの読み込み速度比較")
+    parser.add_argument("--products", type=int, default=10000, help="合成する商品数")
+    parser.add_argument("--skus", type=int, default=3, help="商品あたりの SKU 数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "item_manage.xlsm")
+        store_path = os.path.join(temp_dir, "item_manage.sqlite3")
+        generate_manage_file(path, args.products, args.skus)
+        print(f"合成データ作成: {args.products}商品 x {args.skus}SKU ({os.path.getsize(path) / 1024 / 1024:.1f}MB)")
+
+        expected, file_time = min((load(path) for _ in range(args.repeat)), key=lambda r: r[1])
+        _state, snapshot_time = load(path, store_path)  # 初回はファイルを解析してストアを作成する
+        actual, store_time = min((load(path, store_path) for _ in range(args.repeat)), key=lambda r: r[1])
+        print(f"xlsm解析        {file_time:7.3f}秒")
+        print(f"初回 (ストア作成) {snapshot_time:7.3f}秒")
+        print(f"ストアから読込  {store_time:7.3f}秒")
+        if actual != expected:
+            print("結果が一致しません")
+            return 1
+        print(f"結果一致 / 速度比 {file_time / store_time:.1f}倍")
+        return 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
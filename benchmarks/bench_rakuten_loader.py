@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+RakutenAttributeDefinitionLoader の読み込み速度比較
+
+変更前の実装 (1行ごとにジャンルの項目一覧を並べ替え、推奨値の重複をリストで確認) と
+現在の実装 (全行を集めてから一度だけ並べ替え、推奨値は順序付き集合で重複確認) を、
+同梱の楽天属性定義書と、それを元に合成した大きな定義書・推奨値リストで比較する。
+
+使用例:
+    python benchmarks/bench_rakuten_loader.py                      # 合成データ 100,000行
+    python benchmarks/bench_rakuten_loader.py --rows 20000 --genre-size 200 --repeat 5
+"""
+import os
+import sys
+import csv
+import time
+import random
+import shutil
+import argparse
+import logging
+import tempfile
+
+from synthetic_data import REPO_DIR
+
+from constants import (
+    DEFINITION_CSV_FILE, RECOMMENDED_LIST_CSV_FILE, COL_GENRE_ID, COL_ORDER, COL_DEFINITION_GROUP,
+    COL_ITEM_NAME_JP, REC_COL_DEFINITION_GROUP, REC_COL_ITEM_NAME_JP, REC_COL_RECOMMENDED_VALUE
+)
+from loaders import RakutenAttributeDefinitionLoader
+from utils import open_csv_file_with_fallback
+
+
+class LegacyRakutenLoader(RakutenAttributeDefinitionLoader):
+    """変更前の読み込み方法を再現する比較用ローダー"""
+
+    def _process_definition_row(self, row_data, source_info):
+        genre_id = row_data.get(COL_GENRE_ID, "")
+        before = len(self.genre_definitions.get(genre_id, []))
+        super()._process_definition_row(row_data, source_info)
+        if len(self.genre_definitions.get(genre_id, [])) != before:
+            self.genre_definitions[genre_id].sort(key=lambda x: x.get("order", float('inf')))
+
+    def _parse_recommended_list_csv(self, filepath):
+        if not os.path.exists(filepath):
+            return True
+        with open_csv_file_with_fallback(filepath, 'r', None, "推奨値リスト") as (f, delimiter, _encoding_name):
+            for row_dict_raw in csv.DictReader(f, delimiter=delimiter):
+                row_data = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row_dict_raw.items()}
+                def_group = row_data.get(REC_COL_DEFINITION_GROUP)
+                item_name = row_data.get(REC_COL_ITEM_NAME_JP)
+                rec_value = row_data.get(REC_COL_RECOMMENDED_VALUE)
+                if def_group and item_name and rec_value:
+                    key = (def_group, item_name)
+                    if key not in self.recommended_values_map:
+                        self.recommended_values_map[key] = []
+                    if rec_value not in self.recommended_values_map[key]:
+                        self.recommended_values_map[key].append(rec_value)
+        return True
+
+
+def generate_definition_files(output_dir, rows, genre_size, values_per_item):
+    """同梱の定義書の行を元に、rows 行の定義書と推奨値リストを合成する"""
+    with open_csv_file_with_fallback(os.path.join(REPO_DIR, DEFINITION_CSV_FILE)) as (f, delimiter, _encoding_name):
+        reader = csv.DictReader(f, delimiter=delimiter)
+        fieldnames = reader.fieldnames
+        source_rows = list(reader)
+
+    rng = random.Random(0)
+    keys = sorted({(r[COL_DEFINITION_GROUP], r[COL_ITEM_NAME_JP]) for r in source_rows})
+    with open(os.path.join(output_dir, DEFINITION_CSV_FILE), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for index in range(rows):
+            row = dict(source_rows[index % len(source_rows)])
+            row[COL_GENRE_ID] = str(900000 + index // genre_size)
+            row[COL_ORDER] = str(rng.randrange(genre_size))
+            writer.writerow(row)
+
+    with open(os.path.join(output_dir, RECOMMENDED_LIST_CSV_FILE), "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([REC_COL_DEFINITION_GROUP, REC_COL_ITEM_NAME_JP, REC_COL_RECOMMENDED_VALUE])
+        for _ in range(rows):
+            def_group, item_name = rng.choice(keys)
+            writer.writerow([def_group, item_name, f"推奨値{rng.randrange(values_per_item)}"])
+
+
+def measure(loader_class, base_path, repeat):
+    best, loader = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader = loader_class(base_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return (loader.genre_definitions, loader.recommended_values_map), best
+
+
+def compare(label, base_path, repeat):
+    expected, legacy_time = measure(LegacyRakutenLoader, base_path, repeat)
+    actual, current_time = measure(RakutenAttributeDefinitionLoader, base_path, repeat)
+    print(f"{label}")
+    print(f"  変更前  {legacy_time:7.3f}秒")
+    print(f"  変更後  {current_time:7.3f}秒")
+    if actual != expected:
+        print("  結果が一致しません")
+        return False
+    print(f"  結果一致 / 速度比 {legacy_time / current_time:.1f}倍")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="楽天属性定義ローダーの読み込み速度比較")
+    parser.add_argument("--rows", type=int, default=100000, help="合成する定義書・推奨値リストの行数")
+    parser.add_argument("--genre-size", type=int, default=500, help="合成データの1ジャンルあたりの項目数")
+    parser.add_argument("--values-per-item", type=int, default=200, help="合成データの1項目あたりの推奨値の種類数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    ok = compare(f"同梱の定義書 ({DEFINITION_CSV_FILE})", REPO_DIR, args.repeat)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        generate_definition_files(temp_dir, args.rows, args.genre_size, args.values_per_item)
+        ok = compare(f"合成データ ({args.rows}行, 1ジャンル{args.genre_size}項目)", temp_dir, args.repeat) and ok
+    finally:
+        shutil.rmtree(temp_dir)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
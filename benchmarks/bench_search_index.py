@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+商品一覧の全項目検索 (検索パネルの検索範囲「商品一覧」) の速度比較
+
+変更前は検索のたびに全商品の Main 行を文字列化して全項目を照合していた。
+変更後は bigram 転置索引 (search_index) で検索語を含む可能性のある商品に絞り、空でないセルだけを照合する。
+合成した管理ファイルで、両方の結果 (商品コード・項目名の並び) が一致することと検索時間を比較する。
+
+使用例:
+    python benchmarks/bench_search_index.py                  # 10,000商品
+    python benchmarks/bench_search_index.py --products 2000 --repeat 5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from synthetic_data import generate_manage_file, product_code
+
+from product_repository import ProductRepository
+from search_index import ProductSearchIndex
+
+QUERIES = ["テスト商品1234", "商品99", "ダイニング", "チェア", f"{product_code(4321)}", "存在しない語", "p"]
+
+
+def search_full_scan(repo, search_text):
+    """変更前の SearchPanel.search_product_list と同じ照合 (大文字と小文字を区別しない)"""
+    search_lower = search_text.lower()
+    return [(code, field_name) for code, record in repo.iter_main_records()
+            for field_name, field_value in record.items()
+            if field_value and search_lower in str(field_value).lower()]
+
+
+def search_indexed(repo, index, search_text):
+    search_lower = search_text.lower()
+    return [(code, field_name) for code, fields in repo.iter_main_fields(index.candidates(search_text))
+            for field_name, field_value in fields
+            if search_lower in field_value.lower()]
+
+
+def timed(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="商品一覧の全項目検索の速度比較")
+    parser.add_argument("--products", type=int, default=10000, help="合成する商品数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "item_manage.xlsm")
+        index_path = os.path.join(temp_dir, "item_manage.search_index")
+        generate_manage_file(path, args.products, skus_per_product=1)
+        repo = ProductRepository(path)
+        repo.refresh()
+        print(f"合成データ作成: {args.products}商品 x {len(repo.main_headers)}項目")
+
+        index = ProductSearchIndex(index_path)
+        _result, build_time = timed(lambda: index.build(repo.iter_main_records(), repo.signature), 1)
+        index.save()
+        _result, load_time = timed(lambda: ProductSearchIndex(index_path).load(repo.signature), args.repeat)
+        print(f"索引作成 {build_time:7.3f}秒 / 保存した索引の読込 {load_time:7.3f}秒 "
+              f"({os.path.getsize(index_path) / 1024 / 1024:.1f}MB)")
+
+        all_match, scan_total, indexed_total = True, 0.0, 0.0
+        for query in QUERIES:
+            expected, scan_time = timed(lambda: search_full_scan(repo, query), args.repeat)
+            actual, indexed_time = timed(lambda: search_indexed(repo, index, query), args.repeat)
+            match = actual == expected
+            all_match = all_match and match
+            scan_total += scan_time
+            indexed_total += indexed_time
+            print(f"{query:16s} {len(expected):6d}件  全件走査 {scan_time * 1000:8.1f}ms / 索引 {indexed_time * 1000:8.1f}ms"
+                  f"{'' if match else ' 結果不一致'}")
+        if not all_match:
+            print("結果不一致")
+            return 1
+        print(f"結果一致 / 速度比 {scan_total / indexed_total:.1f}倍")
+        return 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
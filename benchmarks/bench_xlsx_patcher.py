@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+シート XML 直接書き換え (xlsx_patcher) と openpyxl の保存速度比較
+
+1商品の保存 (Main 行の更新と SKU 行の追加) を管理ファイルへ書き込む時間を計測し、
+保存後の内容が両方式で一致することを確認する。
+
+使用例:
+    python benchmarks/bench_xlsx_patcher.py                  # 10,000商品 x 3SKU
+    python benchmarks/bench_xlsx_patcher.py --products 2000 --repeat 5
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from synthetic_data import generate_manage_file, product_code
+
+from openpyxl import load_workbook
+
+from constants import HEADER_PRODUCT_NAME, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE
+from product_repository import ProductRepository
+from manage_writer import PersistenceJob, JOB_SAVE_PRODUCT, apply_jobs
+from xlsx_patcher import open_patch_workbook
+from xlsx_reader import open_workbook
+
+
+def make_job(repo: ProductRepository, code: str, round_no: int) -> PersistenceJob:
+    """既存商品の商品名を変更し、SKU を1行追加する保存ジョブ"""
+    record = repo.get_main_record(code)
+    record[HEADER_PRODUCT_NAME] = f"{record[HEADER_PRODUCT_NAME]} 改{round_no}"
+    sku_records = repo.get_sku_records(code)
+    sku_records.append({HEADER_PRODUCT_CODE_SKU: code, HEADER_SKU_CODE: f"{code}-{round_no}"})
+    return PersistenceJob(JOB_SAVE_PRODUCT, code=code, headers=repo.main_headers,
+                          main_values=[record.get(h, "") for h in repo.main_headers], sku_records=sku_records)
+
+
+def measure(label, open_func, path, code, repeat):
+    repo = ProductRepository(path)
+    repo.refresh()
+    timings = []
+    for round_no in range(repeat):
+        job = make_job(repo, code, round_no)
+        start = time.perf_counter()
+        wb = open_func(path)
+        layout_changed = apply_jobs(wb, repo, [job])
+        wb.save(path)
+        wb.close()
+        timings.append(time.perf_counter() - start)
+        if layout_changed:
+            repo.invalidate()
+        repo.refresh(force=True)
+    print(f"{label:<10} 最小 {min(timings):7.3f}秒  平均 {sum(timings) / len(timings):7.3f}秒")
+    return min(timings)
+
+
+def read_all(path):
+    with open_workbook(path) as wb:
+        return {name: list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="xlsx_patcher と openpyxl の保存速度比較")
+    parser.add_argument("--products", type=int, default=10000, help="合成する商品数")
+    parser.add_argument("--skus", type=int, default=3, help="商品あたりの SKU 数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    args = parser.parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        patch_path = os.path.join(temp_dir, "item_manage.xlsm")
+        openpyxl_path = os.path.join(temp_dir, "item_manage_openpyxl.xlsm")
+        start = time.perf_counter()
+        generate_manage_file(patch_path, args.products, args.skus)
+        shutil.copyfile(patch_path, openpyxl_path)
+        print(f"合成データ作成: {args.products}商品 x {args.skus}SKU "
+              f"({os.path.getsize(patch_path) / 1024 / 1024:.1f}MB, {time.perf_counter() - start:.1f}秒)")
+
+        code = product_code(args.products // 2)
+        openpyxl_time = measure("openpyxl", lambda p: load_workbook(p, keep_vba=True), openpyxl_path, code, args.repeat)
+        patch_time = measure("patch", open_patch_workbook, patch_path, code, args.repeat)
+        if read_all(patch_path) != read_all(openpyxl_path):
+            print("結果が一致しません")
+            return 1
+        print(f"結果一致 / 速度比 {openpyxl_time / patch_time:.1f}倍")
+        return 0
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
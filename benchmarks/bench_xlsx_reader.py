@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+軽量リーダー (xlsx_reader) と openpyxl の読み込み速度比較
+
+使用例:
+    python benchmarks/bench_xlsx_reader.py                  # 10,000商品 x 3SKU
+    python benchmarks/bench_xlsx_reader.py --products 2000 --repeat 5
+    python benchmarks/bench_xlsx_reader.py --file item_manage.xlsm   # 既存ファイルで計測
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from synthetic_data import generate_manage_file
+
+from openpyxl import load_workbook
+
+from xlsx_reader import open_workbook
+
+
+def read_all(open_func, path):
+    """全シートの値を読み込み、シート名→行リストを返す"""
+    wb = open_func(path)
+    try:
+        return {name: list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames}
+    finally:
+        wb.close()
+
+
+def measure(label, open_func, path, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = read_all(open_func, path)
+        timings.append(time.perf_counter() - start)
+    print(f"{label:<10} 最小 {min(timings):7.3f}秒  平均 {sum(timings) / len(timings):7.3f}秒")
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="xlsx_reader と openpyxl の読み込み速度比較")
+    parser.add_argument("--products", type=int, default=10000, help="合成する商品数")
+    parser.add_argument("--skus", type=int, default=3, help="商品あたりの SKU 数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument("--file", help="合成せずに計測する既存の .xlsm / .xlsx")
+    args = parser.parse_args()
+
+    temp_dir = None
+    path = args.file
+    if not path:
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, "item_manage.xlsm")
+        start = time.perf_counter()
+        generate_manage_file(path, args.products, args.skus)
+        print(f"合成データ作成: {args.products}商品 x {args.skus}SKU "
+              f"({os.path.getsize(path) / 1024 / 1024:.1f}MB, {time.perf_counter() - start:.1f}秒)")
+
+    try:
+        expected, openpyxl_time = measure("openpyxl", lambda p: load_workbook(p, read_only=True), path, args.repeat)
+        actual, streaming_time = measure("streaming", open_workbook, path, args.repeat)
+        if actual != expected:
+            print("結果が一致しません")
+            return 1
+        print(f"結果一致 / 速度比 {openpyxl_time / streaming_time:.1f}倍")
+        return 0
+    finally:
+        if temp_dir:
+            os.unlink(path)
+            os.rmdir(temp_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
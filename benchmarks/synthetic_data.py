@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成データ生成
+
+item_template.xlsm のヘッダーに合わせて、指定件数の商品と SKU を持つ
+管理ファイル (item_manage.xlsm 相当) を作成する。
+"""
+import os
+import sys
+
+# リポジトリ直下のモジュールをインポートできるようにパスを追加
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from openpyxl import load_workbook
+
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, TEMPLATE_FILE_NAME, HEADER_MYCODE, HEADER_PRODUCT_NAME,
+    HEADER_CONTROL_COLUMN, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE, HEADER_CHOICE_NAME
+)
+
+TEMPLATE_PATH = os.path.join(REPO_DIR, TEMPLATE_FILE_NAME)
+
+
+def product_code(index: int) -> str:
+    return f"{1000000000 + index * 1000:010d}"
+
+
+def generate_manage_file(output_path: str, products: int = 10000, skus_per_product: int = 3,
+                         template_path: str = TEMPLATE_PATH) -> str:
+    """テンプレートをもとに合成の管理ファイルを作成し、そのパスを返す"""
+    wb = load_workbook(template_path, keep_vba=True)
+    ws_main = wb[MAIN_SHEET_NAME]
+    main_headers = [c.value for c in ws_main[1]]
+    for i in range(products):
+        values = {
+            HEADER_MYCODE: product_code(i),
+            HEADER_CONTROL_COLUMN: "n" if i % 2 == 0 else "p",
+            HEADER_PRODUCT_NAME: f"テスト商品{i} 木製ダイニングチェア",
+        }
+        ws_main.append([values.get(h) for h in main_headers])
+
+    ws_sku = wb[SKU_SHEET_NAME]
+    sku_headers = [c.value for c in ws_sku[1]]
+    for i in range(products):
+        code = product_code(i)
+        for j in range(skus_per_product):
+            values = {
+                HEADER_PRODUCT_CODE_SKU: code,
+                HEADER_SKU_CODE: code[:-3] + f"{(j + 1) * 10:03d}",
+                HEADER_CHOICE_NAME: f"カラー{j}",
+            }
+            ws_sku.append([values.get(h) for h in sku_headers])
+    wb.save(output_path)
+    wb.close()
+    return output_path
@@ -10,6 +10,10 @@ APP_DATA_SUBDIR = "ProductAppUserData"
 TEMPLATE_FILE_NAME = "item_template.xlsm"
 CATEGORY_FILE_NAME = "カテゴリ.csv"
 MANAGE_FILE_NAME = "item_manage.xlsm"
+MANAGE_STORE_FILE_NAME = "item_manage.sqlite3"  # 管理ファイルの SQLite サイドカー (任意)
+MANAGE_SEARCH_INDEX_FILE_NAME = "item_manage.search_index"  # 商品一覧の全文検索索引
+MASTER_CACHE_DIR_NAME = "master_cache"  # マスターCSVの解析結果キャッシュ
+STARTUP_TRACE_FILE_NAME = "startup_trace.json"  # 前回起動時の処理ごとの所要時間 (Chrome トレース形式)
 OUTPUT_FILE_NAME = "item.xlsm"
 MATERIAL_SPEC_MASTER_FILE_NAME = "材質・仕様マスタ.csv"
 
@@ -20,7 +24,7 @@ FALLBACK_ENCODING = "shift_jis"
 # UI設定
 AUTO_SAVE_INTERVAL_MS = 30000
 FROZEN_TABLE_COLUMN_COUNT = 2
-PROGRESS_UPDATE_ROW_INTERVAL = 100
+LOADING_DIALOG_REFRESH_MS = 50  # 起動時の進捗ダイアログの更新間隔 (約20fps)
 
 # 処理設定
 MAX_WORKER_THREADS = 5
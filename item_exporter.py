@@ -0,0 +1,118 @@
+"""
+商品登録入力ツール - item.xlsm 出力モジュール
+
+save_to_excel で既にメモリ上にある Main / SKU の行データから、
+コントロールカラムが 'n' の商品だけを C# ツール用の item.xlsm に書き出す。
+管理ファイルを再度開き直さずに出力できる。
+"""
+import logging
+from shutil import copyfile
+from typing import List, Tuple, Sequence, Optional
+
+from openpyxl import load_workbook
+
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, OUTPUT_FILE_NAME,
+    HEADER_CONTROL_COLUMN, HEADER_MYCODE, HEADER_PRODUCT_CODE_SKU
+)
+
+
+def _header_row(ws) -> List[str]:
+    if ws.max_row < 1:
+        return []
+    first_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    return [str(h).strip() if h is not None else "" for h in first_row]
+
+
+def _reorder(row: Sequence, column_mapping: List[Tuple[int, int]], width: int) -> list:
+    reordered = [""] * width
+    for output_idx, source_idx in column_mapping:
+        if source_idx < len(row):
+            reordered[output_idx] = row[source_idx]
+    return reordered
+
+
+def _column_mapping(output_headers: List[str], source_headers: List[str]) -> List[Tuple[int, int]]:
+    source_index = {}
+    for idx, header in enumerate(source_headers):
+        source_index.setdefault(header, idx)
+    return [(i, source_index[h]) for i, h in enumerate(output_headers) if h in source_index]
+
+
+def build_export_rows(main_table: List[Sequence], sku_table: List[Sequence],
+                      main_template_headers: List[str], sku_template_headers: List[str]) -> Tuple[List[list], List[list], List[str]]:
+    """
+    管理ファイルの行データ (先頭行がヘッダー) から item.xlsm に書き出す行を作る。
+    戻り値は (Main出力行, SKU出力行, 警告メッセージのリスト)。出力行の先頭はヘッダー行。
+    """
+    warnings = []
+    main_out: List[list] = []
+    sku_out: List[list] = []
+    n_mycodes = set()
+
+    if main_table:
+        manage_headers = [str(h).strip() if h is not None else "" for h in main_table[0]]
+        output_headers = main_template_headers or manage_headers
+        main_out.append(list(output_headers))
+        mapping = _column_mapping(output_headers, manage_headers)
+        ctrl_idx = manage_headers.index(HEADER_CONTROL_COLUMN) if HEADER_CONTROL_COLUMN in manage_headers else -1
+        mycode_idx = manage_headers.index(HEADER_MYCODE) if HEADER_MYCODE in manage_headers else -1
+        if ctrl_idx != -1 and mycode_idx != -1:
+            for row in main_table[1:]:
+                if ctrl_idx < len(row) and str(row[ctrl_idx]).strip().lower() == "n":
+                    main_out.append(_reorder(row, mapping, len(output_headers)))
+                    if mycode_idx < len(row) and row[mycode_idx] is not None:
+                        n_mycodes.add(str(row[mycode_idx]).strip())
+        else:
+            warnings.append(f"'{OUTPUT_FILE_NAME}' へのMainデータ書き出し時、'{HEADER_CONTROL_COLUMN}' または '{HEADER_MYCODE}' 列が見つかりません。")
+
+    if sku_table:
+        manage_sku_headers = [str(h).strip() if h is not None else "" for h in sku_table[0]]
+        sku_output_headers = sku_template_headers or manage_sku_headers
+        sku_out.append(list(sku_output_headers))
+        sku_mapping = _column_mapping(sku_output_headers, manage_sku_headers)
+        prod_code_idx = manage_sku_headers.index(HEADER_PRODUCT_CODE_SKU) if HEADER_PRODUCT_CODE_SKU in manage_sku_headers else -1
+        if prod_code_idx != -1:
+            for row in sku_table[1:]:
+                if prod_code_idx < len(row) and row[prod_code_idx] is not None and str(row[prod_code_idx]).strip() in n_mycodes:
+                    sku_out.append(_reorder(row, sku_mapping, len(sku_output_headers)))
+        else:
+            warnings.append(f"'{OUTPUT_FILE_NAME}' へのSKUデータ書き出し時、「{HEADER_PRODUCT_CODE_SKU}」列が見つかりません。")
+
+    return main_out, sku_out, warnings
+
+
+def export_item_xlsm(template_path: str, output_path: str,
+                     main_table: List[Sequence], sku_table: List[Sequence],
+                     main_template_headers: Optional[List[str]] = None,
+                     sku_template_headers: Optional[List[str]] = None) -> List[str]:
+    """
+    テンプレートをコピーして item.xlsm を作成し、'n' の商品とその SKU を書き出す。
+    テンプレートのヘッダーが渡された場合 (template_metadata のキャッシュ) はコピーから読み直さない。
+    警告メッセージのリストを返す。ファイル操作の例外は呼び出し元へ送出する。
+    """
+    copyfile(template_path, output_path)
+    wb_item = load_workbook(output_path, keep_vba=True)
+    try:
+        ws_main = wb_item[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb_item.sheetnames else wb_item.create_sheet(MAIN_SHEET_NAME)
+        ws_sku = wb_item[SKU_SHEET_NAME] if SKU_SHEET_NAME in wb_item.sheetnames else wb_item.create_sheet(SKU_SHEET_NAME)
+
+        if main_template_headers is None:
+            main_template_headers = _header_row(ws_main)
+        if sku_template_headers is None:
+            sku_template_headers = _header_row(ws_sku)
+        main_out, sku_out, warnings = build_export_rows(main_table, sku_table, main_template_headers, sku_template_headers)
+
+        ws_main.delete_rows(1, ws_main.max_row + 1)
+        for row in main_out:
+            ws_main.append(row)
+        ws_sku.delete_rows(1, ws_sku.max_row + 1)
+        for row in sku_out:
+            ws_sku.append(row)
+
+        logging.info(f"出力ファイル '{output_path}' への保存を試みます。(Main {max(len(main_out) - 1, 0)}件, SKU {max(len(sku_out) - 1, 0)}件)")
+        wb_item.save(output_path)
+        logging.info(f"出力ファイル '{output_path}' の保存が完了しました。")
+    finally:
+        wb_item.close()
+    return warnings
@@ -0,0 +1,60 @@
+"""
+商品登録入力ツール - 任意モジュールの遅延インポートモジュール
+
+更新確認・ディスク/メモリ/ネットワーク監視・システム互換性チェックなどの補助モジュールは
+読み込みに時間がかかる (requests や psutil を読み込む) うえ、起動直後には使わない。
+LazyImport はモジュールの属性の代わりに置いておき、最初に呼び出された
+(または真偽値を確認された) 時点でモジュールをインポートする。
+モジュールが無い・インポートに失敗した場合は None と同じように偽として扱う
+(従来の「インポートに失敗したら None」と同じ使い方ができる)。
+"""
+import logging
+import importlib
+import threading
+from typing import Any
+
+_UNRESOLVED = object()
+
+
+class LazyImport:
+    """モジュールの属性を初回使用時にインポートする代理オブジェクト"""
+
+    def __init__(self, module_name: str, attr_name: str):
+        self.module_name = module_name
+        self.attr_name = attr_name
+        self._value: Any = _UNRESOLVED
+        self._lock = threading.Lock()
+
+    @property
+    def resolved(self) -> bool:
+        """既にインポート済み (またはインポートに失敗済み) かどうか"""
+        return self._value is not _UNRESOLVED
+
+    def resolve(self) -> Any:
+        """属性の実体を返す。インポートできない場合は None"""
+        if self._value is _UNRESOLVED:
+            with self._lock:
+                if self._value is _UNRESOLVED:
+                    try:
+                        module = importlib.import_module(self.module_name)
+                        self._value = getattr(module, self.attr_name)
+                    except (ImportError, AttributeError) as e:
+                        logging.warning(f"{self.module_name}.{self.attr_name} を読み込めないため、この機能は利用できません: {e}")
+                        self._value = None
+        return self._value
+
+    def __bool__(self) -> bool:
+        return self.resolve() is not None
+
+    def __call__(self, *args, **kwargs):
+        target = self.resolve()
+        if target is None:
+            raise ImportError(f"{self.module_name}.{self.attr_name} を読み込めません")
+        return target(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        state = "未読み込み" if not self.resolved else repr(self._value)
+        return f"<LazyImport {self.module_name}.{self.attr_name}: {state}>"
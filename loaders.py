@@ -1,19 +1,20 @@
 """
 商品登録入力ツール - データローダーモジュール
 """
+import io
 import os
 import sys
 import csv
 import re
 import logging
+import logging.handlers
 from typing import Optional, List, Dict, Tuple
-from PyQt5.QtWidgets import QApplication, QDialog
 
 
 from constants import (
     YSPEC_CSV_FILE, YSPEC_COL_CATEGORY_ID, YSPEC_COL_SPEC_ID, YSPEC_COL_SPEC_NAME,
     YSPEC_COL_SPEC_VALUE_NAME, YSPEC_COL_SPEC_VALUE_ID, YSPEC_COL_SELECTION_TYPE,
-    YSPEC_COL_DATA_TYPE, DEFAULT_ENCODING, PROGRESS_UPDATE_ROW_INTERVAL,
+    YSPEC_COL_DATA_TYPE, DEFAULT_ENCODING,
     COL_GENRE_ID, COL_ITEM_NAME_JP, COL_ORDER, COL_UNIT_EXISTS,
     COL_RECOMMENDED_UNIT_SOURCE, COL_INPUT_METHOD, COL_DEFINITION_GROUP,
     COL_MULTIPLE_SELECT_ENABLED, COL_REQUIRED_OPTIONAL, REC_COL_DEFINITION_GROUP,
@@ -22,91 +23,140 @@ from constants import (
     MASTER_MATERIAL_SPEC_DESC_COL, MATERIAL_SPEC_MASTER_FILE_NAME,
     EXPLANATION_MARK_ICONS_SUBDIR, MASTER_ID_COLUMN_DEFAULT, MASTER_HIERARCHY_COLUMN_DEFAULT
 )
-from utils import open_csv_file_with_fallback, normalize_wave_dash
+from utils import open_csv_file_with_fallback, decode_csv_bytes, normalize_wave_dash, ProgressChannel
+from master_cache import MasterCacheEntry
+from master_records import (
+    RecordPool, YSpecOption, YSpecDefinition, RakutenAttributeDetail, IdMasterEntry,
+    records_to_cache, records_from_cache, spec_definitions_to_cache, spec_definitions_from_cache
+)
+
+
+def init_loader_process(log_queue, log_level) -> None:
+    """
+    マスター読み込み用の子プロセスの初期化 (ProcessPoolExecutor の initializer)。
+    子プロセスのログはキュー経由で親プロセスのログハンドラーへ送る。
+    子プロセスでは進捗ダイアログを渡さないため、ローダーは Qt を読み込まずに動作する。
+    """
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root_logger.setLevel(log_level)
 
 
 class YSpecDefinitionLoader:
-    """Yahoo!スペック定義を読み込むクラス"""
+    """
+    Yahoo!スペック定義を読み込むクラス
+
+    lazy=True の場合は起動時に全カテゴリを解析せず、カテゴリIDごとの行のバイト位置の索引だけを作る。
+    get_specs_for_category で要求されたカテゴリの行だけをその場で解析し、結果を保持する。
+    (定義書はカテゴリ順に並んでいるとは限らないため、索引はカテゴリごとに複数の範囲を持つ)
+    """
     
-    def __init__(self, base_path, progress_dialog=None):
+    def __init__(self, base_path, progress=None, cache_dir=None, lazy=False):
         self.base_path = base_path
-        self.progress_dialog = progress_dialog
-        self.spec_definitions = {}  # {category_id: [{spec_id: ..., spec_name: ..., options: [...], selection_type: ..., data_type: ...}, ...]}
+        self.progress = progress
+        self.cache_dir = cache_dir  # 解析結果キャッシュの保存先 (None の場合はキャッシュしない)
+        self.lazy = lazy
+        self.spec_definitions = {}  # {category_id: [YSpecDefinition(spec_id, spec_name, selection_type, data_type, options), ...]}
+        self._index = None  # lazy の場合: {"encoding", "delimiter", "fieldnames", "ranges": {category_id: [(開始位置, 終了位置, 開始行番号), ...]}}
+        self._index_signature = None  # 索引を作成した時点の定義書の (更新日時, サイズ)
         self._load_spec_data()
 
+    def _required_columns_present(self, fieldnames, filepath, encoding_name):
+        required_cols = [
+            YSPEC_COL_CATEGORY_ID, YSPEC_COL_SPEC_ID, YSPEC_COL_SPEC_NAME,
+            YSPEC_COL_SELECTION_TYPE, YSPEC_COL_DATA_TYPE
+        ]
+        if not fieldnames or not all(col in fieldnames for col in required_cols):
+            encoding_label = f" ({encoding_name})" if encoding_name != DEFAULT_ENCODING else ""
+            logging.warning(f"Yahoo!スペック定義書 '{filepath}'{encoding_label} に必須ヘッダーが見つかりません。不足: {[h for h in required_cols if h not in (fieldnames or [])]}")
+            return False
+        return True
+
+    def _build_spec_definitions(self, numbered_rows):
+        """
+        定義書の (行番号, DictReader の行) の並びからカテゴリごとのスペック定義を作る。
+        選択肢の重複は spec ごとの value_id の集合で確認する。
+        文字列は intern し、同じ内容の選択肢・選択肢の並びはカテゴリをまたいで共有する。
+        """
+        temp_specs_by_cat_and_spec_id = {}  # {(category_id, spec_id): [spec_id, spec_name, selection_type, data_type, options]}
+        seen_value_ids = {}  # {(category_id, spec_id): {value_id, ...}}
+        pool = RecordPool()
+
+        for row_num, row_dict_raw in numbered_rows:
+            row_data = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row_dict_raw.items()}
+
+            category_id = row_data.get(YSPEC_COL_CATEGORY_ID)
+            spec_id = row_data.get(YSPEC_COL_SPEC_ID)
+            spec_name = row_data.get(YSPEC_COL_SPEC_NAME)
+            selection_type_str = row_data.get(YSPEC_COL_SELECTION_TYPE)
+            data_type_str = row_data.get(YSPEC_COL_DATA_TYPE)
+            spec_value_name = row_data.get(YSPEC_COL_SPEC_VALUE_NAME)
+            spec_value_id = row_data.get(YSPEC_COL_SPEC_VALUE_ID)
+
+            if not category_id or not spec_id or not spec_name or not selection_type_str or not data_type_str:
+                logging.warning(f"Yahoo!スペック定義書 行 {row_num}: 必須情報 (カテゴリID, specID, spec名, selection_type, data_type) が不足しています。スキップします。")
+                continue
+
+            try:
+                selection_type = int(selection_type_str)
+                data_type = int(data_type_str)
+            except ValueError:
+                logging.warning(f"Yahoo!スペック定義書 行 {row_num}: selection_typeまたはdata_typeが数値ではありません。スキップします。")
+                continue
+
+            current_spec_key = (category_id, spec_id)
+
+            if current_spec_key not in temp_specs_by_cat_and_spec_id:
+                temp_specs_by_cat_and_spec_id[current_spec_key] = [
+                    sys.intern(spec_id), sys.intern(spec_name), selection_type, data_type,
+                    []  # [YSpecOption, ...]
+                ]
+                seen_value_ids[current_spec_key] = set()
+            
+            # data_type が 1 (テキスト選択) の場合のみ、選択肢を追加
+            if data_type == 1 and spec_value_name and spec_value_id:
+                # 既に同じspec_value_idの選択肢がないか確認
+                if spec_value_id not in seen_value_ids[current_spec_key]:
+                    seen_value_ids[current_spec_key].add(spec_value_id)
+                    temp_specs_by_cat_and_spec_id[current_spec_key][4].append(pool.share(
+                        YSpecOption(sys.intern(spec_value_id), sys.intern(spec_value_name))
+                    ))
+            
+        
+        # temp_specs_by_cat_and_spec_id からカテゴリごとの一覧に再構成
+        # (キーが (カテゴリID, specID) のため、同じカテゴリ内で spec_id が重複することはない)
+        spec_definitions = {}
+        for (cat_id, _), (spec_id, spec_name, selection_type, data_type, options) in temp_specs_by_cat_and_spec_id.items():
+            if cat_id not in spec_definitions:
+                spec_definitions[cat_id] = []
+            spec_definitions[cat_id].append(
+                YSpecDefinition(spec_id, spec_name, selection_type, data_type, pool.share_tuple(options))
+            )
+        
+        # 各カテゴリのスペックリストを spec_id の昇順でソート
+        for cat_id in spec_definitions:
+            spec_definitions[cat_id].sort(key=lambda x: int(x["spec_id"]) if x["spec_id"].isdigit() else float('inf'))
+        return spec_definitions
+
     def _load_spec_data(self):
         filepath = os.path.join(self.base_path, YSPEC_CSV_FILE)
+        if self.lazy:
+            self._load_index(filepath)
+            return
+        cache = MasterCacheEntry(self.cache_dir, "y_spec_definitions", [filepath])
+        cached = cache.load()
+        if cached is not None:
+            self.spec_definitions = spec_definitions_from_cache(cached)
+            logging.info(f"{len(self.spec_definitions)}カテゴリのYahoo!スペック項目定義をキャッシュから読み込みました。")
+            return
         try:
-            with open_csv_file_with_fallback(filepath, 'r', self.progress_dialog, "Yahoo!スペック定義") as (f, delimiter, encoding_name):
+            with open_csv_file_with_fallback(filepath, 'r', self.progress, "Yahoo!スペック定義") as (f, delimiter, encoding_name):
                 reader = csv.DictReader(f, delimiter=delimiter)
-                required_cols = [
-                    YSPEC_COL_CATEGORY_ID, YSPEC_COL_SPEC_ID, YSPEC_COL_SPEC_NAME,
-                    YSPEC_COL_SELECTION_TYPE, YSPEC_COL_DATA_TYPE
-                ]
-
-                if not reader.fieldnames or not all(col in reader.fieldnames for col in required_cols):
-                    encoding_label = f" ({encoding_name})" if encoding_name != DEFAULT_ENCODING else ""
-                    logging.warning(f"Yahoo!スペック定義書 '{filepath}'{encoding_label} に必須ヘッダーが見つかりません。不足: {[h for h in required_cols if h not in (reader.fieldnames or [])]}")
+                if not self._required_columns_present(reader.fieldnames, filepath, encoding_name):
                     return
-
-                temp_specs_by_cat_and_spec_id = {}  # {(category_id, spec_id): spec_detail}
-
-                for row_num, row_dict_raw in enumerate(reader, start=2):
-                    row_data = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row_dict_raw.items()}
-
-                    category_id = row_data.get(YSPEC_COL_CATEGORY_ID)
-                    spec_id = row_data.get(YSPEC_COL_SPEC_ID)
-                    spec_name = row_data.get(YSPEC_COL_SPEC_NAME)
-                    selection_type_str = row_data.get(YSPEC_COL_SELECTION_TYPE)
-                    data_type_str = row_data.get(YSPEC_COL_DATA_TYPE)
-                    spec_value_name = row_data.get(YSPEC_COL_SPEC_VALUE_NAME)
-                    spec_value_id = row_data.get(YSPEC_COL_SPEC_VALUE_ID)
-
-                    if not category_id or not spec_id or not spec_name or not selection_type_str or not data_type_str:
-                        logging.warning(f"Yahoo!スペック定義書 行 {row_num}: 必須情報 (カテゴリID, specID, spec名, selection_type, data_type) が不足しています。スキップします。")
-                        continue
-
-                    try:
-                        selection_type = int(selection_type_str)
-                        data_type = int(data_type_str)
-                    except ValueError:
-                        logging.warning(f"Yahoo!スペック定義書 行 {row_num}: selection_typeまたはdata_typeが数値ではありません。スキップします。")
-                        continue
-
-                    current_spec_key = (category_id, spec_id)
-
-                    if current_spec_key not in temp_specs_by_cat_and_spec_id:
-                        temp_specs_by_cat_and_spec_id[current_spec_key] = {
-                            "spec_id": spec_id,
-                            "spec_name": spec_name,
-                            "selection_type": selection_type,
-                            "data_type": data_type,
-                            "options": []  # { "value_id": ..., "value_name": ... }
-                        }
-                    
-                    # data_type が 1 (テキスト選択) の場合のみ、選択肢を追加
-                    if data_type == 1 and spec_value_name and spec_value_id:
-                        # 既に同じspec_value_idの選択肢がないか確認
-                        if not any(opt["value_id"] == spec_value_id for opt in temp_specs_by_cat_and_spec_id[current_spec_key]["options"]):
-                            temp_specs_by_cat_and_spec_id[current_spec_key]["options"].append({
-                                "value_id": spec_value_id,
-                                "value_name": spec_value_name
-                            })
-                    
-                    if reader.line_num % (PROGRESS_UPDATE_ROW_INTERVAL * 4) == 0 and self.progress_dialog:
-                        QApplication.processEvents()
-                
-                # temp_specs_by_cat_and_spec_id から self.spec_definitions に再構成
-                for (cat_id, _), spec_detail in temp_specs_by_cat_and_spec_id.items():
-                    if cat_id not in self.spec_definitions:
-                        self.spec_definitions[cat_id] = []
-                    # spec_id の重複を避けるため (既に同じspec_idの項目がなければ追加)
-                    if not any(s["spec_id"] == spec_detail["spec_id"] for s in self.spec_definitions[cat_id]):
-                        self.spec_definitions[cat_id].append(spec_detail)
-                
-                # 各カテゴリのスペックリストを spec_id の昇順でソート
-                for cat_id in self.spec_definitions:
-                    self.spec_definitions[cat_id].sort(key=lambda x: int(x["spec_id"]) if x["spec_id"].isdigit() else float('inf'))
+                self.spec_definitions = self._build_spec_definitions(enumerate(reader, start=2))
+            if self.spec_definitions and cache.enabled:
+                cache.store(spec_definitions_to_cache(self.spec_definitions))
 
         except FileNotFoundError:
             return
@@ -129,26 +179,139 @@ class YSpecDefinitionLoader:
         else:
             logging.warning(f"Yahoo!スペック定義書から有効なデータが読み込まれませんでした。")
 
+    def _load_index(self, filepath):
+        """カテゴリIDごとの行のバイト位置の索引を作る (キャッシュがあればそれを使う)"""
+        self._index = None
+        self.spec_definitions = {}
+        cache = MasterCacheEntry(self.cache_dir, "y_spec_index", [filepath])
+        signature = cache.source_signatures[0]  # 索引作成前の状態 (作成中に変わった場合は次回の確認で作り直す)
+        index = cache.load()
+        if index is None:
+            try:
+                index = self._build_index(filepath)
+            except FileNotFoundError:
+                logging.warning(f"Yahoo!スペック定義書 '{filepath}' が見つかりません。")
+                return
+            except UnicodeDecodeError as e:
+                logging.error(f"エンコーディングエラー '{filepath}': {e}", exc_info=True)
+                return
+            except (OSError, csv.Error) as e:
+                logging.error(f"Yahoo!スペック定義書 '{filepath}' の索引作成中にエラーが発生しました: {e}", exc_info=True)
+                return
+            if index is None:
+                return
+            cache.store(index)
+        self._index = index
+        self._index_signature = signature
+        logging.info(f"Yahoo!スペック定義書の索引を作成しました ({len(index['ranges'])}カテゴリ)。スペック項目は選択されたカテゴリごとに読み込みます。")
+
+    def _build_index(self, filepath):
+        """定義書を1回走査し、カテゴリIDごとに連続する行のバイト範囲をまとめる"""
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        # 文字コードの判定 (ファイル全体をデコードできることも確認する)
+        _text, encoding_name = decode_csv_bytes(data, filepath, "Yahoo!スペック定義書")
+
+        lines = data.splitlines(keepends=True)
+        if not lines:
+            logging.warning(f"Yahoo!スペック定義書から有効なデータが読み込まれませんでした。")
+            return None
+        header_line = lines[0].decode(encoding_name)
+        delimiter = '\t' if '\t' in header_line and ',' not in header_line else ','
+        fieldnames = next(csv.reader([header_line], delimiter=delimiter), [])
+        if not self._required_columns_present(fieldnames, filepath, encoding_name):
+            return None
+        category_col = fieldnames.index(YSPEC_COL_CATEGORY_ID)
+        delimiter_bytes = delimiter.encode('ascii')
+
+        ranges = {}  # {category_id: [(開始位置, 終了位置, 開始行番号), ...]}
+        current_id, range_start, range_line = None, None, None
+        position = len(lines[0])
+        for line_no, line in enumerate(lines[1:], start=2):
+            if b'"' in line:
+                # 引用符を含む行はバイト列の分割では列を正しく取り出せないため csv で解析する
+                fields = next(csv.reader([line.decode(encoding_name)], delimiter=delimiter), [])
+                category_id = fields[category_col].strip() if len(fields) > category_col else ""
+            else:
+                # 区切り文字と改行は Shift_JIS の2バイト目にも UTF-8 の途中にも現れないため、バイト列のまま分割できる
+                fields = line.split(delimiter_bytes, category_col + 1)
+                category_id = fields[category_col].decode(encoding_name).strip() if len(fields) > category_col else ""
+            if category_id != current_id:
+                if current_id:
+                    ranges.setdefault(current_id, []).append((range_start, position, range_line))
+                current_id, range_start, range_line = category_id, position, line_no
+            position += len(line)
+        if current_id:
+            ranges.setdefault(current_id, []).append((range_start, position, range_line))
+        return {"encoding": encoding_name, "delimiter": delimiter, "fieldnames": fieldnames, "ranges": ranges}
+
+    def _load_category(self, category_id):
+        """索引を使って1カテゴリ分の行だけを読み込み、解析結果を保持する"""
+        filepath = os.path.join(self.base_path, YSPEC_CSV_FILE)
+        try:
+            ranges = self._index["ranges"].get(category_id)
+            if not ranges:
+                return []
+            encoding_name = self._index["encoding"]
+            rows = []
+            with open(filepath, 'rb') as f:
+                for start, end, first_line in ranges:
+                    f.seek(start)
+                    text = f.read(end - start).decode(encoding_name)
+                    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=self._index["fieldnames"],
+                                            delimiter=self._index["delimiter"])
+                    rows.extend(enumerate(reader, start=first_line))
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            logging.error(f"Yahoo!スペック定義書 '{filepath}' からカテゴリ {category_id} の読み込み中にエラーが発生しました: {e}", exc_info=True)
+            return []
+        return self._build_spec_definitions(rows).get(category_id, [])
+
+    def _reload_index_if_changed(self):
+        """起動後に定義書が差し替えられた場合は索引を作り直す (読み込み済みのカテゴリも破棄する)"""
+        filepath = os.path.join(self.base_path, YSPEC_CSV_FILE)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return
+        if (stat.st_mtime_ns, stat.st_size) != self._index_signature:
+            logging.info(f"Yahoo!スペック定義書 '{filepath}' が変更されたため索引を作り直します。")
+            self._load_index(filepath)
+
     def get_specs_for_category(self, category_id):
         """指定されたYカテゴリIDに対応するスペック定義のリストを返す"""
-        return self.spec_definitions.get(str(category_id).strip(), [])
+        category_id = str(category_id).strip()
+        if self.lazy:
+            self._reload_index_if_changed()
+            if self._index is not None and category_id not in self.spec_definitions:
+                self.spec_definitions[category_id] = self._load_category(category_id)
+        return self.spec_definitions.get(category_id, [])
 
 
 class RakutenAttributeDefinitionLoader:
     """楽天商品属性定義を読み込むクラス"""
     
-    def __init__(self, base_path, progress_dialog=None):
+    def __init__(self, base_path, progress=None, cache_dir=None):
         self.base_path = base_path
         self.genre_definitions = {}
         self.recommended_values_map = {}
-        self.progress_dialog = progress_dialog
+        self.progress = progress
+        self.cache_dir = cache_dir  # 解析結果キャッシュの保存先 (None の場合はキャッシュしない)
+        self._record_pool = RecordPool()  # 単位の選択肢など同じ内容のタプルを属性定義の間で共有する
         self._load_definition_data()
 
     def _load_definition_data(self):
         definition_file_path = os.path.join(self.base_path, DEFINITION_CSV_FILE)
         recommended_list_file_path = os.path.join(self.base_path, RECOMMENDED_LIST_CSV_FILE)
-        self._parse_definition_csv(definition_file_path)
-        self._parse_recommended_list_csv(recommended_list_file_path)
+        cache = MasterCacheEntry(self.cache_dir, "rakuten_definitions", [definition_file_path, recommended_list_file_path])
+        cached = cache.load()
+        if cached is not None:
+            cached_definitions, self.recommended_values_map = cached
+            self.genre_definitions = records_from_cache(RakutenAttributeDetail, cached_definitions)
+        else:
+            definitions_complete = self._parse_definition_csv(definition_file_path)
+            recommended_complete = self._parse_recommended_list_csv(recommended_list_file_path)
+            if definitions_complete and recommended_complete and self.genre_definitions and cache.enabled:
+                cache.store((records_to_cache(self.genre_definitions), self.recommended_values_map))
         
         if not self.genre_definitions:
             logging.warning(f"'{definition_file_path}' から楽天属性定義の読み込みに失敗しました。")
@@ -159,8 +322,13 @@ class RakutenAttributeDefinitionLoader:
             logging.info(f"{len(self.recommended_values_map)}件の楽天推奨値キーを'{recommended_list_file_path}'から読み込みました。")
 
     def _parse_definition_csv(self, filepath):
+        """
+        最後まで読み込めた場合に True を返す。
+        全行を集めてから、ジャンルごとに並び順で一度だけ並べ替える
+        (行ごとに並べ替えると読み込み全体が O(n² log n) になるため)。
+        """
         try:
-            with open_csv_file_with_fallback(filepath, 'r', self.progress_dialog, "属性定義書") as (f, delimiter, encoding_name):
+            with open_csv_file_with_fallback(filepath, 'r', self.progress, "属性定義書") as (f, delimiter, encoding_name):
                 reader = csv.DictReader(f, delimiter=delimiter)
                 required_cols = [COL_GENRE_ID, COL_ITEM_NAME_JP, COL_ORDER]
                 if not reader.fieldnames or not all(col in reader.fieldnames for col in required_cols):
@@ -175,12 +343,11 @@ class RakutenAttributeDefinitionLoader:
                 for row_num, row_dict_raw in enumerate(reader, start=2):
                     row_data = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row_dict_raw.items()}
                     self._process_definition_row(row_data, f"{source_file_label} (行 {row_num})")
-                    if reader.line_num % PROGRESS_UPDATE_ROW_INTERVAL == 0:
-                        QApplication.processEvents()
+            return True
                         
         except FileNotFoundError:
             logging.warning(f"楽天属性定義書ファイル '{filepath}' が見つかりません。")
-            return
+            return False
         except UnicodeDecodeError:
             logging.warning(f"楽天属性定義書 '{filepath}' のデコードに全てのエンコーディングで失敗しました。", exc_info=True)
         except csv.Error as e:
@@ -189,6 +356,12 @@ class RakutenAttributeDefinitionLoader:
             logging.error(f"楽天属性定義書 '{filepath}' の処理中にメモリ不足が発生しました。", exc_info=True)
         except Exception as e:
             logging.error(f"楽天属性定義書 '{filepath}' の処理中に予期せぬエラーが発生しました。", exc_info=True)
+        finally:
+            # 途中でエラーになった場合も、取り込めた分は並び順どおりに利用できるようにする
+            # (安定ソートのため、同じ並び順の項目は行の順序のまま)
+            for attributes in self.genre_definitions.values():
+                attributes.sort(key=lambda x: x.get("order", float('inf')))
+        return False
 
     def _process_definition_row(self, row_data, source_info):
         genre_id = row_data.get(COL_GENRE_ID, "")
@@ -207,30 +380,36 @@ class RakutenAttributeDefinitionLoader:
             return
             
         unit_options_str = row_data.get(COL_RECOMMENDED_UNIT_SOURCE, "")
-        unit_options_list = [opt.strip() for opt in unit_options_str.split('|') if opt.strip()] if unit_options_str else []
+        unit_options_list = self._record_pool.share_tuple(
+            sys.intern(opt.strip()) for opt in unit_options_str.split('|') if opt.strip()
+        ) if unit_options_str else ()
         
-        attribute_detail = {
-            "name": item_name,
-            "order": order,
-            "unit_exists_raw": row_data.get(COL_UNIT_EXISTS, ""),
-            "unit_options_list": unit_options_list,
-            "input_method": row_data.get(COL_INPUT_METHOD, ""),
-            "definition_group": row_data.get(COL_DEFINITION_GROUP, ""),
-            "options": [],
-            "is_multiple_select": row_data.get(COL_MULTIPLE_SELECT_ENABLED, "不可").strip() == "可",
-            "is_required": row_data.get(COL_REQUIRED_OPTIONAL, "任意").strip() == "必須",
-            "is_exceptionally_multiple": is_exceptionally_multiple,
-            "exception_delimiter": exception_delimiter
-        }
+        attribute_detail = RakutenAttributeDetail(
+            name=sys.intern(item_name),
+            order=order,
+            unit_exists_raw=sys.intern(row_data.get(COL_UNIT_EXISTS, "")),
+            unit_options_list=unit_options_list,
+            input_method=sys.intern(row_data.get(COL_INPUT_METHOD, "")),
+            definition_group=sys.intern(row_data.get(COL_DEFINITION_GROUP, "")),
+            options=(),  # 推奨値は get_attribute_details_for_genre で設定する
+            is_multiple_select=row_data.get(COL_MULTIPLE_SELECT_ENABLED, "不可").strip() == "可",
+            is_required=row_data.get(COL_REQUIRED_OPTIONAL, "任意").strip() == "必須",
+            is_exceptionally_multiple=is_exceptionally_multiple,
+            exception_delimiter=exception_delimiter
+        )
         
         if genre_id not in self.genre_definitions:
             self.genre_definitions[genre_id] = []
-        self.genre_definitions[genre_id].append(attribute_detail)
-        self.genre_definitions[genre_id].sort(key=lambda x: x.get("order", float('inf')))
+        self.genre_definitions[genre_id].append(attribute_detail)  # 並べ替えは _parse_definition_csv の最後で行う
 
     def _parse_recommended_list_csv(self, filepath):
+        """
+        最後まで読み込めた場合とファイルが無い場合に True を返す。
+        推奨値の重複確認は挿入順を保つ dict (順序付き集合) で行い、最後にリストへ変換する。
+        """
+        recommended_value_sets = {}  # {(定義グループ, 項目名): {推奨値: None}}
         try:
-            with open_csv_file_with_fallback(filepath, 'r', self.progress_dialog, "推奨値リスト") as (f, delimiter, encoding_name):
+            with open_csv_file_with_fallback(filepath, 'r', self.progress, "推奨値リスト") as (f, delimiter, encoding_name):
                 reader = csv.DictReader(f, delimiter=delimiter)
                 required_rec_cols = [REC_COL_DEFINITION_GROUP, REC_COL_ITEM_NAME_JP, REC_COL_RECOMMENDED_VALUE]
                 if not reader.fieldnames or not all(col in reader.fieldnames for col in required_rec_cols):
@@ -244,17 +423,15 @@ class RakutenAttributeDefinitionLoader:
                     item_name = row_data.get(REC_COL_ITEM_NAME_JP)
                     rec_value = row_data.get(REC_COL_RECOMMENDED_VALUE)
                     if def_group and item_name and rec_value:
-                        key = (def_group, item_name)
-                        if key not in self.recommended_values_map:
-                            self.recommended_values_map[key] = []
-                        if rec_value not in self.recommended_values_map[key]:
-                            self.recommended_values_map[key].append(rec_value)
-                    if reader.line_num % (PROGRESS_UPDATE_ROW_INTERVAL * 4) == 0:
-                        QApplication.processEvents()
+                        key = (sys.intern(def_group), sys.intern(item_name))
+                        if key not in recommended_value_sets:
+                            recommended_value_sets[key] = {}
+                        recommended_value_sets[key][sys.intern(rec_value)] = None
+            return True
                         
         except FileNotFoundError:
             logging.info(f"楽天推奨値リストファイル '{filepath}' が見つかりません。")
-            return
+            return True  # 推奨値リストは任意 (無い状態もキャッシュのキーに記録される)
         except UnicodeDecodeError:
             logging.warning(f"楽天推奨値リスト '{filepath}' のデコードに全てのエンコーディングで失敗しました。", exc_info=True)
         except csv.Error as e:
@@ -263,24 +440,31 @@ class RakutenAttributeDefinitionLoader:
             logging.error(f"楽天推奨値リスト '{filepath}' の処理中にメモリ不足が発生しました。", exc_info=True)
         except Exception as e:
             logging.error(f"楽天推奨値リスト '{filepath}' の処理中に予期せぬエラーが発生しました。", exc_info=True)
+        finally:
+            for key, values in recommended_value_sets.items():
+                self.recommended_values_map[key] = list(values)
+        return False
 
     def get_attribute_details_for_genre(self, genre_id):
         genre_id_str = str(genre_id).strip()
         details_list_original = self.genre_definitions.get(genre_id_str, [])
         details_list_with_options = []
         for detail_orig in details_list_original:
-            detail_copy = detail_orig.copy()
-            key_for_rec = (detail_copy.get("definition_group"), detail_copy.get("name"))
-            detail_copy["options"] = self.recommended_values_map.get(key_for_rec, [])
-            details_list_with_options.append(detail_copy)
+            key_for_rec = (detail_orig.definition_group, detail_orig.name)
+            details_list_with_options.append(detail_orig._replace(options=self.recommended_values_map.get(key_for_rec, [])))
         return details_list_with_options
 
 
-def load_categories_from_csv(filepath: str, progress_dialog: Optional[QDialog] = None) -> List[Tuple[int, str, str]]:
-    """カテゴリCSVファイルを読み込む"""
+def load_categories_from_csv(filepath: str, progress: Optional[ProgressChannel] = None,
+                             cache_dir: Optional[str] = None) -> List[Tuple[int, str, str]]:
+    """カテゴリCSVファイルを読み込む (cache_dir を指定した場合は解析結果をキャッシュする)"""
     categories: List[Tuple[int, str, str]] = []
+    cache = MasterCacheEntry(cache_dir, "categories", [filepath])
+    cached = cache.load()
+    if cached is not None:
+        return cached
     try:
-        with open_csv_file_with_fallback(filepath, 'r', progress_dialog, "カテゴリ") as (f, delimiter, encoding_name):
+        with open_csv_file_with_fallback(filepath, 'r', progress, "カテゴリ") as (f, delimiter, encoding_name):
             reader = csv.reader(f, delimiter=delimiter)
             next(reader, None)  # ヘッダー行をスキップ
             for row in reader:
@@ -294,8 +478,6 @@ def load_categories_from_csv(filepath: str, progress_dialog: Optional[QDialog] =
                         parent = normalize_wave_dash(raw_parent_name)
 
                         categories.append((level, name, parent))
-                        if reader.line_num % PROGRESS_UPDATE_ROW_INTERVAL == 0:
-                            QApplication.processEvents()
                     except ValueError:
                         logging.warning(f"カテゴリファイル '{filepath}' の不正な行 (レベルが数値ではありません): {row}")
                         continue
@@ -308,18 +490,18 @@ def load_categories_from_csv(filepath: str, progress_dialog: Optional[QDialog] =
     except Exception as e:
         logging.error(f"カテゴリファイル '{filepath}' の読み込み中に予期せぬエラーが発生しました。", exc_info=True)
         raise
+    cache.store(categories)
     return categories
 
 
-def load_explanation_mark_icons(base_path: str, progress_dialog: Optional[QDialog] = None) -> List[Dict[str, str]]:
+def load_explanation_mark_icons(base_path: str, progress: Optional[ProgressChannel] = None) -> List[Dict[str, str]]:
     """説明マークアイコンファイルを読み込む"""
     icons_data: List[Dict[str, str]] = []
     icons_dir = os.path.join(base_path, EXPLANATION_MARK_ICONS_SUBDIR)
     file_label = "説明マークアイコン"
 
-    if progress_dialog:
-        progress_dialog.setLabelText(f"{file_label} ({EXPLANATION_MARK_ICONS_SUBDIR}) を検索中...")
-        QApplication.processEvents()
+    if progress:
+        progress.report(f"{file_label} ({EXPLANATION_MARK_ICONS_SUBDIR}) を検索中...")
 
     if not os.path.isdir(icons_dir):
         logging.info(f"{file_label}ディレクトリ '{icons_dir}' が見つかりません。説明マークアイコン機能は利用できません。")
@@ -342,8 +524,6 @@ def load_explanation_mark_icons(base_path: str, progress_dialog: Optional[QDialo
                     })
                 else:
                     logging.warning(f"{file_label}ファイル名 '{filename}' の形式が不正です (例: 1_説明.jpg)。スキップします。")
-            if progress_dialog and len(icons_data) % 20 == 0:
-                QApplication.processEvents()
         
         icons_data.sort(key=lambda x: int(x["id"]))  # IDの昇順でソート
         logging.info(f"{file_label}ディレクトリ '{icons_dir}' から {len(icons_data)} 件のアイコン情報を読み込みました。")
@@ -352,13 +532,18 @@ def load_explanation_mark_icons(base_path: str, progress_dialog: Optional[QDialo
     return icons_data
 
 
-def load_material_spec_master(filepath: str, progress_dialog: Optional[QDialog] = None) -> Dict[str, str]:
-    """材質・仕様マスターCSVファイルを読み込む"""
+def load_material_spec_master(filepath: str, progress: Optional[ProgressChannel] = None,
+                              cache_dir: Optional[str] = None) -> Dict[str, str]:
+    """材質・仕様マスターCSVファイルを読み込む (cache_dir を指定した場合は解析結果をキャッシュする)"""
     master_data: Dict[str, str] = {}  # {"名称": "説明"}
     file_label = "材質・仕様マスター"
+    cache = MasterCacheEntry(cache_dir, "material_spec_master", [filepath])
+    cached = cache.load()
+    if cached is not None:
+        return cached
     
     try:
-        with open_csv_file_with_fallback(filepath, 'r', progress_dialog, file_label) as (f, delimiter, encoding_name):
+        with open_csv_file_with_fallback(filepath, 'r', progress, file_label) as (f, delimiter, encoding_name):
             reader = csv.DictReader(f, delimiter=delimiter)
             
             name_col = MASTER_MATERIAL_SPEC_NAME_COL
@@ -390,9 +575,8 @@ def load_material_spec_master(filepath: str, progress_dialog: Optional[QDialog]
                 else:
                     logging.warning(f"{file_label} '{filepath}' 行 {row_num}: 名称が空です。スキップします。")
                 
-                if reader.line_num % PROGRESS_UPDATE_ROW_INTERVAL == 0 and progress_dialog:
-                    QApplication.processEvents()
             logging.info(f"{file_label} '{filepath}' から {len(master_data)} 件のデータを読み込みました。")
+        cache.store(master_data)
     except FileNotFoundError:
         logging.info(f"{file_label}ファイル '{filepath}' が見つかりません。材質・仕様マスター機能は利用できません。")
         return {}
@@ -403,8 +587,8 @@ def load_material_spec_master(filepath: str, progress_dialog: Optional[QDialog]
 
 
 def load_id_master_data(filepath, id_col_header, name_col_header, hierarchy_col_header,
-                       progress_dialog=None, file_label="IDマスター"):
-    """IDマスターデータを読み込む"""
+                       progress=None, file_label="IDマスター", cache_dir=None):
+    """IDマスターデータ (IdMasterEntry のリスト) を読み込む (cache_dir を指定した場合は解析結果をキャッシュする)"""
     all_searchable_data_list = []
 
     # セキュリティ強化: ファイルパス検証
@@ -434,8 +618,14 @@ def load_id_master_data(filepath, id_col_header, name_col_header, hierarchy_col_
         logging.error(f"  許可ベース: {allowed_base}")
         raise ValueError("許可されていないファイルパスです")
 
+    cache = MasterCacheEntry(cache_dir, f"id_master_{os.path.splitext(os.path.basename(effective_filepath))[0]}",
+                             [effective_filepath], (id_col_header, name_col_header, hierarchy_col_header))
+    cached = cache.load()
+    if cached is not None:
+        return [IdMasterEntry._make(values) for values in cached]
+
     try:
-        with open_csv_file_with_fallback(effective_filepath, 'r', progress_dialog, file_label) as (f, delimiter, encoding_name):
+        with open_csv_file_with_fallback(effective_filepath, 'r', progress, file_label) as (f, delimiter, encoding_name):
             reader = csv.DictReader(f, delimiter=delimiter)
             required_headers = [id_col_header, hierarchy_col_header]
             if name_col_header:
@@ -453,10 +643,10 @@ def load_id_master_data(filepath, id_col_header, name_col_header, hierarchy_col_
                 item_name = normalize_wave_dash(row.get(name_col_header, "")).strip() if name_col_header else ""
 
                 if item_id and item_hierarchy:
-                    data_entry = {'id': item_id, 'name': item_name, 'hierarchy': item_hierarchy}
+                    data_entry = IdMasterEntry(sys.intern(item_id), sys.intern(item_name), sys.intern(item_hierarchy))
                     all_searchable_data_list.append(data_entry)
-                if reader.line_num % PROGRESS_UPDATE_ROW_INTERVAL == 0:
-                    QApplication.processEvents()
+        if cache.enabled:
+            cache.store([tuple(entry) for entry in all_searchable_data_list])
     except FileNotFoundError:
         logging.info(f"IDマスターファイル '{effective_filepath}' が見つかりません。")
         return []
@@ -0,0 +1,345 @@
+"""
+商品登録入力ツール - 管理ファイル差分書き込みモジュール
+
+保存対象の商品の Main 行と SKU 行ブロックだけを書き換える。
+シート全体を削除して再出力する従来方式に比べ、保存コストが編集量に比例する。
+保存ワーカー (persistence_worker.py) が処理する保存ジョブもここで定義する。
+"""
+import logging
+from typing import List, Dict, Any, Optional
+
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_MYCODE, HEADER_CONTROL_COLUMN, HEADER_PRODUCT_CODE_SKU
+)
+from product_repository import ProductRepository, cell_to_str, derive_sku_headers
+
+
+def trim_headers(headers: List[str]) -> List[str]:
+    """末尾の空ヘッダーを除いたヘッダーリストを返す"""
+    trimmed = list(headers)
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+
+def can_apply_incremental_save(repo: ProductRepository, canonical_main_headers: List[str], code: str) -> bool:
+    """
+    差分保存が可能か判定する。
+    メモリ上の内容がファイルと一致し、列構成が正規ヘッダーと同じで、
+    対象商品の行が一意に特定できる場合のみ True を返す。
+    """
+    if not repo.is_in_sync():
+        return False
+    if not repo.has_main_sheet or not repo.has_sku_sheet:
+        return False
+    if trim_headers(repo.main_headers) != trim_headers(canonical_main_headers):
+        return False
+    if not repo.sku_headers or HEADER_PRODUCT_CODE_SKU not in repo.sku_headers:
+        return False
+    if repo.is_duplicate(code):
+        return False
+    return True
+
+
+def _write_row_cells(ws, row_number: int, values: list) -> int:
+    """値が変わったセルだけを書き換え、書き換えたセル数を返す"""
+    changed = 0
+    for col_idx, value in enumerate(values, start=1):
+        cell = ws.cell(row=row_number, column=col_idx)
+        if cell_to_str(cell.value) != cell_to_str(value):
+            cell.value = value
+            changed += 1
+    return changed
+
+
+def _write_new_row(ws, row_number: int, values: list) -> None:
+    for col_idx, value in enumerate(values, start=1):
+        ws.cell(row=row_number, column=col_idx, value=value)
+
+
+def _contiguous_ranges(row_numbers: List[int]) -> List[tuple]:
+    """行番号リストを (開始行, 行数) の連続範囲に変換する (昇順)"""
+    ranges = []
+    for number in sorted(row_numbers):
+        if ranges and ranges[-1][0] + ranges[-1][1] == number:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + 1)
+        else:
+            ranges.append((number, 1))
+    return ranges
+
+
+def apply_incremental_product_save(ws_main, ws_sku, repo: ProductRepository, code: str,
+                                   main_values: list, sku_rows: List[list]) -> Dict[str, Any]:
+    """
+    対象商品の Main 行と SKU 行をワークシート上で差分更新する。
+    戻り値は保存成功後に ProductRepository.apply_saved_product へ渡す引数の辞書。
+    """
+    code = code.strip()
+    main_row_number = repo.main_row_number(code)
+    if main_row_number is None:
+        main_row_number = ws_main.max_row + 1
+        _write_new_row(ws_main, main_row_number, main_values)
+        changed_cells = len(main_values)
+    else:
+        changed_cells = _write_row_cells(ws_main, main_row_number, main_values)
+
+    existing_sku_rows = repo.sku_row_numbers(code)
+    keep_count = min(len(existing_sku_rows), len(sku_rows))
+    new_sku_row_numbers = existing_sku_rows[:keep_count]
+    inserted = None
+    deleted = []
+
+    for row_number, values in zip(new_sku_row_numbers, sku_rows):
+        changed_cells += _write_row_cells(ws_sku, row_number, values)
+
+    extra_rows = sku_rows[keep_count:]
+    if extra_rows:
+        if existing_sku_rows:
+            # 既存ブロックの直後に必要な行数だけ挿入する
+            insert_at = existing_sku_rows[-1] + 1
+            ws_sku.insert_rows(insert_at, len(extra_rows))
+            inserted = (insert_at, len(extra_rows))
+        else:
+            insert_at = ws_sku.max_row + 1
+        for offset, values in enumerate(extra_rows):
+            _write_new_row(ws_sku, insert_at + offset, values)
+            new_sku_row_numbers.append(insert_at + offset)
+        changed_cells += sum(len(v) for v in extra_rows)
+
+    surplus_rows = existing_sku_rows[keep_count:]
+    if surplus_rows:
+        # 下の行から削除して行番号のずれを防ぐ
+        for start, amount in reversed(_contiguous_ranges(surplus_rows)):
+            ws_sku.delete_rows(start, amount)
+        deleted = surplus_rows
+
+    logging.info(f"差分保存: 商品「{code}」 変更セル数={changed_cells}, SKU挿入={inserted[1] if inserted else 0}行, SKU削除={len(deleted)}行")
+    return {
+        "main_values": main_values,
+        "main_row_number": main_row_number,
+        "sku_rows": sku_rows,
+        "sku_row_numbers": new_sku_row_numbers,
+        "inserted_sku_rows": inserted,
+        "deleted_sku_rows": deleted,
+    }
+
+
+# --- 保存ジョブ ---
+JOB_SAVE_PRODUCT = "save_product"
+JOB_DELETE_PRODUCT = "delete_product"
+JOB_SET_CONTROL = "set_control"
+JOB_EXPORT_ITEM = "export_item"  # 管理ファイルには書き込まず item.xlsm だけを出力する
+
+
+class PersistenceJob:
+    """
+    管理ファイルへの書き込み1件分。
+    同じ key のジョブはキュー上で後から来たものに置き換えられる (最新の状態だけを書き込む)。
+    """
+
+    def __init__(self, kind: str, code: str = "", headers: Optional[List[str]] = None,
+                 main_values: Optional[list] = None, sku_records: Optional[List[Dict[str, str]]] = None,
+                 codes: Optional[List[str]] = None, control_value: str = "",
+                 notify_message: str = ""):
+        self.kind = kind
+        self.code = code.strip()
+        self.headers = headers or []
+        self.main_values = main_values or []
+        self.sku_records = sku_records or []
+        self.codes = [c.strip() for c in codes] if codes is not None else None
+        self.control_value = control_value
+        self.notify_message = notify_message  # 完了時に表示するメッセージ (空なら表示しない)
+
+    @property
+    def key(self) -> tuple:
+        if self.kind == JOB_SET_CONTROL:
+            return ("control", tuple(sorted(self.codes)) if self.codes is not None else "*")
+        if self.kind == JOB_EXPORT_ITEM:
+            return ("export",)
+        # 保存と削除は同じ商品に対する最新の操作だけが意味を持つ
+        return ("product", self.code)
+
+    def __repr__(self) -> str:
+        return f"PersistenceJob({self.kind}, {self.code or self.codes})"
+
+
+def _header_index(ws) -> Dict[str, int]:
+    first_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+    index = {}
+    for idx, header in enumerate(first_row):
+        if header is not None:
+            index.setdefault(str(header).strip(), idx)
+    return index
+
+
+def _find_rows(ws, col_idx: int, code: str) -> List[int]:
+    """指定列の値が code と一致する行番号を昇順で返す"""
+    return [r for r in range(2, ws.max_row + 1)
+            if cell_to_str(ws.cell(row=r, column=col_idx + 1).value).strip() == code]
+
+
+def _rewrite_product_rows(ws_main, ws_sku, job: PersistenceJob) -> None:
+    """Main / SKU シート全体を正規ヘッダーの列順で書き直し、対象商品の行を置き換える"""
+    code = job.code
+    exist_main_rows = list(ws_main.iter_rows(values_only=True))
+    existing_headers = [str(h).strip() if h is not None else "" for h in (exist_main_rows[0] if exist_main_rows else [])]
+    new_row = list(job.main_values)
+    out_main_rows = [list(job.headers)]
+    updated = False
+    for r_tuple in exist_main_rows[1:]:
+        row_dict = dict(zip(existing_headers, (cell_to_str(v) for v in r_tuple)))
+        if row_dict.get(HEADER_MYCODE, "").strip() == code:
+            out_main_rows.append(new_row)
+            updated = True
+        else:
+            out_main_rows.append([row_dict.get(h, "") for h in job.headers])
+    if not updated:
+        out_main_rows.append(new_row)
+    ws_main.delete_rows(1, ws_main.max_row + 1)
+    for row in out_main_rows:
+        ws_main.append(row)
+
+    exist_sku_rows = list(ws_sku.iter_rows(values_only=True))
+    hdr_sku = [str(h).strip() if h is not None else "" for h in (exist_sku_rows[0] if exist_sku_rows and exist_sku_rows[0] else [])]
+    if not hdr_sku and job.sku_records:
+        hdr_sku = derive_sku_headers(job.sku_records)
+        exist_sku_rows = [hdr_sku]
+    if not hdr_sku:
+        return
+    out_sku_rows = [hdr_sku]
+    if HEADER_PRODUCT_CODE_SKU in hdr_sku:
+        prod_code_idx = hdr_sku.index(HEADER_PRODUCT_CODE_SKU)
+        for sku_tuple in exist_sku_rows[1:]:
+            sku_list = list(sku_tuple)
+            sku_list.extend([""] * (len(hdr_sku) - len(sku_list)))
+            if str(sku_list[prod_code_idx]).strip() != code:
+                out_sku_rows.append(sku_list)
+    for record in job.sku_records:
+        out_sku_rows.append([str(record.get(h, "")) for h in hdr_sku])
+    ws_sku.delete_rows(1, ws_sku.max_row + 1)
+    for row in out_sku_rows:
+        ws_sku.append(row)
+
+
+def save_product_rows(wb, repo: ProductRepository, job: PersistenceJob, layout_trusted: bool) -> bool:
+    """
+    保存ジョブをワークブックへ反映する。
+    リポジトリの行番号が使える場合は差分保存、使えない場合はシート全体を書き直す。
+    行番号の対応が崩れた (全体を書き直した) 場合は True を返す。
+    """
+    ws_main = wb[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb.sheetnames else wb.create_sheet(MAIN_SHEET_NAME)
+    ws_sku = wb[SKU_SHEET_NAME] if SKU_SHEET_NAME in wb.sheetnames else wb.create_sheet(SKU_SHEET_NAME)
+    if layout_trusted and can_apply_incremental_save(repo, job.headers, job.code):
+        try:
+            sku_rows = [[str(record.get(h, "")) for h in repo.sku_headers] for record in job.sku_records]
+            plan = apply_incremental_product_save(ws_main, ws_sku, repo, job.code, job.main_values, sku_rows)
+            repo.apply_saved_product(job.code, update_data=False, **plan)
+            return False
+        except Exception as e_incremental:
+            logging.warning(f"差分保存に失敗したため全体書き換えで保存します: {e_incremental}", exc_info=True)
+    _rewrite_product_rows(ws_main, ws_sku, job)
+    return True
+
+
+def delete_product_rows(wb, repo: ProductRepository, job: PersistenceJob, layout_trusted: bool) -> bool:
+    """削除ジョブをワークブックへ反映する。行番号の対応が崩れた場合は True を返す"""
+    code = job.code
+    use_layout = layout_trusted and repo.main_row_number(code) is not None and not repo.is_duplicate(code)
+    if use_layout:
+        main_rows = [repo.main_row_number(code)]
+        sku_rows = repo.sku_row_numbers(code)
+    else:
+        main_rows, sku_rows = [], []
+        if MAIN_SHEET_NAME in wb.sheetnames:
+            mycode_idx = _header_index(wb[MAIN_SHEET_NAME]).get(HEADER_MYCODE)
+            if mycode_idx is not None:
+                main_rows = _find_rows(wb[MAIN_SHEET_NAME], mycode_idx, code)
+        if SKU_SHEET_NAME in wb.sheetnames:
+            prod_code_idx = _header_index(wb[SKU_SHEET_NAME]).get(HEADER_PRODUCT_CODE_SKU)
+            if prod_code_idx is not None:
+                sku_rows = _find_rows(wb[SKU_SHEET_NAME], prod_code_idx, code)
+
+    if not main_rows:
+        logging.warning(f"item_manage.xlsm に削除対象商品「{code}」が見つかりませんでした")
+    for start, amount in reversed(_contiguous_ranges(main_rows)):
+        wb[MAIN_SHEET_NAME].delete_rows(start, amount)
+    for start, amount in reversed(_contiguous_ranges(sku_rows)):
+        wb[SKU_SHEET_NAME].delete_rows(start, amount)
+    logging.info(f"商品「{code}」を削除: Main {len(main_rows)}行, SKU {len(sku_rows)}行")
+
+    if use_layout:
+        repo.apply_deleted_product(code, main_rows[0], sku_rows)
+        return False
+    return bool(main_rows or sku_rows)
+
+
+def set_control_values(wb, repo: ProductRepository, job: PersistenceJob, layout_trusted: bool) -> bool:
+    """コントロールカラム変更ジョブをワークブックへ反映する。行の増減はないため常に False を返す"""
+    if MAIN_SHEET_NAME not in wb.sheetnames:
+        raise ValueError(f"{MAIN_SHEET_NAME}シートが見つかりません。")
+    ws = wb[MAIN_SHEET_NAME]
+    header_index = _header_index(ws)
+    if HEADER_CONTROL_COLUMN not in header_index or HEADER_MYCODE not in header_index:
+        raise ValueError(f"「{HEADER_CONTROL_COLUMN}」または「{HEADER_MYCODE}」が{MAIN_SHEET_NAME}シートのヘッダーに見つかりません。")
+    ctrl_col = header_index[HEADER_CONTROL_COLUMN] + 1
+    mycode_col = header_index[HEADER_MYCODE] + 1
+
+    if job.codes is not None and layout_trusted and not any(repo.is_duplicate(c) for c in job.codes):
+        rows = [repo.main_row_number(c) for c in job.codes]
+        rows = [r for r in rows if r is not None]
+    else:
+        targets = set(job.codes) if job.codes is not None else None
+        rows = []
+        for r in range(2, ws.max_row + 1):
+            code = cell_to_str(ws.cell(row=r, column=mycode_col).value).strip()
+            if code and (targets is None or code in targets):
+                rows.append(r)
+
+    changed = 0
+    for r in rows:
+        cell = ws.cell(row=r, column=ctrl_col)
+        if cell_to_str(cell.value).strip().lower() != job.control_value.lower():
+            cell.value = job.control_value
+            changed += 1
+    logging.info(f"コントロールカラム変更: {changed}行を '{job.control_value}' に変更")
+    repo.apply_saved_control_values(job.codes, job.control_value)
+    return False
+
+
+JOB_HANDLERS = {
+    JOB_SAVE_PRODUCT: save_product_rows,
+    JOB_DELETE_PRODUCT: delete_product_rows,
+    JOB_SET_CONTROL: set_control_values,
+}
+
+
+def can_patch_jobs(repo: ProductRepository, jobs: List[PersistenceJob]) -> bool:
+    """
+    シート XML の直接書き換え (xlsx_patcher.py) で保存できるか判定する。
+    すべてのジョブがリポジトリの行番号を使った差分更新で処理でき、
+    シート全体の書き直しや行の検索が発生しない場合のみ True を返す。
+    """
+    if not repo.is_in_sync():
+        return False
+    for job in jobs:
+        if job.kind == JOB_SAVE_PRODUCT and not can_apply_incremental_save(repo, job.headers, job.code):
+            return False
+        if job.kind == JOB_DELETE_PRODUCT and repo.is_duplicate(job.code):
+            return False
+    return True
+
+
+def apply_jobs(wb, repo: ProductRepository, jobs: List[PersistenceJob]) -> bool:
+    """
+    ジョブを順番にワークブックへ反映する。
+    書き込み開始時点でリポジトリがファイルと同期していれば行番号を使った差分更新を行う。
+    いずれかのジョブで行番号の対応が崩れた場合は True を返す (呼び出し元でリポジトリを無効化する)。
+    """
+    layout_trusted = repo.is_in_sync()
+    layout_changed = False
+    for job in jobs:
+        if job.kind not in JOB_HANDLERS:
+            continue
+        if JOB_HANDLERS[job.kind](wb, repo, job, layout_trusted and not layout_changed):
+            layout_changed = True
+    return layout_changed
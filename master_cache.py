@@ -0,0 +1,128 @@
+"""
+商品登録入力ツール - マスターCSVの解析結果キャッシュモジュール
+
+Yahoo!スペック定義・楽天属性定義・IDマスターなどの CSV を解析した結果を
+ユーザーデータフォルダへ marshal 形式で保存し、次回起動時に CSV を解析せずに読み込む。
+キャッシュは元ファイルのパス・サイズ・更新日時・内容のハッシュに紐付ける。
+更新日時またはサイズだけが変わった場合は内容のハッシュを取り直し、
+ハッシュが同じであればキャッシュを使い続ける (記録するサイズと更新日時は更新する)。
+存在しない元ファイルは「存在しない」という状態として記録し、後から置かれた場合は読み直す。
+"""
+import os
+import sys
+import struct
+import marshal
+import hashlib
+import logging
+from typing import Optional, List, Tuple, Any
+
+from utils import atomic_write
+
+# 解析結果の形式を変えたときは番号を上げる (古いキャッシュは読み込まれずに作り直される)
+MASTER_CACHE_FORMAT_VERSION = 2
+_MAGIC = b"PAMC"
+_HEADER_SIZE = struct.Struct("<I")  # キー部分のバイト数 (解析結果を読まずにキーだけを確認するため)
+# marshal の形式は Python のバージョンごとに異なりうるため、キャッシュのキーに含める
+_PYTHON_VERSION = tuple(sys.version_info[:2])
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class MasterCacheEntry:
+    """
+    1つのマスター (元ファイル1つ以上) の解析結果キャッシュ。
+
+    元ファイルの状態は生成時に取得するため、CSV の解析前に生成すること
+    (解析中にファイルが変わっても、古い状態のキーで新しい内容を保存しない)。
+    cache_dir が None の場合は何もしない (load は常に None、store は保存しない)。
+    """
+
+    def __init__(self, cache_dir: Optional[str], name: str, source_paths: List[str], params: tuple = ()):
+        self.name = name
+        self.cache_path = os.path.join(cache_dir, f"{name}.cache") if cache_dir else None
+        self.source_paths = [os.path.abspath(p) for p in source_paths]
+        self.params = tuple(params)
+        self._signatures = [_stat_signature(p) for p in self.source_paths]
+        self._hashes: List[Optional[str]] = [None] * len(self.source_paths)
+
+    @property
+    def source_signatures(self) -> List[Optional[Tuple[int, int]]]:
+        """生成時に取得した元ファイルの (更新日時, サイズ)。存在しないファイルは None"""
+        return list(self._signatures)
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_path is not None
+
+    def _key(self) -> tuple:
+        return (MASTER_CACHE_FORMAT_VERSION, _PYTHON_VERSION, self.name, self.params, tuple(self.source_paths))
+
+    def _source_hash(self, index: int) -> Optional[str]:
+        if self._signatures[index] is None:
+            return None
+        if self._hashes[index] is None:
+            self._hashes[index] = _file_hash(self.source_paths[index])
+        return self._hashes[index]
+
+    def load(self) -> Optional[Any]:
+        """有効なキャッシュがあれば解析結果を返す。無い・古い・壊れている場合は None"""
+        if not self.enabled:
+            return None
+        try:
+            # marshal.load(ファイル) は少しずつ読み込むため遅い。まとめて読んでから loads する
+            with open(self.cache_path, "rb") as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return None
+                (header_size,) = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+                key, sources = marshal.loads(f.read(header_size))
+                if key != self._key():
+                    return None
+                refreshed = False
+                for index, (signature, content_hash) in enumerate(sources):
+                    if signature == self._signatures[index]:
+                        continue
+                    if content_hash != self._source_hash(index):
+                        return None
+                    refreshed = True
+                data = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError, struct.error) as e:
+            logging.info(f"マスターキャッシュ '{self.cache_path}' を使用できないため CSV を読み込みます: {e}")
+            return None
+        if refreshed:
+            # 内容は同じで更新日時だけが変わった場合、次回はハッシュ計算を省けるよう記録を更新する
+            self.store(data)
+        return data
+
+    def store(self, data: Any) -> None:
+        """解析結果を保存する。保存に失敗してもアプリの動作には影響しないため警告のみ"""
+        if not self.enabled:
+            return
+        try:
+            sources = [(signature, self._source_hash(i)) for i, signature in enumerate(self._signatures)]
+            # 解析中に元ファイルが変わった場合は保存しない (次回起動時に読み直す)
+            if [_stat_signature(p) for p in self.source_paths] != self._signatures:
+                return
+            cache_dir = os.path.dirname(self.cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            header = marshal.dumps((self._key(), sources))
+            with atomic_write(self.cache_path) as f:
+                f.write(_MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+                f.write(marshal.dumps(data))
+        except (OSError, ValueError) as e:
+            logging.warning(f"マスターキャッシュ '{self.cache_path}' を保存できませんでした: {e}")
@@ -0,0 +1,115 @@
+"""
+商品登録入力ツール - マスターデータのレコード定義モジュール
+
+Yahoo!スペック定義・楽天属性定義・IDマスターの各行は件数が多く、
+同じ文字列 (スペック名・選択肢名・入力方式など) や同じ選択肢の並びが何度も現れる。
+各行を dict ではなく名前付きタプル (__slots__ = () で属性の辞書を持たない) のレコードで持ち、
+文字列は sys.intern で、同じ内容の選択肢・選択肢の並びは RecordPool で1つのオブジェクトを共有する。
+レコードは従来の dict と同じく record["name"] / record.get("name", 既定値) で参照できる。
+レコードは変更できない (一部を変える場合は _replace で新しいレコードを作る)。
+
+解析結果キャッシュ (master_cache) は marshal 形式のためタプルの派生クラスを保存できない。
+records_to_cache / spec_definitions_to_cache で通常のタプルに変換して保存し、読み込み時にレコードへ戻す。
+"""
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class MasterRecord:
+    """名前付きタプルのレコードに、従来の dict と同じ参照方法を加える基底クラス"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fields
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+
+class YSpecOption(MasterRecord, namedtuple("YSpecOption", "value_id value_name")):
+    """Yahoo!スペックの選択肢"""
+    __slots__ = ()
+
+
+class YSpecDefinition(MasterRecord, namedtuple("YSpecDefinition", "spec_id spec_name selection_type data_type options")):
+    """Yahoo!スペック項目の定義 (options は YSpecOption のタプル)"""
+    __slots__ = ()
+
+
+class RakutenAttributeDetail(MasterRecord, namedtuple("RakutenAttributeDetail", (
+        "name order unit_exists_raw unit_options_list input_method definition_group "
+        "options is_multiple_select is_required is_exceptionally_multiple exception_delimiter"))):
+    """楽天商品属性の定義 (options はジャンルごとの取得時に推奨値リストを設定する)"""
+    __slots__ = ()
+
+
+class IdMasterEntry(MasterRecord, namedtuple("IdMasterEntry", "id name hierarchy")):
+    """IDマスター (Rジャンル・Yカテゴリ・YAカテゴリ) の1件"""
+    __slots__ = ()
+
+
+class RecordPool:
+    """同じ内容のレコード・タプルを1つのオブジェクトに共有する"""
+
+    def __init__(self):
+        self._items: Dict[Any, Any] = {}
+
+    def share(self, item):
+        """item と同じ内容のものが既にあればそれを、無ければ item を返す"""
+        # レコードは同じ値の通常のタプルとも等しくなるため、型もキーに含める
+        return self._items.setdefault((type(item), item), item)
+
+    def share_tuple(self, items: Iterable) -> tuple:
+        return self.share(tuple(items))
+
+
+def records_to_cache(records_by_key: Dict[str, List[MasterRecord]]) -> Dict[str, List[tuple]]:
+    """{キー: [レコード, ...]} を marshal で保存できる形に変換する"""
+    return {key: [tuple(record) for record in records] for key, records in records_by_key.items()}
+
+
+def records_from_cache(record_class, cached: Dict[str, List[tuple]]) -> Dict[str, List[MasterRecord]]:
+    """records_to_cache で変換した値からレコードを復元する"""
+    make = record_class._make
+    return {key: [make(values) for values in records] for key, records in cached.items()}
+
+
+def spec_definitions_to_cache(spec_definitions: Dict[str, List[YSpecDefinition]]) -> tuple:
+    """
+    Yahoo!スペック定義を (選択肢の一覧, 選択肢の並びの一覧, {カテゴリID: [スペック, ...]}) に変換する。
+    選択肢と選択肢の並びは一覧の番号で参照し、同じものを1回だけ保存する。
+    """
+    option_numbers: Dict[YSpecOption, int] = {}
+    list_numbers: Dict[Tuple[int, ...], int] = {}
+    specs_by_category = {}
+    for category_id, specs in spec_definitions.items():
+        rows = []
+        for spec in specs:
+            numbers = tuple(option_numbers.setdefault(option, len(option_numbers)) for option in spec.options)
+            rows.append((spec.spec_id, spec.spec_name, spec.selection_type, spec.data_type,
+                         list_numbers.setdefault(numbers, len(list_numbers))))
+        specs_by_category[category_id] = rows
+    return [tuple(option) for option in option_numbers], list(list_numbers), specs_by_category
+
+
+def spec_definitions_from_cache(cached: tuple) -> Dict[str, List[YSpecDefinition]]:
+    """spec_definitions_to_cache で変換した値から Yahoo!スペック定義を復元する"""
+    option_values, option_lists, specs_by_category = cached
+    options = [YSpecOption._make(values) for values in option_values]
+    shared_lists = [tuple(options[number] for number in numbers) for numbers in option_lists]
+    return {
+        category_id: [YSpecDefinition(spec_id, spec_name, selection_type, data_type, shared_lists[list_number])
+                      for spec_id, spec_name, selection_type, data_type, list_number in rows]
+        for category_id, rows in specs_by_category.items()
+    }
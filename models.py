@@ -1,14 +1,20 @@
 """
 商品登録入力ツール - テーブルモデルモジュール
 """
-from typing import Optional, List, Dict, Any, Union
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from typing import Optional, List, Dict, Any, Union, Tuple, Iterable
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QAbstractProxyModel, QModelIndex, QVariant
 from PyQt5.QtGui import QColor
 
 from constants import (
     HEADER_ATTR_ITEM_PREFIX, HEADER_ATTR_VALUE_PREFIX, HEADER_ATTR_UNIT_PREFIX,
     UI_HEADER_UNIT
 )
+from utils import normalize_text
+
+# 商品一覧の各行が持つデータのロール
+PRODUCT_LIST_CONTROL_ROLE = Qt.UserRole  # コントロールカラム値
+PRODUCT_LIST_CODE_ROLE = Qt.UserRole + 1  # 商品コード (mycode)
+PRODUCT_LIST_FILTER_KEY_ROLE = Qt.UserRole + 2  # 絞り込み用に正規化 (normalize_text) した表示文字列
 
 
 class SkuTableModel(QAbstractTableModel):
@@ -125,4 +131,282 @@ class SkuTableModel(QAbstractTableModel):
         self._data = new_data if new_data is not None else []
         self._headers = new_headers if new_headers is not None else []
         self._defined_attr_details = new_defined_attr_details if new_defined_attr_details is not None else []
-        self.endResetModel()
+        self.endResetModel()
+
+
+def product_list_text(code: str, name: str, control: str) -> str:
+    """商品一覧の表示文字列"""
+    return f"[{control}] {code} - {name}"
+
+
+class ProductListModel(QAbstractListModel):
+    """
+    商品一覧のモデル。行は商品リポジトリの一覧 (商品コード, 商品名, コントロールカラム値) の順で、
+    表示文字列と絞り込み用に正規化した表示文字列は行を設定したときに作っておく。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Tuple[str, str, str, str, str]] = []  # (商品コード, 商品名, コントロール, 表示文字列, 絞り込み用)
+        self._row_by_code: Optional[Dict[str, int]] = None  # 行の追加・削除後は次に参照したときに作り直す
+
+    @staticmethod
+    def _make_row(code: str, name: str, control: str) -> Tuple[str, str, str, str, str]:
+        text = product_list_text(code, name, control)
+        return (code, name, control, text, normalize_text(text))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Optional[str]:
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return row[3]
+        if role == PRODUCT_LIST_CODE_ROLE:
+            return row[0]
+        if role == PRODUCT_LIST_CONTROL_ROLE:
+            return row[2]
+        if role == PRODUCT_LIST_FILTER_KEY_ROLE:
+            return row[4]
+        return None
+
+    # --- 参照 ---
+    def _code_rows(self) -> Dict[str, int]:
+        if self._row_by_code is None:
+            self._row_by_code = {row[0]: i for i, row in enumerate(self._rows)}
+        return self._row_by_code
+
+    def row_of(self, code: str) -> int:
+        """商品コードの行 (一覧に無い場合は -1)"""
+        return self._code_rows().get(code, -1)
+
+    def contains(self, code: str) -> bool:
+        return self.row_of(code) >= 0
+
+    def code_at(self, row: int) -> str:
+        return self._rows[row][0] if 0 <= row < len(self._rows) else ""
+
+    def text_at(self, row: int) -> str:
+        return self._rows[row][3] if 0 <= row < len(self._rows) else ""
+
+    def filter_key(self, row: int) -> str:
+        return self._rows[row][4]
+
+    def matching_rows(self, filter_key: str, candidates: Optional[List[int]] = None) -> List[int]:
+        """正規化した表示文字列に filter_key を含む行 (candidates を指定した場合はその中から順に選ぶ)"""
+        rows = self._rows
+        if candidates is None:
+            return [i for i, row in enumerate(rows) if filter_key in row[4]]
+        return [i for i in candidates if filter_key in rows[i][4]]
+
+    def list_index_by_code(self) -> Dict[str, int]:
+        """商品コード → 行 の対応表 (コピーなので別スレッドへ渡せる)"""
+        return dict(self._code_rows())
+
+    # --- 更新 ---
+    def set_entries(self, entries: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        一覧を entries (商品コード, 商品名, コントロールカラム値) の並びに合わせる。
+        無くなった行・追加された行・内容が変わった行だけをビューへ通知し、並び順が変わった場合だけ作り直す。
+        """
+        entries = list(entries)
+        new_codes = [entry[0] for entry in entries]
+        new_code_set = set(new_codes)
+        if not self._rows or len(new_code_set) != len(new_codes):
+            self._reset(entries)
+            return
+
+        # 無くなった行を後ろから連続する範囲ごとに削除する
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row][0] in new_code_set:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._rows[row][0] not in new_code_set:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            del self._rows[row + 1:last + 1]
+            self._row_by_code = None
+            self.endRemoveRows()
+
+        old_code_set = {row[0] for row in self._rows}
+        if [code for code in new_codes if code in old_code_set] != [row[0] for row in self._rows]:
+            self._reset(entries)
+            return
+
+        # 追加された行を連続する範囲ごとに挿入し、内容が変わった行を更新する (entries[:i] と行[:i] は一致している)
+        i = 0
+        while i < len(entries):
+            code, name, control = entries[i]
+            if code in old_code_set:
+                current = self._rows[i]
+                if current[1] != name or current[2] != control:
+                    self._rows[i] = self._make_row(code, name, control)
+                    index = self.index(i)
+                    self.dataChanged.emit(index, index)
+                i += 1
+                continue
+            end = i + 1
+            while end < len(entries) and entries[end][0] not in old_code_set:
+                end += 1
+            self.beginInsertRows(QModelIndex(), i, end - 1)
+            self._rows[i:i] = [self._make_row(*entry) for entry in entries[i:end]]
+            self._row_by_code = None
+            self.endInsertRows()
+            i = end
+
+    def _reset(self, entries: List[Tuple[str, str, str]]) -> None:
+        self.beginResetModel()
+        self._rows = [self._make_row(*entry) for entry in entries]
+        self._row_by_code = None
+        self.endResetModel()
+
+    def set_control(self, codes: Iterable[str], control: str) -> None:
+        """商品のコントロールカラム値を変更する"""
+        for code in codes:
+            row = self.row_of(code)
+            if row >= 0 and self._rows[row][2] != control:
+                self._rows[row] = self._make_row(code, self._rows[row][1], control)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+
+class ProductListFilterModel(QAbstractProxyModel):
+    """
+    商品一覧の絞り込み (検索バー) と並べ替え (商品コード順) 用のプロキシモデル。
+    QSortFilterProxyModel は行ごとに Python の filterAcceptsRow を呼び出すため、2万行では1文字ごとに数十ms かかる。
+    ここでは ProductListModel が行ごとに持つ正規化済みの表示文字列をまとめて照合して表示する元の行の一覧を作り直し、
+    検索語を1文字追加した場合は表示中の行だけを照合する。絞り込みも並べ替えもしていない間は元の行をそのまま表示し、
+    元のモデルの行の追加・削除・変更をそのまま伝える (絞り込み中は表示する行を作り直す)。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter_key = ""
+        self._sort_order: Optional[int] = None  # None は元の順、Qt.AscendingOrder / Qt.DescendingOrder は商品コード順
+        self._source_rows: Optional[List[int]] = None  # 表示する元の行 (None は全行を元の順で表示)
+        self._proxy_row_by_source: Optional[Dict[int, int]] = None
+        self._resetting = False  # 元のモデルの変更を表示する行の作り直しとして伝えている間 True
+
+    def setSourceModel(self, model: ProductListModel) -> None:
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.modelAboutToBeReset.connect(self._begin_source_change)
+        model.modelReset.connect(self._end_source_change)
+        model.rowsAboutToBeInserted.connect(lambda parent, first, last: self._begin_source_change(first, last, True))
+        model.rowsInserted.connect(lambda parent, first, last: self._end_source_change(True))
+        model.rowsAboutToBeRemoved.connect(lambda parent, first, last: self._begin_source_change(first, last, False))
+        model.rowsRemoved.connect(lambda parent, first, last: self._end_source_change(False))
+        model.dataChanged.connect(self._on_source_data_changed)
+        self._rebuild()
+        self.endResetModel()
+
+    # --- 行の対応 ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._source_rows is None else len(self._source_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < self.rowCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        row = proxy_index.row()
+        if self._source_rows is not None:
+            if row >= len(self._source_rows):
+                return QModelIndex()
+            row = self._source_rows[row]
+        return self.sourceModel().index(row, 0)
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._source_rows is not None:
+            if self._proxy_row_by_source is None:
+                self._proxy_row_by_source = {source_row: i for i, source_row in enumerate(self._source_rows)}
+            row = self._proxy_row_by_source.get(row, -1)
+            if row < 0:
+                return QModelIndex()
+        return self.createIndex(row, 0)
+
+    # --- 絞り込み・並べ替え ---
+    def set_filter_text(self, text: str) -> bool:
+        """検索語を設定する (正規化した検索語が変わらない場合は False を返し、絞り込み直さない)"""
+        filter_key = normalize_text(text)
+        if filter_key == self._filter_key:
+            return False
+        # 検索語を追加した場合は表示中の行だけを照合すればよい
+        narrowing = bool(self._filter_key) and self._filter_key in filter_key
+        self.beginResetModel()
+        self._filter_key = filter_key
+        self._rebuild(self._source_rows if narrowing else None)
+        self.endResetModel()
+        return True
+
+    def sort(self, column: int, order=Qt.AscendingOrder) -> None:
+        """商品コード順に並べ替える (column が負の場合は元の順に戻す)"""
+        self.beginResetModel()
+        self._sort_order = order if column >= 0 else None
+        self._rebuild()
+        self.endResetModel()
+
+    def _rebuild(self, candidates: Optional[List[int]] = None) -> None:
+        source = self.sourceModel()
+        if not self._filter_key and self._sort_order is None:
+            self._source_rows = None
+        else:
+            rows = source.matching_rows(self._filter_key, candidates)
+            if self._sort_order is not None and candidates is None:
+                rows.sort(key=source.code_at, reverse=self._sort_order == Qt.DescendingOrder)
+            self._source_rows = rows
+        self._proxy_row_by_source = None
+
+    # --- 元のモデルの変更 ---
+    def _begin_source_change(self, first=None, last=None, inserting=None) -> None:
+        if self._source_rows is None and inserting is True:
+            self.beginInsertRows(QModelIndex(), first, last)
+        elif self._source_rows is None and inserting is False:
+            self.beginRemoveRows(QModelIndex(), first, last)
+        else:
+            self._resetting = True
+            self.beginResetModel()
+
+    def _end_source_change(self, inserting=None) -> None:
+        if self._resetting:
+            self._resetting = False
+            self._rebuild()
+            self.endResetModel()
+        elif inserting:
+            self.endInsertRows()
+        else:
+            self.endRemoveRows()
+
+    def _on_source_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles=None) -> None:
+        source = self.sourceModel()
+        if self._source_rows is not None:
+            self.mapFromSource(top_left)  # 対応表を作る
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                if (self._filter_key in source.filter_key(row)) != (row in self._proxy_row_by_source):
+                    # 変更で絞り込みの結果が変わった行がある場合は表示する行を作り直す
+                    self.beginResetModel()
+                    self._rebuild()
+                    self.endResetModel()
+                    return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            index = self.mapFromSource(source.index(row, 0))
+            if index.isValid():
+                self.dataChanged.emit(index, index)
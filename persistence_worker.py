@@ -0,0 +1,256 @@
+"""
+商品登録入力ツール - 保存ワーカーモジュール
+
+管理ファイル (item_manage.xlsm) への書き込みと item.xlsm の出力を
+バックグラウンドスレッドで行う。GUI スレッドは保存内容を ProductRepository に
+先行反映してからジョブを投入するだけなので、大きな .xlsm の保存中も操作を続けられる。
+
+遅延出力モード (既定) では保存ごとに item.xlsm を作り直さず、出力が古くなったことだけを記録する。
+item.xlsm は CSV 生成の直前・終了時・メニューからの明示的な出力で JOB_EXPORT_ITEM として作り直す。
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from openpyxl import load_workbook
+
+from manage_writer import PersistenceJob, JOB_EXPORT_ITEM, apply_jobs, can_patch_jobs
+from xlsx_patcher import UnsupportedPatchError, open_patch_workbook
+from item_exporter import export_item_xlsm
+from product_repository import ProductRepository
+from template_metadata import get_template_metadata
+
+
+class PersistenceQueue:
+    """
+    保存ジョブの待ち行列。
+    同じ key のジョブが待機中なら置き換えて末尾へ移動し、最新の状態だけを書き込む。
+    """
+
+    def __init__(self):
+        self._jobs: "OrderedDict[tuple, PersistenceJob]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stopped = False
+
+    def put(self, job: PersistenceJob, on_locked=None) -> None:
+        with self._cond:
+            previous = self._jobs.pop(job.key, None)
+            if previous is not None:
+                if not job.notify_message:
+                    job.notify_message = previous.notify_message
+                logging.debug(f"保存ジョブを統合しました: {previous!r} -> {job!r}")
+            self._jobs[job.key] = job
+            if on_locked:
+                on_locked()
+            self._cond.notify_all()
+
+    def take_all(self) -> Optional[List[PersistenceJob]]:
+        """ジョブが届くまで待ち、待機中のジョブをすべて取り出す。停止時は None を返す"""
+        with self._cond:
+            while not self._jobs and not self._stopped:
+                self._cond.wait()
+            if not self._jobs:
+                return None
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            self._busy = True
+            return jobs
+
+    def task_done(self, on_idle=None) -> None:
+        """取り出したジョブの処理完了を記録する。待機中のジョブがなければ on_idle を呼ぶ"""
+        with self._cond:
+            self._busy = False
+            if not self._jobs and on_idle:
+                on_idle()
+            self._cond.notify_all()
+
+    def is_idle(self) -> bool:
+        with self._cond:
+            return not self._jobs and not self._busy
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._jobs and not self._busy, timeout)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._jobs)
+
+
+def _apply_and_save(repo: ProductRepository, jobs: List[PersistenceJob], wb) -> None:
+    """開いたワークブックへジョブを反映して保存し、リポジトリの同期状態を更新する"""
+    try:
+        layout_changed = apply_jobs(wb, repo, jobs)
+        wb.save(repo.manage_file_path)
+    finally:
+        wb.close()
+    if layout_changed:
+        repo.invalidate()
+    else:
+        repo.mark_synced()
+
+
+def _write_manage_file(repo: ProductRepository, jobs: List[PersistenceJob]) -> str:
+    """
+    ジョブを管理ファイルへ書き込む。失敗した場合はエラーメッセージを返す。
+    行番号の差分更新だけで済む場合は変更したシートの XML だけを書き換え、
+    それ以外 (または直接書き換えに対応していない内容) は openpyxl で全体を保存する。
+    """
+    manage_file_path = repo.manage_file_path
+    try:
+        logging.info(f"管理ファイル '{manage_file_path}' への保存を試みます。({len(jobs)}件)")
+        if can_patch_jobs(repo, jobs):
+            try:
+                _apply_and_save(repo, jobs, open_patch_workbook(manage_file_path))
+                logging.info(f"管理ファイル '{manage_file_path}' の保存が完了しました。(シートXML直接書き換え)")
+                return ""
+            except UnsupportedPatchError as e:
+                # ファイルは書き換わっていないが、行番号は更新済みのため検索による保存に切り替える
+                logging.warning(f"シートXMLの直接書き換えができないため openpyxl で保存します: {e}")
+                repo.invalidate()
+        _apply_and_save(repo, jobs, load_workbook(manage_file_path, keep_vba=True))
+        logging.info(f"管理ファイル '{manage_file_path}' の保存が完了しました。")
+        return ""
+    except PermissionError:
+        repo.invalidate()
+        msg = f"管理ファイル '{manage_file_path}' が開かれているためアクセスできません。"
+        logging.error(msg)
+        return msg
+    except Exception as e:
+        repo.invalidate()
+        msg = f"管理ファイル '{manage_file_path}' のデータ処理または保存中にエラーが発生しました。\n\nエラー詳細:\n{e}"
+        logging.error(msg, exc_info=True)
+        return msg
+
+
+def process_batch(repo: ProductRepository, jobs: List[PersistenceJob],
+                  export_template_path: str, output_file_path: str, export: bool = True) -> List[Dict[str, Any]]:
+    """
+    ジョブをまとめて管理ファイルへ書き込み、export=True の場合は item.xlsm も出力する。
+    管理ファイルの読み込み・保存はバッチごとに1回だけ行う。戻り値はジョブごとの結果。
+    """
+    results = [{"kind": job.kind, "code": job.code, "success": False, "error": "",
+                "export_error": "", "warnings": [], "notify_message": job.notify_message}
+               for job in jobs]
+    write_jobs = [job for job in jobs if job.kind != JOB_EXPORT_ITEM]
+    if write_jobs:
+        error = _write_manage_file(repo, write_jobs)
+        if error:
+            for result in results:
+                result["error"] = error
+            return results
+
+    for result in results:
+        result["success"] = True
+    if not export:
+        return results
+
+    # item.xlsm はメモリ上の内容 (先行反映済みのジョブを含む) から出力する
+    try:
+        export_repo = repo
+        if not repo.is_in_sync():
+            # シート全体を書き直した場合は、メモリ上の行に無い列 (テンプレートで追加された列) があるため
+            # 書き込んだ管理ファイルを読み直して出力する。書き込み中は後続のジョブが先行反映されているため、
+            # repo 自体は読み直さない (保存ワーカーが空になった後の refresh() で読み直される)
+            export_repo = ProductRepository(repo.manage_file_path)
+            export_repo.refresh()
+        output_dir = os.path.dirname(output_file_path)
+        if output_dir and not os.path.exists(output_dir):
+            logging.info(f"出力先ディレクトリ '{output_dir}' を作成します。")
+            os.makedirs(output_dir, exist_ok=True)
+        metadata = get_template_metadata(export_template_path)
+        warnings = export_item_xlsm(export_template_path, output_file_path, export_repo.main_table(), export_repo.sku_table(),
+                                    metadata.main_headers if metadata.has_main_sheet else [],
+                                    metadata.sku_headers if metadata.has_sku_sheet else [])
+        for result in results:
+            result["warnings"] = warnings
+    except PermissionError:
+        msg = f"出力ファイル '{output_file_path}' が開かれているためアクセスできません。"
+        logging.error(msg)
+        for result in results:
+            result["export_error"] = msg
+    except Exception as e:
+        msg = f"出力ファイル '{output_file_path}' の処理中にエラーが発生しました。\n\nエラー詳細:\n{e}"
+        logging.error(msg, exc_info=True)
+        for result in results:
+            result["export_error"] = msg
+    return results
+
+
+class PersistenceWorker(QThread):
+    """管理ファイルへの書き込みを順番に処理するバックグラウンドスレッド"""
+
+    progress = pyqtSignal(str)            # ステータスバー表示用メッセージ
+    batch_finished = pyqtSignal(list)     # ジョブごとの結果辞書のリスト
+
+    def __init__(self, repo: ProductRepository, export_template_paths: List[str], output_file_path: str,
+                 lazy_export: bool = True, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self.export_template_paths = export_template_paths  # 優先順 (存在する最初のものを使用)
+        self.output_file_path = output_file_path
+        self.lazy_export = lazy_export  # True: 保存ごとに item.xlsm を出力せず、古くなったことだけを記録する
+        self.export_stale = False
+        self._queue = PersistenceQueue()
+
+    def enqueue(self, job: PersistenceJob) -> None:
+        """ジョブを投入する。待機中の同じ商品のジョブは置き換えられる"""
+        self._queue.put(job, on_locked=lambda: self.repo.set_write_pending(True))
+        if not self.isRunning():
+            self.start()
+
+    def is_idle(self) -> bool:
+        return self._queue.is_idle()
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        return self._queue.wait_until_idle(timeout)
+
+    def stop(self) -> None:
+        """待機中のジョブを書き込んでからスレッドを終了させる"""
+        self._queue.stop()
+        self.wait()
+
+    def _export_template_path(self) -> str:
+        for path in self.export_template_paths:
+            if os.path.exists(path):
+                return path
+        return self.export_template_paths[-1]
+
+    def run(self):
+        while True:
+            jobs = self._queue.take_all()
+            if jobs is None:
+                return
+            results = []
+            try:
+                export_now = not self.lazy_export or any(job.kind == JOB_EXPORT_ITEM for job in jobs)
+                has_writes = any(job.kind != JOB_EXPORT_ITEM for job in jobs)
+                self.progress.emit(f"保存中... ({len(jobs)}件)" if has_writes else "item.xlsm を出力中...")
+                results = process_batch(self.repo, jobs, self._export_template_path(), self.output_file_path,
+                                        export=export_now)
+                failed = sum(1 for r in results if not r["success"])
+                if not failed:
+                    if export_now and not results[0]["export_error"]:
+                        self.export_stale = False
+                    elif has_writes:
+                        self.export_stale = True
+                self.progress.emit(f"保存に失敗しました ({failed}件)" if failed else
+                                   (f"保存しました ({len(jobs)}件)" if has_writes else "item.xlsm を出力しました"))
+            except Exception as e:
+                logging.error(f"保存ワーカーで予期せぬエラーが発生しました: {e}", exc_info=True)
+                self.repo.invalidate()
+                results = [{"kind": job.kind, "code": job.code, "success": False, "error": str(e),
+                            "export_error": "", "warnings": [], "notify_message": job.notify_message}
+                           for job in jobs]
+            finally:
+                self._queue.task_done(on_idle=lambda: self.repo.set_write_pending(False))
+            self.batch_finished.emit(results)
@@ -2,9 +2,14 @@ import sys
 import os
 import subprocess
 import logging
+import logging.handlers
 import re
+import html
+import time
 import traceback
+import multiprocessing
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 import json
 from shutil import copyfile
 from PyQt5.QtGui import QColor, QFontMetrics, QRegExpValidator, QDoubleValidator, QKeySequence, QPixmap
@@ -16,7 +21,8 @@ from PyQt5.QtWidgets import (QCompleter,
     QDialogButtonBox, QProgressBar, QStatusBar, QCheckBox
 )
 from PyQt5.QtCore import (Qt, QAbstractTableModel, QModelIndex, QItemSelectionModel, QItemSelection, QItemSelectionRange,
-                          QTimer, QSize, QPoint, QStandardPaths, QSettings, QByteArray, QRegExp, pyqtSignal, QMutex)
+                          QTimer, QSize, QPoint, QStandardPaths, QSettings, QByteArray, QRegExp, pyqtSignal,
+                          QFileSystemWatcher)
 from typing import Optional, List, Dict, Any, Union, Tuple
 from openpyxl import load_workbook
 
@@ -28,8 +34,18 @@ DEFAULT_MARGINS = 10
 PROGRESS_UPDATE_INTERVAL = 50  # UI更新間隔（アイテム数）
 SPACER_HEIGHT = 10  # スペーサーの高さ
 FONT_SIZE_MENU = 13  # メニューフォントサイズ
+Y_SPEC_SECTION_TITLE = "Yahoo!ショッピング スペック情報↓"
+# 段階的起動でマスターの読み込みが終わるまで無効にするボタン (属性名, 必要なマスター)
+MASTER_DEPENDENT_BUTTONS = (
+    ('category_select_btn', ('categories',)),
+    ('open_id_search_button', ('r_genre_master', 'y_category_master', 'ya_category_master')),
+    ('sku_add_btn', ('rakuten_definitions',)),
+    ('explanation_mark_select_btn', ('explanation_icons',)),
+)
+
+from lazy_import import LazyImport
 
-# バージョンチェッカーのインポート
+# バージョンチェッカーのインポート (requests は更新確認の実行時に読み込まれる)
 try:
     from src.utils.version_checker import check_for_updates_on_startup, VersionChecker, CURRENT_VERSION
 except ImportError:
@@ -38,15 +54,11 @@ except ImportError:
     VersionChecker = None
     CURRENT_VERSION = "2.1.0"
 
-# 万が一対策システムのインポート
+# 万が一対策システムのインポート (起動直後に使うもの)
 try:
     from src.utils.crash_recovery import CrashRecoveryManager, setup_crash_handler, setup_qt_exception_handler
     from src.utils.config_recovery import check_and_recover_config
     from src.utils.file_lock_manager import handle_duplicate_launch, handle_file_conflicts, FileLockManager
-    from src.utils.disk_monitor import check_disk_space_before_save, check_disk_space_once
-    from src.utils.memory_manager import MemoryMonitor, check_memory_before_large_operation, optimize_large_data_processing
-    from src.utils.network_monitor import setup_network_monitoring, check_network_before_operation
-    from src.utils.system_compatibility import check_system_compatibility, get_system_info
 except ImportError:
     # フォールバック
     CrashRecoveryManager = None
@@ -56,15 +68,18 @@ except ImportError:
     handle_duplicate_launch = None
     handle_file_conflicts = None
     FileLockManager = None
-    check_disk_space_before_save = None
-    check_disk_space_once = None
-    MemoryMonitor = None
-    check_memory_before_large_operation = None
-    optimize_large_data_processing = None
-    setup_network_monitoring = None
-    check_network_before_operation = None
-    check_system_compatibility = None
-    get_system_info = None
+
+# 監視・互換性チェックは起動直後には使わないため、初回使用時にインポートする
+# (インポートできない場合は従来どおり偽として扱われる)
+check_disk_space_before_save = LazyImport("src.utils.disk_monitor", "check_disk_space_before_save")
+check_disk_space_once = LazyImport("src.utils.disk_monitor", "check_disk_space_once")
+MemoryMonitor = LazyImport("src.utils.memory_manager", "MemoryMonitor")
+check_memory_before_large_operation = LazyImport("src.utils.memory_manager", "check_memory_before_large_operation")
+optimize_large_data_processing = LazyImport("src.utils.memory_manager", "optimize_large_data_processing")
+setup_network_monitoring = LazyImport("src.utils.network_monitor", "setup_network_monitoring")
+check_network_before_operation = LazyImport("src.utils.network_monitor", "check_network_before_operation")
+check_system_compatibility = LazyImport("src.utils.system_compatibility", "check_system_compatibility")
+get_system_info = LazyImport("src.utils.system_compatibility", "get_system_info")
 
 # 分離したモジュールのインポート
 from constants import (
@@ -72,8 +87,8 @@ from constants import (
     APP_NAME,
     
     # ファイル名
-    TEMPLATE_FILE_NAME, CATEGORY_FILE_NAME, MANAGE_FILE_NAME, OUTPUT_FILE_NAME,
-    MATERIAL_SPEC_MASTER_FILE_NAME,
+    TEMPLATE_FILE_NAME, CATEGORY_FILE_NAME, MANAGE_FILE_NAME, MANAGE_STORE_FILE_NAME, MASTER_CACHE_DIR_NAME, OUTPUT_FILE_NAME,
+    MATERIAL_SPEC_MASTER_FILE_NAME, STARTUP_TRACE_FILE_NAME, MANAGE_SEARCH_INDEX_FILE_NAME,
     
     # シート名
     MAIN_SHEET_NAME, SKU_SHEET_NAME,
@@ -105,7 +120,7 @@ from constants import (
     SKU_CODE_SUFFIX_MAX, RAKUTEN_SKU_ATTR_NAME_SIZE_INFO,
     
     # UI設定
-    AUTO_SAVE_INTERVAL_MS, FROZEN_TABLE_COLUMN_COUNT, TABLE_PADDING,
+    AUTO_SAVE_INTERVAL_MS, FROZEN_TABLE_COLUMN_COUNT, TABLE_PADDING, LOADING_DIALOG_REFRESH_MS,
     MAX_WORKER_THREADS,
     
     # Yahoo spec同期名
@@ -120,15 +135,24 @@ from utils import (
     get_byte_count_excel_lenb, get_user_data_dir
 )
 from models import SkuTableModel
+from product_repository import ProductRepository
+from product_store import ProductStore
+from search_index import ProductSearchIndex
+from search_worker import CatalogSearchWorker
+from manage_writer import PersistenceJob, JOB_SAVE_PRODUCT, JOB_DELETE_PRODUCT, JOB_SET_CONTROL, JOB_EXPORT_ITEM
+from persistence_worker import PersistenceWorker
+from template_metadata import get_template_metadata
+from xlsx_reader import open_workbook
+from startup_trace import StartupTracer, run_timed
 from widgets import (
     CustomHtmlTextEdit, FocusControllingTableView, ScrollableFocusControllingTableView,
     MultipleSelectDialog, SkuMultipleAttributeEditor, SkuAttributeDelegate, LoadingDialog,
-    JapaneseLineEdit, JapaneseTextEdit, JapaneseHtmlTextEdit, SearchLineEdit
+    JapaneseLineEdit, JapaneseTextEdit, JapaneseHtmlTextEdit, SearchLineEdit, ProductListView
 )
 from loaders import (
     YSpecDefinitionLoader, RakutenAttributeDefinitionLoader,
     load_categories_from_csv, load_explanation_mark_icons,
-    load_material_spec_master, load_id_master_data
+    load_material_spec_master, load_id_master_data, init_loader_process
 )
 
 class SearchPanel(QWidget):
@@ -138,7 +162,11 @@ class SearchPanel(QWidget):
         self.parent_app = parent
         self.current_results = []
         self.current_index = -1
-        self._update_timer = None  # リアルタイム更新用タイマー
+        # 商品一覧の詳細検索 (ワーカーで実行し、結果は届いた分から表示する)
+        self._catalog_worker = None
+        self._catalog_generation = None  # 実行中の検索の世代番号 (実行中でなければ None)
+        self._catalog_query = None  # 実行中の検索の (検索語, 大文字と小文字を区別するか)
+        self._catalog_auto_jump = False
         self.setup_ui()
         self.setup_field_monitoring()
         
@@ -289,6 +317,7 @@ class SearchPanel(QWidget):
     
     def close_panel(self):
         """検索パネルを閉じる"""
+        self._cancel_catalog_search()
         self.hide()
         if self.parent_app and hasattr(self.parent_app, '_restore_splitter_sizes_without_search'):
             self.parent_app._restore_splitter_sizes_without_search()
@@ -304,6 +333,7 @@ class SearchPanel(QWidget):
             self.perform_search(auto_jump=False)
         elif not has_text:
             # テキストが空の場合は常に結果をクリア
+            self._cancel_catalog_search()
             self.current_results = []
             self.current_index = -1
             self.result_label.setText("検索結果: 0件")
@@ -338,6 +368,7 @@ class SearchPanel(QWidget):
             self.perform_search()
         else:
             # 検索テキストがない場合は結果をクリア
+            self._cancel_catalog_search()
             self.current_results = []
             self.current_index = -1
             self.result_label.setText("検索結果: 0件")
@@ -361,10 +392,16 @@ class SearchPanel(QWidget):
         self.current_results = []
         
         if scope == 0:  # 商品一覧（全フィールド）
-            self.search_product_list(search_text, case_sensitive)
+            if self.search_product_list(search_text, case_sensitive, auto_jump):
+                return  # 結果はワーカーから届いた分から表示する (_on_catalog_results)
         elif scope == 1:  # 現在の商品のフィールド
+            self._cancel_catalog_search()
             self.search_current_product(search_text, case_sensitive)
         
+        self._show_search_results(auto_jump)
+    
+    def _show_search_results(self, auto_jump):
+        """検索結果をリストに表示し、ボタンの状態を更新する"""
         # 検索結果がある場合は常に最初の結果を選択状態にする
         if self.current_results:
             self.current_index = 0
@@ -395,117 +432,155 @@ class SearchPanel(QWidget):
             if self.results_list.count() > 0:
                 self.results_list.setCurrentRow(0)
     
-    def search_product_list(self, search_text, case_sensitive):
-        """商品一覧を検索（各商品の詳細フィールドも含む）"""
+    def search_product_list(self, search_text, case_sensitive, auto_jump=True):
+        """
+        商品一覧を検索（各商品の詳細フィールドも含む）
+        
+        詳細検索はワーカースレッドで行い、開始した場合は True を返す。
+        結果は届いた分から一覧に追加し、新しい検索を始めると実行中の検索は打ち切られる。
+        """
+        self._cancel_catalog_search()
         if not hasattr(self.parent_app, 'manage_file_path') or not self.parent_app.manage_file_path:
             # フォールバック: 商品一覧の表示テキストのみ検索
             self._search_product_list_simple(search_text, case_sensitive)
-            return
-            
-        try:
-            from openpyxl import load_workbook
-            wb = load_workbook(self.parent_app.manage_file_path, read_only=True)
-            
-            if MAIN_SHEET_NAME not in wb.sheetnames:
-                self._search_product_list_simple(search_text, case_sensitive)
-                wb.close()
-                return
-                
-            ws_main = wb[MAIN_SHEET_NAME]
-            main_rows = list(ws_main.iter_rows(values_only=True))
-            
-            if not main_rows:
-                wb.close()
-                return
-                
-            headers = [str(h).strip() if h is not None else "" for h in main_rows[0]]
-            
-            # 各商品の全フィールドを検索
-            for row_idx, row in enumerate(main_rows[1:], 1):
-                row_data = dict(zip(headers, [str(cell) if cell is not None else "" for cell in row]))
-                product_code = row_data.get(HEADER_MYCODE, "")
-                
-                if not product_code:
-                    continue
-                
-                # 対応する商品一覧のアイテムを検索
-                list_item = None
-                list_index = -1
-                for i in range(self.parent_app.product_list.count()):
-                    item = self.parent_app.product_list.item(i)
-                    if item and product_code in item.text():
-                        list_item = item
-                        list_index = i
-                        break
-                
-                if not list_item:
-                    continue
-                
-                # 各フィールドで検索語が見つかるかチェック
-                matched_fields = []
-                for field_name, field_value in row_data.items():
-                    if field_value and self.text_matches(str(field_value), search_text, case_sensitive):
-                        matched_fields.append({
-                            'field_name': field_name,
-                            'field_value': str(field_value)[:100],  # 長すぎる場合は切り詰め
-                            'full_value': str(field_value)
-                        })
-                
-                # マッチしたフィールドがある場合は結果に追加
-                if matched_fields:
-                    for match in matched_fields:
-                        self.current_results.append({
-                            'type': 'product_list',
-                            'index': list_index,
-                            'item': list_item,
-                            'text': list_item.text(),
-                            'field_name': match['field_name'],
-                            'field_value': match['field_value'],
-                            'full_field_value': match['full_value'],
-                            'description': f"商品一覧 [{list_index+1}] - {match['field_name']}: {match['field_value']}"
-                        })
-            
-            wb.close()
+            return False
             
-        except Exception as e:
-            logging.error(f"商品一覧詳細検索エラー: {e}")
-            # エラー時はシンプル検索にフォールバック
+        repo = getattr(self.parent_app, 'product_repository', None)
+        if repo is None:
             self._search_product_list_simple(search_text, case_sensitive)
+            return False
+        
+        # 商品コード → リスト行 の対応表 (コピーを渡すため、検索中に商品一覧が更新されても影響しない)
+        list_index_by_code = self.parent_app.product_list.list_model.list_index_by_code()
+        
+        # 検索索引が未作成の場合は作成を始める (作成が終わるまでは全商品を照合する)
+        if repo.search_index is not None and not repo.search_index.ready:
+            self.parent_app._prepare_search_index()
+        
+        if self._catalog_worker is None:
+            self._catalog_worker = CatalogSearchWorker(repo, self)
+            self._catalog_worker.results_ready.connect(self._on_catalog_results)
+            self._catalog_worker.search_finished.connect(self._on_catalog_search_finished)
+        self.current_index = -1
+        self.results_list.clear()
+        self.result_label.setText("検索中...")
+        self.replace_btn.setEnabled(False)
+        self.replace_all_btn.setEnabled(False)
+        self._catalog_query = (search_text, case_sensitive)
+        self._catalog_auto_jump = auto_jump
+        self._catalog_generation = self._catalog_worker.submit(search_text, case_sensitive, list_index_by_code)
+        return True
+    
+    def is_searching(self):
+        """商品一覧の詳細検索を実行中か"""
+        return self._catalog_generation is not None
+    
+    def _cancel_catalog_search(self):
+        """実行中の商品一覧の詳細検索を打ち切る (届いていない結果は表示しない)"""
+        if self._catalog_generation is not None:
+            self._catalog_generation = None
+            if self._catalog_worker is not None:
+                self._catalog_worker.cancel()
+    
+    def _on_catalog_results(self, generation, matches):
+        """ワーカーから届いた商品一覧の検索結果を追加する"""
+        if generation != self._catalog_generation:
+            return  # 打ち切った検索の結果
+        list_model = self.parent_app.product_list.list_model
+        first_chunk = not self.current_results
+        for list_index, field_name, field_value in matches:
+            if list_index >= list_model.rowCount():
+                continue
+            result = self._product_list_result(list_model, list_index, field_name, field_value)
+            self.current_results.append(result)
+            self._add_result_list_item(len(self.current_results) - 1, result)
+        self.result_label.setText(f"検索結果: {len(self.current_results)}件 (検索中...)")
+        # 最初の結果を選択状態にする (ジャンプは検索完了後)
+        if first_chunk and self.current_results:
+            self.current_index = 0
+            self.results_list.setCurrentRow(0)
+    
+    def _on_catalog_search_finished(self, generation, count, completed):
+        """商品一覧の詳細検索が完了した (completed=False の場合は表示テキストのみの検索に切り替える)"""
+        if generation != self._catalog_generation:
+            return
+        self._catalog_generation = None
+        auto_jump = self._catalog_auto_jump
+        if not completed:
+            search_text, case_sensitive = self._catalog_query
+            self.current_results = []
+            self._search_product_list_simple(search_text, case_sensitive)
+            self._show_search_results(auto_jump)
+            return
+        self.result_label.setText(f"検索結果: {len(self.current_results)}件")
+        if auto_jump and self.current_results:
+            self.current_index = 0
+            self.jump_to_result(0)
+            self.results_list.setCurrentRow(0)
+    
+    @staticmethod
+    def _product_list_result(list_model, list_index, field_name, field_value):
+        """商品一覧の詳細検索の結果1件"""
+        return {
+            'type': 'product_list',
+            'index': list_index,
+            'code': list_model.code_at(list_index),
+            'text': list_model.text_at(list_index),
+            'field_name': field_name,
+            'field_value': field_value[:100],  # 長すぎる場合は切り詰め
+            'full_field_value': field_value,
+            'description': f"商品一覧 [{list_index+1}] - {field_name}: {field_value[:100]}"
+        }
+    
+    def shutdown(self):
+        """検索ワーカーを終了させる (アプリ終了時)"""
+        self._catalog_generation = None
+        if self._catalog_worker is not None:
+            self._catalog_worker.stop()
+            self._catalog_worker = None
     
     def _search_product_list_simple(self, search_text, case_sensitive):
         """商品一覧のシンプル検索（表示テキストのみ）"""
-        for i in range(self.parent_app.product_list.count()):
-            item = self.parent_app.product_list.item(i)
-            if item and self.text_matches(item.text(), search_text, case_sensitive):
+        list_model = self.parent_app.product_list.list_model
+        for i in range(list_model.rowCount()):
+            text = list_model.text_at(i)
+            if self.text_matches(text, search_text, case_sensitive):
                 self.current_results.append({
                     'type': 'product_list',
                     'index': i,
-                    'item': item,
-                    'text': item.text(),
+                    'code': list_model.code_at(i),
+                    'text': text,
                     'description': f"商品一覧 [{i+1}]"
                 })
     
     def search_current_product(self, search_text, case_sensitive):
         """現在の商品のフィールドを検索"""
         for field_name, field_widget in self.parent_app.main_fields.items():
-            text = None
-            if isinstance(field_widget, QLineEdit):
-                text = field_widget.text()
-            elif isinstance(field_widget, QTextEdit):
-                text = field_widget.toPlainText()
-            elif hasattr(field_widget, 'toPlainText'):  # CustomHtmlTextEditなど
-                text = field_widget.toPlainText()
-            else:
-                continue
-                
+            text = self._field_widget_text(field_widget)
             if text and self.text_matches(text, search_text, case_sensitive):
-                self.current_results.append({
-                    'type': 'field',
-                    'field_name': field_name,
-                    'widget': field_widget,
-                    'text': text,
-                    'description': f"フィールド: {field_name}"
-                })
+                self.current_results.append(self._field_result(field_name, field_widget, text))
+    
+    @staticmethod
+    def _field_widget_text(field_widget):
+        """検索対象のフィールドの値 (検索対象外のウィジェットは None)"""
+        if isinstance(field_widget, QLineEdit):
+            return field_widget.text()
+        elif isinstance(field_widget, QTextEdit):
+            return field_widget.toPlainText()
+        elif hasattr(field_widget, 'toPlainText'):  # CustomHtmlTextEditなど
+            return field_widget.toPlainText()
+        return None
+    
+    @staticmethod
+    def _field_result(field_name, field_widget, text):
+        """現在の商品のフィールドの検索結果1件"""
+        return {
+            'type': 'field',
+            'field_name': field_name,
+            'widget': field_widget,
+            'text': text,
+            'description': f"フィールド: {field_name}"
+        }
     
     def text_matches(self, text, search_text, case_sensitive):
         """テキストが検索条件にマッチするかチェック"""
@@ -554,6 +629,8 @@ class SearchPanel(QWidget):
         # 自動検索が無効の場合は検索を実行
         if search_text and not self.auto_search.isChecked():
             self.perform_search(auto_jump=True)
+            if self.is_searching():
+                return  # 商品一覧の検索は完了時に最初の結果へジャンプする
         elif not self.current_results:
             return
         
@@ -573,17 +650,25 @@ class SearchPanel(QWidget):
         self.results_list.clear()
         
         for i, result in enumerate(self.current_results):
-            # 結果の表示形式を改善
-            location = result.get('description', '不明')
-            text_preview = result.get('text', '')[:50]
-            if len(result.get('text', '')) > 50:
-                text_preview += "..."
-                
-            item_text = f"[{i+1}] {location}: {text_preview}"
-            list_item = QListWidgetItem(item_text)
-            list_item.setData(Qt.UserRole, i)  # 結果のインデックスを保存
-            list_item.setToolTip(f"フィールド: {location}\n内容: {result.get('text', '')}")
-            self.results_list.addItem(list_item)
+            self._add_result_list_item(i, result)
+    
+    def _add_result_list_item(self, i, result):
+        """検索結果リストに1件追加する"""
+        list_item = QListWidgetItem()
+        self._set_result_list_item(list_item, i, result)
+        self.results_list.addItem(list_item)
+    
+    def _set_result_list_item(self, list_item, i, result):
+        """検索結果リストの1行に i 番目の結果を表示する"""
+        # 結果の表示形式を改善
+        location = result.get('description', '不明')
+        text_preview = result.get('text', '')[:50]
+        if len(result.get('text', '')) > 50:
+            text_preview += "..."
+            
+        list_item.setText(f"[{i+1}] {location}: {text_preview}")
+        list_item.setData(Qt.UserRole, i)  # 結果のインデックスを保存
+        list_item.setToolTip(f"フィールド: {location}\n内容: {result.get('text', '')}")
     
     def on_result_clicked(self, item):
         """検索結果がクリックされた時の処理"""
@@ -666,13 +751,13 @@ class SearchPanel(QWidget):
             
             elif result_type == 'product_list':
                 # 商品リスト検索結果の場合
-                item = result.get('item')
-                if item and self.parent_app and hasattr(self.parent_app, 'product_list'):
-                    # 商品リストのアイテムを選択
-                    self.parent_app.product_list.setCurrentItem(item)
+                code = result.get('code')
+                if code and self.parent_app and hasattr(self.parent_app, 'product_list'):
+                    # 商品リストの商品を選択
+                    self.parent_app.product_list.set_current_code(code)
                     # 商品データを読み込み
                     if hasattr(self.parent_app, 'load_product'):
-                        self.parent_app.load_product(item)
+                        self.parent_app.load_product(code)
         
         # 結果カウントを更新
         if 0 <= index < len(self.current_results):
@@ -802,15 +887,11 @@ class SearchPanel(QWidget):
         if not self.parent_app or not hasattr(self.parent_app, 'main_fields'):
             return
         
-        # すべてのmain_fieldsのtextChangedシグナルに接続
+        # すべてのmain_fieldsのtextChangedシグナルに接続 (変更されたフィールド名を渡す)
         for field_name, widget in self.parent_app.main_fields.items():
             try:
-                if isinstance(widget, QLineEdit):
-                    widget.textChanged.connect(self.on_field_changed)
-                elif isinstance(widget, QTextEdit):
-                    widget.textChanged.connect(self.on_field_changed)
-                elif hasattr(widget, 'textChanged'):
-                    widget.textChanged.connect(self.on_field_changed)
+                if isinstance(widget, (QLineEdit, QTextEdit)) or hasattr(widget, 'textChanged'):
+                    widget.textChanged.connect(lambda *_args, name=field_name: self.on_field_changed(name))
             except Exception as e:
                 logging.debug(f"フィールド監視設定エラー {field_name}: {e}")
         
@@ -821,18 +902,92 @@ class SearchPanel(QWidget):
         except Exception as e:
             logging.debug(f"検索オプション監視設定エラー: {e}")
     
-    def on_field_changed(self):
-        """フィールド値が変更されたときの処理"""
-        # 検索結果と検索テキストがある場合のみ更新
-        if self.current_results and self.search_input.text().strip():
-            # 頻繁な更新を避けるため少し遅延
-            if not self._update_timer:
-                self._update_timer = QTimer()
-                self._update_timer.setSingleShot(True)
-                self._update_timer.timeout.connect(self.update_search_results_realtime)
-            
-            self._update_timer.stop()
-            self._update_timer.start(300)  # 300ms遅延
+    def on_field_changed(self, field_name):
+        """フィールド値が変更されたときの処理 (変更されたフィールドの検索結果だけを更新する)"""
+        if not self.isVisible() or not self.search_input.text().strip():
+            return
+        # 商品の読み込み中は読み込み後に検索し直すため、フィールドごとには更新しない
+        if getattr(self.parent_app, '_is_loading_data', False) or self.is_searching():
+            return
+        try:
+            self.update_field_result(field_name)
+        except Exception as e:
+            logging.debug(f"検索結果の差分更新中のエラー（継続）: {e}")
+    
+    def update_field_result(self, field_name):
+        """
+        現在の商品の1フィールドを検索語と照合し直し、検索結果とリストをその場で更新する
+        (一致しなくなった結果は削除し、新たに一致した結果は検索時と同じ順の位置に挿入する)
+        """
+        search_text = self.search_input.text().strip()
+        case_sensitive = self.case_sensitive.isChecked()
+        field_widget = self.parent_app.main_fields.get(field_name)
+        text = self._field_widget_text(field_widget)
+        matched = bool(text) and self.text_matches(text, search_text, case_sensitive)
+        
+        scope = self.scope_combo.currentIndex()
+        if scope == 1:  # 現在の商品のフィールド: フィールドの並び順
+            field_order = {name: i for i, name in enumerate(self.parent_app.main_fields)}
+            new_result = self._field_result(field_name, field_widget, text) if matched else None
+            is_target = lambda r: r.get('type') == 'field' and r.get('field_name') == field_name
+            sort_key = lambda r: field_order.get(r.get('field_name'), len(field_order))
+        elif scope == 0:  # 商品一覧: 一覧の行、Mainシートの列の順
+            repo = getattr(self.parent_app, 'product_repository', None)
+            list_model = self.parent_app.product_list.list_model
+            current_code = self.parent_app.product_list.current_code()
+            list_index = list_model.row_of(current_code)
+            if repo is None or list_index < 0 or field_name not in repo.main_headers:
+                return
+            if any('field_name' not in r for r in self.current_results[:1]):
+                return  # 表示テキストのみの検索結果 (詳細検索ができなかった場合) は更新しない
+            header_order = {name: i for i, name in enumerate(repo.main_headers)}
+            new_result = self._product_list_result(list_model, list_index, field_name, text) if matched else None
+            # 一覧の行は検索後の商品の追加・削除でずれるため、結果は商品コードで照合する (行は並び順にのみ使う)
+            is_target = lambda r: r.get('code') == current_code and r.get('field_name') == field_name
+            sort_key = lambda r: (r.get('index', -1), header_order.get(r.get('field_name'), -1))
+        else:
+            return
+        self._patch_result(is_target, new_result, sort_key)
+    
+    def _patch_result(self, is_target, new_result, sort_key):
+        """is_target に該当する検索結果を new_result に置き換える (None の場合は削除する)"""
+        position = next((i for i, r in enumerate(self.current_results) if is_target(r)), None)
+        if position is not None and new_result is not None:
+            if self.current_results[position] == new_result:
+                return
+            self.current_results[position] = new_result
+            self._set_result_list_item(self.results_list.item(position), position, new_result)
+        elif position is not None:
+            del self.current_results[position]
+            self.results_list.takeItem(position)
+            if self.current_index == position:
+                self.current_index = -1
+            elif self.current_index > position:
+                self.current_index -= 1
+            self._renumber_result_list_items(position)
+        elif new_result is not None:
+            key = sort_key(new_result)
+            position = next((i for i, r in enumerate(self.current_results) if sort_key(r) > key),
+                            len(self.current_results))
+            self.current_results.insert(position, new_result)
+            list_item = QListWidgetItem()
+            self._set_result_list_item(list_item, position, new_result)
+            self.results_list.insertItem(position, list_item)
+            if self.current_index >= position:
+                self.current_index += 1
+            self._renumber_result_list_items(position + 1)
+        else:
+            return
+        
+        self.result_label.setText(f"検索結果: {len(self.current_results)}件")
+        can_replace = self.scope_combo.currentIndex() == 1 and len(self.current_results) > 0
+        self.replace_btn.setEnabled(can_replace)
+        self.replace_all_btn.setEnabled(can_replace)
+    
+    def _renumber_result_list_items(self, start):
+        """挿入・削除した位置以降の検索結果リストの番号を振り直す"""
+        for i in range(start, len(self.current_results)):
+            self._set_result_list_item(self.results_list.item(i), i, self.current_results[i])
     
     def on_search_option_changed(self):
         """検索オプション（大文字小文字区別・検索対象）が変更されたときの処理"""
@@ -841,35 +996,6 @@ class SearchPanel(QWidget):
         if search_text:
             self.perform_search(auto_jump=False)  # 現在位置を保持
     
-    def update_search_results_realtime(self):
-        """フィールド変更後のリアルタイム検索結果更新"""
-        search_text = self.search_input.text().strip()
-        if not search_text:
-            return
-        
-        # 現在の選択を保存
-        current_selection = self.current_index
-        current_field = None
-        if 0 <= current_selection < len(self.current_results):
-            current_result = self.current_results[current_selection]
-            current_field = current_result.get('field_name')
-        
-        # 検索を再実行
-        self.perform_search(auto_jump=False)
-        
-        # 可能であれば同じフィールドの選択を維持
-        if current_field:
-            for i, result in enumerate(self.current_results):
-                if result.get('field_name') == current_field:
-                    self.current_index = i
-                    if self.results_list.count() > i:
-                        self.results_list.setCurrentRow(i)
-                    break
-            else:
-                # 前に選択していたフィールドが見つからない場合は選択をクリア
-                self.current_index = -1
-                self.results_list.clearSelection()
-    
     def _perform_replace(self, text, search_text, replace_text):
         """テキストの置換を実行"""
         # 安全性チェック
@@ -940,13 +1066,15 @@ class FilteredLineEdit(QLineEdit):
 
 
 class ExpandableFieldGroup(QWidget):
-    def __init__(self, group_label, group_count, main_fields_dict, always_show=3, has_ab=False, parent_app=None, master_data=None, field_names_list=None):
+    def __init__(self, group_label, group_count, main_fields_dict, always_show=3, has_ab=False, parent_app=None, master_data=None, field_names_list=None, master_loading=False):
         super().__init__(parent_app); self.setObjectName("ExpandableGroup")
         self.group_header_widget = QWidget(); self.group_header_widget.setObjectName("ExpandableGroupHeader")
         group_header_layout = QHBoxLayout(self.group_header_widget); group_header_layout.setContentsMargins(8, 5, 8, 5); group_header_layout.setSpacing(8)
         
         self.field_names_list = field_names_list # 特定のフィールドリストを保持
         self.master_data = master_data # Store master data for this group
+        self.master_loading = master_loading # マスターをバックグラウンドで読み込み中 (読み込み完了時に set_master_data で反映)
+        self.master_combo_pairs = [] # 材質・仕様マスターの選択欄と説明欄の組 (set_master_data で選択肢を更新する)
         self.group_label_widget = QLabel(f"{group_label}"); self.group_label_widget.setObjectName("ExpandableGroupLabel")
         group_header_layout.addWidget(self.group_label_widget); group_header_layout.addStretch()
         self.toggle_button = QPushButton(); self.toggle_button.setObjectName("ExpandableGroupToggleButton"); self.toggle_button.setFixedSize(22, 22)
@@ -1044,18 +1172,24 @@ class ExpandableFieldGroup(QWidget):
                     h_box = QHBoxLayout(); field_a_widget = None
                     field_b_widget, field_b_ui_widget = None, None
 
-                    if self.group_label_prefix in ["材質", "仕様"] and self.master_data:
+                    if self.group_label_prefix in ["材質", "仕様"] and (self.master_data or self.master_loading):
                         field_a_widget = QComboBox()
                         field_a_widget.addItem("") # Blank item
-                        for name_key in sorted(self.master_data.keys()):
+                        for name_key in sorted((self.master_data or {}).keys()):
                             field_a_widget.addItem(name_key)
+                        if self.master_loading:
+                            # 読み込み中は選択できないが、商品を開いた場合の値は保持できるよう編集可能にしておく
+                            field_a_widget.setEditable(True)
+                            field_a_widget.lineEdit().setPlaceholderText("読み込み中...")
+                            field_a_widget.setEnabled(False)
                         
                         field_b_widget = JapaneseLineEdit()
                         field_b_widget.setReadOnly(True)
+                        self.master_combo_pairs.append((field_a_widget, field_b_widget))
 
                         field_a_widget.currentTextChanged.connect(
-                            lambda text, b_w=field_b_widget, master=self.master_data: 
-                                self.on_master_a_selected(text, b_w, master)
+                            lambda text, b_w=field_b_widget: 
+                                self.on_master_a_selected(text, b_w, self.master_data)
                         )
                         if self.parent_app_ref: 
                             field_a_widget.currentTextChanged.connect(self.parent_app_ref.mark_dirty)
@@ -1212,6 +1346,26 @@ class ExpandableFieldGroup(QWidget):
                     b_line_edit_widget = self.main_fields_ref.get(b_field_name)
                     if b_line_edit_widget:
                          self.b_field_stacks[i].setCurrentWidget(b_line_edit_widget)
+    def set_master_data(self, master_data):
+        """バックグラウンドで読み込んだマスターを選択肢に反映する (読み込み中に設定された値は変更扱いにしない)"""
+        self.master_data = master_data
+        self.master_loading = False
+        for combo, field_b_widget in self.master_combo_pairs:
+            current_text = combo.currentText()
+            combo.blockSignals(True)
+            try:
+                # マスターが空の場合は、マスターが無いときと同じく自由入力にする
+                combo.setEditable(not master_data)
+                combo.clear()
+                combo.addItem("")
+                for name_key in sorted(master_data.keys()):
+                    combo.addItem(name_key)
+                combo.setCurrentText(current_text)
+            finally:
+                combo.blockSignals(False)
+            field_b_widget.setReadOnly(bool(master_data))
+            combo.setEnabled(True)
+
     def on_master_a_selected(self, selected_text_a, field_b_widget, master_data_map):
         description = ""
         if selected_text_a and master_data_map: # Ensure text and map are valid
@@ -1384,6 +1538,8 @@ class ExpandableFieldGroup(QWidget):
 class ProductApp(QWidget):
     def __init__(self):
         super().__init__()
+        # 起動処理ごとの所要時間を記録し、遅延実行の初期化まで終わったらユーザーデータフォルダへ保存する
+        self.startup_tracer = StartupTracer(on_complete=self._write_startup_trace)
         # 重要：UI構築で使用される辞書類を最初に初期化
         self.main_fields = {}
         self.category_fields = []
@@ -1395,17 +1551,22 @@ class ProductApp(QWidget):
         self._is_loading_data = False
         self._is_handling_selection_change = False
         
-        self._save_mutex = QMutex()  # 保存処理の排他制御
-        self._setup_logging() # ★★★ ロギング設定を最初に行う ★★★
+        with self.startup_tracer.phase("_setup_logging"):
+            self._setup_logging() # ★★★ ロギング設定を最初に行う ★★★
         
         # 万が一対策システムの初期化
-        self._init_emergency_systems()
+        with self.startup_tracer.phase("_init_emergency_systems"):
+            self._init_emergency_systems()
         
         # Undo/Redo用の履歴管理
         self.undo_stack = []
         self.redo_stack = []
         self.max_undo_history = 50  # 最大履歴数
         self._is_undoing = False  # Undo/Redo実行中フラグ
+        # 段階的起動でバックグラウンド読み込み中のマスター名 (_load_initial_data 参照)
+        self._pending_master_names = set()
+        # Y!spec定義の読み込み中に商品から読み込んだ Y_spec の値 (読み込み完了後に編集欄へ反映する)
+        self._pending_y_spec_values = None
         self._undo_save_timer = None  # デバウンス用タイマー
         
         self.setWindowTitle(f"商品登録入力ツール v{CURRENT_VERSION}")
@@ -1424,9 +1585,12 @@ class ProductApp(QWidget):
                 logging.debug(f"アイコン設定失敗（継続）: {e}")  # デバッグレベルでログ記録
         
         # --- 起動時処理 ---
-        progress = self._show_loading_dialog()
-        self._init_paths_and_dirs(progress)
-        self._load_initial_data(progress)
+        with self.startup_tracer.phase("_show_loading_dialog"):
+            progress = self._show_loading_dialog()
+        with self.startup_tracer.phase("_init_paths_and_dirs"):
+            self._init_paths_and_dirs(progress)
+        with self.startup_tracer.phase("_load_initial_data"):
+            self._load_initial_data(progress)
         progress.show()
         QApplication.processEvents() # ダイアログの表示を確実にする
 
@@ -1442,7 +1606,8 @@ class ProductApp(QWidget):
             self.template_file_path_bundle = os.path.join(self.base_dir_frozen, safe_template_name)
 
             # 管理ファイルの初期化またはアップデート
-            self._initialize_or_update_manage_file()
+            with self.startup_tracer.phase("_initialize_or_update_manage_file"):
+                self._initialize_or_update_manage_file()
             current_step += 1
             progress.setValue(current_step) # テンプレートコピー完了
 
@@ -1471,7 +1636,8 @@ class ProductApp(QWidget):
             logging.debug(f"メモリチェック中のエラー（継続）: {e}")
 
         # --- UI構築開始 ---
-        self._init_ui_components() # 主要なUI要素の初期化
+        with self.startup_tracer.phase("_init_ui_components"):
+            self._init_ui_components() # 主要なUI要素の初期化
         self._setup_copy_paste_actions() # 商品リストのコピペアクション設定（メニューバー作成前に実行）
         self._setup_delete_action() # 商品リストのDeleteキーアクション設定
         
@@ -1503,9 +1669,12 @@ class ProductApp(QWidget):
         self.status_bar.showMessage("起動中...")
         top_layout.addWidget(self.status_bar)
         
-        self._setup_main_layout(main_layout) # メインレイアウトの構築
-        self._connect_signals() # シグナル接続の設定
-        self._setup_tab_order() # タブオーダーの設定
+        with self.startup_tracer.phase("_setup_main_layout"):
+            self._setup_main_layout(main_layout) # メインレイアウトの構築
+        with self.startup_tracer.phase("_connect_signals"):
+            self._connect_signals() # シグナル接続の設定
+        with self.startup_tracer.phase("_setup_tab_order"):
+            self._setup_tab_order() # タブオーダーの設定
 
         # --- 左ペイン ---
         left_widget = QWidget(); left_widget.setObjectName("LeftPane"); left_layout = QVBoxLayout(left_widget)
@@ -1583,7 +1752,8 @@ class ProductApp(QWidget):
         self.expandable_field_group_instances = {}
         for lbl, cnt, ab_flag in expandable_groups:
             master_data_for_group = self.material_spec_master if lbl in ["材質", "仕様"] else None
-            self.expandable_field_group_instances[lbl] = ExpandableFieldGroup(lbl, cnt, self.main_fields, 3, ab_flag, self, master_data=master_data_for_group)
+            master_loading = lbl in ["材質", "仕様"] and self._is_master_loading('material_spec_master')
+            self.expandable_field_group_instances[lbl] = ExpandableFieldGroup(lbl, cnt, self.main_fields, 3, ab_flag, self, master_data=master_data_for_group, master_loading=master_loading)
         self.byte_count_labels = {}
         self.digit_count_label_mycode = None
         added_expandable_groups = set()
@@ -1596,7 +1766,7 @@ class ProductApp(QWidget):
         self._y_spec_section_rendered_in_form = False # Y_specセクションがフォームにレンダリングされたかのフラグ
         
         # Y_specセクションのヘッダーとスペーサーをインスタンス変数として定義
-        self.y_spec_section_label_widget = QLabel("Yahoo!ショッピング スペック情報↓")
+        self.y_spec_section_label_widget = QLabel(Y_SPEC_SECTION_TITLE)
         self.y_spec_section_label_widget.setObjectName("SectionHeader")
         
         self.y_spec_header_spacer_top = QLabel(" ") # 空白文字を設定して高さを認識しやすくする
@@ -1936,31 +2106,47 @@ class ProductApp(QWidget):
         if HEADER_Y_CATEGORY_ID in self.main_fields:
             self.main_fields[HEADER_Y_CATEGORY_ID].textChanged.connect(lambda text: self._on_y_category_id_changed(text))
         
-        # 説明マーク選択ボタンの有効/無効を設定
-        if hasattr(self, 'explanation_mark_select_btn'):
-            self.explanation_mark_select_btn.setEnabled(bool(self.explanation_mark_icon_data))
+        # 説明マーク選択ボタンなどマスターに依存するボタンの有効/無効を設定 (段階的起動では読み込み中は無効)
+        self._update_master_loading_state()
 
         progress.setLabelText(f"商品リスト ({MANAGE_FILE_NAME}) を読み込み中..."); QApplication.processEvents()
-        self.clear_fields(); self.load_list(); self.apply_stylesheet()
+        self.clear_fields()
+        with self.startup_tracer.phase("load_list"):
+            self.load_list()
+        with self.startup_tracer.phase("apply_stylesheet"):
+            self.apply_stylesheet()
+        self._setup_manage_file_watcher()
         current_step += 1 # 商品リスト読み込み完了のステップ
         progress.setValue(current_step); QApplication.processEvents()
 
         progress.stop_animation() # アニメーションを停止
         progress.close()          # 全ての処理が完了したらダイアログを閉じる
         # self.showMaximized() # アプリケーション起動時に最大化表示
-        self.show() # ウィンドウを一度表示してから設定を読み込む
-        self._load_settings()
+        with self.startup_tracer.phase("show"):
+            self.show() # ウィンドウを一度表示してから設定を読み込む
+        with self.startup_tracer.phase("_load_settings"):
+            self._load_settings()
         self._on_y_category_id_changed(self.main_fields.get(HEADER_Y_CATEGORY_ID, JapaneseLineEdit()).text()) # 初期表示のために呼び出し
         
         # ウィンドウ表示後にメニューバーを作成（遅延実行で確実に）
-        QTimer.singleShot(50, self._create_menu_bar)
+        QTimer.singleShot(50, self.startup_tracer.deferred("_create_menu_bar", self._create_menu_bar))
         # フォールバック: メニューバーが作成されない場合に備えて追加の試行
-        QTimer.singleShot(200, self._ensure_menu_bar_visible)
+        QTimer.singleShot(200, self.startup_tracer.deferred("_ensure_menu_bar_visible", self._ensure_menu_bar_visible))
 
         # 自動保存タイマーの設定
         self.auto_save_timer = QTimer(self)
         self.auto_save_timer.timeout.connect(lambda: self._auto_save_data())
         
+        # 段階的起動: ウィンドウ表示後にマスターを読み込み、完了したものから機能を有効にする
+        if getattr(self, '_master_tasks_to_hydrate', None):
+            self._finish_master_hydration_traced = self.startup_tracer.deferred("_finish_master_hydration", self._finish_master_hydration)
+            QTimer.singleShot(0, self.startup_tracer.deferred("_start_master_hydration", self._start_master_hydration))
+        
+        # システム互換性チェックと監視システムはウィンドウ表示後に初期化する
+        QTimer.singleShot(1000, self.startup_tracer.deferred("_init_background_monitors", self._init_background_monitors))
+        # 商品一覧の検索索引は起動後に読み込む (無い場合はバックグラウンドで作成する)
+        QTimer.singleShot(1500, self.startup_tracer.deferred("_prepare_search_index", self._prepare_search_index))
+        
         # ステータスバーの初期化（UIコンポーネント作成後、直接実行）
         # 遅延実行後に呼び出し
         def init_status_bar_delayed():
@@ -1970,7 +2156,7 @@ class ProductApp(QWidget):
             else:
                 logging.debug("_init_status_bar メソッドが存在しません")
         
-        QTimer.singleShot(2000, init_status_bar_delayed)
+        QTimer.singleShot(2000, self.startup_tracer.deferred("_init_status_bar", init_status_bar_delayed))
         
         # スマートナビゲーション機能の初期化（遅延実行）
         def init_smart_navigation():
@@ -1981,7 +2167,7 @@ class ProductApp(QWidget):
             # アプリケーションレベルのTabキーイベントフィルターを追加
             self._setup_global_tab_filter()
                 
-        QTimer.singleShot(2500, init_smart_navigation)
+        QTimer.singleShot(2500, self.startup_tracer.deferred("_setup_smart_navigation", init_smart_navigation))
         
         # 起動時の自動更新チェック（設定が有効な場合のみ、少し遅延させて実行）
         logging.info(f"起動時更新チェック設定: check_for_updates_on_startup={check_for_updates_on_startup is not None}")
@@ -1990,7 +2176,7 @@ class ProductApp(QWidget):
         # 自動更新機能を有効化（シンプル版）
         if check_for_updates_on_startup and getattr(self, 'auto_update_check_enabled', True):
             logging.info("起動時更新チェックを2秒後に実行予定")
-            QTimer.singleShot(2000, lambda: self._delayed_update_check())
+            QTimer.singleShot(2000, self.startup_tracer.deferred("_delayed_update_check", lambda: self._delayed_update_check()))
         else:
             logging.warning("起動時更新チェックがスキップされました")
         self.auto_save_timer.start(AUTO_SAVE_INTERVAL_MS) # 自動保存間隔
@@ -2011,6 +2197,8 @@ class ProductApp(QWidget):
         self.y_spec_width_definition = None
         self.y_spec_depth_definition = None
         self.y_spec_height_definition = None
+
+        self.startup_tracer.finish_synchronous()
         
 
     def _init_emergency_systems(self):
@@ -2053,6 +2241,21 @@ class ProductApp(QWidget):
             if FileLockManager:
                 self.file_lock_manager = FileLockManager()
             
+            # 5.〜7. システム互換性チェック・メモリ監視・ネットワーク監視は
+            # メインウィンドウの表示後に _init_background_monitors で行う
+            
+            # 8. 定期的なハートビート更新タイマー
+            if hasattr(self, 'crash_recovery'):
+                self.heartbeat_timer = QTimer(self)
+                self.heartbeat_timer.timeout.connect(self._update_heartbeat)
+                self.heartbeat_timer.start(60000)  # 1分間隔
+                
+        except Exception as e:
+            logging.error(f"万が一対策システム初期化エラー: {e}")
+    
+    def _init_background_monitors(self):
+        """メインウィンドウ表示後に、システム互換性チェックと各監視システムを初期化する (モジュールはここで初めて読み込まれる)"""
+        try:
             # 5. システム互換性チェック（起動時のみ）
             if check_system_compatibility:
                 compatibility_ok = check_system_compatibility(self)
@@ -2069,15 +2272,8 @@ class ProductApp(QWidget):
             if setup_network_monitoring:
                 setup_network_monitoring(self)
                 logging.info("ネットワーク監視システムを開始しました")
-            
-            # 8. 定期的なハートビート更新タイマー
-            if hasattr(self, 'crash_recovery'):
-                self.heartbeat_timer = QTimer(self)
-                self.heartbeat_timer.timeout.connect(self._update_heartbeat)
-                self.heartbeat_timer.start(60000)  # 1分間隔
-                
         except Exception as e:
-            logging.error(f"万が一対策システム初期化エラー: {e}")
+            logging.error(f"監視システム初期化エラー: {e}")
     
     def _handle_previous_crash(self, crash_info):
         """前回のクラッシュ情報を処理"""
@@ -2174,6 +2370,10 @@ class ProductApp(QWidget):
     def handle_csv_generation_button_click(self):
         # C#ツールが期待する item.xlsm のフルパス
         item_xlsm_for_csharp_path = self.output_file_path # _init_paths_and_dirs で設定済み
+        # 保存ワーカーの書き込みを待ち、item.xlsm が古ければここで出力する
+        if not self._export_item_xlsm_if_stale():
+            logging.warning(f"C#実行試行: {OUTPUT_FILE_NAME} を最新の状態に出力できませんでした。")
+            return
 
         if not os.path.exists(item_xlsm_for_csharp_path):
             QMessageBox.warning(self, "ファイル未保存",
@@ -2251,6 +2451,11 @@ class ProductApp(QWidget):
         # user_data_dir for settings and item_manage.xlsm (same as EXE directory)
         self.user_data_dir = self.exe_dir
         self.manage_file_path = os.path.join(self.user_data_dir, MANAGE_FILE_NAME)
+        # 管理ファイルのメモリ上キャッシュ (一覧・商品読込・検索で共有)
+        self.product_repository = ProductRepository(self.manage_file_path, store=self._open_product_store(),
+                                                    search_index=self._open_search_index())
+        # 管理ファイルへの書き込みを行う保存ワーカー (最初の保存時に起動)
+        self.persistence_worker = None
         
         # Paths related to C# tool and its input item.xlsm (relative to EXE dir)
         self.csharp_dir = os.path.join(self.exe_dir, "C#") 
@@ -2279,7 +2484,8 @@ class ProductApp(QWidget):
                 return
             
             # 既存の管理ファイルがある場合、構造の互換性をチェック
-            compatibility_result = self._check_template_compatibility()
+            with self.startup_tracer.phase("_check_template_compatibility"):
+                compatibility_result = self._check_template_compatibility()
             
             if compatibility_result["needs_update"]:
                 self._handle_template_structure_change(compatibility_result)
@@ -2289,26 +2495,22 @@ class ProductApp(QWidget):
     
     def _check_template_compatibility(self):
         """テンプレートと既存管理ファイルの構造互換性をチェック"""
-        template_wb = None
         manage_wb = None
         
         try:
-            from openpyxl import load_workbook
-            
-            # テンプレートファイルのヘッダーを読み取り
-            template_wb = load_workbook(self.template_file_path_bundle, read_only=True)
-            template_main_ws = template_wb[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in template_wb.sheetnames else None
+            # テンプレートファイルのヘッダー (プロセス内でキャッシュ済み)
+            template_metadata = get_template_metadata(self.template_file_path_bundle)
             
-            # 既存管理ファイルのヘッダーを読み取り  
-            manage_wb = load_workbook(self.manage_file_path, read_only=True)
+            # 既存管理ファイルのヘッダーを読み取り (値のみ必要なため軽量リーダーを使用)
+            manage_wb = open_workbook(self.manage_file_path)
             manage_main_ws = manage_wb[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in manage_wb.sheetnames else None
             
-            if not template_main_ws or not manage_main_ws:
+            if not template_metadata.has_main_sheet or not manage_main_ws:
                 return {"needs_update": False, "reason": "シートが見つかりません"}
             
             # ヘッダー行を取得
-            template_headers = [cell.value for cell in template_main_ws[1]]
-            manage_headers = [cell.value for cell in manage_main_ws[1]]
+            template_headers = list(template_metadata.main_header_cells)
+            manage_headers = list(next(manage_main_ws.iter_rows(min_row=1, max_row=1, values_only=True), ()))
             
             # ヘッダーの比較
             template_headers_clean = [h for h in template_headers if h is not None]
@@ -2348,11 +2550,6 @@ class ProductApp(QWidget):
             return {"needs_update": False, "reason": f"チェックエラー: {str(e)}"}
         finally:
             # リソースの確実な解放
-            if template_wb:
-                try:
-                    template_wb.close()
-                except Exception as e:
-                    logging.debug(f"テンプレートワークブック終了エラー（継続）: {e}")
             if manage_wb:
                 try:
                     manage_wb.close()
@@ -2497,80 +2694,104 @@ class ProductApp(QWidget):
         current_step = 1 # _init_paths_and_dirs で1ステップ消費済みと仮定
 
         safe_category_name = os.path.normpath(CATEGORY_FILE_NAME).lstrip(os.sep + os.altsep)
+        master_cache_dir = self._master_cache_dir()
+        settings = QSettings("株式会社大宝家具", APP_NAME)
+        # 段階的起動: マスターの読み込みを待たずにウィンドウを表示し、読み込み完了したものから機能を有効にする
+        progressive = str(settings.value("startup/progressive_loading", True)).lower() not in ("false", "0")
+        # ローダー (ワーカースレッド) はダイアログに直接触れず、このチャネルへ進捗の文言を報告する
+        # (段階的起動ではダイアログを閉じた後に読み込むため報告しない)
+        progress_channel = None if progressive else progress.channel
+        # Yahoo!スペック定義は索引だけを作り、カテゴリが選択されたときにそのカテゴリ分だけ読み込む
+        lazy_y_spec = str(settings.value("startup/lazy_y_spec", True)).lower() not in ("false", "0")
 
         tasks_definitions = [
             {
                 'name': 'categories',
                 'target_attr': 'categories',
+                'empty_value': list,
                 'func': load_categories_from_csv,
-                'args_factory': lambda: (os.path.join(self.base_dir_frozen, safe_category_name), progress),
+                'args_factory': lambda: (os.path.join(self.base_dir_frozen, safe_category_name), progress_channel, master_cache_dir),
                 'progress_label_before': f"カテゴリ情報 ({CATEGORY_FILE_NAME}) を読み込み中..."
             },
             {
                 'name': 'rakuten_definitions',
                 'target_attr': 'definition_loader',
+                'empty_value': lambda: None,
                 'func': RakutenAttributeDefinitionLoader,
-                'args_factory': lambda: (self.base_dir_frozen, progress),
+                'args_factory': lambda: (self.base_dir_frozen, progress_channel, master_cache_dir),
                 'progress_label_before': f"楽天商品属性定義書 ({DEFINITION_CSV_FILE} と {RECOMMENDED_LIST_CSV_FILE}) を読み込み中..."
             },
             {
                 'name': 'r_genre_master',
                 'target_attr': '_r_genre_master_list',
+                'empty_value': list,
                 'func': load_id_master_data,
                 'args_factory': lambda: (
                     R_GENRE_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_NAME_COLUMN_R_GENRE,
-                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress, "Rジャンルマスター"
+                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress_channel, "Rジャンルマスター", master_cache_dir
                 ),
                 'progress_label_before': f"IDマスター ({R_GENRE_MASTER_FILE}) を読み込み中..."
             },
             {
                 'name': 'y_category_master',
                 'target_attr': '_y_category_master_list',
+                'empty_value': list,
                 'func': load_id_master_data,
                 'args_factory': lambda: (
                     Y_CATEGORY_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_NAME_COLUMN_Y_CATEGORY,
-                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress, "Yカテゴリマスター"
+                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress_channel, "Yカテゴリマスター", master_cache_dir
                 ),
                 'progress_label_before': f"IDマスター ({Y_CATEGORY_MASTER_FILE}) を読み込み中..."
             },
             {
                 'name': 'ya_category_master',
                 'target_attr': '_ya_category_master_list',
+                'empty_value': list,
                 'func': load_id_master_data,
                 'args_factory': lambda: (
                     YA_CATEGORY_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_NAME_COLUMN_YA_CATEGORY,
-                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress, "YAカテゴリマスター"
+                    MASTER_HIERARCHY_COLUMN_DEFAULT, progress_channel, "YAカテゴリマスター", master_cache_dir
                 ),
                 'progress_label_before': f"IDマスター ({YA_CATEGORY_MASTER_FILE}) を読み込み中..."
             },
             {
                 'name': 'y_spec_definitions',
                 'target_attr': 'y_spec_loader',
+                'empty_value': lambda: None,
                 'func': YSpecDefinitionLoader,
-                'args_factory': lambda: (self.base_dir_frozen, progress),
+                'args_factory': lambda: (self.base_dir_frozen, progress_channel, master_cache_dir, lazy_y_spec),
                 'progress_label_before': f"Yahoo!スペック定義 ({YSPEC_CSV_FILE}) を読み込み中..."
             },
             {
                 'name': 'material_spec_master',
                 'target_attr': 'material_spec_master',
+                'empty_value': dict,
                 'func': load_material_spec_master,
-                'args_factory': lambda: (os.path.join(self.base_dir_frozen, MATERIAL_SPEC_MASTER_FILE_NAME), progress),
+                'args_factory': lambda: (os.path.join(self.base_dir_frozen, MATERIAL_SPEC_MASTER_FILE_NAME), progress_channel, master_cache_dir),
                 'progress_label_before': f"材質・仕様マスター ({MATERIAL_SPEC_MASTER_FILE_NAME}) を読み込み中..."
             },
             {
                 'name': 'explanation_icons',
                 'target_attr': 'explanation_mark_icon_data',
+                'empty_value': list,
                 'func': load_explanation_mark_icons,
-                'args_factory': lambda: (self.base_dir_frozen, progress),
+                'args_factory': lambda: (self.base_dir_frozen, progress_channel),
                 'progress_label_before': f"説明マークアイコン ({EXPLANATION_MARK_ICONS_SUBDIR}) を読み込み中..."
             }
         ]
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS) as executor:
-            submitted_task_futures = []
+        if progressive:
+            # 画面はマスターが空の状態で構築し、ウィンドウ表示後に _start_master_hydration で読み込む
             for task_def in tasks_definitions:
-                future = executor.submit(task_def['func'], *task_def['args_factory']())
-                submitted_task_futures.append({'future': future, 'task_def': task_def})
+                setattr(self, task_def['target_attr'], task_def['empty_value']())
+            self._master_tasks_to_hydrate = tasks_definitions
+            self._pending_master_names = {task_def['name'] for task_def in tasks_definitions}
+            progress.setValue(current_step + len(tasks_definitions))
+            return
+
+        executor, log_listener = self._create_loader_executor()
+        with executor:
+            submitted_task_futures = self._submit_master_tasks(executor, tasks_definitions, progress_channel)
 
             for item in submitted_task_futures:
                 future = item['future']
@@ -2579,24 +2800,175 @@ class ProductApp(QWidget):
                 progress.setLabelText(task_definition['progress_label_before'])
                 current_step += 1
                 progress.setValue(current_step)
-                QApplication.processEvents()
+                self._wait_processing_events(future)
+                self._apply_master_result(task_definition, future)
+        if log_listener is not None:
+            log_listener.stop()
+
+    def _submit_master_tasks(self, executor, tasks_definitions, progress_channel):
+        """マスター読み込みタスクを executor に投入し、{'future', 'task_def'} のリストを返す"""
+        uses_processes = isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+        submitted_task_futures = []
+        for task_def in tasks_definitions:
+            args = task_def['args_factory']()
+            if uses_processes and progress_channel is not None:
+                # 子プロセスへは進捗チャネルを渡せない (進捗表示はこのプロセスの待機ループで行う)
+                args = tuple(None if arg is progress_channel else arg for arg in args)
+            # ワーカー内での開始・終了時刻を起動トレースに記録するため run_timed 経由で実行する
+            future = executor.submit(run_timed, task_def['func'], *args)
+            submitted_task_futures.append({'future': future, 'task_def': task_def})
+        return submitted_task_futures
+
+    def _apply_master_result(self, task_definition, future):
+        """完了した読み込みタスクの結果を属性に設定する (エラーはログとメッセージで通知する)"""
+        try:
+            try:
+                result, start, end, pid, tid, thread_name = future.result() # このタスクの完了を待つ
+            except BrokenProcessPool as e:
+                logging.warning(f"{task_definition['name']} を子プロセスで読み込めなかったため、このプロセスで読み込みます: {e}")
+                result, start, end, pid, tid, thread_name = run_timed(task_definition['func'], *task_definition['args_factory']())
+            self.startup_tracer.record(task_definition['name'], start, end, "loader", pid, tid, thread_name)
+            setattr(self, task_definition['target_attr'], result)
+
+            # 特定のタスク完了後のチェック処理
+            if task_definition['name'] == 'rakuten_definitions': # RakutenAttributeDefinitionLoader完了後
+                if not self.definition_loader.genre_definitions:
+                     logging.warning(f"楽天商品属性定義書 '{os.path.join(self.base_dir_frozen, DEFINITION_CSV_FILE)}' が読み込まれなかったか、空です。SKU属性の推奨値機能は利用できません。")
+                     QMessageBox.warning(self, "定義書読込エラー",
+                                         f"楽天商品属性定義書 '{os.path.join(self.base_dir_frozen, DEFINITION_CSV_FILE)}' が読み込まれなかったか、空です。\nSKU属性の推奨値機能は利用できません。\n詳細はログファイルを確認してください。")
+            elif task_definition['name'] == 'ya_category_master': # 最後のIDマスター読み込み後
+                if not self._r_genre_master_list and not self._y_category_master_list and not self._ya_category_master_list:
+                     logging.info("有効なIDマスターデータが読み込まれませんでした。ID検索機能は利用できません。")
+        except Exception as e:
+            logging.error(f"Error loading {task_definition['name']}: {e}", exc_info=True)
+            QMessageBox.warning(self, "データ読み込みエラー", f"{task_definition['progress_label_before']} の読み込み中にエラーが発生しました: {e}\n詳細はログを確認してください。")
+
+    def _start_master_hydration(self):
+        """段階的起動: ウィンドウ表示後にマスターの読み込みを開始し、完了したものから順に画面へ反映する"""
+        tasks_definitions = self._master_tasks_to_hydrate
+        self._master_tasks_to_hydrate = None
+        self._master_hydration_started = time.perf_counter()
+        self._update_master_loading_state()
+        self._master_executor, self._master_log_listener = self._create_loader_executor()
+        self._master_hydration_futures = self._submit_master_tasks(self._master_executor, tasks_definitions, None)
+        self._master_hydration_timer = QTimer(self)
+        self._master_hydration_timer.timeout.connect(self._poll_master_hydration)
+        self._master_hydration_timer.start(LOADING_DIALOG_REFRESH_MS)
+
+    def _poll_master_hydration(self):
+        """完了した読み込みタスクの結果を反映し、すべて完了したら後片付けをする"""
+        # 結果の反映中にメッセージボックスが表示されても、同じタスクを二重に反映しないようタイマーを止めておく
+        self._master_hydration_timer.stop()
+        still_running = []
+        for item in self._master_hydration_futures:
+            if item['future'].done():
+                self._apply_master_result(item['task_def'], item['future'])
+                self._on_master_data_loaded(item['task_def']['name'])
+            else:
+                still_running.append(item)
+        self._master_hydration_futures = still_running
+        if still_running:
+            self._master_hydration_timer.start(LOADING_DIALOG_REFRESH_MS)
+        else:
+            self._finish_master_hydration_traced()
+
+    def _finish_master_hydration(self):
+        """バックグラウンド読み込みの終了処理 (起動トレースへの記録とワーカーの終了)"""
+        self.startup_tracer.record("マスター読み込み (バックグラウンド)", self._master_hydration_started, time.perf_counter(), "loader")
+        self._master_executor.shutdown(wait=False)
+        if self._master_log_listener is not None:
+            self._master_log_listener.stop()
+        logging.info("マスターデータのバックグラウンド読み込みが完了しました")
+
+    def _is_master_loading(self, name):
+        """段階的起動で指定したマスターがまだ読み込み中かどうか"""
+        return name in self._pending_master_names
+
+    def _notify_if_master_loading(self, *names):
+        """指定したマスターのいずれかが読み込み中なら案内を表示して True を返す"""
+        loading = [name for name in names if self._is_master_loading(name)]
+        if not loading:
+            return False
+        QMessageBox.information(self, "読み込み中", "この機能に必要なマスターデータを読み込み中です。\n読み込みが完了すると利用できます。")
+        logging.info(f"読み込み中のマスターが必要な機能の使用を試行: {', '.join(loading)}")
+        return True
+
+    def _update_master_loading_state(self):
+        """マスターに依存するボタンを、読み込み中は無効にしてツールチップで案内する"""
+        if not hasattr(self, '_master_button_tooltips'):
+            self._master_button_tooltips = {}
+        for btn_name, names in MASTER_DEPENDENT_BUTTONS:
+            btn = getattr(self, btn_name, None)
+            if btn is None:
+                continue
+            base_tooltip = self._master_button_tooltips.setdefault(btn_name, btn.toolTip())
+            loading = any(self._is_master_loading(name) for name in names)
+            enabled = not loading
+            if btn_name == 'explanation_mark_select_btn':
+                enabled = enabled and bool(self.explanation_mark_icon_data)
+            btn.setEnabled(enabled)
+            btn.setToolTip(f"{base_tooltip}\n(マスターデータを読み込み中...)".strip() if loading else base_tooltip)
+
+    def _on_master_data_loaded(self, name):
+        """段階的起動で1つのマスターの読み込みが完了したときに、そのマスターを使う機能を有効にする"""
+        self._pending_master_names.discard(name)
+        if name == 'material_spec_master':
+            for group_label in ("材質", "仕様"):
+                efg_instance = self.expandable_field_group_instances.get(group_label)
+                if efg_instance:
+                    efg_instance.set_master_data(self.material_spec_master or {})
+        elif name == 'y_spec_definitions':
+            self._apply_pending_y_spec_values()
+        elif name == 'rakuten_definitions':
+            # 表示中の SKU の属性列・単位列を定義書に合わせて表示し直す
+            if getattr(self, 'sku_data_list', None):
+                self.show_sku_table()
+        self._update_master_loading_state()
 
-                try:
-                    result = future.result() # このタスクの完了を待つ
-                    setattr(self, task_definition['target_attr'], result)
-
-                    # 特定のタスク完了後のチェック処理
-                    if task_definition['name'] == 'rakuten_definitions': # RakutenAttributeDefinitionLoader完了後
-                        if not self.definition_loader.genre_definitions:
-                             logging.warning(f"楽天商品属性定義書 '{os.path.join(self.base_dir_frozen, DEFINITION_CSV_FILE)}' が読み込まれなかったか、空です。SKU属性の推奨値機能は利用できません。")
-                             QMessageBox.warning(self, "定義書読込エラー",
-                                                 f"楽天商品属性定義書 '{os.path.join(self.base_dir_frozen, DEFINITION_CSV_FILE)}' が読み込まれなかったか、空です。\nSKU属性の推奨値機能は利用できません。\n詳細はログファイルを確認してください。")
-                    elif task_definition['name'] == 'ya_category_master': # 最後のIDマスター読み込み後
-                        if not self._r_genre_master_list and not self._y_category_master_list and not self._ya_category_master_list:
-                             logging.info("有効なIDマスターデータが読み込まれませんでした。ID検索機能は利用できません。")
-                except Exception as e:
-                    logging.error(f"Error loading {task_definition['name']}: {e}", exc_info=True)
-                    QMessageBox.warning(self, "データ読み込みエラー", f"{task_definition['progress_label_before']} の読み込み中にエラーが発生しました: {e}\n詳細はログを確認してください。")
+    def _apply_pending_y_spec_values(self):
+        """Y!spec定義の読み込み完了後に、現在の Y カテゴリの編集欄を作り、読み込み中に保持した値を反映する"""
+        pending_values = self._pending_y_spec_values or []
+        self._pending_y_spec_values = None
+        if hasattr(self, 'y_spec_section_label_widget'):
+            self.y_spec_section_label_widget.setText(Y_SPEC_SECTION_TITLE)
+        was_loading_data = self._is_loading_data
+        self._is_loading_data = True # 保持していた値の反映は変更扱いにしない
+        try:
+            self._on_y_category_id_changed(self.main_fields.get(HEADER_Y_CATEGORY_ID, JapaneseLineEdit()).text())
+            for saved_value in pending_values:
+                self._load_y_spec_value(saved_value)
+        finally:
+            self._is_loading_data = was_loading_data
+
+    def _wait_processing_events(self, future):
+        """future の完了を待つ間もイベントを処理し、進捗ダイアログを一定間隔で更新できるようにする"""
+        while not future.done():
+            concurrent.futures.wait([future], timeout=LOADING_DIALOG_REFRESH_MS / 1000)
+            QApplication.processEvents()
+
+    def _create_loader_executor(self):
+        """
+        マスター読み込みに使う Executor と、子プロセスのログを受け取る QueueListener (スレッドの場合は None) を返す。
+        設定 startup/process_pool_loading が有効な場合はプロセスプールを使う
+        (CSV 解析は純粋な Python 処理のため、スレッドでは GIL により並列に実行されない)。
+        """
+        settings = QSettings("株式会社大宝家具", APP_NAME)
+        if str(settings.value("startup/process_pool_loading", False)).lower() in ("true", "1"):
+            try:
+                # 起動中の Qt のスレッドを fork で複製しないよう、常に spawn で子プロセスを作る
+                mp_context = multiprocessing.get_context("spawn")
+                log_queue = mp_context.Queue()
+                root_logger = logging.getLogger()
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(MAX_WORKER_THREADS, os.cpu_count() or 1), mp_context=mp_context,
+                    initializer=init_loader_process, initargs=(log_queue, root_logger.level)
+                )
+                log_listener = logging.handlers.QueueListener(log_queue, *root_logger.handlers, respect_handler_level=True)
+                log_listener.start()
+                return executor, log_listener
+            except (OSError, ValueError) as e:
+                logging.warning(f"マスター読み込み用のプロセスプールを作成できないため、スレッドで読み込みます: {e}")
+        return concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKER_THREADS), None
 
     def _init_ui_components(self):
         """主要なUI要素の初期化"""
@@ -2636,7 +3008,7 @@ class ProductApp(QWidget):
         self.search_bar = JapaneseLineEdit()
         self.search_bar.setPlaceholderText("商品コードまたは商品名で検索")
         
-        self.product_list = QListWidget()
+        self.product_list = ProductListView()
         self.product_list.setObjectName("ProductList")
         self.product_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.product_list.setSelectionMode(QAbstractItemView.ExtendedSelection)  # 複数選択を有効化
@@ -4054,8 +4426,8 @@ class ProductApp(QWidget):
         self.focus_search_action.triggered.connect(lambda: self.focus_search())
         
         # 検索バーと商品リストのイベント
-        self.search_bar.textChanged.connect(lambda text: self.filter_list())
-        self.product_list.currentItemChanged.connect(lambda current, previous: self._handle_product_selection_changed(current, previous))
+        self.search_bar.textChanged.connect(lambda text: self.filter_list(text))
+        self.product_list.currentCodeChanged.connect(lambda current, previous: self._handle_product_selection_changed(current, previous))
         self.product_list.customContextMenuRequested.connect(lambda pos: self.show_product_list_menu(pos))
         
         # ラジオボタンのイベント
@@ -4145,6 +4517,8 @@ class ProductApp(QWidget):
             R_GENRE_MASTER_FILE, MASTER_ID_COLUMN_DEFAULT, MASTER_NAME_COLUMN_R_GENRE, MASTER_HIERARCHY_COLUMN_DEFAULT
         )
     def _open_id_search_dialog(self):
+        if self._notify_if_master_loading('r_genre_master', 'y_category_master', 'ya_category_master'):
+            return
         if not hasattr(self, '_r_genre_master_list') or \
            (not self._r_genre_master_list and not self._y_category_master_list and not self._ya_category_master_list):
              msg = "IDマスターデータが読み込まれていません。ID検索機能は利用できません。"
@@ -4177,6 +4551,8 @@ class ProductApp(QWidget):
                     self.main_fields[HEADER_YA_CATEGORY_ID].setText(selected_ids['YAカテゴリ'])
 
     def open_explanation_mark_dialog(self):
+        if self._notify_if_master_loading('explanation_icons'):
+            return
         if not hasattr(self, 'explanation_mark_icon_data') or not self.explanation_mark_icon_data:
             msg = "説明マークのアイコンデータが読み込まれていません。"
             QMessageBox.information(self, "アイコン情報なし", msg); logging.info(f"説明マークダイアログ表示試行: {msg}")
@@ -4217,13 +4593,13 @@ class ProductApp(QWidget):
                 border-radius: 8px;
                 border-left: 4px solid #3b82f6;
             }
-            QListWidget#ProductList { 
+            QListView#ProductList { 
                 background-color: #ffffff; 
                 border: 1px solid #e2e8f0; 
                 border-radius: 12px; 
                 padding: 8px; 
             }
-            QListWidget#ProductList::item { 
+            QListView#ProductList::item { 
                 padding: 12px 12px; 
                 border: none;
                 border-radius: 8px;
@@ -4231,14 +4607,14 @@ class ProductApp(QWidget):
                 font-weight: 500;
                 color: #334155;
             }
-            QListWidget#ProductList::item:selected { 
+            QListView#ProductList::item:selected { 
                 background-color: #e0f2fe; 
                 color: #0d47a1 !important; 
                 border: 2px solid #1976d2;
                 border-radius: 8px; 
                 font-weight: 600;
             }
-            QListWidget#ProductList::item:hover { 
+            QListView#ProductList::item:hover { 
                 background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #f8fafc, stop:1 #f1f5f9); 
                 border-radius: 8px;
             }
@@ -4764,6 +5140,8 @@ class ProductApp(QWidget):
              self.items_map_by_path[name] = item
 
     def open_category_dialog(self):
+        if self._notify_if_master_loading('categories'):
+            return
         current_paths = [self.main_fields[f"商品カテゴリ{i+1}"].text() for i in range(5) if f"商品カテゴリ{i+1}" in self.main_fields]
         initial_path = next((p.strip() for p in reversed(current_paths) if p and p.strip()), "")
         dlg = CategorySelectDialog(self.categories, self, [initial_path] if initial_path else [""])
@@ -4870,6 +5248,8 @@ class ProductApp(QWidget):
             self._update_status_bar()
 
     def add_sku_column(self, values=None):
+        if self._notify_if_master_loading('rakuten_definitions'):
+            return
         mycode_widget = self.main_fields.get(HEADER_MYCODE)
         mycode = mycode_widget.text().strip() if isinstance(mycode_widget, QLineEdit) else ""
         genre_id_widget = self.main_fields.get(HEADER_R_GENRE_ID)
@@ -5379,47 +5759,86 @@ class ProductApp(QWidget):
 
 
     def load_list(self) -> None:
-        self.product_list.clear()
-        if not self._safe_file_exists(self.manage_file_path): return # ユーザーデータディレクトリの管理ファイル
+        """商品リストを管理ファイルの内容に合わせる (選択は解除し、変わった行だけを更新する)"""
+        self.product_list.clear_current()
+        entries = []
+        if self._safe_file_exists(self.manage_file_path): # ユーザーデータディレクトリの管理ファイル
+            try:
+                repo = self.product_repository
+                repo.refresh()
+                if not repo.has_main_sheet or not repo.main_headers:
+                    pass
+                elif HEADER_MYCODE not in repo.main_headers or HEADER_PRODUCT_NAME not in repo.main_headers:
+                    logging.error(f"Error: {MAIN_SHEET_NAME}に{HEADER_MYCODE} or {HEADER_PRODUCT_NAME}列無")
+                else:
+                    entries = repo.list_entries()
+            except Exception as e: QMessageBox.critical(self,"リスト読込エラー",f"商品リスト読込失敗: {e}\n{traceback.format_exc()}")
+        self.product_list.set_entries(entries)
+
+    # --- 管理ファイルの外部変更検知 ---
+    def _setup_manage_file_watcher(self):
+        """管理ファイルを監視し、Excel などで外部から変更された場合に変わった商品だけを画面へ反映する"""
+        self.manage_file_watcher = QFileSystemWatcher(self)
+        self._manage_file_change_timer = QTimer(self)
+        self._manage_file_change_timer.setSingleShot(True)
+        self._manage_file_change_timer.setInterval(500)  # 保存中に続けて届く通知をまとめる
+        self._manage_file_change_timer.timeout.connect(self._check_manage_file_changes)
+        self.manage_file_watcher.fileChanged.connect(lambda path: self._on_manage_file_changed())
+        # Excel は別名で保存してから置き換えるため、フォルダも監視してファイルを登録し直す
+        self.manage_file_watcher.directoryChanged.connect(lambda path: self._on_manage_file_changed())
+        self.manage_file_watcher.addPath(self.user_data_dir)
+        self._watch_manage_file()
+
+    def _watch_manage_file(self):
+        if os.path.exists(self.manage_file_path) and self.manage_file_path not in self.manage_file_watcher.files():
+            self.manage_file_watcher.addPath(self.manage_file_path)
+
+    def _on_manage_file_changed(self):
+        self._watch_manage_file()
+        self._manage_file_change_timer.start()
+
+    def _check_manage_file_changes(self):
+        """管理ファイルが外部で変更されていれば読み直す (更新日時・サイズ・内容が同じなら何もしない)"""
+        if self.persistence_worker is not None and not self.persistence_worker.is_idle():
+            return  # 自身の書き込み中 (書き込み完了時に同期済みとして記録される)
         try:
-            wb = load_workbook(self.manage_file_path,read_only=True,keep_vba=True)
-            if MAIN_SHEET_NAME not in wb.sheetnames: return
-            ws = wb[MAIN_SHEET_NAME]; rows = list(ws.iter_rows(values_only=True))
-            if not rows or len(rows)<1: return
-            hdr = [str(h).strip() if h is not None else "" for h in rows[0]]
-            try: 
-                code_idx=hdr.index(HEADER_MYCODE)
-                name_idx=hdr.index(HEADER_PRODUCT_NAME)
-                control_idx=hdr.index(HEADER_CONTROL_COLUMN) if HEADER_CONTROL_COLUMN in hdr else -1
-            except ValueError: logging.error(f"Error: {MAIN_SHEET_NAME}に{HEADER_MYCODE} or {HEADER_PRODUCT_NAME}列無"); return
-            for vals in rows[1:]:
-                code = str(vals[code_idx]).strip() if code_idx<len(vals) and vals[code_idx] is not None else ""
-                name = str(vals[name_idx]).strip() if name_idx<len(vals) and vals[name_idx] is not None else ""
-                control = str(vals[control_idx]).strip() if control_idx >= 0 and control_idx<len(vals) and vals[control_idx] is not None else "n"
-                if code: 
-                    item = QListWidgetItem(f"[{control}] {code} - {name}")
-                    item.setData(Qt.UserRole, control)  # コントロールカラム値を保存
-                    self.product_list.addItem(item)
-            wb.close() # type: ignore
-        except Exception as e: QMessageBox.critical(self,"リスト読込エラー",f"商品リスト読込失敗: {e}\n{traceback.format_exc()}")
+            changes = self.product_repository.reload_changes()
+        except Exception as e:
+            logging.warning(f"管理ファイルの外部変更の読み込みに失敗しました: {e}", exc_info=True)
+            return
+        if changes:
+            self._apply_external_changes(changes)
+            self._prepare_search_index()  # 読み直した内容で検索索引を作り直す
+
+    def _apply_external_changes(self, changes):
+        """外部変更で追加・削除・変更された商品の一覧項目と、表示中のフォームだけを更新する"""
+        current_code = self.product_list.current_code()
+        removed = set(changes.removed)
+        self.product_list.set_entries(self.product_repository.list_entries())
+
+        message = (f"{MANAGE_FILE_NAME} の外部変更を読み込みました "
+                   f"(追加 {len(changes.added)}件, 変更 {len(changes.changed)}件, 削除 {len(changes.removed)}件)")
+        if current_code in removed:
+            message += f" / 表示中の商品「{current_code}」は削除されています"
+        elif current_code in changes.changed:
+            if self.is_dirty:
+                message += f" / 表示中の商品「{current_code}」は編集中のため再読み込みしていません (保存すると上書きされます)"
+            else:
+                self.load_product(current_code)
+        self.status_bar.showMessage(message, 10000)
+        logging.info(message)
 
     def filter_list(self, text):
-        norm_txt = normalize_text(text)
-        for i in range(self.product_list.count()): item=self.product_list.item(i); item.setHidden(norm_txt not in normalize_text(item.text()))
+        """検索バーの文字列 (正規化して比較する) を含む商品だけを商品リストに表示する"""
+        self.product_list.set_filter_text(text)
 
-    def load_product(self, current_item): # previous 引数を削除
-        """指定された商品アイテムのデータをフォームに読み込む。ダーティチェックは行わない。"""
-        if not current_item:
+    def load_product(self, code): # previous 引数を削除
+        """指定された商品コードの商品データをフォームに読み込む。ダーティチェックは行わない。"""
+        if not code:
             self.clear_fields(apply_defaults=False) # 選択がなければ完全にクリア
             return
 
         self._is_loading_data = True # データロード開始
-        item_txt = current_item.text()
-        # [n] または [p] のプレフィックスを除去して商品コードを取得
-        if item_txt.startswith('['):
-            code = item_txt.split('] ')[1].split(" - ")[0].strip()
-        else:
-            code = item_txt.split(" - ")[0].strip()
         
         # 編集モードの視覚的インジケーター
         self._set_mode_indicator(f"編集中: {code}", "#2196F3")  # 青色
@@ -5462,10 +5881,11 @@ class ProductApp(QWidget):
             self.is_dirty=False; self.save_btn.setEnabled(False)
             return
         try:
-            wb = load_workbook(self.manage_file_path,read_only=True,keep_vba=True)
-            if MAIN_SHEET_NAME not in wb.sheetnames:
+            repo = self.product_repository
+            repo.refresh()
+            if not repo.has_main_sheet:
                 msg = f"{MAIN_SHEET_NAME}シートが見つかりません。"
-                QMessageBox.warning(self,"シートなし",msg); wb.close() # type: ignore
+                QMessageBox.warning(self,"シートなし",msg)
                 logging.warning(f"商品ロード試行: {msg} (ファイル: {self.manage_file_path})")
                 for fld_val in self.main_fields.values():
                     if isinstance(fld_val,(QLineEdit, QTextEdit, QComboBox)): fld_val.blockSignals(False)
@@ -5479,10 +5899,9 @@ class ProductApp(QWidget):
                     self._update_mycode_digit_count_display("")
                 self.is_dirty=False; self.save_btn.setEnabled(False)
                 return
-            ws_main = wb[MAIN_SHEET_NAME]; main_rows = list(ws_main.iter_rows(values_only=True))
-            if not main_rows or len(main_rows)<1:
+            if not repo.main_headers:
                 msg = f"{MAIN_SHEET_NAME}シートにデータがありません。"
-                QMessageBox.warning(self,"データなし",msg); wb.close() # type: ignore
+                QMessageBox.warning(self,"データなし",msg)
                 logging.warning(f"商品ロード試行: {msg} (ファイル: {self.manage_file_path})")
                 for fld_val in self.main_fields.values():
                     if isinstance(fld_val,(QLineEdit, QTextEdit, QComboBox)): fld_val.blockSignals(False)
@@ -5496,10 +5915,9 @@ class ProductApp(QWidget):
                     self._update_mycode_digit_count_display("")
                 self.is_dirty=False; self.save_btn.setEnabled(False)
                 return
-            hdr_main = [str(h).strip() if h is not None else "" for h in main_rows[0]]
-            if HEADER_MYCODE not in hdr_main:
+            if HEADER_MYCODE not in repo.main_headers:
                 msg = f"{MAIN_SHEET_NAME}シートに'{HEADER_MYCODE}'列が見つかりません。"
-                QMessageBox.critical(self,"ヘッダーエラー",f"{msg}\n詳細はログファイルを確認してください。"); wb.close() # type: ignore
+                QMessageBox.critical(self,"ヘッダーエラー",f"{msg}\n詳細はログファイルを確認してください。")
                 logging.error(f"商品ロード試行: {msg} (ファイル: {self.manage_file_path})")
                 for fld_val in self.main_fields.values():
                     if isinstance(fld_val,(QLineEdit, QTextEdit, QComboBox)): fld_val.blockSignals(False)
@@ -5514,8 +5932,7 @@ class ProductApp(QWidget):
                 self.is_dirty=False; self.save_btn.setEnabled(False)
                 return
 
-            mycode_idx = hdr_main.index(HEADER_MYCODE)
-            loaded_main_data = next((dict(zip(hdr_main,map(lambda x:str(x) if x is not None else "",r))) for r in main_rows[1:] if mycode_idx<len(r) and str(r[mycode_idx]).strip()==code),None)
+            loaded_main_data = repo.get_main_record(code)
 
             if loaded_main_data:
                 ctrl_v = loaded_main_data.get(HEADER_CONTROL_COLUMN,"n").strip().lower(); self.control_radio_p.setChecked(True) if ctrl_v=="p" else self.control_radio_n.setChecked(True)
@@ -5571,27 +5988,21 @@ class ProductApp(QWidget):
                     self._load_y_spec_value(loaded_main_data.get(f_name, "")) # 修正: index引数を削除し、保存文字列を直接渡す
 
             self.sku_data_list = []
-            if SKU_SHEET_NAME in wb.sheetnames:
-                ws_sku = wb[SKU_SHEET_NAME]; sku_rows = list(ws_sku.iter_rows(values_only=True))
-                if sku_rows and len(sku_rows)>0:
-                    sku_hdr = [str(h).strip() if h is not None else "" for h in sku_rows[0]]
-                    if HEADER_PRODUCT_CODE_SKU in sku_hdr:
-                        prod_code_idx = sku_hdr.index(HEADER_PRODUCT_CODE_SKU)
-                        cur_mycode = loaded_main_data.get(HEADER_MYCODE,code) if loaded_main_data else code
-                        for sku_row in sku_rows[1:]:
-                            if prod_code_idx<len(sku_row) and str(sku_row[prod_code_idx]).strip()==cur_mycode:
-                                self.sku_data_list.append(dict(zip(sku_hdr,map(lambda x:str(x) if x is not None else "",sku_row))))
-                        def sku_sort_key(s_item):
-                            code_val = s_item.get(HEADER_SKU_CODE, "")
-                            if code_val and len(code_val) >= 3 and code_val[-3:].isdigit():
-                                return int(code_val[-3:])
-                            return float('inf') # 数値でない、または短い場合は最後に
-                        self.sku_data_list.sort(key=sku_sort_key)
-                    else:
-                        msg = f"{SKU_SHEET_NAME}シートに「{HEADER_PRODUCT_CODE_SKU}」列が見つかりません。"
-                        QMessageBox.warning(self,"SKU読込エラー",msg)
-                        logging.warning(f"商品ロード (SKU): {msg} (ファイル: {self.manage_file_path})")
-            self.show_sku_table(); wb.close() # type: ignore
+            if repo.has_sku_sheet and repo.sku_headers:
+                if HEADER_PRODUCT_CODE_SKU in repo.sku_headers:
+                    cur_mycode = loaded_main_data.get(HEADER_MYCODE,code) if loaded_main_data else code
+                    self.sku_data_list = repo.get_sku_records(cur_mycode)
+                    def sku_sort_key(s_item):
+                        code_val = s_item.get(HEADER_SKU_CODE, "")
+                        if code_val and len(code_val) >= 3 and code_val[-3:].isdigit():
+                            return int(code_val[-3:])
+                        return float('inf') # 数値でない、または短い場合は最後に
+                    self.sku_data_list.sort(key=sku_sort_key)
+                else:
+                    msg = f"{SKU_SHEET_NAME}シートに「{HEADER_PRODUCT_CODE_SKU}」列が見つかりません。"
+                    QMessageBox.warning(self,"SKU読込エラー",msg)
+                    logging.warning(f"商品ロード (SKU): {msg} (ファイル: {self.manage_file_path})")
+            self.show_sku_table()
             if hasattr(self,'right_splitter') and self.right_splitter.count()>1: self.right_splitter.setSizes([self.right_splitter.height()*3//5,self.right_splitter.height()*2//5])
         except Exception as e:
             logging.error(f"商品「{code}」の読み込み中に予期せぬエラーが発生しました。", exc_info=True)
@@ -6033,18 +6444,7 @@ class ProductApp(QWidget):
         caller_info = call_stack[-2].strip() if len(call_stack) >= 2 else "不明"
         logging.info(f"save_to_excel 呼び出し元: {caller_info}")
         
-        # --- Initialize workbooks to None (before any early returns) ---
-        wb_mng = None
-        wb_item = None
-        wb_mng_ro = None
-        
-        mutex_locked = False
-        if not self._save_mutex.tryLock():
-            QMessageBox.warning(self, "保存中", "別の保存処理が実行中です。しばらく待ってから再度お試しください。")
-            logging.info("保存処理が既に実行中のため、新規の保存リクエストをスキップしました。")
-            return
-        mutex_locked = True
-
+        cursor_overridden = False
         try:
             # --- データ検証を最初に実行 ---
             if not is_delete_operation:
@@ -6065,18 +6465,17 @@ class ProductApp(QWidget):
                 if not check_disk_space_before_save(self.manage_file_path, estimated_records, self):
                     return  # 容量不足またはユーザーがキャンセルした場合
             
-            # Workbooks already initialized at method start
-
-            # QApplication.setOverrideCursor(Qt.WaitCursor) はこの try ブロックの外側に移動
-            # tryLock の後、実際の処理の前に設定する
+            # ファイルへの書き込みは保存ワーカーが行うため、ここでは保存内容の作成のみ
             QApplication.setOverrideCursor(Qt.WaitCursor)
+            cursor_overridden = True
 
             # --- Safely populate _temp_y_spec_values_for_save ---
             self._temp_y_spec_values_for_save = {}
             for i in range(MAX_Y_SPEC_COUNT):
                 header = f"Y_spec{i+1}"
                 try:
-                    if (self.y_spec_current_editors[i] is not None and
+                    if self._pending_y_spec_values is not None or (
+                            self.y_spec_current_editors[i] is not None and
                             self.y_spec_current_definitions[i] is not None):
                         self._temp_y_spec_values_for_save[header] = self._get_y_spec_value_for_save(i)
                     else:
@@ -6106,34 +6505,31 @@ class ProductApp(QWidget):
             if not is_delete_operation and (not code or not name):
                 msg = f"{HEADER_MYCODE}と{HEADER_PRODUCT_NAME}は必須入力です。"
                 QMessageBox.warning(self,"入力エラー",msg); logging.warning(f"保存試行: {msg}")
-                # QApplication.restoreOverrideCursor() # Ensure cursor is restored before early return
                 return
+            if not os.path.exists(self.template_file_path_bundle):
+                msg = f"出力用テンプレート '{self.template_file_path_bundle}' が見つかりません。"
+                logging.critical(msg)
+                QMessageBox.critical(self,"エラー",f"{msg}\n詳細はログファイルを確認してください。")
+                return
+            repo = self.product_repository
             try:
                 if not os.path.exists(self.manage_file_path): # ユーザーデータディレクトリの管理ファイル
                     logging.info(f"管理ファイル '{self.manage_file_path}' が存在しません。")
-                    if os.path.exists(self.template_file_path_bundle): # バンドルされたテンプレート
-                        logging.info(f"テンプレート '{self.template_file_path_bundle}' から管理ファイルをコピーします。")
-                        # 一時ファイルで安全にコピー
-                        temp_file = self.manage_file_path + ".tmp"
-                        try:
-                            copyfile(self.template_file_path_bundle, temp_file)
-                            os.replace(temp_file, self.manage_file_path)  # 原子操作
-                            wb_mng=load_workbook(self.manage_file_path,keep_vba=True)
-                        except Exception as e:
-                            if os.path.exists(temp_file):
-                                try:
-                                    os.remove(temp_file)
-                                except OSError as cleanup_e:
-                                    logging.debug(f"一時ファイル削除エラー（継続）: {cleanup_e}")
-                            raise e
-                    else:
-                        msg = f"テンプレート '{self.template_file_path_bundle}' が見つかりません。新規管理ファイルを作成できません。"
-                        logging.critical(msg)
-                        QMessageBox.critical(self,"エラー",f"{msg}\n詳細はログファイルを確認してください。")
-                        return
-                else:
-                    logging.info(f"既存の管理ファイル '{self.manage_file_path}' を読み込みます。")
-                    wb_mng=load_workbook(self.manage_file_path,keep_vba=True)
+                    logging.info(f"テンプレート '{self.template_file_path_bundle}' から管理ファイルをコピーします。")
+                    # 一時ファイルで安全にコピー
+                    temp_file = self.manage_file_path + ".tmp"
+                    try:
+                        copyfile(self.template_file_path_bundle, temp_file)
+                        os.replace(temp_file, self.manage_file_path)  # 原子操作
+                    except Exception as e:
+                        if os.path.exists(temp_file):
+                            try:
+                                os.remove(temp_file)
+                            except OSError as cleanup_e:
+                                logging.debug(f"一時ファイル削除エラー（継続）: {cleanup_e}")
+                        raise e
+                # 保存ワーカーの書き込み待ちがある間はメモリ上の内容が最新なので再読み込みされない
+                repo.refresh()
             except PermissionError:
                 msg = f"管理ファイル '{self.manage_file_path}' が開かれているためアクセスできません。"
                 logging.error(msg)
@@ -6144,268 +6540,40 @@ class ProductApp(QWidget):
                 logging.error(msg, exc_info=True)
                 QMessageBox.critical(self,"ファイルエラー",f"{msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e}")
                 return
-            
-            logging.debug(f"save_to_excel - After wb_mng load - Y_カテゴリID: '{self.main_fields.get(HEADER_Y_CATEGORY_ID).text() if HEADER_Y_CATEGORY_ID in self.main_fields else 'N/A'}'")
-            try:
-                ws_main_mng=wb_mng[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb_mng.sheetnames else wb_mng.create_sheet(MAIN_SHEET_NAME)
-                exist_main_rows_tuples=list(ws_main_mng.iter_rows(values_only=True))
-
-                # テンプレートファイルから正しい列順序を取得
-                template_main_headers = []
-                try:
-                    if os.path.exists(self.template_file_path_bundle):
-                        template_wb = load_workbook(self.template_file_path_bundle, read_only=True)
-                        if MAIN_SHEET_NAME in template_wb.sheetnames:
-                            template_ws = template_wb[MAIN_SHEET_NAME]
-                            template_row = list(template_ws.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-                            template_main_headers = [str(h).strip() if h is not None else "" for h in template_row]
-                        template_wb.close()
-                        logging.info(f"テンプレートから列順序を取得: {len(template_main_headers)}列")
-                except Exception as e:
-                    logging.warning(f"テンプレート列順序取得エラー: {e}")
-                
-                # テンプレート順序が取得できた場合はそれを使用、できない場合は従来通り
-                if template_main_headers:
-                    canonical_main_headers = template_main_headers
-                else:
-                    canonical_main_headers = [HEADER_CONTROL_COLUMN] + self.main_field_order # type: ignore
-                if HEADER_MYCODE not in canonical_main_headers:
-                    # QMessageBox.critical(self,"内部エラー",f"'{HEADER_MYCODE}'が定義済みヘッダーにありません。"); wb_mng.close(); return
-                    msg = f"内部エラー: '{HEADER_MYCODE}'が定義済みヘッダーにありません。" # type: ignore
-                    logging.critical(msg)
-                    QMessageBox.critical(self,"内部エラー",f"{msg}\n詳細はログファイルを確認してください。")
-                    return
-                # Read existing headers from the file, if any
-                existing_headers_from_file = [str(h).strip() if h is not None else "" for h in (exist_main_rows_tuples[0] if exist_main_rows_tuples else [])]
-
-                out_main_rows_data = [canonical_main_headers] # Start output with the canonical headers
-                updated_product_in_file = False
-
-                # Process existing data rows from the file
-                for r_tuple in (exist_main_rows_tuples[1:] if exist_main_rows_tuples else []):
-                    # Create a dictionary from the existing row using its original headers from the file
-                    current_excel_row_dict = {}
-                    if existing_headers_from_file:
-                        current_excel_row_dict = dict(zip(existing_headers_from_file, (str(val) if val is not None else "" for val in r_tuple)))
-                    
-                    current_mycode_from_file = current_excel_row_dict.get(HEADER_MYCODE, "").strip()
-
-                    if current_mycode_from_file == code: # This is the product currently being saved
-                        new_row_data_list = []
-                        for h_debug in canonical_main_headers:
-                            val_debug = self._get_value_for_excel_cell(h_debug, current_excel_row_dict)
-                            new_row_data_list.append(val_debug)
-                        out_main_rows_data.append(new_row_data_list)
-                        updated_product_in_file = True
-                    else: # This is another product, preserve its data, mapping to canonical_main_headers
-                        preserved_row_data_list = []
-                        for h_debug in canonical_main_headers:
-                            val_debug = current_excel_row_dict.get(h_debug, "")
-                            preserved_row_data_list.append(val_debug)
-                        out_main_rows_data.append(preserved_row_data_list)
-                
-                if not updated_product_in_file: # If the product being saved was new (not found in existing file)
-                    new_row_data_list = [self._get_value_for_excel_cell(h) for h in canonical_main_headers]
-                    out_main_rows_data.append(new_row_data_list)
-
-                ws_main_mng.delete_rows(1,ws_main_mng.max_row+1); [ws_main_mng.append(r_data_list) for r_data_list in out_main_rows_data]
-                
-                ws_sku_mng=wb_mng[SKU_SHEET_NAME] if SKU_SHEET_NAME in wb_mng.sheetnames else wb_mng.create_sheet(SKU_SHEET_NAME)
-                exist_sku_rows=list(ws_sku_mng.iter_rows(values_only=True))
-                hdr_sku_mng=[str(h).strip() if h is not None else "" for h in (exist_sku_rows[0] if exist_sku_rows and exist_sku_rows[0] else [])]
-                if not hdr_sku_mng and self.sku_data_list:
-                    all_sku_keys=set(k for item in self.sku_data_list for k in item.keys() if not k.startswith("_highlight_"))
-                    pref_sku_order=[HEADER_PRODUCT_CODE_SKU,HEADER_SKU_CODE,HEADER_CHOICE_NAME,HEADER_MEMO,HEADER_GROUP]+[f"{p}{i}" for i in range(1,MAX_SKU_ATTRIBUTES+1) for p in [HEADER_ATTR_ITEM_PREFIX,HEADER_ATTR_VALUE_PREFIX,HEADER_ATTR_UNIT_PREFIX]]
-                    hdr_sku_mng=[k for k in pref_sku_order if k in all_sku_keys]+sorted([k for k in all_sku_keys if k not in pref_sku_order])
-                    ws_sku_mng.append(hdr_sku_mng); exist_sku_rows=[hdr_sku_mng] # type: ignore
-                out_sku_rows=[hdr_sku_mng] if hdr_sku_mng else []
-                if hdr_sku_mng and HEADER_PRODUCT_CODE_SKU in hdr_sku_mng:
-                    prod_code_idx_sku=hdr_sku_mng.index(HEADER_PRODUCT_CODE_SKU)
-                    for r_idx,sku_r_tuple in enumerate(exist_sku_rows[1:],1): # type: ignore
-                        sku_r_list=list(sku_r_tuple); sku_r_list.extend([""]*(len(hdr_sku_mng)-len(sku_r_list)))
-                        if str(sku_r_list[prod_code_idx_sku]).strip()!=code: out_sku_rows.append(sku_r_list)
-                if hdr_sku_mng:
-                    for cur_sku_dict in self.sku_data_list: cur_sku_dict[HEADER_PRODUCT_CODE_SKU]=code; out_sku_rows.append([str(cur_sku_dict.get(h_col,"")) for h_col in hdr_sku_mng])
-                if hdr_sku_mng or (len(out_sku_rows) > 0 and out_sku_rows[0]): # Ensure out_sku_rows is not just [[]]
-                    ws_sku_mng.delete_rows(1,ws_sku_mng.max_row+1); [ws_sku_mng.append(r_sku) for r_sku in out_sku_rows]
-                
-                # --- User-suggested garbage collection ---
-                import gc
-                gc.collect()
-                logging.debug("Explicit garbage collection called before saving manage file.")
 
-                logging.info(f"管理ファイル '{self.manage_file_path}' への保存を試みます。")
-                wb_mng.save(self.manage_file_path)
-                logging.info(f"管理ファイル '{self.manage_file_path}' の保存が完了しました。")
-
-            except Exception as e_mng_process:
-                msg = f"管理ファイル '{self.manage_file_path}' のデータ処理または保存中にエラーが発生しました。"
-                logging.error(msg, exc_info=True)
-                QMessageBox.critical(self,"管理ファイル処理エラー",f"{msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e_mng_process}")
-                return
-            finally:
-                if wb_mng:
-                    try:
-                        wb_mng.close()
-                        logging.info(f"管理ファイル '{self.manage_file_path}' をクローズしました。")
-                    except Exception as e_close_mng:
-                        logging.warning(f"管理ファイル '{self.manage_file_path}' のクローズ中にエラー: {e_close_mng}")
-                    wb_mng = None # Mark as closed
-            
-            logging.debug(f"save_to_excel - After item_manage.xlsm save - Y_カテゴリID: '{self.main_fields.get(HEADER_Y_CATEGORY_ID).text() if HEADER_Y_CATEGORY_ID in self.main_fields else 'N/A'}'")
-            if not os.path.exists(self.template_file_path_bundle):
-                msg = f"出力用テンプレート '{self.template_file_path_bundle}' が見つかりません。"
-                logging.critical(msg)
-                QMessageBox.critical(self,"エラー",f"{msg}\n詳細はログファイルを確認してください。")
-                return
-            
+            # テンプレートファイルから正しい列順序を取得
+            template_main_headers = []
             try:
-                # item.xlsm の出力先ディレクトリ (C#ツール指定の場所) が存在するか確認し、なければ作成
-                if not os.path.exists(self.item_xlsm_output_dir):
-                    logging.info(f"出力先ディレクトリ '{self.item_xlsm_output_dir}' を作成します。")
-                    os.makedirs(self.item_xlsm_output_dir, exist_ok=True)
-
-                # クリーンなテンプレートを使用（サンプルデータなし）
-                template_to_use = self.clean_template_file_path if os.path.exists(self.clean_template_file_path) else self.template_file_path_bundle
-                logging.info(f"出力ファイル '{self.output_file_path}' をクリーンテンプレート '{template_to_use}' からコピーします。")
-                copyfile(template_to_use, self.output_file_path); wb_item=load_workbook(self.output_file_path,keep_vba=True)
-                
-                ws_main_item=wb_item[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb_item.sheetnames else wb_item.create_sheet(MAIN_SHEET_NAME)
-                ws_sku_item=wb_item[SKU_SHEET_NAME] if SKU_SHEET_NAME in wb_item.sheetnames else wb_item.create_sheet(SKU_SHEET_NAME)
-
-                try:
-                    logging.info(f"読み取り専用で管理ファイル '{self.manage_file_path}' を再度開きます。")
-                    wb_mng_ro=load_workbook(self.manage_file_path,read_only=True,keep_vba=True)
-                    ws_main_ro=wb_mng_ro[MAIN_SHEET_NAME] if MAIN_SHEET_NAME in wb_mng_ro.sheetnames else None
-                    ws_sku_ro=wb_mng_ro[SKU_SHEET_NAME] if SKU_SHEET_NAME in wb_mng_ro.sheetnames else None
-                    main_rows_out=list(ws_main_ro.iter_rows(values_only=True)) if ws_main_ro else []
-                    sku_rows_out=list(ws_sku_ro.iter_rows(values_only=True)) if ws_sku_ro else []
-                except Exception as e_ro_load:
-                    logging.error(f"読み取り専用管理ファイル '{self.manage_file_path}' の読み込み中にエラー: {e_ro_load}", exc_info=True)
-                    # Decide if this is critical or if we can proceed with empty data
-                    main_rows_out, sku_rows_out = [], [] # Proceed with empty data as a fallback
-                finally:
-                    if wb_mng_ro:
-                        try:
-                            wb_mng_ro.close()
-                            logging.info(f"読み取り専用の管理ファイル '{self.manage_file_path}' をクローズしました。")
-                        except Exception as e_close_ro: logging.warning(f"読み取り専用管理ファイル '{self.manage_file_path}' のクローズ中にエラー: {e_close_ro}")
-                        wb_mng_ro = None # Mark as closed
-                # テンプレートの列順序を取得
-                template_headers = []
-                if ws_main_item.max_row > 0:
-                    template_row = list(ws_main_item.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-                    template_headers = [str(h).strip() if h is not None else "" for h in template_row]
-                
-                ws_main_item.delete_rows(1,ws_main_item.max_row+1)
-                n_mycodes_set=set()
-                if main_rows_out:
-                    manage_headers=[str(h).strip() if h is not None else "" for h in main_rows_out[0]]
-                    
-                    # テンプレートの列順序に合わせて出力
-                    if template_headers:
-                        # テンプレートの列順序を使用
-                        output_headers = template_headers
-                    else:
-                        # テンプレートに列がない場合は管理ファイルの順序を使用
-                        output_headers = manage_headers
-                    
-                    ws_main_item.append(output_headers)
-                    
-                    # 列のマッピングを作成（管理ファイル → テンプレート順序）
-                    column_mapping = {}
-                    for i, template_header in enumerate(output_headers):
-                        if template_header in manage_headers:
-                            column_mapping[i] = manage_headers.index(template_header)
-                    
-                    ctrl_idx=manage_headers.index(HEADER_CONTROL_COLUMN) if HEADER_CONTROL_COLUMN in manage_headers else -1
-                    mycode_idx_main=manage_headers.index(HEADER_MYCODE) if HEADER_MYCODE in manage_headers else -1
-                    if ctrl_idx!=-1 and mycode_idx_main!=-1:
-                        for r_data_main in main_rows_out[1:]:
-                            if ctrl_idx<len(r_data_main) and str(r_data_main[ctrl_idx]).strip().lower()=="n":
-                                # テンプレートの列順序に合わせてデータを再配置
-                                reordered_row = [""] * len(output_headers)
-                                for template_idx, manage_idx in column_mapping.items():
-                                    if manage_idx < len(r_data_main):
-                                        reordered_row[template_idx] = r_data_main[manage_idx]
-                                
-                                ws_main_item.append(reordered_row)
-                                if mycode_idx_main<len(r_data_main) and r_data_main[mycode_idx_main] is not None: n_mycodes_set.add(str(r_data_main[mycode_idx_main]).strip())
-                    else:
-                        msg = f"'{OUTPUT_FILE_NAME}' へのMainデータ書き出し時、'{HEADER_CONTROL_COLUMN}' または '{HEADER_MYCODE}' 列が見つかりません。"
-                        logging.warning(f"保存処理: {msg}")
-                        QMessageBox.warning(self,"警告",msg)
-
-                # SKUシートのテンプレート列順序を取得
-                sku_template_headers = []
-                if ws_sku_item.max_row > 0:
-                    sku_template_row = list(ws_sku_item.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-                    sku_template_headers = [str(h).strip() if h is not None else "" for h in sku_template_row]
-                
-                ws_sku_item.delete_rows(1,ws_sku_item.max_row+1)
-                if sku_rows_out:
-                    manage_sku_headers=[str(h).strip() if h is not None else "" for h in sku_rows_out[0]]
-                    
-                    # テンプレートの列順序に合わせて出力
-                    if sku_template_headers:
-                        sku_output_headers = sku_template_headers
-                    else:
-                        sku_output_headers = manage_sku_headers
-                    
-                    ws_sku_item.append(sku_output_headers)
-                    
-                    # SKU列のマッピングを作成
-                    sku_column_mapping = {}
-                    for i, template_header in enumerate(sku_output_headers):
-                        if template_header in manage_sku_headers:
-                            sku_column_mapping[i] = manage_sku_headers.index(template_header)
-                    
-                    prod_code_idx_sku=manage_sku_headers.index(HEADER_PRODUCT_CODE_SKU) if HEADER_PRODUCT_CODE_SKU in manage_sku_headers else -1
-                    if prod_code_idx_sku!=-1:
-                        for r_data_sku in sku_rows_out[1:]:
-                            if prod_code_idx_sku<len(r_data_sku) and r_data_sku[prod_code_idx_sku] is not None and str(r_data_sku[prod_code_idx_sku]).strip() in n_mycodes_set:
-                                # テンプレートの列順序に合わせてSKUデータを再配置
-                                reordered_sku_row = [""] * len(sku_output_headers)
-                                for template_idx, manage_idx in sku_column_mapping.items():
-                                    if manage_idx < len(r_data_sku):
-                                        reordered_sku_row[template_idx] = r_data_sku[manage_idx]
-                                
-                                ws_sku_item.append(reordered_sku_row)
-                    else:
-                        msg = f"'{OUTPUT_FILE_NAME}' へのSKUデータ書き出し時、「{HEADER_PRODUCT_CODE_SKU}」列が見つかりません。" # type: ignore
-                        logging.warning(f"保存処理: {msg}")
-                        QMessageBox.warning(self,"警告",msg)
-
-                logging.info(f"出力ファイル '{self.output_file_path}' への保存を試みます。")
-                wb_item.save(self.output_file_path)
-                logging.info(f"出力ファイル '{self.output_file_path}' の保存が完了しました。")
-
-            except PermissionError:
-                msg = f"出力ファイル '{self.output_file_path}' が開かれているためアクセスできません。"
-                logging.error(msg)
-                QMessageBox.critical(self,"保存エラー",f"{msg}\n詳細はログファイルを確認してください。")
-                return
+                template_main_headers = get_template_metadata(self.template_file_path_bundle).main_headers
+                logging.debug(f"テンプレートから列順序を取得: {len(template_main_headers)}列")
             except Exception as e:
-                msg = f"出力ファイル '{self.output_file_path}' の処理中にエラーが発生しました。"
-                logging.error(msg, exc_info=True)
-                QMessageBox.critical(self,"ファイルエラー",f"{msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e}")
+                logging.warning(f"テンプレート列順序取得エラー: {e}")
+            
+            # テンプレート順序が取得できた場合はそれを使用、できない場合は従来通り
+            if template_main_headers:
+                canonical_main_headers = template_main_headers
+            else:
+                canonical_main_headers = [HEADER_CONTROL_COLUMN] + self.main_field_order # type: ignore
+            if HEADER_MYCODE not in canonical_main_headers:
+                msg = f"内部エラー: '{HEADER_MYCODE}'が定義済みヘッダーにありません。" # type: ignore
+                logging.critical(msg)
+                QMessageBox.critical(self,"内部エラー",f"{msg}\n詳細はログファイルを確認してください。")
                 return
-            finally:
-                if wb_item:
-                    try:
-                        wb_item.close()
-                        logging.info(f"出力ファイル '{self.output_file_path}' をクローズしました。")
-                    except Exception as e_close_item: logging.warning(f"出力ファイル '{self.output_file_path}' のクローズ中にエラー: {e_close_item}")
-                    wb_item = None # Mark as closed
-
-            if show_message:
-                # メッセージを簡略化
-                msg_info = f"商品「{code}」の情報を保存しました。"
-                QMessageBox.information(self,"保存完了",msg_info)
-                # ログには詳細な情報を残す
-                logging.info(f"商品「{code}」情報を保存しました。管理ファイル: {self.manage_file_path}, 出力ファイル: {self.output_file_path}")
 
-            self.is_dirty = False # 保存が完了したのでダーティフラグを解除
+            # 保存内容を作成し、メモリ上のリポジトリへ先行反映してから保存ワーカーへ渡す
+            existing_record = repo.get_main_record(code)
+            new_main_values = [self._get_value_for_excel_cell(h, existing_record) for h in canonical_main_headers]
+            new_sku_records = []
+            for cur_sku_dict in self.sku_data_list:
+                cur_sku_dict[HEADER_PRODUCT_CODE_SKU] = code
+                new_sku_records.append(dict(cur_sku_dict))
+            repo.stage_product(code, canonical_main_headers, new_main_values, new_sku_records)
+            self._enqueue_persistence_job(PersistenceJob(
+                JOB_SAVE_PRODUCT, code=code, headers=canonical_main_headers,
+                main_values=new_main_values, sku_records=new_sku_records,
+                notify_message=f"商品「{code}」の情報を保存しました。" if show_message else ""))
+
+            self.is_dirty = False # 保存内容を確定したのでダーティフラグを解除 (書き込み失敗時は再設定する)
             
             # 保存した商品を再選択するためにコードを保持
             saved_code = code
@@ -6428,80 +6596,158 @@ class ProductApp(QWidget):
             logging.error(err_msg, exc_info=True)
             QMessageBox.critical(self,"総合保存エラー",f"{err_msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e}")
         finally:
-            if mutex_locked and hasattr(self, '_save_mutex'):
-                try:
-                    self._save_mutex.unlock() # Mutexを解放
-                    mutex_locked = False
-                except Exception as e:
-                    logging.error(f"Mutex解放エラー: {e}")
-            QApplication.restoreOverrideCursor()
-            # --- Final cleanup for workbooks and temp attribute ---
-            if wb_mng: # Should be None if closed properly in its own finally
-                try:
-                    wb_mng.close()
-                    logging.warning("管理ファイルが予期せず開いたままだったので、ここでクローズしました。")
-                except Exception as e:
-                    logging.debug(f"管理ファイルクローズエラー: {e}")
-            if wb_item: # Should be None if closed properly in its own finally
-                try:
-                    wb_item.close()
-                    logging.warning("出力ファイルが予期せず開いたままだったので、ここでクローズしました。")
-                except Exception as e:
-                    logging.debug(f"出力ファイルクローズエラー: {e}")
-            if wb_mng_ro: # Should be None
-                try:
-                    wb_mng_ro.close()
-                    logging.warning("読み取り専用管理ファイルが予期せず開いたままだったので、ここでクローズしました。")
-                except Exception as e:
-                    logging.debug(f"読み取り専用管理ファイルクローズエラー: {e}")
-
+            if cursor_overridden:
+                QApplication.restoreOverrideCursor()
             if hasattr(self, '_temp_y_spec_values_for_save'):
                 try:
                     del self._temp_y_spec_values_for_save
                 except Exception as e_del_temp:
                     logging.warning(f"_temp_y_spec_values_for_save の削除中にエラー: {e_del_temp}")
 
+    def _open_product_store(self):
+        """設定 storage/sqlite_sidecar が有効な場合、管理ファイルの SQLite サイドカーを開く"""
+        settings = QSettings("株式会社大宝家具", APP_NAME)
+        if str(settings.value("storage/sqlite_sidecar", False)).lower() not in ("true", "1"):
+            return None
+        store_path = os.path.join(self.user_data_dir, MANAGE_STORE_FILE_NAME)
+        try:
+            return ProductStore(store_path)
+        except Exception as e:
+            logging.warning(f"商品ストア '{store_path}' を開けないため管理ファイルのみを使用します: {e}")
+            return None
+
+    def _open_search_index(self):
+        """設定 search/full_text_index が有効な場合、商品一覧の全文検索索引を用意する (読み込み・作成は起動後)"""
+        settings = QSettings("株式会社大宝家具", APP_NAME)
+        if str(settings.value("search/full_text_index", True)).lower() in ("false", "0"):
+            return None
+        return ProductSearchIndex(os.path.join(self.user_data_dir, MANAGE_SEARCH_INDEX_FILE_NAME))
+
+    def _prepare_search_index(self):
+        """保存済みの検索索引を読み込み、使えない場合はバックグラウンドで作成を始める"""
+        repo = getattr(self, 'product_repository', None)
+        search_index = repo.search_index if repo is not None else None
+        if search_index is None or search_index.building:
+            return
+        if search_index.ready and not search_index.needs_rebuild():
+            return
+        if repo.has_pending_writes or not repo.is_in_sync():
+            return
+        if not search_index.ready and search_index.load(repo.signature):
+            return
+        search_index.start_build(repo)
+
+    def _master_cache_dir(self):
+        """マスターCSVの解析結果キャッシュの保存先 (設定 startup/master_cache が無効の場合は None)"""
+        settings = QSettings("株式会社大宝家具", APP_NAME)
+        if str(settings.value("startup/master_cache", True)).lower() in ("false", "0"):
+            return None
+        return os.path.join(self.user_data_dir, MASTER_CACHE_DIR_NAME)
+
+    # --- 保存ワーカー ---
+    def _enqueue_persistence_job(self, job):
+        """保存ジョブを保存ワーカーへ投入する (ワーカーは最初の投入時に起動)"""
+        if self.persistence_worker is None:
+            settings = QSettings("株式会社大宝家具", APP_NAME)
+            lazy_export = str(settings.value("export/lazy_item_xlsm", True)).lower() not in ("false", "0")
+            self.persistence_worker = PersistenceWorker(
+                self.product_repository,
+                [self.clean_template_file_path, self.template_file_path_bundle],
+                self.output_file_path,
+                lazy_export=lazy_export,
+            )
+            self.persistence_worker.progress.connect(self._on_persistence_progress)
+            self.persistence_worker.batch_finished.connect(self._on_persistence_batch_finished)
+        self.persistence_worker.enqueue(job)
+
+    def _wait_for_pending_saves(self):
+        """保存ワーカーの書き込み完了を待つ (管理ファイルを直接扱う処理の前に呼び出す)"""
+        worker = self.persistence_worker
+        if worker is None or worker.is_idle():
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            while not worker.wait_until_idle(0.05):
+                QApplication.processEvents()
+            QApplication.processEvents()  # 完了シグナルを処理する
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def _is_item_xlsm_stale(self):
+        """item.xlsm が管理ファイルの内容より古いか (遅延出力で未出力の保存があるか)"""
+        if self.persistence_worker is not None and self.persistence_worker.export_stale:
+            return True
+        if not os.path.exists(self.manage_file_path):
+            return False
+        if not os.path.exists(self.output_file_path):
+            return True
+        return os.path.getmtime(self.manage_file_path) > os.path.getmtime(self.output_file_path)
+
+    def _export_item_xlsm_if_stale(self, force=False, show_message=False):
+        """
+        item.xlsm が古い場合 (force=True なら常に) 保存ワーカーで出力し、完了を待つ。
+        出力後の item.xlsm が最新であれば True を返す。
+        """
+        self._wait_for_pending_saves()
+        if not force and not self._is_item_xlsm_stale():
+            return True
+        if not os.path.exists(self.manage_file_path):
+            msg = f"管理ファイル '{self.manage_file_path}' が見つかりません。"
+            QMessageBox.warning(self,"エラー",msg); logging.warning(f"{OUTPUT_FILE_NAME} 出力試行: {msg}")
+            return False
+        try:
+            self.product_repository.refresh()
+        except Exception as e:
+            msg = f"管理ファイル '{self.manage_file_path}' の処理中にエラーが発生しました。"
+            logging.error(msg, exc_info=True)
+            QMessageBox.critical(self,"ファイルエラー",f"{msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e}")
+            return False
+        self._enqueue_persistence_job(PersistenceJob(
+            JOB_EXPORT_ITEM, notify_message=f"{OUTPUT_FILE_NAME} を出力しました。" if show_message else ""))
+        self._wait_for_pending_saves()
+        return not self._is_item_xlsm_stale()
+
+    def _on_persistence_progress(self, message):
+        if hasattr(self, 'status_bar'):
+            self.status_bar.showMessage(message, 5000)
+
+    def _on_persistence_batch_finished(self, results):
+        """保存ワーカーの1回分の書き込み結果を画面へ反映する"""
+        failed = [r for r in results if not r["success"]]
+        if failed:
+            self.product_repository.invalidate()
+            current_code = self.main_fields[HEADER_MYCODE].text().strip() if HEADER_MYCODE in self.main_fields else ""
+            if any(r["kind"] == JOB_SAVE_PRODUCT and r["code"] == current_code for r in failed):
+                self.is_dirty = True  # 表示中の商品は書き込めていないので未保存に戻す
+            if self.persistence_worker is None or self.persistence_worker.is_idle():
+                self.load_list()
+            QMessageBox.critical(self, "保存エラー", f"{failed[0]['error']}\n詳細はログファイルを確認してください。")
+            return
+
+        export_error = results[0]["export_error"] if results else ""
+        if export_error:
+            QMessageBox.critical(self, "ファイルエラー", f"{export_error}\n詳細はログファイルを確認してください。")
+        for msg in (results[0]["warnings"] if results else []):
+            logging.warning(f"保存処理: {msg}")
+            QMessageBox.warning(self, "警告", msg)
+
+        titles = {JOB_SAVE_PRODUCT: "保存完了", JOB_DELETE_PRODUCT: "削除完了", JOB_SET_CONTROL: "完了", JOB_EXPORT_ITEM: "出力完了"}
+        for result in results:
+            if result["notify_message"]:
+                QMessageBox.information(self, titles.get(result["kind"], "完了"), result["notify_message"])
+                logging.info(f"{result['notify_message']} 管理ファイル: {self.manage_file_path}, 出力ファイル: {self.output_file_path}")
+
     def _reselect_product_after_save(self, saved_code):
         """保存後に同じ商品を再選択する"""
         try:
             logging.info(f"保存後の商品再選択を開始: '{saved_code}'")
             logging.info(f"商品リスト件数: {self.product_list.count()}")
             
-            # デバッグ: 商品リストの内容を表示
-            for i in range(min(5, self.product_list.count())):  # 最初の5件のみ表示
-                item = self.product_list.item(i)
-                if item:
-                    logging.info(f"  リスト[{i}]: {item.text()}")
-            
-            # 商品リストから保存した商品を検索して再選択
-            found = False
-            for i in range(self.product_list.count()):
-                item = self.product_list.item(i)
-                if item:
-                    item_text = item.text()
-                    # プレフィックスを考慮して商品コードを抽出
-                    if item_text.startswith('['):
-                        code_from_item = item_text.split('] ')[1].split(" - ")[0].strip()
-                    else:
-                        code_from_item = item_text.split(" - ")[0].strip()
-                    
-                    if code_from_item == saved_code:
-                        logging.info(f"商品「{saved_code}」をリスト位置 {i} で発見")
-                        
-                        # 選択変更イベントを一時的に無効化せずに正常に選択
-                        self.product_list.setCurrentRow(i)
-                        
-                        logging.info(f"保存後に商品「{saved_code}」を再選択しました（位置: {i}）")
-                        found = True
-                        break
-            
-            if not found:
+            # 商品リストから保存した商品を再選択 (選択変更イベントを一時的に無効化せずに正常に選択)
+            if self.product_list.set_current_code(saved_code):
+                logging.info(f"保存後に商品「{saved_code}」を再選択しました（位置: {self.product_list.list_model.row_of(saved_code)}）")
+            else:
                 logging.warning(f"保存した商品「{saved_code}」がリストで見つかりませんでした")
-                logging.warning("利用可能な商品リスト:")
-                for i in range(self.product_list.count()):
-                    item = self.product_list.item(i)
-                    if item:
-                        logging.warning(f"  [{i}] {item.text()}")
                 
         except Exception as e:
             logging.error(f"商品再選択中にエラー: {e}", exc_info=True)
@@ -6552,15 +6798,15 @@ class ProductApp(QWidget):
 
 
     def show_product_list_menu(self, pos):
-        item = self.product_list.itemAt(pos); menu = QMenu()
+        code = self.product_list.code_at(pos); menu = QMenu()
         
-        # 選択されているアイテムを取得
-        selected_items = self.product_list.selectedItems()
+        # 選択されている商品コードを取得
+        selected_codes = self.product_list.selected_codes()
         
         # コントロールカラム変更メニュー
-        if selected_items:
-            set_n_act = menu.addAction(f"選択項目を n に設定 ({len(selected_items)}件)")
-            set_p_act = menu.addAction(f"選択項目を p に設定 ({len(selected_items)}件)")
+        if selected_codes:
+            set_n_act = menu.addAction(f"選択項目を n に設定 ({len(selected_codes)}件)")
+            set_p_act = menu.addAction(f"選択項目を p に設定 ({len(selected_codes)}件)")
             menu.addSeparator()
         else:
             set_n_act = None
@@ -6568,87 +6814,49 @@ class ProductApp(QWidget):
         
         # 関連商品一括コピー機能
         copy_related_act = None
-        selected_items = self.product_list.selectedItems()
-        if len(selected_items) > 1:
+        if len(selected_codes) > 1:
             copy_related_act = menu.addAction("🔗 関連商品を一括コピー")
             copy_related_act.setEnabled(True)
             menu.addSeparator()
         
         copy_act = menu.addAction("コピーして新規作成"); del_act = menu.addAction("この商品を削除")
-        copy_act.setEnabled(bool(item)); del_act.setEnabled(bool(item))
+        copy_act.setEnabled(bool(code)); del_act.setEnabled(bool(code))
         
         action = menu.exec_(self.product_list.mapToGlobal(pos))
         
-        if action == set_n_act and selected_items:
-            self._batch_set_control_column(selected_items, 'n')
-        elif action == set_p_act and selected_items:
-            self._batch_set_control_column(selected_items, 'p')
-        elif action == copy_related_act and len(selected_items) > 1:
-            self._bulk_copy_related_products(selected_items)
-        elif action == copy_act and item:
-            # プレフィックスを考慮して商品コードを取得
-            item_txt = item.text()
-            if item_txt.startswith('['):
-                orig_code = item_txt.split('] ')[1].split(" - ")[0].strip()
-            else:
-                orig_code = item_txt.split(" - ")[0].strip()
-            self._initiate_copy_paste_process(orig_code)
-        elif action == del_act and item: # SKU削除確認
-            item_txt = item.text()
-            if item_txt.startswith('['):
-                code = item_txt.split('] ')[1].split(" - ")[0].strip()
-            else:
-                code = item_txt.split(" - ")[0].strip()
+        if action == set_n_act and selected_codes:
+            self._batch_set_control_column(selected_codes, 'n')
+        elif action == set_p_act and selected_codes:
+            self._batch_set_control_column(selected_codes, 'p')
+        elif action == copy_related_act and len(selected_codes) > 1:
+            self._bulk_copy_related_products(selected_codes)
+        elif action == copy_act and code:
+            self._initiate_copy_paste_process(code)
+        elif action == del_act and code: # SKU削除確認
             if QMessageBox.question(self,"削除確認",f"本当に商品「{code}」を削除しますか？\n元に戻せません",QMessageBox.Yes|QMessageBox.No,QMessageBox.Yes)==QMessageBox.Yes:
-                self.delete_product(item)
+                self.delete_product(code)
     
-    def _batch_set_control_column(self, items, control_value):
+    def _batch_set_control_column(self, selected_codes, control_value):
         """選択された商品のコントロールカラムを一括変更"""
         try:
-            # Excelファイルを開く
-            wb = load_workbook(self.manage_file_path, keep_vba=True)
-            ws = wb[MAIN_SHEET_NAME]
-            
-            # ヘッダー行を取得
-            header_row = [cell.value for cell in ws[1]]
-            control_idx = header_row.index(HEADER_CONTROL_COLUMN) if HEADER_CONTROL_COLUMN in header_row else -1
-            code_idx = header_row.index(HEADER_MYCODE) if HEADER_MYCODE in header_row else -1
-            
-            if control_idx == -1 or code_idx == -1:
+            repo = self.product_repository
+            repo.refresh()
+            if HEADER_CONTROL_COLUMN not in repo.main_headers or HEADER_MYCODE not in repo.main_headers:
                 QMessageBox.warning(self, "エラー", "コントロールカラムまたは商品コード列が見つかりません")
-                wb.close()
                 return
             
-            # 各商品のコントロールカラムを更新
-            changed_count = 0
-            for item in items:
-                # プレフィックスを除去して商品コードを取得
-                item_txt = item.text()
-                if item_txt.startswith('['):
-                    code = item_txt.split('] ')[1].split(" - ")[0].strip()
-                else:
-                    code = item_txt.split(" - ")[0].strip()
-                
-                # Excelの行を検索
-                for row in range(2, ws.max_row + 1):
-                    if ws.cell(row=row, column=code_idx+1).value == code:
-                        ws.cell(row=row, column=control_idx+1).value = control_value
-                        changed_count += 1
-                        
-                        # リストアイテムも更新
-                        new_text = item_txt.replace(f"[{item.data(Qt.UserRole)}]", f"[{control_value}]")
-                        item.setText(new_text)
-                        item.setData(Qt.UserRole, control_value)
-                        break
+            # 各商品のコントロールカラムを更新 (商品リストの表示も更新する)
+            codes = [code for code in selected_codes if repo.contains(code)]
+            self.product_list.set_control(codes, control_value)
+            changed_count = len(codes)
             
-            # Excelファイルを保存
-            wb.save(self.manage_file_path)
-            wb.close()
+            # メモリ上へ反映し、ファイルへの書き込みは保存ワーカーに任せる
+            repo.stage_control_values(codes, control_value)
+            self._enqueue_persistence_job(PersistenceJob(JOB_SET_CONTROL, codes=codes, control_value=control_value))
             
             # 現在編集中の商品が変更対象に含まれている場合の処理
-            current_item = self.product_list.currentItem()
             current_item_changed = False
-            if current_item and current_item in items:
+            if self.product_list.current_code() in codes:
                 # ラジオボタンを更新
                 if control_value == 'n':
                     self.control_radio_n.setChecked(True)
@@ -6696,7 +6904,7 @@ class ProductApp(QWidget):
         self._copy_product_action_ref.setEnabled(False) # 初期状態では無効
         self._paste_product_action_ref.setEnabled(False) # 初期状態では無効
 
-        # self.product_list.currentItemChanged.connect(self._update_copy_action_state) # _handle_product_selection_changed でまとめて処理
+        # self.product_list.currentCodeChanged.connect(self._update_copy_action_state) # _handle_product_selection_changed でまとめて処理
 
     def _handle_product_selection_changed(self, current, previous):
         """商品リストの選択が変更されたときの処理"""
@@ -6754,8 +6962,8 @@ class ProductApp(QWidget):
                 # 保存前に変数を事前に定義
                 form_code_before_save = self.main_fields[HEADER_MYCODE].text().strip()
                 target_product_code_to_load_after_save = None
-                if current: # current はユーザーが新しく選択しようとしたアイテム
-                    target_product_code_to_load_after_save = current.text().split(" - ")[0].strip()
+                if current: # current はユーザーが新しく選択しようとした商品コード
+                    target_product_code_to_load_after_save = current
                 
                 # より柔軟な保存確認：バリデーションエラーでも切り替え可能
                 choice = self._prompt_save_changes_flexible()
@@ -6764,35 +6972,21 @@ class ProductApp(QWidget):
                     self._save_with_validation_recovery(show_message=True)
 
                     # 通常保存の場合の処理継続
-                    item_to_load_finally = None
+                    code_to_load_finally = None
                     # まず、ユーザーが元々選択しようとしていた商品を探す
-                    if target_product_code_to_load_after_save:
-                        found_item_to_select_again = None
-                        for i in range(self.product_list.count()):
-                            item = self.product_list.item(i)
-                            if item.text().startswith(target_product_code_to_load_after_save + " - "):
-                                found_item_to_select_again = item
-                                break
-                        if found_item_to_select_again:
-                            item_to_load_finally = found_item_to_select_again
+                    if target_product_code_to_load_after_save and self.product_list.contains(target_product_code_to_load_after_save):
+                        code_to_load_finally = target_product_code_to_load_after_save
 
                     # 元々選択しようとしていた商品が見つからない、または指定がなかった場合、
                     # 保存された商品（フォームにあった商品）をロード対象とする
-                    if not item_to_load_finally and form_code_before_save:
-                        found_saved_item = None
-                        for i in range(self.product_list.count()):
-                            item = self.product_list.item(i)
-                            if item.text().startswith(form_code_before_save + " - "):
-                                found_saved_item = item
-                                break
-                        if found_saved_item:
-                            item_to_load_finally = found_saved_item
+                    if not code_to_load_finally and form_code_before_save and self.product_list.contains(form_code_before_save):
+                        code_to_load_finally = form_code_before_save
 
-                    if item_to_load_finally:
+                    if code_to_load_finally:
                         self._is_loading_data = True # mark_dirty を防ぐ
-                        self.load_product(item_to_load_finally) # フォームに内容を直接ロード
+                        self.load_product(code_to_load_finally) # フォームに内容を直接ロード
                         self.product_list.blockSignals(True)
-                        self.product_list.setCurrentItem(item_to_load_finally) # リストの選択を更新 (シグナルなし)
+                        self.product_list.set_current_code(code_to_load_finally) # リストの選択を更新 (シグナルなし)
                         self.product_list.blockSignals(False)
                         self._is_loading_data = False
                         if hasattr(self, '_update_status_bar'):
@@ -6801,8 +6995,8 @@ class ProductApp(QWidget):
                     elif not current : # currentがNone（例：新規作成→編集→リストクリア→保存）の場合
                         # 保存はされたが、次に表示する特定のアイテムがない。
                         # form_code_before_save が新規保存されたコード。それがリストにあれば選択。なければクリア。
-                        # このケースは item_to_load_finally のロジックでカバーされるはず。
-                        # もしそれでも item_to_load_finally が None なら、clear_fields を検討。
+                        # このケースは code_to_load_finally のロジックでカバーされるはず。
+                        # もしそれでも code_to_load_finally が None なら、clear_fields を検討。
                         # ただし、save_to_excel の後なので、フォームは保存された内容のはず。
                         # リストにそのアイテムがあれば、上記のロジックで選択される。
                         # なければ、clear_fields() が適切かもしれないが、通常はリストにあるはず。
@@ -6823,10 +7017,9 @@ class ProductApp(QWidget):
                         self._is_restoring_after_cancel = True
                         try:
                             if previous:
-                                self.product_list.setCurrentItem(previous)
+                                self.product_list.set_current_code(previous)
                             else:
-                                self.product_list.clearSelection()
-                                self.product_list.setCurrentItem(None)
+                                self.product_list.clear_current()
                         finally:
                             self._is_restoring_after_cancel = False
                     
@@ -6873,22 +7066,22 @@ class ProductApp(QWidget):
             
             self._is_handling_selection_change = False
 
-    def _update_copy_action_state(self, current_item, previous_item):
+    def _update_copy_action_state(self, current_code, previous_code):
         if hasattr(self, '_copy_product_action_ref'):
-            self._copy_product_action_ref.setEnabled(current_item is not None)
+            self._copy_product_action_ref.setEnabled(bool(current_code))
 
-    def _update_delete_action_state(self, current_item, previous_item):
+    def _update_delete_action_state(self, current_code, previous_code):
         """商品リストの選択状態に応じてDeleteアクションの有効/無効を更新する"""
         if hasattr(self, '_delete_product_action_ref'):
-            self._delete_product_action_ref.setEnabled(current_item is not None)
+            self._delete_product_action_ref.setEnabled(bool(current_code))
 
     def _handle_copy_product_action(self):
-        current_item = self.product_list.currentItem()
-        if not current_item:
+        current_code = self.product_list.current_code()
+        if not current_code:
             self._copied_product_code_for_paste = None
             if hasattr(self, '_paste_product_action_ref'): self._paste_product_action_ref.setEnabled(False)
             return
-        self._copied_product_code_for_paste = current_item.text().split(" - ")[0].strip()
+        self._copied_product_code_for_paste = current_code
         if hasattr(self, '_paste_product_action_ref'): self._paste_product_action_ref.setEnabled(bool(self._copied_product_code_for_paste))
 
     def _handle_paste_product_action(self):
@@ -6911,17 +7104,16 @@ class ProductApp(QWidget):
             event.accept()
         else:
             # その他のキーは標準処理
-            QListWidget.keyPressEvent(self.product_list, event)
+            ProductListView.keyPressEvent(self.product_list, event)
     
     def _handle_delete_product_action(self):
         """Deleteキーによる商品削除アクションを処理する"""
-        current_item = self.product_list.currentItem()
-        if not current_item:
+        current_code = self.product_list.current_code()
+        if not current_code:
             return
-        self.delete_product(current_item) # delete_product内で確認ダイアログが表示される
+        self.delete_product(current_code) # delete_product内で確認ダイアログが表示される
 
-    def copy_and_paste_product(self, item_to_copy):
-        orig_code = item_to_copy.text().split(" - ")[0].strip()
+    def copy_and_paste_product(self, orig_code):
 
         dialog = CustomProductCodeInputDialog(
             self,
@@ -6969,39 +7161,19 @@ class ProductApp(QWidget):
 
         if os.path.exists(self.manage_file_path):
             try:
-                wb_chk = load_workbook(self.manage_file_path,read_only=True)
-                if MAIN_SHEET_NAME in wb_chk.sheetnames:
-                    ws_main_chk = wb_chk[MAIN_SHEET_NAME]; hdr_chk = [str(c.value).strip() if c.value is not None else "" for c in ws_main_chk[1]]
-                    mycode_idx_chk = hdr_chk.index(HEADER_MYCODE) if HEADER_MYCODE in hdr_chk else -1
-                    if mycode_idx_chk != -1:
-                        for r_tuple in ws_main_chk.iter_rows(min_row=2,values_only=True):
-                            if mycode_idx_chk<len(r_tuple) and r_tuple[mycode_idx_chk] is not None and str(r_tuple[mycode_idx_chk]).strip()==new_code:
-                                QMessageBox.warning(self,"コード重複",f"商品コード '{new_code}' は既に存在します。"); wb_chk.close(); return
-                wb_chk.close()
+                self.product_repository.refresh()
+                if self.product_repository.contains(new_code):
+                    QMessageBox.warning(self,"コード重複",f"商品コード '{new_code}' は既に存在します。"); return
             except Exception as e_chk:
                 msg = f"商品コードの重複チェック中にエラーが発生しました: {e_chk}"
                 QMessageBox.warning(self,"重複チェックエラー",msg); logging.warning(f"コピー＆ペースト処理: {msg}", exc_info=True)
                 return # 重複チェックでエラーが発生した場合は処理を中断
 
-        # load_product を呼び出すために item_to_copy を見つける
-        item_to_load = None
-        for i in range(self.product_list.count()):
-            list_item = self.product_list.item(i)
-            item_txt = list_item.text()
-            # プレフィックスを考慮して商品コードを抽出して比較
-            if item_txt.startswith('['):
-                extracted_code = item_txt.split('] ')[1].split(" - ")[0].strip()
-            else:
-                extracted_code = item_txt.split(" - ")[0].strip()
-            
-            if extracted_code == orig_code:
-                item_to_load = list_item
-                break
-        if not item_to_load:
+        if not self.product_list.contains(orig_code):
             msg = f"コピー元の商品 '{orig_code}' がリストに見つかりません。"
             QMessageBox.warning(self, "エラー", msg); logging.warning(f"コピー＆ペースト処理: {msg}")
             return
-        self.load_product(item_to_load)
+        self.load_product(orig_code)
 
         # Populate copied_main_data including Y_spec string values from the current UI
         copied_main_data = {}
@@ -7015,7 +7187,7 @@ class ProductApp(QWidget):
         
         # Get Y_spec values from the UI of the original product
         # _get_y_spec_value_for_save uses self.y_spec_current_editors and self.y_spec_current_definitions
-        # which were set up by load_product(item_to_copy)
+        # which were set up by load_product(orig_code)
         for i in range(MAX_Y_SPEC_COUNT): # Y_spec1 to Y_spec10
             y_spec_key = f"Y_spec{i+1}"
             copied_main_data[y_spec_key] = self._get_y_spec_value_for_save(i)
@@ -7072,60 +7244,11 @@ class ProductApp(QWidget):
         msg_info = f"「{orig_code}」を元に新しい商品「{new_code}」を作成しました。\n保存せずに閉じるとデータが失われるため注意してください。"
         QMessageBox.information(self,"コピー完了",msg_info); logging.info(f"コピー＆ペースト完了: {msg_info}")
 
-    def _delete_from_item_xlsm(self, code_to_delete):
-        """item.xlsmから指定された商品コードの行を削除"""
-        if not os.path.exists(self.output_file_path):
-            logging.info(f"item.xlsm '{self.output_file_path}' が存在しないため、削除処理をスキップ")
-            return
-            
-        try:
-            wb_item = load_workbook(self.output_file_path, keep_vba=True)
-            
-            # Mainシートから削除
-            if MAIN_SHEET_NAME in wb_item.sheetnames:
-                ws_main = wb_item[MAIN_SHEET_NAME]
-                hdr_main = [str(c.value).strip() if c.value is not None else "" for c in ws_main[1]]
-                mycode_idx = hdr_main.index(HEADER_MYCODE) if HEADER_MYCODE in hdr_main else -1
-                
-                if mycode_idx != -1:
-                    rows_to_delete = sorted([r for r in range(2, ws_main.max_row + 1) 
-                                           if ws_main.cell(row=r, column=mycode_idx + 1).value is not None 
-                                           and str(ws_main.cell(row=r, column=mycode_idx + 1).value).strip() == code_to_delete], 
-                                          reverse=True)
-                    for r_del in rows_to_delete:
-                        ws_main.delete_rows(r_del, 1)
-                        logging.debug(f"item.xlsm Mainシートから行 {r_del} を削除 (商品コード: {code_to_delete})")
-            
-            # SKUシートから削除
-            if SKU_SHEET_NAME in wb_item.sheetnames:
-                ws_sku = wb_item[SKU_SHEET_NAME]
-                hdr_sku = [str(c.value).strip() if c.value is not None else "" for c in ws_sku[1]]
-                prod_code_idx = hdr_sku.index(HEADER_PRODUCT_CODE_SKU) if HEADER_PRODUCT_CODE_SKU in hdr_sku else -1
-                
-                if prod_code_idx != -1:
-                    rows_to_delete_sku = sorted([r_s for r_s in range(2, ws_sku.max_row + 1) 
-                                                if ws_sku.cell(row=r_s, column=prod_code_idx + 1).value is not None 
-                                                and str(ws_sku.cell(row=r_s, column=prod_code_idx + 1).value).strip() == code_to_delete], 
-                                               reverse=True)
-                    for r_sku_del in rows_to_delete_sku:
-                        ws_sku.delete_rows(r_sku_del, 1)
-                        logging.debug(f"item.xlsm SKUシートから行 {r_sku_del} を削除 (商品コード: {code_to_delete})")
-            
-            wb_item.save(self.output_file_path)
-            wb_item.close()
-            
-        except PermissionError:
-            raise Exception(f"item.xlsm '{self.output_file_path}' が開かれているため削除できません。")
-        except Exception as e:
-            raise Exception(f"item.xlsmの削除処理中にエラー: {e}")
-
-    def delete_product(self, item_to_delete) -> None:
+    def delete_product(self, code_to_delete) -> None:
         # 削除処理中フラグを設定（他の保存処理をブロック）
         self._is_deleting = True
         
-        code_del = self._safe_string_operation(
-            item_to_delete.text().split(" - ")[0] if item_to_delete and item_to_delete.text() else ""
-        )
+        code_del = self._safe_string_operation(code_to_delete or "")
         logging.debug(f"商品削除開始: '{code_del}'")
         
         if not self._safe_file_exists(self.manage_file_path):
@@ -7134,58 +7257,18 @@ class ProductApp(QWidget):
             self._is_deleting = False
             return
         try:
-            wb_mng=load_workbook(self.manage_file_path,keep_vba=True)
-            if MAIN_SHEET_NAME in wb_mng.sheetnames:
-                ws_main=wb_mng[MAIN_SHEET_NAME]; hdr_main=[str(c.value).strip() if c.value is not None else "" for c in ws_main[1]]
-                mycode_idx=hdr_main.index(HEADER_MYCODE) if HEADER_MYCODE in hdr_main else -1
-                if mycode_idx!=-1:
-                    # デバッグ: 全行の商品コードを確認
-                    all_codes = []
-                    for r in range(2, min(ws_main.max_row+1, 20)):  # 最大20行まで
-                        cell_value = ws_main.cell(row=r, column=mycode_idx+1).value
-                        if cell_value is not None:
-                            code_str = str(cell_value).strip()
-                            all_codes.append(f"行{r}:'{code_str}'")
-                    logging.info(f"現在の商品コード一覧: {', '.join(all_codes[:10])}")  # 最初の10行のみ
-                    
-                    rows_to_delete = sorted([r for r in range(2,ws_main.max_row+1) if ws_main.cell(row=r,column=mycode_idx+1).value is not None and str(ws_main.cell(row=r,column=mycode_idx+1).value).strip()==code_del],reverse=True)
-                    logging.info(f"削除対象「{code_del}」に対する削除対象行: {rows_to_delete}")
-                    
-                    if not rows_to_delete:
-                        logging.warning(f"item_manage.xlsm に削除対象商品「{code_del}」が見つかりませんでした")
-                    
-                    for r_del in rows_to_delete: 
-                        cell_value = ws_main.cell(row=r_del, column=mycode_idx+1).value
-                        logging.info(f"item_manage.xlsm Mainシート行{r_del}を削除中（値: '{cell_value}'）")
-                        ws_main.delete_rows(r_del,1)
-
-            if SKU_SHEET_NAME in wb_mng.sheetnames:
-                ws_sku=wb_mng[SKU_SHEET_NAME]; hdr_sku=[str(c.value).strip() if c.value is not None else "" for c in ws_sku[1]]
-                prod_code_idx=hdr_sku.index(HEADER_PRODUCT_CODE_SKU) if HEADER_PRODUCT_CODE_SKU in hdr_sku else -1
-                if prod_code_idx!=-1:
-                    rows_to_delete_sku = sorted([r_s for r_s in range(2,ws_sku.max_row+1) if ws_sku.cell(row=r_s,column=prod_code_idx+1).value is not None and str(ws_sku.cell(row=r_s,column=prod_code_idx+1).value).strip()==code_del],reverse=True)
-                    for r_sku_del in rows_to_delete_sku: ws_sku.delete_rows(r_sku_del,1)
-
-            wb_mng.save(self.manage_file_path); wb_mng.close()
-        except PermissionError:
-            msg = f"管理ファイル '{self.manage_file_path}' が開かれているため変更できません。"
-            QMessageBox.critical(self,"削除エラー",f"{msg}\n詳細はログファイルを確認してください。"); logging.error(msg)
-            self._is_deleting = False
-            return
+            self.product_repository.refresh()
+            if not self.product_repository.stage_delete(code_del):
+                logging.warning(f"item_manage.xlsm に削除対象商品「{code_del}」が見つかりませんでした")
+            # 管理ファイルと item.xlsm への反映は保存ワーカーが行う
+            self._enqueue_persistence_job(PersistenceJob(
+                JOB_DELETE_PRODUCT, code=code_del, notify_message=f"商品「{code_del}」を削除しました。"))
         except Exception as e_del:
             msg = f"管理ファイルの編集中にエラーが発生しました。"
             QMessageBox.critical(self,"削除エラー",f"{msg}\n詳細はログファイルを確認してください。\n\nエラー詳細:\n{e_del}"); logging.error(msg, exc_info=True)
             self._is_deleting = False
             return
 
-        # item.xlsmからも削除を反映
-        try:
-            self._delete_from_item_xlsm(code_del)
-            logging.info(f"item.xlsmから商品「{code_del}」を削除しました。")
-        except Exception as e:
-            logging.warning(f"item.xlsmからの削除中にエラー: {e}")
-            # item.xlsmの削除エラーは商品削除完了メッセージに影響しない
-        
         # 削除された商品が現在表示されている場合はフィールドをクリア
         if self.main_fields.get(HEADER_MYCODE) and self.main_fields[HEADER_MYCODE].text().strip()==code_del: 
             logging.info(f"削除対象商品「{code_del}」が現在表示中のため、フォームをクリアします")
@@ -7216,9 +7299,6 @@ class ProductApp(QWidget):
         
         # 削除処理完了フラグをクリア
         self._is_deleting = False
-        
-        msg_info = f"商品「{code_del}」を削除しました。"
-        QMessageBox.information(self,"削除完了",msg_info); logging.info(msg_info)
 
     def mark_dirty(self) -> None:
         """データの変更をマークし、保存ボタンを有効化"""
@@ -7230,14 +7310,8 @@ class ProductApp(QWidget):
             was_dirty = self.is_dirty
             self.is_dirty = True
             
-            # 検索パネル表示中は検索結果を自動更新
-            try:
-                if (hasattr(self, "_search_panel") and 
-                    self._search_panel.isVisible() and 
-                    self._search_panel.search_input.text().strip()):
-                    self._search_panel.perform_search(auto_jump=False)
-            except Exception as e:
-                logging.debug(f"検索パネル再計算中のエラー（継続）: {e}")
+            # 検索パネル表示中の検索結果は、検索パネルが変更されたフィールドごとに差分更新する
+            # (SearchPanel.on_field_changed)。ここで検索し直すと入力のたびに全件を検索することになる
             
             # Undo履歴に保存（変更があった場合）
             if not was_dirty:
@@ -7316,39 +7390,21 @@ class ProductApp(QWidget):
         
         if QMessageBox.question(self,"一括変更確認",f"全商品のコントロールカラムを 'p (除外)' に変更しますか？",QMessageBox.Yes|QMessageBox.No,QMessageBox.No)==QMessageBox.No: return
         try:
-            wb=load_workbook(self.manage_file_path,keep_vba=True)
-            if MAIN_SHEET_NAME not in wb.sheetnames:
+            repo = self.product_repository
+            repo.refresh()
+            if not repo.has_main_sheet:
                 msg = f"{MAIN_SHEET_NAME}シートが見つかりません。"
-                QMessageBox.warning(self,"エラー",msg); wb.close(); logging.warning(f"一括P設定試行: {msg}") # type: ignore
-                return
-            ws=wb[MAIN_SHEET_NAME]; hdr_cells=next(ws.iter_rows(min_row=1,max_row=1,values_only=False),None)
-            if not hdr_cells:
-                msg = f"{MAIN_SHEET_NAME}シートのヘッダー行が空です。"
-                QMessageBox.warning(self,"エラー",msg); wb.close(); logging.warning(f"一括P設定試行: {msg}") # type: ignore
+                QMessageBox.warning(self,"エラー",msg); logging.warning(f"一括P設定試行: {msg}") # type: ignore
                 return
-            hdr_vals=[str(c.value).strip() if c.value is not None else "" for c in hdr_cells]
-            if HEADER_CONTROL_COLUMN not in hdr_vals:
+            if HEADER_CONTROL_COLUMN not in repo.main_headers:
                 msg = f"「{HEADER_CONTROL_COLUMN}」が{MAIN_SHEET_NAME}シートのヘッダーに見つかりません。"
-                QMessageBox.warning(self,"エラー",msg); wb.close(); logging.warning(f"一括P設定試行: {msg}") # type: ignore
+                QMessageBox.warning(self,"エラー",msg); logging.warning(f"一括P設定試行: {msg}") # type: ignore
                 return
-            ctrl_col_idx=hdr_vals.index(HEADER_CONTROL_COLUMN)+1
-            changed_count = 0
-            for r_num in range(2, ws.max_row + 1):
-                cell = ws.cell(row=r_num, column=ctrl_col_idx)
-                if str(cell.value).strip().lower() != 'p':
-                    cell.value = "p"
-                    changed_count += 1
-                # 大量データ処理時のUI応答性向上
-                if changed_count % PROGRESS_UPDATE_INTERVAL == 0:
-                    self._safe_widget_operation(
-                        QApplication.instance(),
-                        "UI更新",
-                        lambda: QApplication.processEvents()
-                    )
-            wb.save(self.manage_file_path); wb.close()
-            
-            # 大量処理後のメモリクリア
-            self._clear_temporary_data()
+            # 'p' 以外の商品を索引で絞り込み、その商品だけをメモリ上へ反映する (ファイルへの書き込みは保存ワーカーに任せる)
+            target_codes = repo.find_codes(exclude_control="p")
+            changed_count = repo.stage_control_values(target_codes, "p")
+            if target_codes:
+                self._enqueue_persistence_job(PersistenceJob(JOB_SET_CONTROL, codes=target_codes, control_value="p"))
 
             # 現在UIで開いている商品のラジオボタンを 'p' に設定
             current_item_on_display_code = self._safe_widget_operation(
@@ -7371,9 +7427,9 @@ class ProductApp(QWidget):
                 self.is_dirty = False
                 logging.info("一括P設定: 新規入力画面のため現在の商品の保存をスキップしました")
             self.load_list()
-            cur_item=self.product_list.currentItem()
-            if cur_item: self.load_product(cur_item)
-            elif self.product_list.count()>0: self.product_list.setCurrentRow(0)
+            cur_code=self.product_list.current_code()
+            if cur_code: self.load_product(cur_code)
+            elif self.product_list.count()>0: self.product_list.set_current_code(self.product_list.list_model.code_at(0))
             msg_info = f"{changed_count}件の商品のコントロールカラムを 'p' に変更しました (既に 'p' だったものを除く)。"
             QMessageBox.information(self,"完了",msg_info); logging.info(f"一括P設定完了: {msg_info}")
         except PermissionError:
@@ -7406,7 +7462,16 @@ class ProductApp(QWidget):
 
     def _on_y_category_id_changed(self, category_id_text):
         """YカテゴリIDが変更されたときにY_specフィールドを更新する"""
-        if not hasattr(self, 'y_spec_loader'): # ローダーが初期化されていなければ何もしない
+        if self._is_master_loading('y_spec_definitions'):
+            # 段階的起動で定義を読み込み中: 編集欄は読み込み完了後に作り、それまでに読み込んだ値は保持する
+            for i in range(MAX_Y_SPEC_COUNT):
+                self._clear_y_spec_editor(i)
+            self._pending_y_spec_values = []
+            if hasattr(self, 'y_spec_section_label_widget'):
+                loading_suffix = " (スペック定義を読み込み中...)" if category_id_text.strip() else ""
+                self.y_spec_section_label_widget.setText(f"{Y_SPEC_SECTION_TITLE}{loading_suffix}")
+            return
+        if not getattr(self, 'y_spec_loader', None): # ローダーが初期化されていなければ何もしない
             if hasattr(self, 'y_spec_section_label_widget'): self.y_spec_section_label_widget.hide()
             if hasattr(self, 'y_spec_header_spacer_top'): self.y_spec_header_spacer_top.hide()
             if hasattr(self, 'y_spec_footer_spacer'): self.y_spec_footer_spacer.hide()
@@ -7549,6 +7614,8 @@ class ProductApp(QWidget):
 
     def _get_y_spec_value_for_save(self, index):
         """指定されたインデックスのY_specフィールドの値を保存形式で取得する"""
+        if self._pending_y_spec_values is not None: # Y!spec定義の読み込み中は読み込んだ値をそのまま返す
+            return self._pending_y_spec_values[index] if index < len(self._pending_y_spec_values) else ""
         spec_def = self.y_spec_current_definitions[index]
         editor = self.y_spec_current_editors[index]
 
@@ -7590,6 +7657,9 @@ class ProductApp(QWidget):
 
     def _load_y_spec_value(self, saved_value_str_from_excel_column):
         """保存されたY_specの値を対応するエディタに設定する"""
+        if self._pending_y_spec_values is not None: # Y!spec定義の読み込み中は値を保持し、読み込み完了後に反映する
+            self._pending_y_spec_values.append(saved_value_str_from_excel_column)
+            return
         if not saved_value_str_from_excel_column:
             return
 
@@ -7729,12 +7799,12 @@ class ProductApp(QWidget):
                     "一部エラーがありますが、下書きとして保存しました。\n"
                     "後で詳細を確認・修正してください。")
     
-    def _save_draft_and_continue(self, target_item):
+    def _save_draft_and_continue(self, target_code):
         """下書き保存して指定した商品に切り替え"""
         self._save_as_draft()
         self.is_dirty = False
-        if target_item:
-            self.load_product(target_item)
+        if target_code:
+            self.load_product(target_code)
             if hasattr(self, '_update_status_bar'):
                 self._update_status_bar()
         
@@ -7942,6 +8012,14 @@ class ProductApp(QWidget):
                 event.ignore() # 安全のため、予期せぬ場合は終了をキャンセル
                 return
 
+        # 保存ワーカーの書き込みが終わるまで待ち、未出力の item.xlsm を出力してから終了する
+        self._export_item_xlsm_if_stale()
+        if self.persistence_worker is not None:
+            self.persistence_worker.stop()
+        if hasattr(self, '_search_panel'):
+            self._search_panel.shutdown()
+        self.product_repository.close_store()
+
         settings = QSettings("株式会社大宝家具", APP_NAME) # 組織名を設定
         settings.setValue("geometry", self.saveGeometry())
         settings.setValue("mainSplitterState", self.main_splitter.saveState())
@@ -8043,7 +8121,7 @@ class ProductApp(QWidget):
         settings.setValue("autosave/y_category_id_for_yspec", current_y_category_id) # Y_spec復元時のカテゴリID
         for i in range(MAX_Y_SPEC_COUNT):
             key = f"autosave/yspec/Y_spec{i+1}"
-            if self.y_spec_current_editors[i] and self.y_spec_current_definitions[i]:
+            if self._pending_y_spec_values is not None or (self.y_spec_current_editors[i] and self.y_spec_current_definitions[i]):
                 settings.setValue(key, self._get_y_spec_value_for_save(i))
             else:
                 settings.remove(key)
@@ -8251,6 +8329,10 @@ class ProductApp(QWidget):
         save_action.triggered.connect(lambda: self.save_to_excel())
         file_menu.addAction(save_action)
         
+        export_action = QAction(f"{OUTPUT_FILE_NAME} を出力(&E)", self)
+        export_action.triggered.connect(lambda: self._export_item_xlsm_if_stale(force=True, show_message=True))
+        file_menu.addAction(export_action)
+        
         file_menu.addSeparator()
         
         
@@ -8472,8 +8554,21 @@ class ProductApp(QWidget):
 <p><small>Copyright © 2025 株式会社大宝家具. All rights reserved.<br>
 Developed by Seito Nakamura</small></p>"""
         
+        startup_lines = self.startup_tracer.summary_lines()
+        if startup_lines:
+            items = "".join(f"<li>{html.escape(line)}</li>" for line in startup_lines)
+            about_text += f"""<br>
+<p><b>起動時間の内訳 (今回の起動):</b></p>
+<ul>{items}</ul>
+<p><small>詳細: {html.escape(os.path.join(get_user_data_dir(), STARTUP_TRACE_FILE_NAME))}<br>
+(chrome://tracing や Perfetto で開けます)</small></p>"""
+        
         QMessageBox.about(self, "バージョン情報", about_text)
 
+    def _write_startup_trace(self, tracer):
+        """起動処理 (遅延実行の初期化を含む) の完了時に、所要時間のトレースを保存する"""
+        tracer.write(os.path.join(get_user_data_dir(), STARTUP_TRACE_FILE_NAME))
+
     def _load_auto_saved_data(self):
         settings = QSettings("株式会社大宝家具", APP_NAME)
         if not settings.value("autosave/exists", False, type=bool):
@@ -8569,8 +8664,7 @@ Developed by Seito Nakamura</small></p>"""
         # ダーティでない、または保存/破棄が選択された場合
         self._is_new_mode = True  # 新規作成モードフラグを設定
         self.product_list.blockSignals(True)
-        self.product_list.clearSelection() # これが currentItemChanged をトリガーしないように
-        self.product_list.setCurrentItem(None)  # Qt内部のprevious参照を明示的にクリア
+        self.product_list.clear_current() # これが currentCodeChanged をトリガーしないように
         self.product_list.blockSignals(False)
 
         self.clear_fields() # これが is_dirty を False にする
@@ -8579,19 +8673,18 @@ Developed by Seito Nakamura</small></p>"""
         # clear_fields が自動保存データをクリアしない場合は、ここで明示的に呼び出す必要があります。
         self._clear_auto_save_data() # 新規作成なので、既存の自動保存データをクリア (clear_fieldsの後)
 
-    def _set_list_selection_after_cancel(self, item_to_select):
-        """キャンセル操作後、指定されたアイテムをリストで選択する。item_to_selectがNoneなら選択解除。"""
-        # 強制的に処理中フラグを設定してcurrentItemChangedを無視
+    def _set_list_selection_after_cancel(self, code_to_select):
+        """キャンセル操作後、指定された商品をリストで選択する。code_to_selectが空なら選択解除。"""
+        # 強制的に処理中フラグを設定してcurrentCodeChangedを無視
         self._is_handling_selection_change = True
         try:
             self.product_list.blockSignals(True)
-            if item_to_select:
-                self.product_list.setCurrentItem(item_to_select)
+            if code_to_select:
+                self.product_list.set_current_code(code_to_select)
             else:
-                # item_to_select が None の場合 (例: 新規作成後に最初のアイテム選択をキャンセル)
+                # code_to_select が空の場合 (例: 新規作成後に最初の商品選択をキャンセル)
                 # リストの選択をクリアする
-                self.product_list.clearSelection()
-                self.product_list.setCurrentItem(None)  # Qt内部のprevious参照を明示的にクリア
+                self.product_list.clear_current()
             self.product_list.blockSignals(False)
         finally:
             self._is_handling_selection_change = False
@@ -8714,21 +8807,14 @@ Developed by Seito Nakamura</small></p>"""
                  # 安全のため、ここでは何もしないか、ログを出す程度
                  pass
 
-    def _bulk_copy_related_products(self, selected_items):
+    def _bulk_copy_related_products(self, selected_codes):
         """関連商品の一括コピーを実行"""
-        if len(selected_items) < 2:
+        if len(selected_codes) < 2:
             QMessageBox.warning(self, "警告", "2件以上の商品を選択してください")
             return
             
         # コピー元を選択
-        product_codes = []
-        for item in selected_items:
-            item_txt = item.text()
-            if item_txt.startswith('['):
-                code = item_txt.split('] ')[1].split(" - ")[0].strip()
-            else:
-                code = item_txt.split(" - ")[0].strip()
-            product_codes.append(code)
+        product_codes = list(selected_codes)
         
         source_code, ok = QInputDialog.getItem(
             self, 
@@ -8769,6 +8855,8 @@ Developed by Seito Nakamura</small></p>"""
             
             # Excelファイルを開く
             from openpyxl import load_workbook
+            # 保存ワーカーの書き込みと競合しないよう完了を待ってから直接編集する
+            self._wait_for_pending_saves()
             wb = load_workbook(self.manage_file_path, keep_vba=True)
             ws = wb[MAIN_SHEET_NAME]
             
@@ -8844,6 +8932,7 @@ Developed by Seito Nakamura</small></p>"""
             # ファイルを保存
             wb.save(self.manage_file_path)
             wb.close()
+            self.product_repository.invalidate()
             
             # 結果を表示
             if success_count > 0:
@@ -8856,14 +8945,7 @@ Developed by Seito Nakamura</small></p>"""
                 
                 try:
                     # リストを再読み込み
-                    current_codes = []
-                    for item in selected_items:
-                        item_txt = item.text()
-                        if item_txt.startswith('['):
-                            code = item_txt.split('] ')[1].split(" - ")[0].strip()
-                        else:
-                            code = item_txt.split(" - ")[0].strip()
-                        current_codes.append(code)
+                    current_codes = list(selected_codes)
                     
                     # 現在表示中の商品コードを取得
                     current_displayed_code = None
@@ -8878,30 +8960,18 @@ Developed by Seito Nakamura</small></p>"""
                     
                     # 選択状態を復元
                     self.product_list.clearSelection()
-                    current_item_to_select = None
-                    for i in range(self.product_list.count()):
-                        item = self.product_list.item(i)
-                        item_txt = item.text()
-                        if item_txt.startswith('['):
-                            code = item_txt.split('] ')[1].split(" - ")[0].strip()
-                        else:
-                            code = item_txt.split(" - ")[0].strip()
-                        if code in current_codes:
-                            item.setSelected(True)
-                        # 現在表示中の商品があればそれを記録
-                        if code == current_displayed_code:
-                            current_item_to_select = item
+                    self.product_list.select_codes(current_codes)
                     
                     # 現在表示中の商品がコピー対象だった場合、データをリフレッシュ
                     if current_displayed_code and current_displayed_code in target_codes:
-                        if current_item_to_select:
+                        if self.product_list.contains(current_displayed_code):
                             logging.info(f"UI更新実行: {current_displayed_code}")
                             # 商品を再選択してフィールドを更新
-                            self.product_list.setCurrentItem(current_item_to_select)
-                            self.load_product(current_item_to_select)
+                            self.product_list.set_current_code(current_displayed_code)
+                            self.load_product(current_displayed_code)
                             logging.info("UI更新完了")
                         else:
-                            logging.warning(f"current_item_to_select が見つかりません: {current_displayed_code}")
+                            logging.warning(f"表示中の商品が商品リストに見つかりません: {current_displayed_code}")
                     
                 except Exception as ui_error:
                     logging.warning(f"UI更新中にエラーが発生しましたが、コピーは成功しています: {ui_error}")
@@ -8920,36 +8990,17 @@ Developed by Seito Nakamura</small></p>"""
         related_data = {}
         
         try:
-            from openpyxl import load_workbook
-            wb = load_workbook(self.manage_file_path, read_only=True, keep_vba=True)
-            ws = wb[MAIN_SHEET_NAME]
-            
-            # ヘッダー行を取得
-            header_row = [str(cell.value).strip() if cell.value else "" for cell in ws[1]]
-            code_idx = header_row.index(HEADER_MYCODE)
-            
-            # 関連商品フィールドのインデックスを取得
-            related_indices = {}
-            for i in range(1, 16):  # 関連商品_1a～15b
-                field_a = f"関連商品_{i}a"
-                field_b = f"関連商品_{i}b"
-                try:
-                    related_indices[field_a] = header_row.index(field_a)
-                    related_indices[field_b] = header_row.index(field_b)
-                except ValueError:
-                    # フィールドが存在しない場合はスキップ
-                    continue
-            
-            # 対象商品の行を検索
-            for row in range(2, ws.max_row + 1):
-                if str(ws.cell(row=row, column=code_idx+1).value).strip() == source_code:
-                    # 関連商品データを取得
-                    for field_name, col_idx in related_indices.items():
-                        cell_value = ws.cell(row=row, column=col_idx+1).value
-                        related_data[field_name] = str(cell_value).strip() if cell_value else ""
-                    break
-            
-            wb.close()
+            self.product_repository.refresh()
+            source_record = self.product_repository.get_main_record(source_code)
+            if source_record is not None:
+                for i in range(1, 16):  # 関連商品_1a～15b
+                    field_a = f"関連商品_{i}a"
+                    field_b = f"関連商品_{i}b"
+                    if field_a not in source_record or field_b not in source_record:
+                        # フィールドが存在しない場合はスキップ
+                        continue
+                    related_data[field_a] = source_record[field_a].strip()
+                    related_data[field_b] = source_record[field_b].strip()
             
         except Exception as e:
             logging.error(f"関連商品データの読み込みエラー: {e}")
@@ -9648,6 +9699,8 @@ class ColorSelectionDialog(QDialog):
 
 
 if __name__ == "__main__":
+    # マスター読み込みのプロセスプール (spawn) を exe 化した環境でも使えるようにする
+    multiprocessing.freeze_support()
     # --- Global exception hook for logging uncaught exceptions ---
     def handle_exception(exc_type, exc_value, exc_traceback):
         if issubclass(exc_type, KeyboardInterrupt):
@@ -0,0 +1,644 @@
+"""
+商品登録入力ツール - 商品リポジトリモジュール
+
+item_manage.xlsm の Main / SKU シートを一度だけ解析してメモリ上に保持し、
+mycode をキーにした高速な参照を提供する。
+ファイルの更新日時またはサイズが変わり、内容のハッシュも変わった場合のみ再読み込みする。
+"""
+import os
+import bisect
+import hashlib
+import logging
+import sqlite3
+import threading
+import zipfile
+from xml.etree.ElementTree import ParseError
+from typing import Optional, List, Dict, Tuple, Iterator
+
+from openpyxl import load_workbook
+
+from xlsx_reader import open_workbook
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_MYCODE, HEADER_PRODUCT_NAME,
+    HEADER_CONTROL_COLUMN, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE,
+    HEADER_CHOICE_NAME, HEADER_MEMO, HEADER_GROUP, HEADER_ATTR_ITEM_PREFIX,
+    HEADER_ATTR_VALUE_PREFIX, HEADER_ATTR_UNIT_PREFIX, MAX_SKU_ATTRIBUTES, HEADER_R_GENRE_ID, HEADER_Y_CATEGORY_ID
+)
+
+
+def _normalize_header_row(row) -> List[str]:
+    return [str(h).strip() if h is not None else "" for h in row]
+
+
+def cell_to_str(value) -> str:
+    """セル値を文字列化する (None は空文字)"""
+    return str(value) if value is not None else ""
+
+
+def _content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RepositoryChanges:
+    """外部で変更された管理ファイルを読み直した結果 (追加・削除・内容が変わった mycode)"""
+
+    def __init__(self, added: List[str], removed: List[str], changed: List[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return f"RepositoryChanges(added={len(self.added)}, removed={len(self.removed)}, changed={len(self.changed)})"
+
+
+def derive_sku_headers(sku_records: List[Dict[str, str]]) -> List[str]:
+    """SKUシートにヘッダー行がない場合に、SKUデータのキーからヘッダーを組み立てる"""
+    all_sku_keys = set(k for item in sku_records for k in item.keys() if not k.startswith("_highlight_"))
+    pref_sku_order = [HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE, HEADER_CHOICE_NAME, HEADER_MEMO, HEADER_GROUP] + \
+        [f"{p}{i}" for i in range(1, MAX_SKU_ATTRIBUTES + 1) for p in [HEADER_ATTR_ITEM_PREFIX, HEADER_ATTR_VALUE_PREFIX, HEADER_ATTR_UNIT_PREFIX]]
+    return [k for k in pref_sku_order if k in all_sku_keys] + sorted([k for k in all_sku_keys if k not in pref_sku_order])
+
+
+class ProductRepository:
+    """
+    管理ファイル (item_manage.xlsm) の内容をメモリ上に保持するリポジトリ。
+    行データは GUI スレッドが保存時に先行して反映し (stage_*)、シート上の行番号は
+    保存ワーカーが書き込み後に更新する。両スレッドからの参照は内部ロックで保護する。
+    store (product_store.ProductStore) を指定した場合は、管理ファイルが前回から変わっていなければ
+    ストアから読み込み、保存ワーカーが書き込んだ変更もストアへ反映する。
+    search_index (search_index.ProductSearchIndex) を指定した場合は、先行反映した変更を索引にも反映し、
+    管理ファイルを読み直した場合は索引を無効にする。
+    """
+
+    def __init__(self, manage_file_path: str, store=None, search_index=None):
+        self.manage_file_path = manage_file_path
+        self.store = store
+        self.search_index = search_index
+        self.main_headers: List[str] = []
+        self.sku_headers: List[str] = []
+        self.has_main_sheet = False
+        self.has_sku_sheet = False
+        self._main_rows: Dict[str, tuple] = {}  # {mycode: Mainシートの行 (ヘッダー長に揃えたタプル)}
+        self._sku_rows_by_code: Dict[str, List[tuple]] = {}  # {商品コード: [SKUシートの行, ...]}
+        # 行単位の差分保存で使用するシート上の行番号 (1始まり、ヘッダー行=1)
+        self._main_row_numbers: Dict[str, int] = {}
+        self._sku_row_numbers_by_code: Dict[str, List[int]] = {}
+        self._duplicate_codes = set()
+        self._duplicate_rows: List[Tuple[int, tuple]] = []  # 重複した mycode の2行目以降の (行番号, 行) (出力時のみ使用)
+        self._signature: Optional[Tuple[int, int]] = None  # (mtime_ns, size)
+        self._content_hash: Optional[str] = None  # 読み込んだ時点のファイル内容のハッシュ (自身の書き込み後は不明)
+        self._loaded = False
+        self._write_pending = False  # 保存ワーカーに未書き込みのジョブがある間は再読み込みしない
+        self._store_valid = False  # ストアの内容が読み込み済みの管理ファイルと一致しているか
+        self._lock = threading.RLock()
+
+    # --- 読み込み制御 ---
+    def _current_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.manage_file_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """メモリ上の内容に対応する管理ファイルの (更新日時, サイズ)"""
+        return self._signature
+
+    def invalidate(self) -> None:
+        """次回の refresh() で必ず再読み込みさせる"""
+        with self._lock:
+            self._loaded = False
+            self._signature = None
+            self._content_hash = None
+            self._discard_store()
+            if self.search_index is not None:
+                self.search_index.invalidate()
+
+    def set_write_pending(self, pending: bool) -> None:
+        """保存ワーカーの未書き込みジョブの有無を設定する"""
+        with self._lock:
+            self._write_pending = pending
+
+    @property
+    def has_pending_writes(self) -> bool:
+        return self._write_pending
+
+    def is_in_sync(self) -> bool:
+        """メモリ上の内容が現在のファイルと一致しているか (読込後に外部変更がないか)"""
+        return self._loaded and self._signature is not None and self._signature == self._current_signature()
+
+    def mark_synced(self) -> None:
+        """自身で書き込んだ直後に呼び出し、現在のファイル状態を読込済みとして記録する"""
+        with self._lock:
+            self._signature = self._current_signature()
+            self._content_hash = None
+            if self._signature is not None and self._store_valid:
+                self._store_call("commit", self._signature)
+            if self.search_index is not None:
+                self.search_index.mark_synced(self._signature)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        ファイルが変更されていれば再読み込みする。
+        再読み込みを行った場合は True を返す。読み込みエラーは呼び出し元へ送出する。
+        保存ワーカーが書き込み中の間はメモリ上の内容が最新のため再読み込みしない。
+        """
+        with self._lock:
+            if not force and self._write_pending:
+                return False
+            signature = self._current_signature()
+            if not force and self._loaded and signature == self._signature:
+                return False
+            if signature is None:
+                self._clear()
+                self._loaded = True
+                self._signature = None
+                self._content_hash = None
+                return True
+            content_hash = _content_hash(self.manage_file_path)
+            if not force and self._loaded and content_hash == self._content_hash:
+                # 更新日時だけが変わった場合 (内容を変えずに上書き保存された等) は読み直さない
+                if self.search_index is not None and self.search_index.signature == self._signature:
+                    self.search_index.mark_synced(signature)
+                self._signature = signature
+                if self._store_valid:
+                    self._store_call("commit", signature)
+                return False
+            self._load(signature)
+            self._signature = signature
+            self._content_hash = content_hash
+            self._loaded = True
+            return True
+
+    def _row_hashes(self) -> Dict[str, int]:
+        """商品ごとの Main 行と SKU 行のハッシュ"""
+        return {code: hash((row, tuple(self._sku_rows_by_code.get(code, ()))))
+                for code, row in self._main_rows.items()}
+
+    def reload_changes(self) -> Optional[RepositoryChanges]:
+        """
+        管理ファイルが外部で変更されていれば読み直し、行ハッシュを比較して変わった商品を返す。
+        変更がない場合・保存ワーカーの書き込み中・未読み込みの場合は None を返す。
+        """
+        with self._lock:
+            if self._write_pending or not self._loaded:
+                return None
+            main_headers, sku_headers = list(self.main_headers), list(self.sku_headers)
+            before = self._row_hashes()
+            if not self.refresh():
+                return None
+            after = self._row_hashes()
+            if main_headers != self.main_headers or sku_headers != self.sku_headers:
+                # 列構成が変わった場合は全商品を変更扱いにする
+                changed = [code for code in after if code in before]
+            else:
+                changed = [code for code, h in after.items() if code in before and before[code] != h]
+            changes = RepositoryChanges(
+                added=[code for code in after if code not in before],
+                removed=[code for code in before if code not in after],
+                changed=changed,
+            )
+            logging.info(f"商品リポジトリ: 管理ファイルの外部変更を読み込みました {changes!r}")
+            return changes
+
+    def _clear(self) -> None:
+        self.main_headers = []
+        self.sku_headers = []
+        self.has_main_sheet = False
+        self.has_sku_sheet = False
+        self._main_rows = {}
+        self._sku_rows_by_code = {}
+        self._main_row_numbers = {}
+        self._sku_row_numbers_by_code = {}
+        self._duplicate_codes = set()
+        self._duplicate_rows = []
+
+    def _load(self, signature: Tuple[int, int]) -> None:
+        if self.search_index is not None and self.search_index.signature != signature:
+            self.search_index.invalidate()
+        if self.store is not None and self._load_from_store(signature):
+            return
+        try:
+            self._load_with(open_workbook)
+        except (zipfile.BadZipFile, KeyError, ParseError, ValueError) as e:
+            # 軽量リーダーで解釈できない形式の場合は openpyxl で読み直す
+            logging.warning(f"商品リポジトリ: 軽量リーダーでの読み込みに失敗したため openpyxl で読み込みます: {e}")
+            self._load_with(lambda path: load_workbook(path, read_only=True))
+        self._write_store_snapshot(signature)
+
+    # --- SQLite サイドカーストア ---
+    def _store_call(self, method: str, *args) -> None:
+        """ストアの操作を行う。ストアのエラーは記録してストアの使用をやめる (管理ファイルの処理は続ける)"""
+        if self.store is None:
+            return
+        try:
+            getattr(self.store, method)(*args)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logging.warning(f"商品リポジトリ: 商品ストアの操作 ({method}) に失敗したため使用を停止します: {e}")
+            self.store.close()
+            self.store = None
+
+    def _discard_store(self) -> None:
+        self._store_valid = False
+        self._store_call("discard")
+
+    def _record_to_store(self, method: str, *args) -> None:
+        """
+        保存ワーカーがシートへ書き込んだ変更をストアへ記録する (mark_synced() で確定)。
+        メモリ上の内容がファイルと同期していない状態での書き込みはストアを無効にする。
+        """
+        if self.store is None or not self._store_valid:
+            return
+        if not self.is_in_sync():
+            self._discard_store()
+            return
+        self._store_call(method, *args)
+
+    def close_store(self) -> None:
+        """ストアを閉じ、検索索引を保存する (アプリ終了時)"""
+        with self._lock:
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+                self._store_valid = False
+            if self.search_index is not None and not self._write_pending and self.is_in_sync():
+                self.search_index.save()
+
+    def _index_product(self, code: str) -> None:
+        """メモリへ反映した商品の Main 行を検索索引に登録し直す"""
+        if self.search_index is not None:
+            self.search_index.set_product(code, dict(zip(self.main_headers, map(cell_to_str, self._main_rows[code]))))
+
+    def _load_from_store(self, signature: Tuple[int, int]) -> bool:
+        try:
+            snapshot = self.store.load_snapshot(signature)
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning(f"商品リポジトリ: 商品ストアを読み込めないため管理ファイルから読み込みます: {e}")
+            snapshot = None
+        if snapshot is None:
+            return False
+        self._clear()
+        self.main_headers = snapshot["main_headers"]
+        self.sku_headers = snapshot["sku_headers"]
+        self.has_main_sheet = snapshot["has_main_sheet"]
+        self.has_sku_sheet = snapshot["has_sku_sheet"]
+        for code, row_number, values in snapshot["main_rows"]:
+            self._main_rows[code] = self._fit_row(values, len(self.main_headers))
+            self._main_row_numbers[code] = row_number
+        for code, row_number, values in snapshot["sku_rows"]:
+            self._sku_rows_by_code.setdefault(code, []).append(self._fit_row(values, len(self.sku_headers)))
+            self._sku_row_numbers_by_code.setdefault(code, []).append(row_number)
+        self._store_valid = True
+        logging.debug(f"商品リポジトリ: 商品ストアから{len(self._main_rows)}件の商品を読み込みました ({self.store.db_path})")
+        return True
+
+    def _write_store_snapshot(self, signature: Tuple[int, int]) -> None:
+        if self.store is None:
+            return
+        self._store_valid = False
+        if self._duplicate_codes:
+            # 重複行は行番号で追跡できないため、ストアは使わずに毎回管理ファイルから読み込む
+            self._discard_store()
+            return
+        main_rows = [(code, self._main_row_numbers[code], row) for code, row in self._main_rows.items()]
+        sku_rows = [(code, number, row)
+                    for code, rows in self._sku_rows_by_code.items()
+                    for number, row in zip(self._sku_row_numbers_by_code[code], rows)]
+        self._store_call("write_snapshot", signature, self.main_headers, self.sku_headers,
+                         self.has_main_sheet, self.has_sku_sheet, main_rows, sku_rows)
+        self._store_valid = self.store is not None
+
+    def find_codes(self, control: Optional[str] = None, genre_id: Optional[str] = None,
+                   y_category_id: Optional[str] = None, exclude_control: Optional[str] = None) -> List[str]:
+        """
+        コントロールカラム・R_ジャンルID・Y_カテゴリID が一致する mycode をファイル順で返す。
+        exclude_control を指定した場合はコントロールカラムがその値以外の商品に絞り込む
+        (重複した mycode はいずれかの行が条件に一致すれば含める)。
+        ストアがファイルと同期している場合はストアの索引を使い、それ以外はメモリ上を走査する。
+        """
+        with self._lock:
+            if self.store is not None and self._store_valid and not self._write_pending and self.is_in_sync():
+                try:
+                    return self.store.find_codes(control, genre_id, y_category_id, exclude_control)
+                except sqlite3.Error as e:
+                    logging.warning(f"商品リポジトリ: 商品ストアでの検索に失敗しました: {e}")
+            conditions = [(h, v.strip(), True) for h, v in ((HEADER_CONTROL_COLUMN, control), (HEADER_R_GENRE_ID, genre_id),
+                                                            (HEADER_Y_CATEGORY_ID, y_category_id)) if v is not None]
+            if exclude_control is not None:
+                conditions.append((HEADER_CONTROL_COLUMN, exclude_control.strip(), False))
+            indexes = [(self.main_headers.index(h) if h in self.main_headers else None, v, equal)
+                       for h, v, equal in conditions]
+
+            def matches(row) -> bool:
+                return all(((cell_to_str(row[idx]).strip() if idx is not None else "") == v) == equal
+                           for idx, v, equal in indexes)
+
+            matched = {code for code, row in self._main_rows.items() if matches(row)}
+            matched.update(self._duplicate_row_code(row) for _number, row in self._duplicate_rows if matches(row))
+            return [code for code in self._main_rows if code in matched]
+
+    def _load_with(self, open_func) -> None:
+        self._clear()
+        wb = open_func(self.manage_file_path)
+        try:
+            if MAIN_SHEET_NAME in wb.sheetnames:
+                self.has_main_sheet = True
+                self._load_main_rows(wb[MAIN_SHEET_NAME].iter_rows(values_only=True))
+            if SKU_SHEET_NAME in wb.sheetnames:
+                self.has_sku_sheet = True
+                self._load_sku_rows(wb[SKU_SHEET_NAME].iter_rows(values_only=True))
+        finally:
+            wb.close()
+        logging.debug(f"商品リポジトリ: {len(self._main_rows)}件の商品を読み込みました ({self.manage_file_path})")
+
+    def _load_main_rows(self, rows_iter: Iterator[tuple]) -> None:
+        header_row = next(rows_iter, None)
+        if header_row is None:
+            return
+        self.main_headers = _normalize_header_row(header_row)
+        if HEADER_MYCODE not in self.main_headers:
+            return
+        width = len(self.main_headers)
+        code_idx = self.main_headers.index(HEADER_MYCODE)
+        for row_number, row in enumerate(rows_iter, start=2):
+            if code_idx >= len(row) or row[code_idx] is None:
+                continue
+            code = str(row[code_idx]).strip()
+            if not code:
+                continue
+            if code in self._main_rows:
+                logging.warning(f"商品リポジトリ: {MAIN_SHEET_NAME}シートに重複した{HEADER_MYCODE} '{code}' があります。最初の行を使用します。")
+                self._duplicate_codes.add(code)
+                self._duplicate_rows.append((row_number, self._fit_row(row, width)))
+                continue
+            self._main_rows[code] = self._fit_row(row, width)
+            self._main_row_numbers[code] = row_number
+
+    def _load_sku_rows(self, rows_iter: Iterator[tuple]) -> None:
+        header_row = next(rows_iter, None)
+        if header_row is None:
+            return
+        self.sku_headers = _normalize_header_row(header_row)
+        if HEADER_PRODUCT_CODE_SKU not in self.sku_headers:
+            return
+        width = len(self.sku_headers)
+        prod_code_idx = self.sku_headers.index(HEADER_PRODUCT_CODE_SKU)
+        for row_number, row in enumerate(rows_iter, start=2):
+            if prod_code_idx >= len(row) or row[prod_code_idx] is None:
+                continue
+            code = str(row[prod_code_idx]).strip()
+            if not code:
+                continue
+            self._sku_rows_by_code.setdefault(code, []).append(self._fit_row(row, width))
+            self._sku_row_numbers_by_code.setdefault(code, []).append(row_number)
+
+    @staticmethod
+    def _fit_row(row: tuple, width: int) -> tuple:
+        if len(row) == width:
+            return tuple(row)
+        if len(row) > width:
+            return tuple(row[:width])
+        return tuple(row) + (None,) * (width - len(row))
+
+    # --- 参照 API ---
+    def __len__(self) -> int:
+        return len(self._main_rows)
+
+    def contains(self, code: str) -> bool:
+        return code.strip() in self._main_rows
+
+    def product_codes(self) -> List[str]:
+        with self._lock:
+            return list(self._main_rows.keys())
+
+    def list_entries(self) -> List[Tuple[str, str, str]]:
+        """商品一覧用に (mycode, 商品名, コントロールカラム値) をファイル順で返す (重複した mycode は最初の行のみ)"""
+        if HEADER_PRODUCT_NAME not in self.main_headers:
+            return []
+        name_idx = self.main_headers.index(HEADER_PRODUCT_NAME)
+        control_idx = self.main_headers.index(HEADER_CONTROL_COLUMN) if HEADER_CONTROL_COLUMN in self.main_headers else -1
+        entries = []
+        with self._lock:
+            rows = list(self._main_rows.items())
+        for code, row in rows:
+            name = str(row[name_idx]).strip() if row[name_idx] is not None else ""
+            control = str(row[control_idx]).strip() if control_idx >= 0 and row[control_idx] is not None else "n"
+            entries.append((code, name, control))
+        return entries
+
+    def get_main_record(self, code: str) -> Optional[Dict[str, str]]:
+        """mycode に対応する Main 行をヘッダー名→文字列値の辞書で返す"""
+        with self._lock:
+            row = self._main_rows.get(code.strip())
+        if row is None:
+            return None
+        return dict(zip(self.main_headers, map(cell_to_str, row)))
+
+    def get_sku_records(self, code: str) -> List[Dict[str, str]]:
+        """商品コードに対応する SKU 行をファイル順で返す"""
+        with self._lock:
+            rows = list(self._sku_rows_by_code.get(code.strip(), []))
+        return [dict(zip(self.sku_headers, map(cell_to_str, row))) for row in rows]
+
+    def iter_main_records(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """(mycode, Main行の辞書) をファイル順で返すイテレータ"""
+        with self._lock:
+            rows = list(self._main_rows.items())
+        for code, row in rows:
+            yield code, dict(zip(self.main_headers, map(cell_to_str, row)))
+
+    def iter_main_fields(self, codes: Optional[List[str]] = None) -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+        """
+        (mycode, [(ヘッダー名, 文字列値), ...]) を返すイテレータ (空のセルは含めない)。
+        codes を指定した場合はその順で、存在する商品だけを返す。全項目の検索用。
+        """
+        with self._lock:
+            headers = self.main_headers
+            if codes is None:
+                rows = list(self._main_rows.items())
+            else:
+                rows = [(code, self._main_rows[code]) for code in codes if code in self._main_rows]
+        for code, row in rows:
+            yield code, [(h, str(v)) for h, v in zip(headers, row) if v is not None and v != ""]
+
+    def main_table(self) -> List[tuple]:
+        """
+        Main シートの内容を [ヘッダー行, データ行, ...] の形で返す (item.xlsm 出力用)。
+        重複した mycode の2行目以降も含め、ファイルの行順で返す (未保存の新規商品は末尾)。
+        """
+        with self._lock:
+            if not self.main_headers:
+                return []
+            if not self._duplicate_rows:
+                return [tuple(self.main_headers)] + list(self._main_rows.values())
+            numbered = [(self._main_row_numbers.get(code), row) for code, row in self._main_rows.items()]
+            numbered.extend(self._duplicate_rows)
+            numbered.sort(key=lambda item: (item[0] is None, item[0] or 0))
+            return [tuple(self.main_headers)] + [row for _, row in numbered]
+
+    def sku_table(self) -> List[tuple]:
+        """SKU シートの内容を [ヘッダー行, データ行, ...] の形で返す (item.xlsm 出力用)"""
+        with self._lock:
+            if not self.sku_headers:
+                return []
+            table = [tuple(self.sku_headers)]
+            for rows in self._sku_rows_by_code.values():
+                table.extend(rows)
+            return table
+
+    # --- 行単位の差分保存用 API ---
+    def is_duplicate(self, code: str) -> bool:
+        return code.strip() in self._duplicate_codes
+
+    def main_row_number(self, code: str) -> Optional[int]:
+        return self._main_row_numbers.get(code.strip())
+
+    def sku_row_numbers(self, code: str) -> List[int]:
+        return list(self._sku_row_numbers_by_code.get(code.strip(), []))
+
+    def apply_saved_product(self, code: str, main_values: list, main_row_number: int,
+                            sku_rows: List[list], sku_row_numbers: List[int],
+                            inserted_sku_rows: Optional[Tuple[int, int]] = None,
+                            deleted_sku_rows: Optional[List[int]] = None,
+                            update_data: bool = True) -> None:
+        """
+        差分保存でシートへ書き込んだ内容をメモリ上にも反映する。
+        inserted_sku_rows は (挿入位置, 行数)、deleted_sku_rows は削除した行番号のリスト。
+        他商品の SKU 行番号は挿入・削除に合わせてずらす。
+        update_data=False の場合は行番号のみ更新する (行データは stage_product で反映済みの場合)。
+        """
+        code = code.strip()
+        with self._lock:
+            if inserted_sku_rows or deleted_sku_rows:
+                deleted_sorted = sorted(deleted_sku_rows or [])
+                for other_code, numbers in self._sku_row_numbers_by_code.items():
+                    if other_code == code:
+                        continue
+                    if deleted_sorted:
+                        numbers[:] = [n - bisect.bisect_left(deleted_sorted, n) for n in numbers]
+                    if inserted_sku_rows:
+                        insert_at, count = inserted_sku_rows
+                        numbers[:] = [n + count if n >= insert_at else n for n in numbers]
+
+            self._main_row_numbers[code] = main_row_number
+            if sku_row_numbers:
+                self._sku_row_numbers_by_code[code] = list(sku_row_numbers)
+            else:
+                self._sku_row_numbers_by_code.pop(code, None)
+            self._record_to_store("record_saved_product", code, self._fit_row(tuple(main_values), len(self.main_headers)),
+                                  main_row_number, [self._fit_row(tuple(r), len(self.sku_headers)) for r in sku_rows],
+                                  list(sku_row_numbers), inserted_sku_rows, deleted_sku_rows)
+            if not update_data:
+                return
+            self._main_rows[code] = self._fit_row(tuple(main_values), len(self.main_headers))
+            self._index_product(code)
+            if sku_rows:
+                width = len(self.sku_headers)
+                self._sku_rows_by_code[code] = [self._fit_row(tuple(r), width) for r in sku_rows]
+            else:
+                self._sku_rows_by_code.pop(code, None)
+
+    def apply_deleted_product(self, code: str, main_row_number: int, deleted_sku_rows: List[int]) -> None:
+        """シートから商品の行を削除した後、他商品の行番号を削除分だけ詰める"""
+        code = code.strip()
+        deleted_sorted = sorted(deleted_sku_rows)
+        with self._lock:
+            self._main_row_numbers.pop(code, None)
+            self._sku_row_numbers_by_code.pop(code, None)
+            for other_code, number in self._main_row_numbers.items():
+                if number > main_row_number:
+                    self._main_row_numbers[other_code] = number - 1
+            self._duplicate_rows = [(number - 1 if number > main_row_number else number, row)
+                                    for number, row in self._duplicate_rows]
+            if deleted_sorted:
+                for numbers in self._sku_row_numbers_by_code.values():
+                    numbers[:] = [n - bisect.bisect_left(deleted_sorted, n) for n in numbers]
+            self._record_to_store("record_deleted_product", code, main_row_number, deleted_sorted)
+
+    def apply_saved_control_values(self, codes: Optional[List[str]], control_value: str) -> None:
+        """コントロールカラムをシートへ書き込んだ後に呼び出す (ストアへの反映のみ。行データは先行反映済み)"""
+        with self._lock:
+            self._record_to_store("record_control_values", codes, control_value)
+
+    # --- 保存内容の先行反映 (GUI スレッドから呼び出す) ---
+    def stage_product(self, code: str, headers: List[str], main_values: list,
+                      sku_records: List[Dict[str, str]]) -> None:
+        """保存する商品の Main 行・SKU 行をファイル書き込み前にメモリへ反映する"""
+        code = code.strip()
+        with self._lock:
+            if not self.main_headers:
+                self.main_headers = list(headers)
+                self.has_main_sheet = True
+            if not self.sku_headers and sku_records:
+                self.sku_headers = derive_sku_headers(sku_records)
+                self.has_sku_sheet = True
+            values_by_header = dict(zip(headers, main_values))
+            current_row = self._main_rows.get(code)
+            current_by_header = dict(zip(self.main_headers, current_row)) if current_row else {}
+            self._main_rows[code] = tuple(
+                values_by_header[h] if h in values_by_header else current_by_header.get(h)
+                for h in self.main_headers
+            )
+            self._index_product(code)
+            if sku_records:
+                self._sku_rows_by_code[code] = [
+                    tuple(str(rec.get(h, "")) for h in self.sku_headers) for rec in sku_records
+                ]
+            else:
+                self._sku_rows_by_code.pop(code, None)
+
+    def stage_delete(self, code: str) -> bool:
+        """削除する商品をファイル書き込み前にメモリから取り除く。存在した場合は True を返す"""
+        code = code.strip()
+        with self._lock:
+            existed = self._main_rows.pop(code, None) is not None
+            self._sku_rows_by_code.pop(code, None)
+            if self.search_index is not None:
+                self.search_index.remove_product(code)
+            self._duplicate_rows = [(number, row) for number, row in self._duplicate_rows
+                                    if self._duplicate_row_code(row) != code]
+            return existed
+
+    def stage_control_values(self, codes: Optional[List[str]], control_value: str) -> int:
+        """
+        コントロールカラムの値をファイル書き込み前にメモリへ反映する。
+        codes が None の場合は全商品が対象。値が変わった商品数を返す。
+        """
+        with self._lock:
+            if HEADER_CONTROL_COLUMN not in self.main_headers:
+                return 0
+            ctrl_idx = self.main_headers.index(HEADER_CONTROL_COLUMN)
+            targets = self._main_rows.keys() if codes is None else [c.strip() for c in codes]
+            changed = 0
+            for code in list(targets):
+                row = self._main_rows.get(code)
+                if row is None or cell_to_str(row[ctrl_idx]).strip().lower() == control_value.lower():
+                    continue
+                self._main_rows[code] = row[:ctrl_idx] + (control_value,) + row[ctrl_idx + 1:]
+                if self.search_index is not None:
+                    self.search_index.add_text(code, control_value)
+                changed += 1
+            if self._duplicate_rows:
+                # 管理ファイルでは重複した mycode の全行が変更されるため、出力用の重複行にも反映する
+                target_set = None if codes is None else set(targets)
+                self._duplicate_rows = [
+                    (number, row[:ctrl_idx] + (control_value,) + row[ctrl_idx + 1:])
+                    if target_set is None or self._duplicate_row_code(row) in target_set else (number, row)
+                    for number, row in self._duplicate_rows
+                ]
+            return changed
+
+    def _duplicate_row_code(self, row: tuple) -> str:
+        return cell_to_str(row[self.main_headers.index(HEADER_MYCODE)]).strip()
@@ -0,0 +1,261 @@
+"""
+商品登録入力ツール - SQLite サイドカーストアモジュール
+
+item_manage.xlsm の Main / SKU シートの内容を、同じフォルダの SQLite データベース
+(WAL モード) に写しとして保持する。管理ファイルの更新日時・サイズが記録と一致する場合、
+ProductRepository は .xlsm を解析せずにこのストアから読み込む。
+
+保存ワーカーが管理ファイルへ書き込んだ変更は、同じ内容をストアへ記録しておき、
+ファイルの保存が成功した時点 (commit) でまとめて確定する。保存に失敗した場合や
+シート全体を書き直した場合は記録を破棄し、次回の読み込みで .xlsm から作り直す。
+コントロールカラム・ジャンルID・Yカテゴリで商品を絞り込む索引も提供する。
+"""
+import json
+import logging
+import sqlite3
+import datetime
+from typing import Optional, List, Dict, Tuple, Any
+
+from constants import HEADER_CONTROL_COLUMN, HEADER_R_GENRE_ID, HEADER_Y_CATEGORY_ID
+
+SCHEMA_VERSION = "3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS main (
+    mycode TEXT PRIMARY KEY,
+    row_number INTEGER NOT NULL,
+    control TEXT,
+    genre_id TEXT,
+    y_category_id TEXT,
+    row_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_main_control ON main (control);
+CREATE INDEX IF NOT EXISTS idx_main_genre_id ON main (genre_id);
+CREATE INDEX IF NOT EXISTS idx_main_y_category_id ON main (y_category_id);
+CREATE INDEX IF NOT EXISTS idx_main_row_number ON main (row_number);
+CREATE TABLE IF NOT EXISTS sku (
+    mycode TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    row_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sku_mycode ON sku (mycode);
+CREATE INDEX IF NOT EXISTS idx_sku_row_number ON sku (row_number);
+"""
+
+
+def _encode_value(value):
+    """JSON で表せないセル値 (日付・時刻) を型の印付きの辞書に変換する"""
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"$time": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"$timedelta": value.total_seconds()}
+    raise TypeError(f"保存できないセル値の型です: {type(value).__name__}")
+
+
+def _decode_value(obj: Dict[str, Any]):
+    if "$datetime" in obj:
+        return datetime.datetime.fromisoformat(obj["$datetime"])
+    if "$date" in obj:
+        return datetime.date.fromisoformat(obj["$date"])
+    if "$time" in obj:
+        return datetime.time.fromisoformat(obj["$time"])
+    if "$timedelta" in obj:
+        return datetime.timedelta(seconds=obj["$timedelta"])
+    return obj
+
+
+# json.dumps / json.loads に引数を渡すと呼び出しごとにエンコーダーが作られるため使い回す
+_ENCODER = json.JSONEncoder(ensure_ascii=False, default=_encode_value)
+_DECODER = json.JSONDecoder(object_hook=_decode_value)
+
+
+def encode_row(values) -> str:
+    return _ENCODER.encode(list(values))
+
+
+def decode_row(text: str) -> tuple:
+    return tuple(_DECODER.decode(text))
+
+
+def _key_text(value) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+class ProductStore:
+    """
+    管理ファイルの内容を写した SQLite データベース。
+    ProductRepository のロック内から呼び出す前提のため、接続は複数スレッドで共有する。
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if self._get_meta("schema_version") != SCHEMA_VERSION:
+            # 形式の異なる (または書き込みが完了していない) ストアは作り直す (次回の読み込みで管理ファイルから書き込まれる)
+            self._conn.executescript("DROP TABLE IF EXISTS main; DROP TABLE IF EXISTS sku; DELETE FROM meta;")
+        self._conn.executescript(_SCHEMA)
+        self._column_index: Dict[str, int] = {}
+
+    # --- メタ情報 ---
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _use_headers(self, main_headers: List[str]) -> None:
+        self._column_index = {h: i for i, h in reversed(list(enumerate(main_headers)))}
+
+    def _indexed_values(self, values: tuple) -> Tuple[str, str, str]:
+        """Main 行から索引用の (コントロールカラム, ジャンルID, Yカテゴリ) を取り出す"""
+        result = []
+        for header in (HEADER_CONTROL_COLUMN, HEADER_R_GENRE_ID, HEADER_Y_CATEGORY_ID):
+            idx = self._column_index.get(header)
+            result.append(_key_text(values[idx]) if idx is not None and idx < len(values) else "")
+        return tuple(result)
+
+    # --- スナップショット ---
+    def load_snapshot(self, signature: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """
+        記録した管理ファイルの状態が signature と一致する場合に内容を返す。一致しない場合は None。
+        戻り値は main_headers / sku_headers / has_main_sheet / has_sku_sheet と、
+        行番号順の main_rows [(mycode, 行番号, 値タプル)]・sku_rows [(商品コード, 行番号, 値タプル)]。
+        """
+        if self._get_meta("schema_version") != SCHEMA_VERSION:
+            return None
+        if self._get_meta("signature") != json.dumps(list(signature)):
+            return None
+        headers = json.loads(self._get_meta("headers") or "{}")
+        self._use_headers(headers.get("main", []))
+        return {
+            "main_headers": headers.get("main", []),
+            "sku_headers": headers.get("sku", []),
+            "has_main_sheet": headers.get("has_main_sheet", False),
+            "has_sku_sheet": headers.get("has_sku_sheet", False),
+            "main_rows": [(code, number, decode_row(data)) for code, number, data in self._conn.execute(
+                "SELECT mycode, row_number, row_data FROM main ORDER BY row_number")],
+            "sku_rows": [(code, number, decode_row(data)) for code, number, data in self._conn.execute(
+                "SELECT mycode, row_number, row_data FROM sku ORDER BY row_number")],
+        }
+
+    def write_snapshot(self, signature: Tuple[int, int], main_headers: List[str], sku_headers: List[str],
+                       has_main_sheet: bool, has_sku_sheet: bool,
+                       main_rows: List[Tuple[str, int, tuple]], sku_rows: List[Tuple[str, int, tuple]]) -> None:
+        """管理ファイルから読み込んだ内容でストア全体を置き換える"""
+        self._use_headers(main_headers)
+        try:
+            self._conn.execute("DELETE FROM main")
+            self._conn.execute("DELETE FROM sku")
+            self._conn.executemany(
+                "INSERT INTO main (mycode, row_number, control, genre_id, y_category_id, row_data) VALUES (?, ?, ?, ?, ?, ?)",
+                ((code, number) + self._indexed_values(values) + (encode_row(values),)
+                 for code, number, values in main_rows))
+            self._conn.executemany(
+                "INSERT INTO sku (mycode, row_number, row_data) VALUES (?, ?, ?)",
+                ((code, number, encode_row(values)) for code, number, values in sku_rows))
+            self._set_meta("schema_version", SCHEMA_VERSION)
+            self._set_meta("headers", json.dumps({"main": main_headers, "sku": sku_headers,
+                                                  "has_main_sheet": has_main_sheet, "has_sku_sheet": has_sku_sheet},
+                                                 ensure_ascii=False))
+            self._set_meta("signature", json.dumps(list(signature)))
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    # --- 保存内容の記録 (commit まで確定しない) ---
+    def record_saved_product(self, code: str, main_values: tuple, main_row_number: int,
+                             sku_rows: List[tuple], sku_row_numbers: List[int],
+                             inserted_sku_rows: Optional[Tuple[int, int]] = None,
+                             deleted_sku_rows: Optional[List[int]] = None) -> None:
+        """差分保存した商品の行と、挿入・削除でずれた他商品の SKU 行番号を記録する"""
+        conn = self._conn
+        conn.execute("DELETE FROM sku WHERE mycode = ?", (code,))
+        for number in sorted(deleted_sku_rows or [], reverse=True):
+            conn.execute("UPDATE sku SET row_number = row_number - 1 WHERE row_number > ?", (number,))
+        if inserted_sku_rows:
+            insert_at, count = inserted_sku_rows
+            conn.execute("UPDATE sku SET row_number = row_number + ? WHERE row_number >= ?", (count, insert_at))
+        conn.executemany(
+            "INSERT INTO sku (mycode, row_number, row_data) VALUES (?, ?, ?)",
+            ((code, number, encode_row(values)) for values, number in zip(sku_rows, sku_row_numbers)))
+        conn.execute(
+            "INSERT OR REPLACE INTO main (mycode, row_number, control, genre_id, y_category_id, row_data) VALUES (?, ?, ?, ?, ?, ?)",
+            (code, main_row_number) + self._indexed_values(main_values) + (encode_row(main_values),))
+
+    def record_deleted_product(self, code: str, main_row_number: int, deleted_sku_rows: List[int]) -> None:
+        """削除した商品の行を取り除き、後続の行番号を詰めて記録する"""
+        conn = self._conn
+        conn.execute("DELETE FROM main WHERE mycode = ?", (code,))
+        conn.execute("DELETE FROM sku WHERE mycode = ?", (code,))
+        conn.execute("UPDATE main SET row_number = row_number - 1 WHERE row_number > ?", (main_row_number,))
+        for number in sorted(deleted_sku_rows, reverse=True):
+            conn.execute("UPDATE sku SET row_number = row_number - 1 WHERE row_number > ?", (number,))
+
+    def record_control_values(self, codes: Optional[List[str]], control_value: str) -> None:
+        """コントロールカラムの変更を記録する。codes が None の場合は全商品"""
+        ctrl_idx = self._column_index.get(HEADER_CONTROL_COLUMN)
+        if ctrl_idx is None:
+            return
+        # 既に control_value の行は索引で除き、変更する行の row_data だけを読み直す
+        if codes is None:
+            rows = self._conn.execute("SELECT mycode, row_data FROM main WHERE control < ? OR control > ?",
+                                      (control_value, control_value)).fetchall()
+        else:
+            rows = []
+            for code in codes:
+                rows.extend(self._conn.execute("SELECT mycode, row_data FROM main WHERE mycode = ? AND control != ?",
+                                               (code, control_value)))
+        updates = []
+        for code, data in rows:
+            values = list(decode_row(data))
+            if ctrl_idx < len(values):
+                values[ctrl_idx] = control_value
+            updates.append((control_value, encode_row(values), code))
+        self._conn.executemany("UPDATE main SET control = ?, row_data = ? WHERE mycode = ?", updates)
+
+    def commit(self, signature: Tuple[int, int]) -> None:
+        """記録した変更を、書き込み後の管理ファイルの状態とともに確定する"""
+        self._set_meta("signature", json.dumps(list(signature)))
+        self._conn.commit()
+
+    def discard(self) -> None:
+        """未確定の記録を破棄し、次回は管理ファイルから読み直すようにする"""
+        self._conn.rollback()
+        self._conn.execute("DELETE FROM meta WHERE key = 'signature'")
+        self._conn.commit()
+
+    # --- 索引による絞り込み ---
+    def find_codes(self, control: Optional[str] = None, genre_id: Optional[str] = None,
+                   y_category_id: Optional[str] = None, exclude_control: Optional[str] = None) -> List[str]:
+        """
+        条件に一致する mycode を行番号順で返す (指定しない条件は絞り込まない)。
+        exclude_control を指定した場合はコントロールカラムがその値以外の商品に絞り込む。
+        """
+        conditions, params = [], []
+        for column, value in (("control", control), ("genre_id", genre_id), ("y_category_id", y_category_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value.strip())
+        if exclude_control is not None:
+            # != では索引を使えないため、前後の範囲の OR として索引を引く
+            conditions.append("(control < ? OR control > ?)")
+            params.extend([exclude_control.strip()] * 2)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._conn.execute(f"SELECT row_number, mycode FROM main{where}", params).fetchall()
+        return [code for _number, code in sorted(rows)]
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"商品ストアを閉じる際にエラーが発生しました: {e}")
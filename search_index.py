@@ -0,0 +1,295 @@
+"""
+商品登録入力ツール - 商品一覧の全文検索索引モジュール
+
+管理ファイル (item_manage.xlsm) の Main シートの全項目を対象に、
+文字の1文字と連続する2文字 (bigram) から商品を引ける転置索引を作る。
+日本語は単語の区切りが無いため、単語ではなく文字 n-gram で索引する。
+
+索引は候補の絞り込みにだけ使い、候補の商品は呼び出し側で実際の値と照合する。
+そのため索引が実際より多くの文字を含んでいても (古い値の文字が残っていても) 結果は正しい。
+保存された商品は新しい文書番号で登録し直し、古い文書番号は無効にする (索引からは取り除かない)。
+
+索引は管理ファイルと同じフォルダに marshal 形式で保存し、管理ファイルの
+(更新日時, サイズ) が保存時と同じ場合だけ次回起動時に読み込む。
+"""
+import os
+import array
+import marshal
+import logging
+import threading
+from typing import Optional, List, Dict, Tuple, Iterable, Set
+
+from utils import atomic_write
+
+# 索引の形式を変えたときは番号を上げる (古い索引は読み込まれずに作り直される)
+SEARCH_INDEX_FORMAT_VERSION = 1
+# 無効になった文書番号がこの割合を超えたら作り直す
+REBUILD_DEAD_RATIO = 0.5
+_POSTING_TYPECODE = "I"
+
+
+def index_grams(text: str) -> Set[str]:
+    """索引に登録する文字 (小文字化した1文字と連続する2文字) の集合"""
+    text = text.lower()
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def query_grams(query: str) -> Set[str]:
+    """検索語を含む文書が必ず持つ文字の集合 (2文字以上なら連続する2文字、1文字ならその文字)"""
+    query = query.lower()
+    if len(query) < 2:
+        return set(query)
+    return {query[i:i + 2] for i in range(len(query) - 1)}
+
+
+class ProductSearchIndex:
+    """
+    商品コードごとの文書に対する bigram 転置索引。
+
+    索引の作成 (build) はワーカースレッドで行い、作成中の変更 (保存・削除) は記録しておいて
+    作成後に反映し直す。ready が False の間は candidates が None を返すため、
+    呼び出し側は従来どおり全商品を走査する。
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path  # None の場合は保存しない
+        self.signature: Optional[Tuple[int, int]] = None  # 索引の内容に対応する管理ファイルの (更新日時, サイズ)
+        self._postings: Dict[str, array.array] = {}
+        self._docs: List[Optional[str]] = []  # 文書番号 → 商品コード (無効になった文書は None)
+        self._doc_ids: Dict[str, int] = {}  # 商品コード → 現在の文書番号
+        self._ready = False
+        self._dirty = False  # 保存後に変更があったか
+        self._building = False
+        self._changed_during_build: Set[str] = set()
+        self._generation = 0  # invalidate() のたびに増やし、それ以前に始めた作成結果を捨てる
+        self._lock = threading.RLock()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @property
+    def building(self) -> bool:
+        return self._building
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    # --- 作成・読み込み ---
+    @staticmethod
+    def _build_structures(records: Iterable[Tuple[str, Dict[str, str]]]):
+        postings: Dict[str, array.array] = {}
+        docs: List[Optional[str]] = []
+        doc_ids: Dict[str, int] = {}
+        for code, record in records:
+            doc_id = len(docs)
+            docs.append(code)
+            doc_ids[code] = doc_id
+            grams = set()
+            for value in record.values():
+                if value:
+                    grams |= index_grams(value)
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = array.array(_POSTING_TYPECODE, (doc_id,))
+                else:
+                    posting.append(doc_id)
+        return postings, docs, doc_ids
+
+    def build(self, records: Iterable[Tuple[str, Dict[str, str]]], signature: Optional[Tuple[int, int]]) -> None:
+        """(商品コード, {項目名: 値}) の並びから索引を作り直す"""
+        postings, docs, doc_ids = self._build_structures(records)
+        with self._lock:
+            self._postings, self._docs, self._doc_ids = postings, docs, doc_ids
+            self.signature = signature
+            self._ready = True
+            self._dirty = True
+
+    def start_build(self, repository) -> bool:
+        """
+        商品リポジトリの内容からワーカースレッドで索引を作る。既に作成中の場合は False を返す。
+        作成中に保存・削除された商品は作成後にリポジトリから読み直して反映し、作成後に索引を保存する。
+        """
+        with self._lock:
+            if self._building:
+                return False
+            self._building = True
+            self._changed_during_build = set()
+            generation = self._generation
+        thread = threading.Thread(target=self._build_from_repository, args=(repository, generation),
+                                  name="search-index-build", daemon=True)
+        thread.start()
+        return True
+
+    def _build_from_repository(self, repository, generation: int) -> None:
+        try:
+            records = list(repository.iter_main_records())
+            postings, docs, doc_ids = self._build_structures(records)
+            with self._lock:
+                if generation != self._generation:
+                    logging.info("管理ファイルが読み直されたため、作成中の検索索引を破棄しました")
+                    return
+                self._postings, self._docs, self._doc_ids = postings, docs, doc_ids
+                # 一覧を取得した後の変更は下で反映し直すため、現在のファイル状態に対応する
+                self.signature = repository.signature
+                self._ready = True
+                self._dirty = True
+                changed, self._changed_during_build = self._changed_during_build, set()
+            for code in changed:
+                record = repository.get_main_record(code)
+                if record is None:
+                    self.remove_product(code)
+                else:
+                    self.set_product(code, record)
+            logging.info(f"商品一覧の検索索引を作成しました ({len(doc_ids)}件, {len(postings)}種類の文字)")
+            if not repository.has_pending_writes:
+                # 書き込み待ちの変更を含む索引は保存しない (終了時に保存する)
+                self.save()
+        except Exception as e:
+            logging.warning(f"商品一覧の検索索引を作成できませんでした: {e}", exc_info=True)
+        finally:
+            with self._lock:
+                self._building = False
+
+    def load(self, signature: Optional[Tuple[int, int]]) -> bool:
+        """保存した索引が signature の管理ファイルに対応していれば読み込んで True を返す"""
+        if not self.path or signature is None or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                saved = marshal.loads(f.read())
+            if saved.get("version") != SEARCH_INDEX_FORMAT_VERSION or tuple(saved["signature"]) != tuple(signature):
+                return False
+            postings = {}
+            for gram, data in saved["postings"].items():
+                posting = array.array(_POSTING_TYPECODE)
+                posting.frombytes(data)
+                postings[gram] = posting
+            docs = saved["docs"]
+        except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+            logging.warning(f"商品一覧の検索索引 '{self.path}' を読み込めないため作り直します: {e}")
+            return False
+        with self._lock:
+            self._postings = postings
+            self._docs = docs
+            self._doc_ids = {code: doc_id for doc_id, code in enumerate(docs) if code is not None}
+            self.signature = tuple(signature)
+            self._ready = True
+            self._dirty = False
+        logging.info(f"商品一覧の検索索引を読み込みました ({len(self._doc_ids)}件)")
+        return True
+
+    def save(self) -> bool:
+        """索引を保存する (変更が無い場合・管理ファイルとの対応が不明な場合は保存しない)"""
+        with self._lock:
+            if not self.path or not self._ready or not self._dirty or self.signature is None:
+                return False
+            data = marshal.dumps({
+                "version": SEARCH_INDEX_FORMAT_VERSION,
+                "signature": tuple(self.signature),
+                "docs": list(self._docs),
+                "postings": {gram: posting.tobytes() for gram, posting in self._postings.items()},
+            })
+            self._dirty = False
+        try:
+            with atomic_write(self.path) as f:
+                f.write(data)
+        except OSError as e:
+            logging.warning(f"商品一覧の検索索引 '{self.path}' を保存できませんでした: {e}")
+            return False
+        return True
+
+    # --- 差分更新 (ProductRepository から呼び出す) ---
+    def invalidate(self) -> None:
+        """管理ファイルが外部で変更された場合など、索引を使えない状態にする"""
+        with self._lock:
+            self._ready = False
+            self.signature = None
+            self._generation += 1
+
+    def mark_synced(self, signature: Optional[Tuple[int, int]]) -> None:
+        """差分更新を反映済みの内容が管理ファイルへ書き込まれた後に、対応する状態を記録する"""
+        with self._lock:
+            if self._ready:
+                self.signature = signature
+
+    def set_product(self, code: str, record: Dict[str, str]) -> None:
+        """商品の全項目を新しい文書番号で登録し直す"""
+        grams = set()
+        for value in record.values():
+            if value:
+                grams |= index_grams(value)
+        with self._lock:
+            if self._building:
+                self._changed_during_build.add(code)
+            old_doc_id = self._doc_ids.get(code)
+            if old_doc_id is not None:
+                self._docs[old_doc_id] = None
+            doc_id = len(self._docs)
+            self._docs.append(code)
+            self._doc_ids[code] = doc_id
+            self._add_grams(doc_id, grams)
+            self._dirty = True
+
+    def add_text(self, code: str, text: str) -> None:
+        """商品の1項目の値が変わった場合に、新しい値の文字を追加する (古い値の文字は照合で除外される)"""
+        with self._lock:
+            if self._building:
+                self._changed_during_build.add(code)
+            doc_id = self._doc_ids.get(code)
+            if doc_id is None or not text:
+                return
+            self._add_grams(doc_id, index_grams(text))
+            self._dirty = True
+
+    def remove_product(self, code: str) -> None:
+        with self._lock:
+            if self._building:
+                self._changed_during_build.add(code)
+            doc_id = self._doc_ids.pop(code, None)
+            if doc_id is not None:
+                self._docs[doc_id] = None
+                self._dirty = True
+
+    def _add_grams(self, doc_id: int, grams: Set[str]) -> None:
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array.array(_POSTING_TYPECODE, (doc_id,))
+            elif posting[-1] != doc_id:
+                posting.append(doc_id)
+
+    def needs_rebuild(self) -> bool:
+        """無効になった文書番号が多くなり、作り直した方がよいか"""
+        with self._lock:
+            return bool(self._docs) and (len(self._docs) - len(self._doc_ids)) / len(self._docs) > REBUILD_DEAD_RATIO
+
+    # --- 検索 ---
+    def candidates(self, query: str) -> Optional[List[str]]:
+        """
+        検索語を含む可能性のある商品コードを登録順で返す (大文字と小文字は区別しない)。
+        索引が使えない場合は None を返す。
+        """
+        grams = query_grams(query)
+        with self._lock:
+            if not self._ready:
+                return None
+            if not grams:
+                return [code for code in self._docs if code is not None]
+            postings = []
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            doc_ids = set(postings[0])
+            for posting in postings[1:]:
+                doc_ids.intersection_update(posting)
+                if not doc_ids:
+                    return []
+            docs = self._docs
+            return [docs[doc_id] for doc_id in sorted(doc_ids) if docs[doc_id] is not None]
@@ -0,0 +1,128 @@
+"""
+商品登録入力ツール - 商品一覧検索ワーカーモジュール
+
+検索パネルの検索範囲「商品一覧（全フィールド）」の検索をバックグラウンドスレッドで行い、
+見つかった結果を一定件数ごとに GUI スレッドへ送る。
+検索語の入力中は1文字ごとに検索し直すため、新しい検索を投入すると実行中の検索は打ち切られる
+(投入ごとに世代番号を増やし、古い世代の検索は次の商品を調べる前に終了する)。
+"""
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from product_repository import ProductRepository
+
+# 何件見つかるごとに GUI スレッドへ送るか
+RESULT_CHUNK_SIZE = 100
+
+
+def iter_catalog_matches(repo: ProductRepository, search_text: str, case_sensitive: bool,
+                         list_index_by_code: Dict[str, int],
+                         should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[int, str, str]]:
+    """
+    商品一覧に表示されている商品の全項目から検索語を探し、(一覧の行, 項目名, 値) を一覧の順で返す。
+    検索索引が使える場合は検索語を含む可能性のある商品だけを照合する。
+    should_stop が True を返した時点で (次の商品を調べる前に) 終了する。
+    """
+    search_index = repo.search_index
+    candidate_codes = search_index.candidates(search_text) if search_index is not None else None
+    if candidate_codes is None:
+        candidate_codes = list(list_index_by_code)
+    else:
+        candidate_codes = [code for code in candidate_codes if code in list_index_by_code]
+    candidate_codes.sort(key=list_index_by_code.__getitem__)
+    needle = search_text if case_sensitive else search_text.lower()
+    for product_code, row_fields in repo.iter_main_fields(candidate_codes):
+        if should_stop is not None and should_stop():
+            return
+        list_index = list_index_by_code[product_code]
+        for field_name, field_value in row_fields:
+            if needle in (field_value if case_sensitive else field_value.lower()):
+                yield list_index, field_name, field_value
+
+
+class CatalogSearchWorker(QThread):
+    """商品一覧の全項目検索を行うバックグラウンドスレッド (最新の検索だけを実行する)"""
+
+    results_ready = pyqtSignal(int, list)        # (世代番号, [(一覧の行, 項目名, 値), ...])
+    search_finished = pyqtSignal(int, int, bool)  # (世代番号, 件数, 検索できたか)
+
+    def __init__(self, repo: ProductRepository, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._request: Optional[Tuple[int, str, bool, Dict[str, int]]] = None
+        self._stopped = False
+
+    def submit(self, search_text: str, case_sensitive: bool, list_index_by_code: Dict[str, int]) -> int:
+        """検索を投入して世代番号を返す。実行中・待機中の検索は打ち切られる"""
+        with self._cond:
+            self._generation += 1
+            self._request = (self._generation, search_text, case_sensitive, list_index_by_code)
+            self._cond.notify()
+            generation = self._generation
+        if not self.isRunning():
+            self.start()
+        return generation
+
+    def cancel(self) -> None:
+        """実行中・待機中の検索を打ち切る"""
+        with self._cond:
+            self._generation += 1
+            self._request = None
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def stop(self) -> None:
+        """検索を打ち切ってスレッドを終了させる"""
+        with self._cond:
+            self._stopped = True
+            self._generation += 1
+            self._request = None
+            self._cond.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                request, self._request = self._request, None
+            generation, search_text, case_sensitive, list_index_by_code = request
+            try:
+                self.repo.refresh()
+                if not self.repo.has_main_sheet:
+                    self.search_finished.emit(generation, 0, False)
+                    continue
+                count = self._search(generation, search_text, case_sensitive, list_index_by_code)
+            except Exception as e:
+                logging.error(f"商品一覧詳細検索エラー: {e}", exc_info=True)
+                self.search_finished.emit(generation, 0, False)
+                continue
+            if count is not None:
+                self.search_finished.emit(generation, count, True)
+
+    def _search(self, generation: int, search_text: str, case_sensitive: bool,
+                list_index_by_code: Dict[str, int]) -> Optional[int]:
+        """見つかった件数を返す。新しい検索が投入された場合は打ち切って None を返す"""
+        chunk: List[Tuple[int, str, str]] = []
+        count = 0
+        cancelled = lambda: generation != self._generation
+        for match in iter_catalog_matches(self.repo, search_text, case_sensitive, list_index_by_code, cancelled):
+            chunk.append(match)
+            if len(chunk) >= RESULT_CHUNK_SIZE:
+                self.results_ready.emit(generation, chunk)
+                count += len(chunk)
+                chunk = []
+        if cancelled():
+            return None
+        if chunk:
+            self.results_ready.emit(generation, chunk)
+            count += len(chunk)
+        return count
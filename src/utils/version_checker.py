@@ -15,7 +15,6 @@ import webbrowser
 import re
 import time
 import hashlib
-import requests
 from typing import Optional, Dict, Any, Tuple
 from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
@@ -2020,6 +2019,8 @@ def check_for_updates_simple(parent=None, silent=False):
     シンプルな更新チェック（通知のみ）
     """
     try:
+        # requests の読み込みは重いため、起動時ではなく更新確認の実行時に行う
+        import requests
         
         # GitHub APIから最新バージョンを取得
         response = requests.get("https://api.github.com/repos/SEI1026/Product_app/releases/latest", timeout=5)
@@ -2076,6 +2077,7 @@ def simple_auto_update(parent, download_url, new_version):
         QApplication.processEvents()
         
         # 1. 新バージョンをダウンロード
+        import requests
         logging.info(f"更新ダウンロード開始: {download_url}")
         response = requests.get(download_url, stream=True)
         total_size = int(response.headers.get('content-length', 0))
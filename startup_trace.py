@@ -0,0 +1,153 @@
+"""
+商品登録入力ツール - 起動処理の所要時間記録モジュール
+
+起動時の各処理 (パス設定・マスター読み込み・UI構築・遅延実行される初期化など) と
+マスター読み込みの各タスクの開始時刻と所要時間を記録し、
+Chrome のトレースイベント形式 (chrome://tracing や Perfetto で表示できる JSON) で保存する。
+時刻は time.perf_counter (単調増加し、同じマシン上の別プロセスとも共通の時計) で計測する。
+"""
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Callable
+
+from utils import atomic_write
+
+# 要約に表示する処理の最大数 (所要時間の長い順)
+SUMMARY_MAX_PHASES = 12
+
+
+def run_timed(func: Callable, *args):
+    """
+    func(*args) を実行し、(結果, 開始時刻, 終了時刻, プロセスID, スレッドID, スレッド名) を返す。
+    プロセスプールからも呼べるようモジュールの関数にしている。
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    end = time.perf_counter()
+    thread = threading.current_thread()
+    return result, start, end, os.getpid(), thread.ident, thread.name
+
+
+class StartupTracer:
+    """
+    起動処理の区間を記録する。
+
+    同期的な処理は phase() で囲み、QTimer.singleShot で遅延実行する初期化は deferred() で包む。
+    finish_synchronous() の呼び出し後、遅延実行の処理がすべて終わった時点で on_complete が呼ばれ、
+    それ以降の記録は行わない (起動後の通常操作で同じメソッドが呼ばれても記録しない)。
+    """
+
+    def __init__(self, on_complete: Optional[Callable[["StartupTracer"], None]] = None):
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.thread_names: Dict[tuple, str] = {}
+        self.completed = False
+        self._on_complete = on_complete
+        self._pending_deferred = 0
+        self._synchronous_finished = False
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def record(self, name: str, start: float, end: float, category: str = "startup",
+               pid: Optional[int] = None, tid: Optional[int] = None, thread_name: Optional[str] = None) -> None:
+        """perf_counter の開始・終了時刻で1つの区間を記録する"""
+        thread = threading.current_thread()
+        pid = self._pid if pid is None else pid
+        tid = thread.ident if tid is None else tid
+        with self._lock:
+            if self.completed:
+                return
+            self.events.append({"name": name, "cat": category, "start": start, "end": end, "pid": pid, "tid": tid})
+            self.thread_names.setdefault((pid, tid), thread_name or thread.name)
+
+    @contextmanager
+    def phase(self, name: str, category: str = "startup"):
+        """with 文で囲んだ処理の所要時間を記録する (例外が発生した場合も記録する)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), category)
+
+    def deferred(self, name: str, func: Callable) -> Callable:
+        """遅延実行する初期化処理を包み、実行時の所要時間を記録する関数を返す"""
+        with self._lock:
+            self._pending_deferred += 1
+
+        def run(*args, **kwargs):
+            try:
+                with self.phase(name, "deferred"):
+                    return func(*args, **kwargs)
+            finally:
+                self._finish_deferred()
+        return run
+
+    def finish_synchronous(self) -> None:
+        """コンストラクタでの同期的な起動処理の終了を記録する"""
+        self.record("起動処理 (同期)", self.origin, time.perf_counter(), "total")
+        with self._lock:
+            self._synchronous_finished = True
+        self._complete_if_done()
+
+    def _finish_deferred(self) -> None:
+        with self._lock:
+            self._pending_deferred -= 1
+        self._complete_if_done()
+
+    def _complete_if_done(self) -> None:
+        with self._lock:
+            if self.completed or not self._synchronous_finished or self._pending_deferred > 0:
+                return
+            self.events.append({"name": "起動処理 (遅延実行を含む)", "cat": "total", "start": self.origin,
+                                "end": time.perf_counter(), "pid": self._pid, "tid": threading.get_ident()})
+            self.completed = True
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome のトレースイベント形式 (時刻と所要時間はマイクロ秒) の辞書を返す"""
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}}
+            for (pid, tid), thread_name in thread_names.items()
+        ]
+        for event in sorted(events, key=lambda e: e["start"]):
+            trace_events.append({
+                "name": event["name"], "cat": event["cat"], "ph": "X",
+                "ts": round((event["start"] - self.origin) * 1e6, 1),
+                "dur": round((event["end"] - event["start"]) * 1e6, 1),
+                "pid": event["pid"], "tid": event["tid"],
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> bool:
+        """トレースを JSON で保存する。保存に失敗しても起動には影響しないため警告のみ"""
+        try:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            with atomic_write(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_chrome_trace(), f, ensure_ascii=False, indent=1)
+        except (OSError, ValueError) as e:
+            logging.warning(f"起動トレース '{path}' を保存できませんでした: {e}")
+            return False
+        logging.info(f"起動トレースを保存しました: {path}")
+        return True
+
+    def summary_lines(self, max_phases: int = SUMMARY_MAX_PHASES) -> List[str]:
+        """「処理名: ミリ秒」の行のリスト。合計を先頭に、各処理を所要時間の長い順に並べる"""
+        with self._lock:
+            events = list(self.events)
+        totals = [e for e in events if e["cat"] == "total"]
+        phases = sorted((e for e in events if e["cat"] != "total"),
+                        key=lambda e: e["end"] - e["start"], reverse=True)
+        lines = [f"{e['name']}: {(e['end'] - e['start']) * 1000:.0f} ms" for e in totals]
+        for event in phases[:max_phases]:
+            label = f"{event['name']} (読込タスク)" if event["cat"] == "loader" else event["name"]
+            lines.append(f"{label}: {(event['end'] - event['start']) * 1000:.0f} ms")
+        return lines
@@ -0,0 +1,99 @@
+"""
+商品登録入力ツール - テンプレート情報キャッシュモジュール
+
+item_template.xlsm の Main / SKU シートのヘッダー行を一度だけ読み込み、
+プロセス内で使い回す。保存・item.xlsm 出力・起動時の互換性チェックで共有する。
+ファイルの更新日時またはサイズが変わった場合は内容のハッシュを取り直し、
+ハッシュが変わっていればヘッダーを読み直す。
+"""
+import os
+import hashlib
+import logging
+import threading
+from typing import Optional, List, Dict, Tuple
+
+from xlsx_reader import open_workbook
+from constants import MAIN_SHEET_NAME, SKU_SHEET_NAME
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TemplateMetadata:
+    """テンプレートファイルのヘッダー情報"""
+
+    def __init__(self, path: str, content_hash: str, main_header_cells: tuple, sku_header_cells: tuple,
+                 has_main_sheet: bool, has_sku_sheet: bool):
+        self.path = path
+        self.content_hash = content_hash
+        self.main_header_cells = main_header_cells  # 1行目のセル値そのまま (None を含む)
+        self.sku_header_cells = sku_header_cells
+        self.has_main_sheet = has_main_sheet
+        self.has_sku_sheet = has_sku_sheet
+
+    @property
+    def main_headers(self) -> List[str]:
+        """Main シートのヘッダー (前後の空白を除いた文字列、空セルは "")"""
+        return [str(h).strip() if h is not None else "" for h in self.main_header_cells]
+
+    @property
+    def sku_headers(self) -> List[str]:
+        return [str(h).strip() if h is not None else "" for h in self.sku_header_cells]
+
+
+def read_template_metadata(path: str) -> TemplateMetadata:
+    """テンプレートファイルを読み込んでヘッダー情報を作成する"""
+    content_hash = _file_hash(path)
+    wb = open_workbook(path)
+    try:
+        header_cells = {}
+        for sheet_name in (MAIN_SHEET_NAME, SKU_SHEET_NAME):
+            if sheet_name in wb.sheetnames:
+                header_cells[sheet_name] = next(wb[sheet_name].iter_rows(min_row=1, max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    return TemplateMetadata(
+        path, content_hash,
+        tuple(header_cells.get(MAIN_SHEET_NAME, ())), tuple(header_cells.get(SKU_SHEET_NAME, ())),
+        MAIN_SHEET_NAME in header_cells, SKU_SHEET_NAME in header_cells,
+    )
+
+
+_cache: Dict[str, Tuple[Tuple[int, int], TemplateMetadata]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_template_metadata(path: str) -> TemplateMetadata:
+    """
+    テンプレートのヘッダー情報をキャッシュから返す。
+    ファイルが存在しない場合は FileNotFoundError、読み込みエラーは呼び出し元へ送出する。
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        if cached and _file_hash(key) == cached[1].content_hash:
+            # 更新日時だけが変わった場合 (コピー等) は読み直さない
+            _cache[key] = (signature, cached[1])
+            return cached[1]
+        metadata = read_template_metadata(key)
+        _cache[key] = (signature, metadata)
+        logging.info(f"テンプレート情報を読み込みました: '{key}' (Main {len(metadata.main_header_cells)}列, SKU {len(metadata.sku_header_cells)}列)")
+        return metadata
+
+
+def clear_template_metadata_cache(path: Optional[str] = None) -> None:
+    """キャッシュを破棄する。path を省略した場合はすべて破棄する"""
+    with _cache_lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
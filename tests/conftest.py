@@ -21,6 +21,11 @@ except ImportError:
 # プロジェクトルートをパスに追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_MYCODE, HEADER_PRODUCT_NAME,
+    HEADER_CONTROL_COLUMN, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE
+)
+
 
 @pytest.fixture(scope="session")
 def qapp():
@@ -87,6 +92,58 @@ def mock_logger():
     return logger
 
 
+# 管理ファイル (item_manage.xlsm) のテスト用の内容
+MANAGE_MAIN_HEADERS = [HEADER_CONTROL_COLUMN, HEADER_MYCODE, HEADER_PRODUCT_NAME]
+MANAGE_SKU_HEADERS = [HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE]
+MANAGE_MAIN_ROWS = [["n", "A001", "商品A"], ["n", "B001", "商品B"], ["p", "C001", "商品C"]]
+MANAGE_SKU_ROWS = [["A001", "A010"], ["B001", "B010"], ["B001", "B020"], ["C001", "C010"]]
+
+
+@pytest.fixture
+def manage_headers():
+    """テスト用の管理ファイルの (Mainシートのヘッダー, SKUシートのヘッダー)"""
+    return list(MANAGE_MAIN_HEADERS), list(MANAGE_SKU_HEADERS)
+
+
+@pytest.fixture
+def manage_file_factory(tmp_path):
+    """
+    管理ファイルを tmp_path に作成する関数を返す (作成したファイルのパスを返す)。
+    同じ name で呼び出すとファイルを作り直す。sku_rows=None の場合は SKU シートを作らない。
+    """
+    from openpyxl import Workbook
+
+    def make(name="item_manage.xlsx", main_rows=MANAGE_MAIN_ROWS, sku_rows=MANAGE_SKU_ROWS,
+             main_headers=MANAGE_MAIN_HEADERS, sku_headers=MANAGE_SKU_HEADERS):
+        path = str(tmp_path / name)
+        wb = Workbook()
+        ws_main = wb.active
+        ws_main.title = MAIN_SHEET_NAME
+        for row in [main_headers] + list(main_rows):
+            ws_main.append(row)
+        if sku_rows is not None:
+            ws_sku = wb.create_sheet(SKU_SHEET_NAME)
+            for row in [sku_headers] + list(sku_rows):
+                ws_sku.append(row)
+        wb.save(path)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def save_job():
+    """Mainシートが MANAGE_MAIN_HEADERS の列の商品の保存ジョブを作る関数を返す"""
+    from manage_writer import PersistenceJob, JOB_SAVE_PRODUCT
+
+    def make(code, name, sku_codes, control="n"):
+        return PersistenceJob(JOB_SAVE_PRODUCT, code=code, headers=MANAGE_MAIN_HEADERS,
+                              main_values=[control, code, name],
+                              sku_records=[{HEADER_PRODUCT_CODE_SKU: code, HEADER_SKU_CODE: s} for s in sku_codes])
+
+    return make
+
+
 # テスト環境固有の設定
 def pytest_configure(config):
     """pytest設定の初期化"""
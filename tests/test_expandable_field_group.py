@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+ExpandableFieldGroup クラスのテスト
+
+- 段階的起動で材質・仕様マスターを読み込み中の間は選択欄が無効で、値は保持できること
+- 読み込み完了時 (set_master_data) に選択肢が反映され、変更扱いにならないこと
+"""
+import sys
+import os
+from unittest.mock import Mock
+from PyQt5.QtWidgets import QApplication, QComboBox
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_app import ExpandableFieldGroup
+
+
+class TestExpandableFieldGroupMasterLoading:
+    """材質・仕様マスターのバックグラウンド読み込みのテスト"""
+
+    @classmethod
+    def setup_class(cls):
+        """テストクラス全体の前に実行"""
+        cls.app = QApplication.instance() or QApplication([])
+
+    def _create_group(self, master_loading=True, master_data=None):
+        parent = Mock()
+        main_fields = {}
+        group = ExpandableFieldGroup("材質", 6, main_fields, 3, True, None, master_data=master_data,
+                                     master_loading=master_loading)
+        group.parent_app_ref = parent  # 変更通知 (mark_dirty) の呼び出しを確認するため後から設定する
+        return group, main_fields, parent
+
+    def test_loading_combo_keeps_value(self):
+        """読み込み中の選択欄は無効で、商品から読み込んだ値を保持し、完了後も変更扱いにしない"""
+        group, main_fields, parent = self._create_group()
+        combo = main_fields["材質_2a"]
+        assert isinstance(combo, QComboBox) and not combo.isEnabled()
+        combo.setCurrentText("木")
+        main_fields["材質_2b"].setText("木製")
+        parent.mark_dirty.reset_mock()
+
+        group.set_master_data({"木": "木製", "鉄": "スチール"})
+        assert combo.isEnabled() and not combo.isEditable()
+        assert [combo.itemText(i) for i in range(combo.count())] == ["", "木", "鉄"]
+        assert combo.currentText() == "木"
+        assert main_fields["材質_2b"].text() == "木製"
+        parent.mark_dirty.assert_not_called()
+
+        combo.setCurrentText("鉄")
+        assert main_fields["材質_2b"].text() == "スチール"
+
+    def test_empty_master_allows_free_text(self):
+        """マスターが空だった場合は自由入力できる"""
+        group, main_fields, _parent = self._create_group()
+        group.set_master_data({})
+        combo = main_fields["材質_2a"]
+        assert combo.isEnabled() and combo.isEditable()
+        assert not main_fields["材質_2b"].isReadOnly()
+
+    def test_without_master_uses_line_edits(self):
+        """マスターが無く読み込み中でもない場合は従来どおり入力欄になる"""
+        _group, main_fields, _parent = self._create_group(master_loading=False)
+        assert not isinstance(main_fields["材質_2a"], QComboBox)
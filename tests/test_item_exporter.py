@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+item_exporter.py モジュールのテスト
+
+- コントロールカラム 'n' の商品と、その SKU だけが出力されること
+- テンプレートの列順序に合わせて並べ替えられること
+"""
+import pytest
+import sys
+import os
+import tempfile
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+
+from constants import (
+    MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_MYCODE, HEADER_PRODUCT_NAME,
+    HEADER_CONTROL_COLUMN, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE
+)
+from item_exporter import build_export_rows, export_item_xlsm
+
+MAIN_TABLE = [
+    [HEADER_CONTROL_COLUMN, HEADER_MYCODE, HEADER_PRODUCT_NAME],
+    ["n", "A001", "商品A"],
+    ["p", "B001", "商品B"],
+    ["N", "C001", "商品C"],
+]
+SKU_TABLE = [
+    [HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE],
+    ["A001", "A010"],
+    ["B001", "B010"],
+    ["C001", "C010"],
+]
+
+
+class TestBuildExportRows:
+    """build_export_rows 関数のテスト"""
+
+    def test_filters_n_products_and_reorders(self):
+        """'n' の商品だけがテンプレート列順で出力される"""
+        main_out, sku_out, warnings = build_export_rows(
+            MAIN_TABLE, SKU_TABLE,
+            [HEADER_MYCODE, HEADER_CONTROL_COLUMN, "テンプレートのみの列"],
+            [HEADER_SKU_CODE, HEADER_PRODUCT_CODE_SKU],
+        )
+
+        assert warnings == []
+        assert main_out == [
+            [HEADER_MYCODE, HEADER_CONTROL_COLUMN, "テンプレートのみの列"],
+            ["A001", "n", ""],
+            ["C001", "N", ""],
+        ]
+        assert sku_out == [[HEADER_SKU_CODE, HEADER_PRODUCT_CODE_SKU], ["A010", "A001"], ["C010", "C001"]]
+
+    def test_missing_control_column_warns(self):
+        """コントロールカラムがない場合は警告を返し、データ行は出力しない"""
+        main_out, sku_out, warnings = build_export_rows([[HEADER_MYCODE], ["A001"]], SKU_TABLE, [], [])
+
+        assert main_out == [[HEADER_MYCODE]]
+        assert sku_out == [SKU_TABLE[0]]
+        assert len(warnings) == 1
+
+
+class TestExportItemXlsm:
+    """export_item_xlsm 関数のテスト"""
+
+    def test_writes_output_from_template(self):
+        """テンプレートをコピーして出力ファイルを作成する"""
+        temp_dir = tempfile.mkdtemp()
+        template_path = os.path.join(temp_dir, "template.xlsx")
+        output_path = os.path.join(temp_dir, "item.xlsx")
+        wb = Workbook()
+        wb.active.title = MAIN_SHEET_NAME
+        wb.active.append([HEADER_CONTROL_COLUMN, HEADER_MYCODE, HEADER_PRODUCT_NAME])
+        wb.create_sheet(SKU_SHEET_NAME).append([HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE])
+        wb.save(template_path)
+
+        try:
+            warnings = export_item_xlsm(template_path, output_path, MAIN_TABLE, SKU_TABLE)
+
+            assert warnings == []
+            wb_out = load_workbook(output_path, read_only=True)
+            main_rows = list(wb_out[MAIN_SHEET_NAME].iter_rows(values_only=True))
+            sku_rows = list(wb_out[SKU_SHEET_NAME].iter_rows(values_only=True))
+            wb_out.close()
+            assert [r[1] for r in main_rows[1:]] == ["A001", "C001"]
+            assert [r[1] for r in sku_rows[1:]] == ["A010", "C010"]
+        finally:
+            for path in (template_path, output_path):
+                if os.path.exists(path):
+                    os.unlink(path)
+            os.rmdir(temp_dir)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+lazy_import.py モジュールのテスト
+
+- 最初に使われるまでモジュールをインポートしないこと
+- インポートできない場合は偽として扱われること
+- product_app の読み込み時に監視用モジュールと requests が読み込まれないこと
+"""
+import sys
+import os
+import subprocess
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lazy_import import LazyImport
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImport:
+    """LazyImport クラスのテスト"""
+
+    def test_imported_on_first_call(self):
+        """呼び出すまでインポートせず、呼び出すと実体の関数を実行する"""
+        sys.modules.pop("colorsys", None)
+        rgb_to_hsv = LazyImport("colorsys", "rgb_to_hsv")
+        assert "colorsys" not in sys.modules and not rgb_to_hsv.resolved
+
+        assert rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules and rgb_to_hsv.resolved
+
+    def test_missing_module_is_falsy(self):
+        """インポートできないモジュールは偽として扱い、呼び出すと ImportError になる"""
+        missing = LazyImport("no_such_module_for_test", "check")
+        assert not missing
+        assert missing.resolve() is None
+        try:
+            missing()
+        except ImportError:
+            pass
+        else:
+            raise AssertionError("ImportError が発生しませんでした")
+
+    def test_product_app_defers_monitors(self):
+        """product_app を読み込んだ時点では監視用モジュールと requests は読み込まれない"""
+        code = ("import sys, product_app; "
+                "print(','.join(m for m in ('requests', 'src.utils.disk_monitor', 'src.utils.memory_manager', "
+                "'src.utils.network_monitor', 'src.utils.system_compatibility') if m in sys.modules))")
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        completed = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+        assert completed.stdout.strip() == ""
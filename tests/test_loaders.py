@@ -17,7 +17,18 @@ from unittest.mock import Mock, patch
 # テスト対象のモジュールをインポートできるようにパスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from loaders import load_categories_from_csv, load_explanation_mark_icons, load_material_spec_master
+from loaders import (
+    load_categories_from_csv, load_explanation_mark_icons, load_material_spec_master,
+    RakutenAttributeDefinitionLoader, YSpecDefinitionLoader
+)
+from constants import (
+    DEFINITION_CSV_FILE, RECOMMENDED_LIST_CSV_FILE, COL_GENRE_ID, COL_ITEM_NAME_JP, COL_ORDER,
+    COL_DEFINITION_GROUP, REC_COL_DEFINITION_GROUP, REC_COL_ITEM_NAME_JP, REC_COL_RECOMMENDED_VALUE,
+    YSPEC_CSV_FILE
+)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+YSPEC_HEADER = "id,name,path_name,spec_id,spec_name,spec_value_name,spec_value_id,selection_type,data_type\n"
 
 
 class TestLoadCategoriesFromCsv:
@@ -159,6 +170,86 @@ class TestLoadMaterialSpecMaster:
             os.unlink(temp_path)
 
 
+class TestRakutenAttributeDefinitionLoader:
+    """RakutenAttributeDefinitionLoader クラスのテスト"""
+
+    def _write_csv(self, path, rows):
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            csv.writer(f).writerows(rows)
+
+    def test_order_and_recommended_values(self):
+        """ジャンルごとに並び順で並び (同じ並び順は行の順)、推奨値は最初に現れた順で重複しない"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self._write_csv(os.path.join(temp_dir, DEFINITION_CSV_FILE), [
+                [COL_GENRE_ID, COL_ITEM_NAME_JP, COL_ORDER, COL_DEFINITION_GROUP],
+                ["100", "色", "3", "G1"],
+                ["100", "素材", "1", "G1"],
+                ["200", "幅", "2", "G2"],
+                ["100", "ブランド名", "1", "G1"],
+                ["100", "不正な並び順", "x", "G1"],
+            ])
+            self._write_csv(os.path.join(temp_dir, RECOMMENDED_LIST_CSV_FILE), [
+                [REC_COL_DEFINITION_GROUP, REC_COL_ITEM_NAME_JP, REC_COL_RECOMMENDED_VALUE],
+                ["G1", "色", "赤"], ["G1", "色", "青"], ["G1", "色", "赤"], ["G1", "色", "白"],
+            ])
+
+            loader = RakutenAttributeDefinitionLoader(temp_dir)
+
+            assert [d["name"] for d in loader.genre_definitions["100"]] == ["素材", "ブランド名", "色"]
+            assert [d["name"] for d in loader.genre_definitions["200"]] == ["幅"]
+            assert loader.recommended_values_map == {("G1", "色"): ["赤", "青", "白"]}
+            details = loader.get_attribute_details_for_genre("100")
+            assert details[2]["options"] == ["赤", "青", "白"]
+        finally:
+            for name in os.listdir(temp_dir):
+                os.unlink(os.path.join(temp_dir, name))
+            os.rmdir(temp_dir)
+
+
+class TestYSpecDefinitionLoader:
+    """YSpecDefinitionLoader クラスのテスト"""
+
+    def test_lazy_matches_full_load(self):
+        """索引から読み込んだカテゴリのスペック定義が全件読み込みと一致する"""
+        full = YSpecDefinitionLoader(REPO_DIR)
+        lazy = YSpecDefinitionLoader(REPO_DIR, lazy=True)
+
+        assert lazy.spec_definitions == {}
+        for category_id, specs in full.spec_definitions.items():
+            assert lazy.get_specs_for_category(category_id) == specs
+        assert lazy.get_specs_for_category("存在しないカテゴリ") == []
+
+    def test_lazy_unsorted_and_changed_file(self):
+        """カテゴリの行が離れていても全てを読み込み、定義書が差し替えられたら読み直す"""
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, YSPEC_CSV_FILE)
+        try:
+            with open(path, 'w', encoding='shift_jis', newline='') as f:
+                f.write(YSPEC_HEADER)
+                f.write("100,机,家具,2,色,赤,21,1,1\n")
+                f.write("200,椅子,家具,5,幅,,,0,2\n")
+                f.write("100,机,家具,2,色,青,22,1,1\n")
+                f.write("100,机,家具,1,素材,木,11,1,1\n")
+                f.write("100,机,家具,2,色,赤,21,1,1\n")
+            loader = YSpecDefinitionLoader(temp_dir, lazy=True)
+
+            specs = loader.get_specs_for_category(" 100 ")
+            assert [s["spec_id"] for s in specs] == ["1", "2"]
+            assert [o["value_name"] for o in specs[1]["options"]] == ["赤", "青"]
+            assert [s["spec_name"] for s in loader.get_specs_for_category("200")] == ["幅"]
+
+            with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+                f.write(YSPEC_HEADER)
+                f.write("100,机,家具,3,高さ,,,0,2\n")
+            os.utime(path, ns=(0, 0))
+            assert [s["spec_name"] for s in loader.get_specs_for_category("100")] == ["高さ"]
+            assert loader.get_specs_for_category("200") == []
+        finally:
+            os.unlink(path)
+            os.rmdir(temp_dir)
+
+
 # 統合テスト
 class TestLoadersIntegration:
     """ローダー機能の統合テスト"""
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+manage_writer.py モジュールのテスト
+
+- 対象商品の行だけを書き換える差分保存
+- SKU 行の挿入・削除と他商品の行番号の追従
+"""
+import pytest
+import sys
+import os
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from constants import MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_PRODUCT_NAME
+from product_repository import ProductRepository
+from manage_writer import can_apply_incremental_save, apply_incremental_product_save
+
+
+@pytest.fixture
+def manage_file(manage_file_factory):
+    return manage_file_factory(
+        sku_rows=[["A001", "A010"], ["A001", "A020"], ["B001", "B010"], ["C001", "C010"], ["C001", "C020"]])
+
+
+def _save_incrementally(path, repo, code, main_values, sku_rows):
+    wb = load_workbook(path)
+    plan = apply_incremental_product_save(wb[MAIN_SHEET_NAME], wb[SKU_SHEET_NAME], repo, code, main_values, sku_rows)
+    wb.save(path)
+    wb.close()
+    repo.apply_saved_product(code, **plan)
+    repo.mark_synced()
+
+
+def _assert_matches_file(repo, path):
+    reloaded = ProductRepository(path)
+    reloaded.refresh()
+    assert reloaded.product_codes() == repo.product_codes()
+    for code in reloaded.product_codes():
+        assert reloaded.get_main_record(code) == repo.get_main_record(code)
+        assert reloaded.get_sku_records(code) == repo.get_sku_records(code)
+        assert reloaded.main_row_number(code) == repo.main_row_number(code)
+        assert reloaded.sku_row_numbers(code) == repo.sku_row_numbers(code)
+
+
+class TestIncrementalSave:
+    """差分保存のテスト"""
+
+    def test_can_apply_requires_sync_and_matching_headers(self, manage_file, manage_headers):
+        """ファイルと同期済みで列構成が一致する場合のみ差分保存可能"""
+        main_headers, _sku_headers = manage_headers
+        repo = ProductRepository(manage_file)
+        assert can_apply_incremental_save(repo, main_headers, "A001") is False
+
+        repo.refresh()
+        assert can_apply_incremental_save(repo, main_headers, "A001") is True
+        assert can_apply_incremental_save(repo, main_headers + ["新列"], "A001") is False
+
+    def test_update_main_row_only(self, manage_file):
+        """Main 行の値だけが書き換わる"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+
+        _save_incrementally(manage_file, repo, "B001", ["p", "B001", "商品B改"], [["B001", "B010"]])
+
+        assert repo.is_in_sync()
+        assert repo.get_main_record("B001")[HEADER_PRODUCT_NAME] == "商品B改"
+        _assert_matches_file(repo, manage_file)
+
+    def test_insert_sku_rows_shifts_following_products(self, manage_file):
+        """SKU 行の追加で後続商品の行番号がずれる"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+
+        _save_incrementally(manage_file, repo, "A001", ["n", "A001", "商品A"],
+                            [["A001", "A010"], ["A001", "A020"], ["A001", "A030"]])
+
+        assert repo.sku_row_numbers("A001") == [2, 3, 4]
+        assert repo.sku_row_numbers("C001") == [6, 7]
+        _assert_matches_file(repo, manage_file)
+
+    def test_delete_sku_rows_and_add_new_product(self, manage_file):
+        """SKU 行の削除と新規商品の追加"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+
+        _save_incrementally(manage_file, repo, "A001", ["n", "A001", "商品A"], [["A001", "A010"]])
+        _save_incrementally(manage_file, repo, "D001", ["n", "D001", "商品D"], [["D001", "D010"]])
+
+        assert repo.sku_row_numbers("B001") == [3]
+        assert repo.product_codes()[-1] == "D001"
+        _assert_matches_file(repo, manage_file)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+master_cache.py モジュールのテスト
+
+- 2回目以降の読み込みでは CSV を解析せずにキャッシュから同じ内容を返すこと
+- 元ファイルの内容が変わった場合は読み直し、更新日時だけの変更ではキャッシュを使うこと
+- 任意ファイル (楽天推奨値リスト) が後から置かれた場合も読み直すこと
+"""
+import pytest
+import sys
+import os
+import shutil
+import tempfile
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loaders
+from loaders import YSpecDefinitionLoader, RakutenAttributeDefinitionLoader, load_material_spec_master
+from constants import YSPEC_CSV_FILE, RECOMMENDED_LIST_CSV_FILE
+from master_cache import MasterCacheEntry
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def dirs():
+    temp_dir = tempfile.mkdtemp()
+    cache_dir = os.path.join(temp_dir, "cache")
+    yield temp_dir, cache_dir
+    shutil.rmtree(temp_dir)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(text)
+
+
+def _no_csv_read(monkeypatch):
+    def fail(*args, **kwargs):
+        pytest.fail("CSV ファイルが読み込まれました")
+    monkeypatch.setattr(loaders, "open_csv_file_with_fallback", fail)
+
+
+class TestMasterCache:
+    """MasterCacheEntry クラスとローダーの連携のテスト"""
+
+    def test_yspec_loaded_from_cache(self, dirs, monkeypatch):
+        """Yahoo!スペック定義の2回目の読み込みは CSV を解析せずに同じ内容を返す"""
+        _temp_dir, cache_dir = dirs
+        first = YSpecDefinitionLoader(REPO_DIR, cache_dir=cache_dir)
+        assert first.spec_definitions
+
+        _no_csv_read(monkeypatch)
+        second = YSpecDefinitionLoader(REPO_DIR, cache_dir=cache_dir)
+        assert second.spec_definitions == first.spec_definitions
+
+    def test_changed_content_is_read_again(self, dirs):
+        """内容が変わると読み直し、同じ内容のまま更新日時だけが変わった場合はキャッシュを使う"""
+        temp_dir, cache_dir = dirs
+        path = os.path.join(temp_dir, "material.csv")
+        _write(path, "名称,説明\n木,木製\n")
+        assert load_material_spec_master(path, cache_dir=cache_dir) == {"木": "木製"}
+
+        _write(path, "名称,説明\n鉄,スチール\n")
+        assert load_material_spec_master(path, cache_dir=cache_dir) == {"鉄": "スチール"}
+
+        os.utime(path, ns=(0, 0))
+        cache = MasterCacheEntry(cache_dir, "material_spec_master", [path])
+        assert cache.load() == {"鉄": "スチール"}
+        # ハッシュが一致したため記録が新しい更新日時に書き換えられている
+        assert MasterCacheEntry(cache_dir, "material_spec_master", [path])._hashes == [None]
+        assert MasterCacheEntry(cache_dir, "material_spec_master", [path]).load() == {"鉄": "スチール"}
+
+    def test_optional_file_added_later(self, dirs, monkeypatch):
+        """楽天推奨値リストが無い状態のキャッシュは、リストが置かれると使われない"""
+        temp_dir, cache_dir = dirs
+        shutil.copy(os.path.join(REPO_DIR, loaders.DEFINITION_CSV_FILE), temp_dir)
+        first = RakutenAttributeDefinitionLoader(temp_dir, cache_dir=cache_dir)
+        assert first.genre_definitions and not first.recommended_values_map
+
+        with monkeypatch.context() as m:
+            _no_csv_read(m)
+            cached = RakutenAttributeDefinitionLoader(temp_dir, cache_dir=cache_dir)
+        assert cached.genre_definitions == first.genre_definitions
+
+        _write(os.path.join(temp_dir, RECOMMENDED_LIST_CSV_FILE),
+               f"{loaders.REC_COL_DEFINITION_GROUP},{loaders.REC_COL_ITEM_NAME_JP},{loaders.REC_COL_RECOMMENDED_VALUE}\nG1,色,赤\n")
+        reloaded = RakutenAttributeDefinitionLoader(temp_dir, cache_dir=cache_dir)
+        assert reloaded.recommended_values_map == {("G1", "色"): ["赤"]}
+
+    def test_broken_cache_is_ignored(self, dirs):
+        """壊れたキャッシュファイルは無視して CSV から読み込む"""
+        temp_dir, cache_dir = dirs
+        path = os.path.join(temp_dir, "material.csv")
+        _write(path, "名称,説明\n木,木製\n")
+        os.makedirs(cache_dir)
+        with open(os.path.join(cache_dir, "material_spec_master.cache"), "wb") as f:
+            f.write(b"PAMC\x00broken")
+
+        assert load_material_spec_master(path, cache_dir=cache_dir) == {"木": "木製"}
+        assert MasterCacheEntry(cache_dir, "material_spec_master", [path]).load() == {"木": "木製"}
+
+    def test_yspec_index_loaded_from_cache(self, dirs, monkeypatch):
+        """Yahoo!スペック定義の索引も2回目はキャッシュから読み込む"""
+        _temp_dir, cache_dir = dirs
+        first = YSpecDefinitionLoader(REPO_DIR, cache_dir=cache_dir, lazy=True)
+
+        monkeypatch.setattr(YSpecDefinitionLoader, "_build_index",
+                            lambda self, filepath: pytest.fail("索引が作り直されました"))
+        second = YSpecDefinitionLoader(REPO_DIR, cache_dir=cache_dir, lazy=True)
+        category_id = next(iter(first._index["ranges"]))
+        assert second.get_specs_for_category(category_id) == first.get_specs_for_category(category_id)
+        assert second.get_specs_for_category(category_id)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+master_records.py モジュールのテスト
+
+- レコードを従来の dict と同じ書き方 (record["name"], record.get) で参照できること
+- Yahoo!スペック定義のキャッシュ形式への変換と復元で内容が変わらず、同じ選択肢の並びが共有されること
+- プロセスプールから受け取る際の pickle で型と内容が保たれること
+"""
+import sys
+import os
+import pickle
+import marshal
+
+import pytest
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from master_records import (
+    YSpecOption, YSpecDefinition, IdMasterEntry, RakutenAttributeDetail, RecordPool,
+    records_to_cache, records_from_cache, spec_definitions_to_cache, spec_definitions_from_cache
+)
+
+
+def _spec_definitions():
+    pool = RecordPool()
+    colors = pool.share_tuple(pool.share(YSpecOption(value_id, name)) for value_id, name in (("1", "赤"), ("2", "青")))
+    return {
+        "100": [YSpecDefinition("10", "色", 0, 1, colors), YSpecDefinition("11", "幅", 0, 2, ())],
+        "200": [YSpecDefinition("10", "色", 1, 1, pool.share_tuple([YSpecOption("1", "赤"), YSpecOption("2", "青")]))],
+    }
+
+
+class TestMasterRecord:
+    """レコードの参照方法のテスト"""
+
+    def test_dict_style_access(self):
+        """キーでの参照・get・in が dict と同じように使える"""
+        entry = IdMasterEntry("100816", "間仕切り", "インテリア・寝具・収納>間仕切り>屏風")
+        assert entry["hierarchy"] == "インテリア・寝具・収納>間仕切り>屏風"
+        assert entry.get("name") == "間仕切り"
+        assert entry.get("unknown", "") == ""
+        assert "id" in entry and "unknown" not in entry
+        with pytest.raises(KeyError):
+            entry["unknown"]
+
+    def test_replace_keeps_original(self):
+        """_replace は新しいレコードを返し、元のレコードは変わらない"""
+        detail = RakutenAttributeDetail("カラー", 1, "-", ("-",), "選択式", "チェア", (), False, False, False, "|")
+        with_options = detail._replace(options=["赤", "青"])
+        assert with_options["options"] == ["赤", "青"]
+        assert detail["options"] == ()
+
+
+class TestCacheConversion:
+    """キャッシュ形式への変換と復元のテスト"""
+
+    def test_spec_definitions_round_trip(self):
+        """marshal で保存・復元しても内容が変わらず、同じ選択肢の並びは1つのタプルを共有する"""
+        spec_definitions = _spec_definitions()
+        cached = marshal.loads(marshal.dumps(spec_definitions_to_cache(spec_definitions)))
+        restored = spec_definitions_from_cache(cached)
+        assert restored == spec_definitions
+        assert isinstance(restored["100"][0], YSpecDefinition)
+        assert isinstance(restored["100"][0]["options"][0], YSpecOption)
+        assert restored["100"][0]["options"] is restored["200"][0]["options"]
+        assert len(cached[0]) == 2  # 選択肢は2件だけ保存される
+
+    def test_records_round_trip(self):
+        """楽天属性定義などのレコードの一覧を marshal で保存・復元できる"""
+        definitions = {"100": [RakutenAttributeDetail("カラー", 1, "-", ("-",), "選択式", "チェア", (), True, False, False, "|")]}
+        restored = records_from_cache(RakutenAttributeDetail, marshal.loads(marshal.dumps(records_to_cache(definitions))))
+        assert restored == definitions
+        assert isinstance(restored["100"][0], RakutenAttributeDetail)
+
+    def test_pickle(self):
+        """pickle で型と内容が保たれる"""
+        spec_definitions = _spec_definitions()
+        restored = pickle.loads(pickle.dumps(spec_definitions))
+        assert restored == spec_definitions
+        assert type(restored["100"][0]["options"][0]) is YSpecOption
@@ -14,7 +14,7 @@ from PyQt5.QtCore import Qt, QModelIndex
 # テスト対象のモジュールをインポートできるようにパスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from models import SkuTableModel
+from models import SkuTableModel, ProductListModel, ProductListFilterModel, PRODUCT_LIST_CODE_ROLE
 
 
 class TestSkuTableModel:
@@ -183,5 +183,116 @@ class TestSkuTableModel:
         assert self.model.rowCount() == len(test_data_list) - 3
 
 
+def _entries(count, control="n"):
+    return [(f"10000000{i:02d}", f"チェア{i}" if i % 2 == 0 else f"テーブル{i}", control) for i in range(count)]
+
+
+def _visible_codes(proxy):
+    return [proxy.index(row, 0).data(PRODUCT_LIST_CODE_ROLE) for row in range(proxy.rowCount())]
+
+
+class TestProductListModel:
+    """ProductListModel のテスト"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_set_entries_updates_changed_rows_only(self):
+        """再読み込みでは無くなった行・追加された行・変わった行だけを通知する"""
+        model = ProductListModel()
+        entries = _entries(10)
+        model.set_entries(entries)
+        assert model.rowCount() == 10
+        assert model.index(0).data() == "[n] 1000000000 - チェア0"
+
+        events = []
+        model.modelReset.connect(lambda: events.append("reset"))
+        model.rowsRemoved.connect(lambda parent, first, last: events.append(("removed", first, last)))
+        model.rowsInserted.connect(lambda parent, first, last: events.append(("inserted", first, last)))
+        model.dataChanged.connect(lambda top_left, bottom_right, roles=None: events.append(("changed", top_left.row())))
+
+        new_entries = entries[:2] + entries[4:]
+        new_entries[5] = (new_entries[5][0], "名前変更", "p")
+        new_entries.insert(0, ("2000000000", "新商品", "n"))
+        model.set_entries(new_entries)
+        assert events == [("removed", 2, 3), ("inserted", 0, 0), ("changed", 6)]
+        assert [model.code_at(row) for row in range(model.rowCount())] == [entry[0] for entry in new_entries]
+        assert model.text_at(6) == "[p] 1000000007 - 名前変更"
+
+    def test_lookup_by_code(self):
+        """商品コードから行を引く"""
+        model = ProductListModel()
+        model.set_entries(_entries(5))
+        assert model.row_of("1000000003") == 3
+        assert model.row_of("9999999999") == -1
+        assert model.contains("1000000000")
+        model.set_entries(_entries(5)[1:])
+        assert model.row_of("1000000003") == 2
+        assert not model.contains("1000000000")
+        assert model.list_index_by_code() == {f"10000000{i:02d}": i - 1 for i in range(1, 5)}
+
+    def test_set_control(self):
+        """コントロールカラム値の変更は表示文字列と絞り込み用の文字列に反映される"""
+        model = ProductListModel()
+        model.set_entries(_entries(3))
+        model.set_control(["1000000001"], "p")
+        assert model.text_at(1) == "[p] 1000000001 - テーブル1"
+        assert model.matching_rows("[P]") == [1]
+
+
+class TestProductListFilterModel:
+    """ProductListFilterModel のテスト"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setup_method(self):
+        self.model = ProductListModel()
+        self.model.set_entries(_entries(10))
+        self.proxy = ProductListFilterModel()
+        self.proxy.setSourceModel(self.model)
+
+    def test_filter_is_normalized(self):
+        """絞り込みは全角・半角、ひらがな・カタカナ、大文字・小文字を区別しない"""
+        assert self.proxy.rowCount() == 10
+        assert self.proxy.set_filter_text("ﾃｰﾌﾞﾙ")
+        assert _visible_codes(self.proxy) == [f"10000000{i:02d}" for i in range(1, 10, 2)]
+        assert self.proxy.set_filter_text("ﾃｰﾌﾞﾙ1")
+        assert _visible_codes(self.proxy) == ["1000000001"]
+        assert not self.proxy.set_filter_text("テーブル1")
+        assert self.proxy.set_filter_text("")
+        assert self.proxy.rowCount() == 10
+
+    def test_map_between_source_and_proxy(self):
+        """表示されていない行は無効な index になる"""
+        self.proxy.set_filter_text("チェア")
+        assert self.proxy.mapFromSource(self.model.index(4)).row() == 2
+        assert not self.proxy.mapFromSource(self.model.index(3)).isValid()
+        assert self.proxy.mapToSource(self.proxy.index(2, 0)).row() == 4
+
+    def test_follows_source_changes(self):
+        """元のモデルの行の追加・削除・変更に追従する"""
+        self.proxy.set_filter_text("チェア")
+        entries = _entries(10)
+        entries[1] = (entries[1][0], "チェア1", "n")
+        del entries[2]
+        entries.append(("2000000000", "新チェア", "n"))
+        self.model.set_entries(entries)
+        assert _visible_codes(self.proxy) == ["1000000000", "1000000001", "1000000004", "1000000006",
+                                              "1000000008", "2000000000"]
+        self.proxy.set_filter_text("")
+        assert _visible_codes(self.proxy) == [entry[0] for entry in entries]
+
+    def test_sort_by_code(self):
+        """商品コード順に並べ替える (column が負の場合は元の順に戻す)"""
+        self.model.set_entries(list(reversed(_entries(5))))
+        self.proxy.sort(0, Qt.AscendingOrder)
+        assert _visible_codes(self.proxy) == [f"10000000{i:02d}" for i in range(5)]
+        self.proxy.sort(-1)
+        assert _visible_codes(self.proxy) == [f"10000000{i:02d}" for i in range(4, -1, -1)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+persistence_worker.py モジュールのテスト
+
+- 同じ商品のジョブが待ち行列上で最新のものに統合されること
+- ジョブをまとめて管理ファイルへ書き込み、メモリ上の内容と一致すること
+- 遅延出力では item.xlsm を出力ジョブのときだけ作成すること
+"""
+import pytest
+import sys
+import os
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from constants import MAIN_SHEET_NAME, HEADER_PRODUCT_CODE_SKU, HEADER_SKU_CODE, HEADER_R_GENRE_ID
+from product_repository import ProductRepository
+from manage_writer import PersistenceJob, JOB_SAVE_PRODUCT, JOB_DELETE_PRODUCT, JOB_SET_CONTROL, JOB_EXPORT_ITEM
+from persistence_worker import PersistenceQueue, process_batch
+
+
+@pytest.fixture
+def files(manage_file_factory, tmp_path):
+    """(管理ファイル, 出力用テンプレート, item.xlsm の出力先) のパス"""
+    manage_path = manage_file_factory(main_rows=[["n", "A001", "商品A"], ["n", "B001", "商品B"], ["n", "C001", "商品C"]])
+    template_path = manage_file_factory("template.xlsx", main_rows=[], sku_rows=[])
+    return manage_path, template_path, str(tmp_path / "item.xlsx")
+
+
+class TestPersistenceQueue:
+    """PersistenceQueue クラスのテスト"""
+
+    def test_same_product_jobs_are_coalesced(self, save_job):
+        """同じ商品のジョブは最新のものだけが残り、末尾へ移動する"""
+        queue = PersistenceQueue()
+        queue.put(save_job("A001", "商品A1", []))
+        queue.put(PersistenceJob(JOB_SET_CONTROL, codes=None, control_value="p"))
+        queue.put(save_job("A001", "商品A2", []))
+
+        jobs = queue.take_all()
+
+        assert [job.kind for job in jobs] == [JOB_SET_CONTROL, JOB_SAVE_PRODUCT]
+        assert jobs[1].main_values[2] == "商品A2"
+        assert not queue.is_idle()
+        queue.task_done()
+        assert queue.is_idle()
+
+    def test_notify_message_is_kept_when_coalesced(self, save_job):
+        """統合された後のジョブに完了メッセージがなければ前のジョブのものを引き継ぐ"""
+        queue = PersistenceQueue()
+        first = save_job("A001", "商品A1", [])
+        first.notify_message = "保存しました"
+        queue.put(first)
+        queue.put(save_job("A001", "商品A2", []))
+
+        assert queue.take_all()[0].notify_message == "保存しました"
+
+
+class TestProcessBatch:
+    """process_batch 関数のテスト"""
+
+    def test_batch_writes_staged_changes(self, files, save_job):
+        """先行反映した保存・削除・コントロール変更が1回の書き込みでファイルと一致する"""
+        manage_path, template_path, output_path = files
+        repo = ProductRepository(manage_path)
+        repo.refresh()
+
+        jobs = [
+            save_job("A001", "商品A改", ["A010", "A020"]),
+            PersistenceJob(JOB_DELETE_PRODUCT, code="B001"),
+            save_job("D001", "商品D", ["D010"]),
+            PersistenceJob(JOB_SET_CONTROL, codes=["C001"], control_value="p"),
+        ]
+        for job in jobs:
+            if job.kind == JOB_SAVE_PRODUCT:
+                repo.stage_product(job.code, job.headers, job.main_values, job.sku_records)
+            elif job.kind == JOB_DELETE_PRODUCT:
+                repo.stage_delete(job.code)
+            else:
+                repo.stage_control_values(job.codes, job.control_value)
+
+        results = process_batch(repo, jobs, template_path, output_path)
+
+        assert all(r["success"] and not r["export_error"] for r in results)
+        assert repo.is_in_sync()
+        reloaded = ProductRepository(manage_path)
+        reloaded.refresh()
+        assert reloaded.product_codes() == repo.product_codes() == ["A001", "C001", "D001"]
+        for code in reloaded.product_codes():
+            assert reloaded.get_main_record(code) == repo.get_main_record(code)
+            assert reloaded.get_sku_records(code) == repo.get_sku_records(code)
+            assert reloaded.main_row_number(code) == repo.main_row_number(code)
+            assert reloaded.sku_row_numbers(code) == repo.sku_row_numbers(code)
+
+        wb_out = load_workbook(output_path, read_only=True)
+        exported = [r[1] for r in list(wb_out[MAIN_SHEET_NAME].iter_rows(values_only=True))[1:]]
+        wb_out.close()
+        assert exported == ["A001", "D001"]
+
+    def test_export_after_layout_change_keeps_new_columns(self, files, manage_file_factory, manage_headers):
+        """シート全体を書き直した (列が増えた) 保存の直後の出力にも、増えた列の値が含まれる"""
+        manage_path, template_path, output_path = files
+        main_headers, _sku_headers = manage_headers
+        headers = main_headers + [HEADER_R_GENRE_ID]
+        manage_file_factory("template.xlsx", main_rows=[], sku_rows=[], main_headers=headers)
+        repo = ProductRepository(manage_path)
+        repo.refresh()
+        job = PersistenceJob(JOB_SAVE_PRODUCT, code="A001", headers=headers, main_values=["n", "A001", "商品A改", "100"],
+                             sku_records=[{HEADER_PRODUCT_CODE_SKU: "A001", HEADER_SKU_CODE: "A010"}])
+        repo.stage_product(job.code, job.headers, job.main_values, job.sku_records)
+
+        results = process_batch(repo, [job], template_path, output_path)
+
+        assert results[0]["success"] and not results[0]["export_error"]
+        wb_out = load_workbook(output_path, read_only=True)
+        exported = list(wb_out[MAIN_SHEET_NAME].iter_rows(values_only=True))
+        wb_out.close()
+        genre_idx = list(exported[0]).index(HEADER_R_GENRE_ID)
+        assert [(r[1], r[genre_idx]) for r in exported[1:]] == [("A001", "100"), ("B001", None), ("C001", None)]
+
+    def test_missing_file_reports_failure(self, files, save_job):
+        """管理ファイルを開けない場合は全ジョブが失敗として返り、リポジトリは無効化される"""
+        manage_path, template_path, output_path = files
+        repo = ProductRepository(manage_path)
+        repo.refresh()
+        os.unlink(manage_path)
+
+        results = process_batch(repo, [save_job("A001", "商品A", [])], template_path, output_path)
+
+        assert results[0]["success"] is False
+        assert results[0]["error"]
+        assert not repo.is_loaded
+
+    def test_lazy_export_writes_item_xlsm_only_on_export_job(self, files, save_job):
+        """export=False では item.xlsm を作らず、出力ジョブのみのバッチは管理ファイルに書き込まない"""
+        manage_path, template_path, output_path = files
+        repo = ProductRepository(manage_path)
+        repo.refresh()
+        job = save_job("A001", "商品A改", ["A010"])
+        repo.stage_product(job.code, job.headers, job.main_values, job.sku_records)
+
+        results = process_batch(repo, [job], template_path, output_path, export=False)
+        assert results[0]["success"] is True
+        assert not os.path.exists(output_path)
+
+        manage_mtime = os.stat(manage_path).st_mtime_ns
+        results = process_batch(repo, [PersistenceJob(JOB_EXPORT_ITEM)], template_path, output_path)
+        assert results[0]["success"] is True
+        assert os.stat(manage_path).st_mtime_ns == manage_mtime
+        wb_out = load_workbook(output_path, read_only=True)
+        names = [r[2] for r in list(wb_out[MAIN_SHEET_NAME].iter_rows(values_only=True))[1:]]
+        wb_out.close()
+        assert names == ["商品A改", "商品B", "商品C"]
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+product_repository.py モジュールのテスト
+
+- Main / SKU シートのメモリ上インデックス化
+- ファイル変更時のみの再読み込み
+"""
+import pytest
+import sys
+import os
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import HEADER_MYCODE, HEADER_PRODUCT_NAME, HEADER_CONTROL_COLUMN, HEADER_SKU_CODE
+from product_repository import ProductRepository
+
+
+@pytest.fixture
+def manage_file(manage_file_factory):
+    return manage_file_factory(
+        main_rows=[["n", "1000000001", "商品A"], ["p", "1000000002", "商品B"], [None, "1000000003", None]],
+        sku_rows=[["1000000001", "1000000001010"], ["1000000002", "1000000002010"], ["1000000001", "1000000001020"]],
+    )
+
+
+class TestProductRepository:
+    """ProductRepository クラスのテスト"""
+
+    def test_list_entries(self, manage_file):
+        """商品一覧用のエントリがファイル順で返される"""
+        repo = ProductRepository(manage_file)
+        assert repo.refresh() is True
+
+        assert repo.list_entries() == [
+            ("1000000001", "商品A", "n"),
+            ("1000000002", "商品B", "p"),
+            ("1000000003", "", "n"),
+        ]
+
+    def test_get_main_and_sku_records(self, manage_file):
+        """mycode による Main 行・SKU 行の取得"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+
+        record = repo.get_main_record("1000000002")
+        assert record[HEADER_PRODUCT_NAME] == "商品B"
+        assert repo.get_main_record("9999999999") is None
+
+        skus = repo.get_sku_records("1000000001")
+        assert [s[HEADER_SKU_CODE] for s in skus] == ["1000000001010", "1000000001020"]
+        assert repo.get_sku_records("1000000003") == []
+        assert repo.contains(" 1000000001 ")
+
+    def test_refresh_only_when_file_changes(self, manage_file, manage_file_factory):
+        """ファイルが変わらない限り再読み込みしない"""
+        repo = ProductRepository(manage_file)
+        assert repo.refresh() is True
+        assert repo.refresh() is False
+
+        manage_file_factory(main_rows=[["n", "2000000001", "商品C"]], sku_rows=[])
+        st = os.stat(manage_file)
+        os.utime(manage_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert repo.refresh() is True
+        assert repo.product_codes() == ["2000000001"]
+
+    def test_missing_file(self, tmp_path):
+        """管理ファイルが存在しない場合は空として扱う"""
+        repo = ProductRepository(str(tmp_path / "not_exists_item_manage.xlsm"))
+        repo.refresh()
+
+        assert len(repo) == 0
+        assert repo.has_main_sheet is False
+
+    def test_duplicate_codes(self, manage_file, manage_file_factory):
+        """重複した mycode は一覧では最初の行のみ、出力用の Main シートではファイルの行順のまま含める"""
+        manage_file_factory(
+            main_rows=[["n", "1000000001", "商品A"], ["n", "1000000002", "商品B"],
+                       ["n", "1000000001", "商品A (重複)"], ["n", "1000000003", "商品C"]],
+            sku_rows=[],
+        )
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+
+        assert [code for code, _, _ in repo.list_entries()] == ["1000000001", "1000000002", "1000000003"]
+        assert repo.is_duplicate("1000000001")
+        assert [row[2] for row in repo.main_table()[1:]] == ["商品A", "商品B", "商品A (重複)", "商品C"]
+
+        repo.stage_control_values(["1000000001"], "p")
+        repo.stage_product("1000000004", [HEADER_CONTROL_COLUMN, HEADER_MYCODE, HEADER_PRODUCT_NAME],
+                           ["n", "1000000004", "商品D"], [])
+        repo.apply_deleted_product("1000000002", 3, [])
+        repo.stage_delete("1000000002")
+        assert [row[:3] for row in repo.main_table()[1:]] == [
+            ("p", "1000000001", "商品A"), ("p", "1000000001", "商品A (重複)"),
+            ("n", "1000000003", "商品C"), ("n", "1000000004", "商品D"),
+        ]
+
+
+def _touch(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestExternalChanges:
+    """ProductRepository.reload_changes のテスト"""
+
+    def test_changed_rows_are_reported(self, manage_file, manage_file_factory):
+        """外部で変更された商品だけが追加・削除・変更として返される"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+        assert repo.reload_changes() is None
+
+        manage_file_factory(
+            main_rows=[["n", "1000000001", "商品A"], ["n", "1000000002", "商品B"], ["n", "1000000004", "商品D"]],
+            sku_rows=[["1000000001", "1000000001010"], ["1000000002", "1000000002010"], ["1000000001", "1000000001020"]],
+        )
+        _touch(manage_file)
+        changes = repo.reload_changes()
+
+        assert changes.added == ["1000000004"]
+        assert changes.removed == ["1000000003"]
+        assert changes.changed == ["1000000002"]
+        assert repo.list_entries()[1] == ("1000000002", "商品B", "n")
+
+    def test_same_content_is_not_reloaded(self, manage_file):
+        """更新日時だけが変わった場合は読み直さない"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+        _touch(manage_file)
+
+        assert repo.reload_changes() is None
+        assert repo.is_in_sync()
+
+    def test_no_reload_while_writes_pending(self, manage_file, manage_file_factory):
+        """保存ワーカーの書き込み待ちの間は外部変更を読み込まない"""
+        repo = ProductRepository(manage_file)
+        repo.refresh()
+        manage_file_factory(main_rows=[["n", "2000000001", "商品C"]], sku_rows=[])
+        _touch(manage_file)
+        repo.set_write_pending(True)
+
+        assert repo.reload_changes() is None
+        assert repo.contains("1000000001")
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+product_store.py モジュールのテスト
+
+- 管理ファイルが変わっていなければ SQLite ストアから読み込むこと
+- 保存ワーカーの書き込みがストアにも反映され、ファイルの内容と一致すること
+- コントロールカラム・ジャンルID・Yカテゴリの索引で絞り込めること
+- 形式の異なる古いストアは作り直すこと
+"""
+import pytest
+import sys
+import os
+import sqlite3
+import datetime
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import HEADER_SKU_CODE, HEADER_R_GENRE_ID, HEADER_Y_CATEGORY_ID
+import product_repository
+from product_repository import ProductRepository
+from product_store import ProductStore, encode_row, decode_row
+from manage_writer import PersistenceJob, JOB_DELETE_PRODUCT, JOB_SET_CONTROL
+from persistence_worker import process_batch
+
+
+@pytest.fixture
+def paths(manage_file_factory, tmp_path):
+    """(管理ファイル, SQLite ストア, 一時フォルダ) のパス"""
+    manage_path = manage_file_factory(sku_rows=[["A001", "A010"], ["B001", "B010"], ["A001", "A020"], ["C001", "C010"]])
+    return manage_path, str(tmp_path / "item_manage.sqlite3"), str(tmp_path)
+
+
+def _state(repo):
+    codes = repo.product_codes()
+    return (repo.list_entries(), repo.main_table(), repo.sku_table(),
+            {c: (repo.main_row_number(c), repo.sku_row_numbers(c)) for c in codes})
+
+
+def _no_file_read(monkeypatch):
+    monkeypatch.setattr(product_repository, "open_workbook",
+                        lambda path: pytest.fail("管理ファイルが読み込まれました"))
+
+
+class TestProductStore:
+    """ProductStore クラスと ProductRepository の連携のテスト"""
+
+    def test_reload_from_store(self, paths, monkeypatch):
+        """2回目以降の起動ではファイルを解析せずにストアから同じ内容を読み込む"""
+        manage_path, store_path, _temp_dir = paths
+        first = ProductRepository(manage_path, store=ProductStore(store_path))
+        first.refresh()
+        first.close_store()
+
+        _no_file_read(monkeypatch)
+        second = ProductRepository(manage_path, store=ProductStore(store_path))
+        second.refresh()
+
+        assert _state(second) == _state(first)
+        assert second.get_sku_records("A001")[1][HEADER_SKU_CODE] == "A020"
+        second.close_store()
+
+    def test_changed_file_is_read_again(self, paths):
+        """ストアの記録とファイルの状態が異なる場合はファイルから読み直す"""
+        manage_path, store_path, _temp_dir = paths
+        repo = ProductRepository(manage_path, store=ProductStore(store_path))
+        repo.refresh()
+        repo.close_store()
+        os.utime(manage_path, ns=(0, 0))
+
+        store = ProductStore(store_path)
+        assert store.load_snapshot((0, os.path.getsize(manage_path))) is None
+        store.close()
+
+    def test_written_jobs_are_mirrored(self, paths, monkeypatch, save_job):
+        """保存・削除・コントロールカラム変更の後もストアとファイルの内容が一致する"""
+        manage_path, store_path, temp_dir = paths
+        repo = ProductRepository(manage_path, store=ProductStore(store_path))
+        repo.refresh()
+        jobs = [
+            save_job("A001", "商品A改", ["A010", "A020", "A030"]),
+            PersistenceJob(JOB_DELETE_PRODUCT, code="B001"),
+            PersistenceJob(JOB_SET_CONTROL, codes=None, control_value="p"),
+        ]
+        repo.stage_product("A001", jobs[0].headers, jobs[0].main_values, jobs[0].sku_records)
+        repo.stage_delete("B001")
+        repo.stage_control_values(None, "p")
+
+        results = process_batch(repo, jobs, "", os.path.join(temp_dir, "item.xlsx"), export=False)
+        assert all(r["success"] for r in results)
+        repo.close_store()
+
+        from_file = ProductRepository(manage_path)
+        from_file.refresh()
+        _no_file_read(monkeypatch)
+        from_store = ProductRepository(manage_path, store=ProductStore(store_path))
+        from_store.refresh()
+
+        assert _state(from_store) == _state(from_file)
+        assert from_store.find_codes(exclude_control="p") == []
+        from_store.close_store()
+
+    def test_find_codes_uses_index(self, manage_file_factory, manage_headers, paths):
+        """索引の列で絞り込み、ファイル順で返す (ストアを使わない場合も同じ結果になる)"""
+        _manage_path, store_path, _temp_dir = paths
+        main_headers, _sku_headers = manage_headers
+        manage_path = manage_file_factory(
+            main_headers=main_headers + [HEADER_R_GENRE_ID, HEADER_Y_CATEGORY_ID],
+            main_rows=[["n", "A001", "商品A", "100", "y1"], ["p", "B001", "商品B", "200", "y1"],
+                       ["n", "C001", "商品C", "100", "y2"], [None, "D001", "商品D", "100", "y2"]],
+        )
+        repo = ProductRepository(manage_path, store=ProductStore(store_path))
+        repo.refresh()
+
+        for _ in range(2):
+            assert repo.find_codes(control="n") == ["A001", "C001"]
+            assert repo.find_codes(genre_id="100", y_category_id="y2") == ["C001", "D001"]
+            assert repo.find_codes(exclude_control="p") == ["A001", "C001", "D001"]
+            assert repo.find_codes(genre_id="100", exclude_control="n") == ["D001"]
+            repo.close_store()
+
+    def test_set_all_control_through_index(self, paths, monkeypatch):
+        """'p' 以外の商品だけを変更した後も、ストアの索引とファイルの内容が一致する"""
+        manage_path, store_path, temp_dir = paths
+        repo = ProductRepository(manage_path, store=ProductStore(store_path))
+        repo.refresh()
+        codes = repo.find_codes(exclude_control="p")
+        assert codes == ["A001", "B001"]
+        assert repo.stage_control_values(codes, "p") == 2
+
+        job = PersistenceJob(JOB_SET_CONTROL, codes=codes, control_value="p")
+        assert process_batch(repo, [job], "", os.path.join(temp_dir, "item.xlsx"), export=False)[0]["success"]
+        assert repo.find_codes(exclude_control="p") == []
+        repo.close_store()
+
+        _no_file_read(monkeypatch)
+        from_store = ProductRepository(manage_path, store=ProductStore(store_path))
+        from_store.refresh()
+        assert [control for _, _, control in from_store.list_entries()] == ["p", "p", "p"]
+        assert from_store.find_codes(control="p") == ["A001", "B001", "C001"]
+        from_store.close_store()
+
+    def test_old_schema_is_rebuilt(self, paths):
+        """形式の異なるストアは作り直し、管理ファイルから読み込む"""
+        manage_path, store_path, _temp_dir = paths
+        conn = sqlite3.connect(store_path)
+        conn.executescript(
+            "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE main (mycode TEXT PRIMARY KEY, row_number INTEGER NOT NULL, control TEXT, row_data TEXT NOT NULL);"
+            "INSERT INTO meta VALUES ('schema_version', '1');"
+        )
+        conn.close()
+
+        repo = ProductRepository(manage_path, store=ProductStore(store_path))
+        repo.refresh()
+        assert [code for code, _, _ in repo.list_entries()] == ["A001", "B001", "C001"]
+        repo.close_store()
+
+        store = ProductStore(store_path)
+        assert store.load_snapshot(repo.signature) is not None
+        store.close()
+
+    def test_row_values_keep_types(self):
+        """日付などのセル値の型を保ったまま保存できる"""
+        values = ("文字", 1, 2.5, True, None, datetime.datetime(2024, 1, 2, 3, 4), datetime.date(2024, 5, 6))
+        assert decode_row(encode_row(values)) == values
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+search_index.py モジュールのテスト
+
+- 検索語を含む商品が候補に必ず含まれ、含まない商品は絞り込まれること
+- 保存・削除の差分更新と、管理ファイルに対応する場合だけの読み込み
+- ProductRepository の先行反映・再読み込みとの連携
+"""
+import sys
+import os
+import time
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import HEADER_MYCODE, HEADER_PRODUCT_NAME
+from product_repository import ProductRepository
+from search_index import ProductSearchIndex
+
+RECORDS = [
+    ("1000000001", {"商品名": "木製ダイニングチェア", "キャッチコピー": "北欧風"}),
+    ("1000000002", {"商品名": "スチールラック", "キャッチコピー": "Heavy Duty"}),
+    ("1000000003", {"商品名": "ダイニングテーブル", "キャッチコピー": ""}),
+]
+
+
+def _built_index(path=None):
+    index = ProductSearchIndex(path)
+    index.build(RECORDS, (1, 2))
+    return index
+
+
+class TestCandidates:
+    """候補の絞り込みのテスト"""
+
+    def test_not_ready(self):
+        """作成前は None を返す (呼び出し側で全商品を走査する)"""
+        assert ProductSearchIndex(None).candidates("チェア") is None
+
+    def test_bigram_and_single_char(self):
+        """2文字以上は連続する2文字、1文字はその文字で絞り込み、大文字と小文字は区別しない"""
+        index = _built_index()
+        assert index.candidates("ダイニング") == ["1000000001", "1000000003"]
+        assert index.candidates("heavy") == ["1000000002"]
+        assert index.candidates("北") == ["1000000001"]
+        assert index.candidates("ソファ") == []
+
+    def test_candidates_are_superset(self):
+        """連続する2文字が全て含まれていれば候補になる (実際に含むかは呼び出し側で照合する)"""
+        index = _built_index()
+        assert index.candidates("チェアック") == []
+        assert "1000000002" in index.candidates("ラック")
+
+
+class TestIncrementalUpdate:
+    """差分更新のテスト"""
+
+    def test_set_and_remove_product(self):
+        """保存した商品は新しい内容で引け、削除した商品は候補に含まれない"""
+        index = _built_index()
+        index.set_product("1000000001", {"商品名": "ソファベッド"})
+        index.set_product("1000000004", {"商品名": "ソファ"})
+        assert index.candidates("ソファ") == ["1000000001", "1000000004"]
+        assert index.candidates("チェア") == []
+        index.remove_product("1000000003")
+        assert index.candidates("テーブル") == []
+        assert len(index) == 3
+
+    def test_add_text(self):
+        """1項目の値を追加すると、その値でも候補になる"""
+        index = _built_index()
+        index.add_text("1000000002", "p")
+        assert "1000000002" in index.candidates("P")
+
+    def test_needs_rebuild(self):
+        """無効になった文書番号が半分を超えると作り直しが必要になる"""
+        index = _built_index()
+        assert not index.needs_rebuild()
+        for _ in range(4):
+            index.set_product("1000000001", {"商品名": "チェア"})
+        assert index.needs_rebuild()
+
+
+class TestPersistence:
+    """保存と読み込みのテスト"""
+
+    def test_round_trip(self, tmp_path):
+        """保存した索引は同じ管理ファイルの状態に対してだけ読み込まれる"""
+        path = str(tmp_path / "item_manage.search_index")
+        index = _built_index(path)
+        index.set_product("1000000002", {"商品名": "スチール棚"})
+        assert index.save() is True
+        assert index.save() is False  # 変更が無ければ保存しない
+
+        loaded = ProductSearchIndex(path)
+        assert loaded.load((9, 9)) is False
+        assert loaded.load((1, 2)) is True
+        assert loaded.candidates("スチール") == ["1000000002"]
+        assert loaded.candidates("ラック") == []
+        assert len(loaded) == 3
+
+    def test_broken_file(self, tmp_path):
+        """壊れた索引は読み込まずに False を返す"""
+        path = tmp_path / "item_manage.search_index"
+        path.write_bytes(b"broken")
+        assert ProductSearchIndex(str(path)).load((1, 2)) is False
+
+
+class TestRepositoryIntegration:
+    """ProductRepository との連携のテスト"""
+
+    def test_staged_changes_and_reload(self, tmp_path, manage_file_factory):
+        """先行反映した変更が索引に反映され、外部で変更された管理ファイルを読み直すと索引は無効になる"""
+        manage_file = manage_file_factory(main_rows=[["n", "1000000001", "商品A"], ["n", "1000000002", "商品B"]],
+                                          sku_rows=None)
+        index = ProductSearchIndex(str(tmp_path / "item_manage.search_index"))
+        repo = ProductRepository(manage_file, search_index=index)
+        repo.refresh()
+        assert index.start_build(repo) is True
+        deadline = time.time() + 10
+        while (index.building or not index.ready) and time.time() < deadline:
+            time.sleep(0.01)
+        assert index.candidates("商品") == ["1000000001", "1000000002"]
+        assert index.signature == repo.signature
+
+        repo.stage_product("1000000003", [HEADER_MYCODE, HEADER_PRODUCT_NAME], ["1000000003", "新商品"], [])
+        repo.stage_delete("1000000001")
+        repo.stage_control_values(None, "u")
+        assert index.candidates("新商品") == ["1000000003"]
+        assert index.candidates("商品A") == []
+        assert index.candidates("u") == ["1000000002", "1000000003"]
+
+        time.sleep(0.01)
+        manage_file_factory(main_rows=[["n", "1000000005", "別の商品"]], sku_rows=None)
+        repo.refresh()
+        assert index.candidates("商品") is None
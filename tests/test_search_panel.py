@@ -11,7 +11,7 @@ from unittest.mock import Mock, patch, MagicMock
 
 # PyQt5のテスト用インポート
 try:
-    from PyQt5.QtWidgets import QApplication, QWidget, QLineEdit, QTextEdit
+    from PyQt5.QtWidgets import QApplication, QWidget, QLineEdit, QTextEdit, QListWidgetItem
     from PyQt5.QtCore import Qt
     from PyQt5.QtTest import QTest
     import pytest_qt
@@ -24,6 +24,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 if PYQT_AVAILABLE:
     from product_app import SearchPanel
+    from models import ProductListModel
 
 pytestmark = pytest.mark.skipif(not PYQT_AVAILABLE, reason="PyQt5 not available")
 
@@ -192,10 +193,47 @@ class TestSearchFunctionality:
     def test_field_monitoring_setup(self, search_panel_with_data):
         """フィールド監視の設定テスト"""
         panel = search_panel_with_data
-        
-        # フィールド監視が設定されることを確認
-        # (実際の実装では textChanged シグナルが接続される)
-        assert hasattr(panel, '_update_timer')
+        panel.parent_app._is_loading_data = False
+        panel.show()
+        panel.scope_combo.setCurrentIndex(1)
+        panel.search_input.setText("テーブル")
+        panel.perform_search(auto_jump=False)
+        assert [r['field_name'] for r in panel.current_results] == ['商品名', '説明']
+        
+        # フィールドの変更はそのフィールドの検索結果だけを更新する (検索し直さない)
+        with patch.object(panel, 'perform_search') as mock_search:
+            panel.parent_app.main_fields['説明'].setPlainText("椅子です")
+            panel.parent_app.main_fields['field3'].setText("テーブル脚")
+            mock_search.assert_not_called()
+        assert [r['field_name'] for r in panel.current_results] == ['field3', '商品名']
+        assert [panel.results_list.item(i).data(Qt.UserRole) for i in range(panel.results_list.count())] == [0, 1]
+        assert panel.result_label.text() == "検索結果: 2件"
+
+    def test_product_list_result_matched_by_code(self, search_panel_with_data):
+        """検索後に一覧の行がずれても、現在の商品の検索結果だけを商品コードで照合して更新する"""
+        panel = search_panel_with_data
+        panel.auto_search.setChecked(False)
+        panel.scope_combo.setCurrentIndex(0)
+        panel.search_input.setText("テーブル")
+        model = ProductListModel()
+        model.set_entries([("1000000001", "テーブルA", "n"), ("1000000002", "テーブルB", "n")])
+        panel.parent_app.product_list.list_model = model
+        panel.parent_app.product_list.current_code.return_value = "1000000002"
+        panel.parent_app.product_repository.main_headers = ['商品名', '説明']
+        for row, name in enumerate(["テーブルA", "テーブルB"]):
+            result = SearchPanel._product_list_result(model, row, '商品名', name)
+            list_item = QListWidgetItem()
+            panel._set_result_list_item(list_item, row, result)
+            panel.current_results.append(result)
+            panel.results_list.addItem(list_item)
+
+        # 検索結果の表示中に一覧の先頭へ商品が追加され、行がずれる
+        model.set_entries([("1000000000", "新商品", "n"), ("1000000001", "テーブルA", "n"), ("1000000002", "テーブルB", "n")])
+        panel.update_field_result('商品名')
+
+        assert [(r['code'], r['field_value']) for r in panel.current_results] == [
+            ("1000000001", "テーブルA"), ("1000000002", "テーブル 木製 120cm")]
+        assert panel.results_list.count() == 2
 
 
 if __name__ == "__main__":
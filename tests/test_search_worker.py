@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+search_worker.py モジュールのテスト
+
+- 商品一覧の全項目検索の結果が一覧の順で返り、検索索引の有無で変わらないこと
+- ワーカーが結果を分割して送り、最後に投入した検索の結果と件数を通知すること
+"""
+import sys
+import os
+import time
+
+import pytest
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+from PyQt5.QtWidgets import QApplication
+
+from product_repository import ProductRepository
+from search_index import ProductSearchIndex
+import search_worker
+from search_worker import CatalogSearchWorker, iter_catalog_matches
+
+
+@pytest.fixture
+def repo(manage_file_factory):
+    path = manage_file_factory(
+        main_rows=[["n", f"10000000{i:02d}", f"チェア{i}" if i % 3 == 0 else f"テーブル{i}"] for i in range(30)],
+        sku_rows=None,
+    )
+    repo = ProductRepository(path)
+    repo.refresh()
+    return repo
+
+
+def _list_index_by_code(repo):
+    # 商品一覧の表示順はファイルの逆順とする
+    codes = repo.product_codes()
+    return {code: len(codes) - 1 - i for i, code in enumerate(codes)}
+
+
+class TestIterCatalogMatches:
+    """iter_catalog_matches 関数のテスト"""
+
+    def test_matches_in_list_order(self, repo):
+        """結果は一覧の順で返り、検索索引を使っても変わらない"""
+        list_index_by_code = _list_index_by_code(repo)
+        expected = list(iter_catalog_matches(repo, "チェア", False, list_index_by_code))
+        assert [name for _, _, name in expected] == [f"チェア{i}" for i in range(27, -1, -3)]
+        assert [index for index, _, _ in expected] == sorted(index for index, _, _ in expected)
+
+        repo.search_index = ProductSearchIndex(None)
+        repo.search_index.build(repo.iter_main_records(), repo.signature)
+        assert list(iter_catalog_matches(repo, "チェア", False, list_index_by_code)) == expected
+
+    def test_case_sensitive_and_stop(self, repo):
+        """大文字と小文字の区別と、途中での打ち切り"""
+        list_index_by_code = _list_index_by_code(repo)
+        assert len(list(iter_catalog_matches(repo, "N", False, list_index_by_code))) == 30
+        assert list(iter_catalog_matches(repo, "N", True, list_index_by_code)) == []
+        assert list(iter_catalog_matches(repo, "n", False, list_index_by_code, should_stop=lambda: True)) == []
+
+
+class TestCatalogSearchWorker:
+    """CatalogSearchWorker クラスのテスト"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def _run(self, done, timeout=10):
+        deadline = time.time() + timeout
+        while not done() and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+
+    def test_streams_chunks_of_latest_search(self, repo, monkeypatch):
+        """結果を分割して送り、最後に投入した検索の件数を通知する (古い世代の通知は受け取り側で捨てる)"""
+        monkeypatch.setattr(search_worker, "RESULT_CHUNK_SIZE", 4)
+        worker = CatalogSearchWorker(repo)
+        chunks, finished = [], []
+        worker.results_ready.connect(lambda generation, matches: chunks.append((generation, matches)))
+        worker.search_finished.connect(lambda generation, count, completed: finished.append((generation, count, completed)))
+        try:
+            worker.submit("テーブル", False, _list_index_by_code(repo))
+            latest = worker.submit("チェア", False, _list_index_by_code(repo))
+            self._run(lambda: any(generation == latest for generation, _, _ in finished))
+        finally:
+            worker.stop()
+        assert finished[-1] == (latest, 10, True)
+        latest_chunks = [matches for generation, matches in chunks if generation == latest]
+        assert [len(matches) for matches in latest_chunks] == [4, 4, 2]
+        assert all(name.startswith("チェア") for matches in latest_chunks for _, _, name in matches)
+
+    def test_missing_main_sheet(self, tmp_path):
+        """Main シートが無い場合は検索できなかったことを通知する"""
+        path = str(tmp_path / "empty.xlsx")
+        Workbook().save(path)
+        worker = CatalogSearchWorker(ProductRepository(path))
+        finished = []
+        worker.search_finished.connect(lambda generation, count, completed: finished.append(completed))
+        try:
+            worker.submit("チェア", False, {})
+            self._run(lambda: finished)
+        finally:
+            worker.stop()
+        assert finished == [False]
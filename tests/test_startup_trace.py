@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+startup_trace.py モジュールのテスト
+
+- 処理の区間とワーカーで実行したタスクの区間が Chrome のトレースイベント形式で保存されること
+- 遅延実行の処理がすべて終わった時点で完了の通知が一度だけ行われ、以降は記録しないこと
+- 要約が合計と所要時間の長い順の処理を返すこと
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+import concurrent.futures
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from startup_trace import StartupTracer, run_timed
+
+
+class TestStartupTracer:
+    """StartupTracer クラスのテスト"""
+
+    def test_chrome_trace_written(self):
+        """同期処理とワーカースレッドのタスクが JSON のトレースに書き出される"""
+        tracer = StartupTracer()
+        with tracer.phase("_init_paths_and_dirs"):
+            pass
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="loader") as executor:
+            result, start, end, pid, tid, thread_name = executor.submit(run_timed, sorted, [3, 1, 2]).result()
+        assert result == [1, 2, 3] and start <= end
+        tracer.record("categories", start, end, "loader", pid, tid, thread_name)
+        tracer.finish_synchronous()
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "sub", "startup_trace.json")
+            assert tracer.write(path)
+            with open(path, encoding="utf-8") as f:
+                trace = json.load(f)
+        finally:
+            shutil.rmtree(temp_dir)
+
+        events = {e["name"]: e for e in trace["traceEvents"] if e["ph"] == "X"}
+        assert {"_init_paths_and_dirs", "categories", "起動処理 (同期)"} <= set(events)
+        assert events["categories"]["cat"] == "loader"
+        assert events["categories"]["tid"] != events["_init_paths_and_dirs"]["tid"]
+        assert all(e["ts"] >= 0 and e["dur"] >= 0 for e in events.values())
+        thread_names = [e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"]
+        assert any(name.startswith("loader") for name in thread_names)
+
+    def test_complete_after_deferred(self):
+        """遅延実行の処理が残っている間は完了せず、すべて終わると一度だけ通知する"""
+        completed = []
+        tracer = StartupTracer(on_complete=completed.append)
+        menu_bar = tracer.deferred("_create_menu_bar", lambda: "menu")
+        navigation = tracer.deferred("_setup_smart_navigation", lambda: None)
+        tracer.finish_synchronous()
+        assert completed == []
+
+        assert menu_bar() == "menu"
+        assert completed == []
+        navigation()
+        assert completed == [tracer] and tracer.completed
+
+        # 起動後の記録は無視される
+        with tracer.phase("_check_template_compatibility"):
+            pass
+        names = [e["name"] for e in tracer.events]
+        assert "_check_template_compatibility" not in names
+        assert "起動処理 (遅延実行を含む)" in names
+
+    def test_deferred_exception_still_completes(self):
+        """遅延実行の処理が例外で終わっても完了として扱う"""
+        completed = []
+        tracer = StartupTracer(on_complete=completed.append)
+
+        def fail():
+            raise RuntimeError("失敗")
+        run = tracer.deferred("_delayed_update_check", fail)
+        tracer.finish_synchronous()
+        try:
+            run()
+        except RuntimeError:
+            pass
+        assert completed == [tracer]
+        assert any(e["name"] == "_delayed_update_check" for e in tracer.events)
+
+    def test_summary_lines(self):
+        """要約は合計を先頭に、処理を所要時間の長い順に並べる"""
+        tracer = StartupTracer()
+        base = tracer.origin
+        tracer.record("apply_stylesheet", base, base + 0.010)
+        tracer.record("_init_ui_components", base, base + 0.200)
+        tracer.record("y_spec_definitions", base, base + 0.050, "loader")
+        tracer.finish_synchronous()
+
+        lines = tracer.summary_lines(max_phases=2)
+        assert lines[0].startswith("起動処理 (同期)")
+        assert lines[1].startswith("起動処理 (遅延実行を含む)")
+        assert lines[2:] == ["_init_ui_components: 200 ms", "y_spec_definitions (読込タスク): 50 ms"]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+template_metadata.py モジュールのテスト
+
+- テンプレートのヘッダーがプロセス内でキャッシュされること
+- ファイルの内容が変わった場合に読み直されること
+"""
+import pytest
+import sys
+import os
+import tempfile
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+
+from constants import MAIN_SHEET_NAME, SKU_SHEET_NAME, HEADER_MYCODE, HEADER_PRODUCT_CODE_SKU
+import template_metadata
+from template_metadata import get_template_metadata, clear_template_metadata_cache
+
+
+def _write_template(path, main_headers, sku_headers=None):
+    wb = Workbook()
+    wb.active.title = MAIN_SHEET_NAME
+    wb.active.append(main_headers)
+    if sku_headers is not None:
+        wb.create_sheet(SKU_SHEET_NAME).append(sku_headers)
+    wb.save(path)
+
+
+@pytest.fixture
+def template_path():
+    temp_dir = tempfile.mkdtemp()
+    path = os.path.join(temp_dir, "template.xlsx")
+    yield path
+    clear_template_metadata_cache()
+    if os.path.exists(path):
+        os.unlink(path)
+    os.rmdir(temp_dir)
+
+
+class TestTemplateMetadata:
+    """get_template_metadata 関数のテスト"""
+
+    def test_headers_are_read_once(self, template_path, monkeypatch):
+        """2回目以降はファイルを読み直さずにキャッシュを返す"""
+        _write_template(template_path, [" " + HEADER_MYCODE, None, "商品名"], [HEADER_PRODUCT_CODE_SKU])
+        first = get_template_metadata(template_path)
+
+        monkeypatch.setattr(template_metadata, "read_template_metadata",
+                            lambda path: pytest.fail("キャッシュが使われていません"))
+        second = get_template_metadata(template_path)
+
+        assert second is first
+        assert first.main_headers == [HEADER_MYCODE, "", "商品名"]
+        assert first.main_header_cells[1] is None
+        assert first.sku_headers == [HEADER_PRODUCT_CODE_SKU]
+
+    def test_changed_file_is_reloaded(self, template_path):
+        """内容が変わったファイルは読み直す"""
+        _write_template(template_path, [HEADER_MYCODE])
+        first = get_template_metadata(template_path)
+        assert first.has_sku_sheet is False
+
+        _write_template(template_path, [HEADER_MYCODE, "追加列"], [HEADER_PRODUCT_CODE_SKU])
+        os.utime(template_path, ns=(0, 0))
+        second = get_template_metadata(template_path)
+
+        assert second.main_headers == [HEADER_MYCODE, "追加列"]
+        assert second.has_sku_sheet is True
+        assert second.content_hash != first.content_hash
@@ -6,15 +6,19 @@ utils.py モジュールのテスト
 - normalize_text
 - normalize_wave_dash
 - get_byte_count_excel_lenb
+- ProgressChannel
+- open_csv_file_with_fallback (文字コードの事前判定)
 """
 import pytest
 import sys
 import os
+import threading
 
 # テスト対象のモジュールをインポートできるようにパスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import normalize_text, normalize_wave_dash, get_byte_count_excel_lenb
+import utils
+from utils import normalize_text, normalize_wave_dash, get_byte_count_excel_lenb, ProgressChannel, open_csv_file_with_fallback
 
 
 class TestNormalizeText:
@@ -47,6 +51,11 @@ class TestNormalizeText:
         text = "テストデータ 123 ABC"
         assert normalize_text(text) == text
 
+    def test_normalize_hiragana(self):
+        """ひらがなはカタカナに変換し、英字は大文字にする"""
+        assert normalize_text("いすちぇあ") == "イスチェア"
+        assert normalize_text("ちぇあ abc") == normalize_text("チェア ABC")
+
 
 class TestNormalizeWaveDash:
     """normalize_wave_dash 関数のテスト"""
@@ -104,5 +113,64 @@ class TestGetByteCountExcelLenb:
         assert get_byte_count_excel_lenb("！＠＃") == 6
 
 
+class TestProgressChannel:
+    """ProgressChannel クラスのテスト"""
+
+    def test_take_returns_latest_report_once(self):
+        """最後に報告された文言だけを1回返す"""
+        channel = ProgressChannel()
+        assert channel.take() is None
+        channel.report("カテゴリ を読み込み中...")
+        channel.report("IDマスター を読み込み中...")
+        assert channel.take() == "IDマスター を読み込み中..."
+        assert channel.take() is None
+
+    def test_report_from_threads(self):
+        """複数のスレッドから報告しても、いずれかのスレッドの最後の文言が取り出せる"""
+        channel = ProgressChannel()
+        threads = [threading.Thread(target=lambda n=n: [channel.report(f"{n}-{i}") for i in range(1000)])
+                   for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert channel.take() in {f"{n}-999" for n in range(4)}
+
+
+class TestOpenCsvFileWithFallback:
+    """open_csv_file_with_fallback 関数のテスト"""
+
+    def _write(self, tmp_path, name, text, encoding):
+        path = tmp_path / name
+        path.write_bytes(text.encode(encoding))
+        return str(path)
+
+    def _read(self, path):
+        with open_csv_file_with_fallback(path) as (f, delimiter, encoding):
+            return f.read(), delimiter, encoding
+
+    def test_utf8_with_bom(self, tmp_path):
+        """BOM付きUTF-8はBOMを除いて読み込む"""
+        path = self._write(tmp_path, "bom.csv", "ID\t名前\r\n1\tソファ\r\n", "utf-8-sig")
+        text, delimiter, encoding = self._read(path)
+        assert (text, delimiter, encoding) == ("ID\t名前\r\n1\tソファ\r\n", "\t", "utf-8-sig")
+
+    def test_shift_jis_after_long_ascii(self, tmp_path):
+        """判定に使う先頭部分より後ろに Shift_JIS の文字があっても、読み込み中に失敗せず Shift_JIS で読める"""
+        text = "id,name\r\n" + "1,abc\r\n" * (utils.ENCODING_SNIFF_BYTES // 7 + 1) + "2,テーブル\r\n"
+        path = self._write(tmp_path, "late.csv", text, "shift_jis")
+        assert self._read(path) == (text, ",", "shift_jis")
+
+    def test_empty_file(self, tmp_path):
+        """空のファイルも読み込める"""
+        path = self._write(tmp_path, "empty.csv", "", "utf-8")
+        assert self._read(path) == ("", ",", "utf-8-sig")
+
+    def test_missing_file(self, tmp_path):
+        """ファイルが無い場合は FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            self._read(str(tmp_path / "missing.csv"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
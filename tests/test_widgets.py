@@ -15,7 +15,8 @@ from PyQt5.QtTest import QTest
 # テスト対象のモジュールをインポートできるようにパスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from widgets import JapaneseLineEdit, JapaneseTextEdit, JapaneseHtmlTextEdit
+from widgets import JapaneseLineEdit, JapaneseTextEdit, JapaneseHtmlTextEdit, ProductListView
+from models import PRODUCT_LIST_CODE_ROLE
 
 
 class TestJapaneseWidgets:
@@ -169,5 +170,56 @@ class TestCustomWidgetFunctionality:
         parent.close()
 
 
+class TestProductListView:
+    """ProductListView のテスト"""
+
+    @classmethod
+    def setup_class(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setup_method(self):
+        self.view = ProductListView()
+        self.view.set_entries([(f"10000000{i:02d}", f"チェア{i}" if i % 2 == 0 else f"テーブル{i}", "n")
+                               for i in range(10)])
+        self.changes = []
+        self.view.currentCodeChanged.connect(lambda current, previous: self.changes.append((current, previous)))
+
+    def test_select_by_code(self):
+        """商品コードで選択し、変わったときだけ通知する"""
+        assert self.view.set_current_code("1000000003")
+        assert self.view.current_code() == "1000000003"
+        assert self.view.set_current_code("1000000003")
+        assert not self.view.set_current_code("9999999999")
+        assert self.changes == [("1000000003", "")]
+        self.view.clear_current()
+        assert self.changes[-1] == ("", "1000000003")
+
+    def test_filter_keeps_current(self):
+        """絞り込みで表示されなくなっても選択中の商品は変わらず、表示されれば選択し直す"""
+        self.view.set_current_code("1000000003")
+        self.view.set_filter_text("ﾁｪｱ")
+        assert self.view.current_code() == "1000000003"
+        assert not self.view.currentIndex().isValid()
+        self.view.set_filter_text("")
+        assert self.view.currentIndex().data(PRODUCT_LIST_CODE_ROLE) == "1000000003"
+        assert self.changes == [("1000000003", "")]
+
+    def test_reload_keeps_or_clears_current(self):
+        """再読み込みで選択中の商品が残れば選択したままにし、無くなれば選択を解除する"""
+        self.view.set_current_code("1000000005")
+        self.view.set_entries([("2000000000", "新商品", "n"), ("1000000005", "テーブル5", "p")])
+        assert self.view.current_code() == "1000000005"
+        assert self.view.currentIndex().row() == 1
+        self.view.set_entries([("2000000000", "新商品", "n")])
+        assert self.view.current_code() == ""
+        assert self.view.count() == 1
+
+    def test_select_codes(self):
+        """選択に加えた商品を一覧の順で返す (表示されていない商品は選択しない)"""
+        self.view.set_filter_text("ﾃｰﾌﾞﾙ")
+        self.view.select_codes(["1000000005", "1000000001", "1000000002"])
+        assert self.view.selected_codes() == ["1000000001", "1000000005"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
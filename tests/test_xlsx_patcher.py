@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+xlsx_patcher.py モジュールのテスト
+
+- シート XML の直接書き換えの結果が openpyxl で保存した場合と同じ値になること
+- 変更していない部品 (vbaProject.bin など) がそのまま残ること
+"""
+import pytest
+import sys
+import os
+import shutil
+import zipfile
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from constants import MAIN_SHEET_NAME
+from product_repository import ProductRepository
+from manage_writer import PersistenceJob, JOB_DELETE_PRODUCT, JOB_SET_CONTROL, apply_jobs
+from xlsx_patcher import PatchWorkbook, UnsupportedPatchError
+
+VBA_BYTES = b"\x00\x01dummy vba project\xff"
+
+
+@pytest.fixture
+def manage_paths(manage_file_factory, tmp_path):
+    """同じ内容の管理ファイルを2つ (直接書き換え用と openpyxl 用) 作る"""
+    patch_path = manage_file_factory(
+        "patch.xlsx",
+        main_rows=[["n", "A001", "商品A"], ["n", "B001", "商品B", 12.5], ["p", "C001", " 前後に空白 "]],
+    )
+    with zipfile.ZipFile(patch_path, "a") as z:
+        z.writestr("xl/vbaProject.bin", VBA_BYTES)
+    openpyxl_path = str(tmp_path / "openpyxl.xlsx")
+    shutil.copyfile(patch_path, openpyxl_path)
+    return patch_path, openpyxl_path
+
+
+def _sheet_values(path):
+    wb = load_workbook(path)
+    values = {name: list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames}
+    wb.close()
+    return values
+
+
+def _apply(path, wb, jobs):
+    repo = ProductRepository(path)
+    repo.refresh()
+    layout_changed = apply_jobs(wb, repo, jobs)
+    wb.save(path)
+    wb.close()
+    return repo, layout_changed
+
+
+class TestPatchWorkbook:
+    """PatchWorkbook クラスのテスト"""
+
+    def test_same_result_as_openpyxl(self, manage_paths, save_job):
+        """更新・SKU行の挿入と削除・商品の追加と削除の結果が openpyxl と一致する"""
+        patch_path, openpyxl_path = manage_paths
+        jobs = [
+            save_job("A001", "商品A & <改>", ["A010", "A020", "A030"]),
+            save_job("B001", "商品B", ["B010"]),
+            save_job("D001", "新商品", ["D010", "D020"]),
+            PersistenceJob(JOB_DELETE_PRODUCT, code="C001"),
+            PersistenceJob(JOB_SET_CONTROL, codes=["B001", "D001"], control_value="p"),
+        ]
+
+        repo, layout_changed = _apply(patch_path, PatchWorkbook(patch_path), jobs)
+        _apply(openpyxl_path, load_workbook(openpyxl_path, keep_vba=True), jobs)
+
+        assert layout_changed is False
+        assert _sheet_values(patch_path) == _sheet_values(openpyxl_path)
+        # 差分更新後の行番号が保存後のファイルと一致する
+        reloaded = ProductRepository(patch_path)
+        reloaded.refresh()
+        for code in ("A001", "B001", "D001"):
+            assert repo.main_row_number(code) == reloaded.main_row_number(code)
+            assert repo.sku_row_numbers(code) == reloaded.sku_row_numbers(code)
+
+    def test_untouched_parts_are_copied(self, manage_paths):
+        """変更していないシートと vbaProject.bin は元の内容のまま残る"""
+        patch_path, _openpyxl_path = manage_paths
+        with zipfile.ZipFile(patch_path) as z:
+            before = {name: z.read(name) for name in z.namelist()}
+
+        _apply(patch_path, PatchWorkbook(patch_path), [PersistenceJob(JOB_SET_CONTROL, codes=None, control_value="p")])
+
+        with zipfile.ZipFile(patch_path) as z:
+            after = {name: z.read(name) for name in z.namelist()}
+        changed = [name for name in before if before[name] != after[name]]
+        assert changed == ["xl/worksheets/sheet1.xml"]
+        assert after["xl/vbaProject.bin"] == VBA_BYTES
+        assert [row[0] for row in _sheet_values(patch_path)[MAIN_SHEET_NAME][1:]] == ["p", "p", "p"]
+
+    def test_unsupported_value_keeps_file(self, manage_paths):
+        """書き換えに対応していない値は UnsupportedPatchError とし、元のファイルを変更しない"""
+        patch_path, _openpyxl_path = manage_paths
+        with open(patch_path, "rb") as f:
+            original = f.read()
+        wb = PatchWorkbook(patch_path)
+        wb[MAIN_SHEET_NAME].cell(row=2, column=3, value=object())
+
+        with pytest.raises(UnsupportedPatchError):
+            wb.save(patch_path)
+        wb.close()
+
+        with open(patch_path, "rb") as f:
+            assert f.read() == original
+        assert [name for name in os.listdir(os.path.dirname(patch_path)) if name.endswith(".tmp")] == []
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+xlsx_reader.py モジュールのテスト
+
+- openpyxl の iter_rows(values_only=True) と同じ値・同じ行の形で読み込めること
+"""
+import pytest
+import sys
+import os
+import datetime
+import tempfile
+
+# テスト対象のモジュールをインポートできるようにパスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+
+from xlsx_reader import open_workbook
+
+
+@pytest.fixture
+def workbook_path():
+    temp_dir = tempfile.mkdtemp()
+    path = os.path.join(temp_dir, "sample.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Main"
+    ws.append(["mycode", "商品名", None, "価格"])
+    ws["A3"] = "A001"
+    ws["B3"] = "テスト商品"
+    ws["C3"] = True
+    ws["D3"] = 1980
+    ws["A4"] = 1.5
+    ws["B4"] = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    ws["C4"] = datetime.date(2020, 5, 5)
+    ws["D4"] = "=SUM(1,2)"
+    ws["F6"] = "列の外側"
+    wb.create_sheet("SKU").append(["商品コード", "SKUコード"])
+    wb.save(path)
+    yield path
+    os.unlink(path)
+    os.rmdir(temp_dir)
+
+
+class TestStreamingWorkbook:
+    """StreamingWorkbook クラスのテスト"""
+
+    def test_rows_match_openpyxl(self, workbook_path):
+        """全シートの行が openpyxl の読み取り専用モードと一致する"""
+        expected_wb = load_workbook(workbook_path, read_only=True)
+        with open_workbook(workbook_path) as wb:
+            assert wb.sheetnames == expected_wb.sheetnames
+            for name in wb.sheetnames:
+                expected = list(expected_wb[name].iter_rows(values_only=True))
+                assert list(wb[name].iter_rows(values_only=True)) == expected
+        expected_wb.close()
+
+    def test_row_range_and_values(self, workbook_path):
+        """行範囲の指定と、欠けた行の補完・型変換"""
+        with open_workbook(workbook_path) as wb:
+            rows = list(wb["Main"].iter_rows(min_row=2, max_row=4, values_only=True))
+
+        assert rows[0] == (None,) * 6  # 2行目は空行として補完される
+        assert rows[1] == ("A001", "テスト商品", True, 1980, None, None)
+        assert rows[2][1] == datetime.datetime(2024, 1, 2, 3, 4, 5)
+        assert rows[2][3] == "=SUM(1,2)"
+
+    def test_missing_sheet_raises_key_error(self, workbook_path):
+        """存在しないシート名は KeyError"""
+        with open_workbook(workbook_path) as wb:
+            with pytest.raises(KeyError):
+                wb["存在しない"]
@@ -1,68 +1,162 @@
 """
 商品登録入力ツール - ユーティリティ関数モジュール
 """
+import io
 import os
 import sys
 import csv
+import mmap
+import codecs
+import shutil
+import tempfile
 import functools
+import threading
 import unicodedata
 import logging
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Union, Tuple
-from PyQt5.QtCore import QStandardPaths
-from PyQt5.QtWidgets import QApplication
 
 from constants import (
-    DEFAULT_ENCODING, FALLBACK_ENCODING, PROGRESS_UPDATE_ROW_INTERVAL,
+    DEFAULT_ENCODING, FALLBACK_ENCODING,
     APP_DATA_SUBDIR
 )
 
+# 文字コードの推定に使う先頭のバイト数
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+
+class ProgressChannel:
+    """
+    読み込み処理 (ワーカースレッド) から進捗表示の文言を受け取るスレッドセーフな受け渡し口。
+
+    report は最新の文言を置き換えるだけで GUI には触れない。
+    表示の更新はメインスレッドが take で文言を取り出して行う (LoadingDialog が一定間隔で行う)。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._text: Optional[str] = None
+
+    def report(self, text: str) -> None:
+        with self._lock:
+            self._text = text
+
+    def take(self) -> Optional[str]:
+        """前回の取り出し以降に報告された最新の文言 (無ければ None)"""
+        with self._lock:
+            text, self._text = self._text, None
+        return text
+
+
+def guess_csv_encoding(data) -> str:
+    """
+    BOM と先頭 ENCODING_SNIFF_BYTES バイトから文字コードを推定する。
+    BOM 付き、または先頭部分が UTF-8 として正しければ UTF-8、そうでなければ Shift_JIS とする
+    (先頭部分だけでは判定しきれないため、decode_csv_bytes は推定が外れた場合にもう一方で再試行する)。
+    """
+    if data[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        return DEFAULT_ENCODING
+    try:
+        # 末尾で途切れたマルチバイト文字はエラーにしない (final=False)
+        codecs.getincrementaldecoder(DEFAULT_ENCODING)().decode(data[:ENCODING_SNIFF_BYTES], final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return DEFAULT_ENCODING
+
+
+def decode_csv_bytes(data, filepath="", file_label="CSVファイル") -> Tuple[str, str]:
+    """
+    CSVファイルの内容 (bytes や mmap) を文字列に変換し、(文字列, 使用したエンコーディング) を返す。
+    推定した文字コードで1回だけデコードし、失敗した場合のみもう一方の文字コードで再試行する。
+    どの文字コードでもデコードできない場合は最後の UnicodeDecodeError を発生させる。
+    """
+    first = guess_csv_encoding(data)
+    encodings_to_try = [first] + [e for e in (DEFAULT_ENCODING, FALLBACK_ENCODING) if e != first]
+
+    for encoding in encodings_to_try:
+        try:
+            text = str(data, encoding)
+        except UnicodeDecodeError:
+            if encoding == encodings_to_try[-1]:
+                raise
+            logging.info(f"{file_label} '{filepath}' を{encoding}で読み込み失敗。{encodings_to_try[-1]}で再試行します。")
+            continue
+        return text, encoding
+
+
+def read_csv_text(filepath, file_label="CSVファイル") -> Tuple[str, str]:
+    """ファイル全体を1回読み込んでデコードし、(文字列, 使用したエンコーディング) を返す (大きなファイルは mmap で読む)"""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:  # 空のファイルは mmap できない
+            return decode_csv_bytes(b"", filepath, file_label)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return decode_csv_bytes(buffer, filepath, file_label)
+
 
 @contextmanager
-def open_csv_file_with_fallback(filepath, mode='r', progress_dialog=None, file_label="CSVファイル"):
+def open_csv_file_with_fallback(filepath, mode='r', progress=None, file_label="CSVファイル"):
     """
-    CSVファイルをUTF-8 (BOM付き)で開き、失敗したらShift_JISで再試行するコンテキストマネージャ。
+    CSVファイルの文字コード (UTF-8 (BOM付き) または Shift_JIS) を読み込み前に判定して開くコンテキストマネージャ。
     ファイルオブジェクト、デリミタ、使用されたエンコーディングをyieldする。
+    読み込みモードではファイル全体を1回だけデコードした文字列を返すため、
+    読み進めた途中でデコードに失敗して最初から読み直すことはない。
     ファイルが見つからない場合やデコードに失敗した場合は例外を発生させる。
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"{file_label} '{filepath}' が見つかりません。")
 
-    encodings_to_try = [DEFAULT_ENCODING, FALLBACK_ENCODING]
-    file_obj = None
     base_filename = os.path.basename(filepath)
+    if 'r' not in mode:  # 書き込みモードは文字コードの判定・デリミタ検出を行わない
+        with open(filepath, mode, encoding=DEFAULT_ENCODING, newline='') as file_obj:
+            yield file_obj, None, DEFAULT_ENCODING
+        return
+
+    if progress:
+        progress.report(f"{file_label} ({base_filename}) を読み込み中...")
+    try:
+        text, encoding = read_csv_text(filepath, file_label)
+    except Exception:
+        logging.warning(f"{file_label} '{filepath}' のオープン/読み込み中に予期せぬエラー。", exc_info=True)
+        raise
+    if progress and encoding != DEFAULT_ENCODING:
+        progress.report(f"{file_label} ({base_filename} ({encoding})) を読み込み中...")
 
-    for encoding_idx, encoding in enumerate(encodings_to_try):
-        if progress_dialog:
-            label_suffix = f" ({encoding})" if encoding != DEFAULT_ENCODING else ""
-            progress_dialog.setLabelText(f"{file_label} ({base_filename}{label_suffix}) を読み込み中...")
-            QApplication.processEvents()
+    first_line = text.partition('\n')[0]
+    delimiter = '\t' if '\t' in first_line and ',' not in first_line else ','
+    with io.StringIO(text, newline='') as file_obj:
+        yield file_obj, delimiter, encoding
+
+
+@contextmanager
+def atomic_write(path, mode='wb', encoding=None, prefix="tmp", suffix=".tmp"):
+    """
+    path と同じディレクトリの一時ファイルに書き込み、成功したときだけ path と置き換えるコンテキストマネージャ。
+    一時ファイルのファイルオブジェクトをyieldする。書き込み中に例外が発生した場合は一時ファイルを削除し、
+    path は元の内容のまま残る。path が既に存在する場合はそのパーミッションを引き継ぐ。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as file_obj:
+            yield file_obj
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
         try:
-            file_obj = open(filepath, mode, encoding=encoding, newline='')
-            delimiter = None
-            if 'r' in mode:  # 読み込みモードの場合のみデリミタ検出
-                first_line = file_obj.readline()
-                file_obj.seek(0)
-                delimiter = '\t' if '\t' in first_line and ',' not in first_line else ','
-            
-            try:
-                yield file_obj, delimiter, encoding
-            finally:
-                if file_obj:
-                    file_obj.close()
-            return  # 成功したら終了
-        except UnicodeDecodeError:
-            if file_obj: 
-                file_obj.close()
-            if encoding == FALLBACK_ENCODING:  # 最後のフォールバックでも失敗
-                raise  # 元のUnicodeDecodeErrorを再発生させる
-            logging.info(f"{file_label} '{filepath}' を{encoding}で読み込み失敗。{FALLBACK_ENCODING}で再試行します。")
-        except Exception as e:  # FileNotFoundErrorもここでキャッチされる可能性あり
-            if file_obj: 
-                file_obj.close()
-            logging.warning(f"{file_label} '{filepath}' ({encoding}) のオープン/読み込み中に予期せぬエラー。", exc_info=True)
-            if encoding == FALLBACK_ENCODING or isinstance(e, FileNotFoundError):
-                raise  # 最後のフォールバックでのエラー、またはFileNotFoundErrorは再発生
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+# ひらがな→カタカナの変換表 (normalize_text の呼び出しごとに作らないようにモジュール読み込み時に1度だけ作る)
+_HIRAGANA_TO_KATAKANA = str.maketrans(
+    'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん'
+    'ぁぃぅぇぉゃゅょっ',
+    'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン'
+    'ァィゥェォャュョッ'
+)
 
 
 @functools.lru_cache(maxsize=1000)
@@ -72,14 +166,8 @@ def normalize_text(text: Optional[Union[str, int, float]]) -> str:
         return ""
     text_str = str(text)  # 数値なども文字列として扱えるように
     text_str = unicodedata.normalize('NFKC', text_str).upper()
-    # ひらがなをカタカナに変換（効率的な変換）
-    hiragana_to_katakana = str.maketrans(
-        'あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん'
-        'ぁぃぅぇぉゃゅょっ',
-        'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワヲン'
-        'ァィゥェォャュョッ'
-    )
-    return text_str.translate(hiragana_to_katakana)
+    # ひらがなをカタカナに変換
+    return text_str.translate(_HIRAGANA_TO_KATAKANA)
 
 
 @functools.lru_cache(maxsize=500)
@@ -126,6 +214,7 @@ def get_user_data_dir(preferred_dir: Optional[str] = None) -> str:
     # フォールバック: ドキュメントフォルダ
     try:
         # QStandardPathsを使用して標準的なドキュメントディレクトリを取得
+        from PyQt5.QtCore import QStandardPaths
         docs_path = QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation)
         if not docs_path or not os.path.exists(docs_path):  # パスが取得できないか、存在しない場合
             logging.warning(f"標準ドキュメントディレクトリが見つかりません。ホームディレクトリを試みます。")
@@ -3,20 +3,22 @@
 """
 import logging
 from typing import Optional, List, Any
-from PyQt5.QtCore import Qt, QTimer, QSize
+from PyQt5.QtCore import Qt, QTimer, QSize, QItemSelection, QItemSelectionModel, pyqtSignal
 from PyQt5.QtWidgets import (
     QTextEdit, QTableView, QWidget, QHBoxLayout, QLineEdit, QPushButton,
     QSizePolicy, QDialog, QListWidget, QListWidgetItem, QDialogButtonBox,
     QVBoxLayout, QStyledItemDelegate, QComboBox, QCompleter, QMessageBox,
     QLabel, QProgressBar, QPlainTextEdit, QInputDialog, QAbstractItemView,
-    QApplication, QAbstractItemDelegate
+    QApplication, QAbstractItemDelegate, QListView
 )
 from PyQt5.QtGui import QInputMethodEvent
 
 from constants import (
     HEADER_ATTR_VALUE_PREFIX, HEADER_ATTR_UNIT_PREFIX,
-    HEADER_ATTR_ITEM_PREFIX
+    HEADER_ATTR_ITEM_PREFIX, LOADING_DIALOG_REFRESH_MS
 )
+from models import ProductListModel, ProductListFilterModel, PRODUCT_LIST_CODE_ROLE
+from utils import ProgressChannel
 
 
 
@@ -748,7 +750,12 @@ class SkuAttributeDelegate(QStyledItemDelegate):
         return sanitized.strip()
     
 class LoadingDialog(QDialog):
-    """起動時に表示される進捗ダイアログ"""
+    """
+    起動時に表示される進捗ダイアログ
+
+    ワーカースレッドの読み込み処理は channel (ProgressChannel) へ文言を報告するだけで、
+    ダイアログは表示中に一定間隔で channel から最新の文言を取り出してラベルを更新する。
+    """
 
     def __init__(self, message: str, total_steps: int, parent=None):
         super().__init__(parent)
@@ -762,6 +769,23 @@ class LoadingDialog(QDialog):
         self.setLayout(layout)
         self.setModal(True)
         self.resize(400, 120)
+        self.channel = ProgressChannel()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(LOADING_DIALOG_REFRESH_MS)
+        self._refresh_timer.timeout.connect(self._apply_reported_progress)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_timer.start()
+
+    def hideEvent(self, event):
+        self._refresh_timer.stop()
+        super().hideEvent(event)
+
+    def _apply_reported_progress(self):
+        text = self.channel.take()
+        if text is not None:
+            self.label.setText(text)
 
     def update_progress(self, step: int):
         self.progress_bar.setValue(step)
@@ -1081,3 +1105,133 @@ class SearchLineEdit(JapaneseLineEdit):
             event.accept()
             return
         super().keyPressEvent(event)
+
+
+
+class ProductListView(QListView):
+    """
+    商品一覧のビュー。行は ProductListModel が持ち、ProductListFilterModel で絞り込んで表示する。
+    選択中の商品は商品コードで扱い、変わったときに currentCodeChanged (現在, 直前) を通知する
+    (選択されていない場合は空文字列)。絞り込みや一覧の更新で選択中の行が表示されなくなっても
+    選択中の商品は変えず、通知もしない。
+    """
+
+    currentCodeChanged = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.list_model = ProductListModel(self)
+        self.filter_model = ProductListFilterModel(self)
+        self.filter_model.setSourceModel(self.list_model)
+        self.setModel(self.filter_model)
+        self.setUniformItemSizes(True)  # 全行を同じ高さとして扱い、表示範囲の行だけを描画する
+        self._current_code = ""
+        self._keeping_current = False
+        self.selectionModel().currentChanged.connect(self._on_current_index_changed)
+
+    def _on_current_index_changed(self, current, previous):
+        if not self._keeping_current:
+            self._set_current_code(self._code_of(current))
+
+    @staticmethod
+    def _code_of(index) -> str:
+        return (index.data(PRODUCT_LIST_CODE_ROLE) or "") if index.isValid() else ""
+
+    def _set_current_code(self, code: str) -> None:
+        if code != self._current_code:
+            previous_code, self._current_code = self._current_code, code
+            self.currentCodeChanged.emit(code, previous_code)
+
+    def _view_index(self, code: str):
+        return self.filter_model.mapFromSource(self.list_model.index(self.list_model.row_of(code)))
+
+    def _update_keeping_current(self, update) -> None:
+        """
+        update() で行が追加・削除・非表示になっても選択中の商品を変えない。
+        選択中の商品が表示されていれば選択し直し、一覧から無くなった場合は選択を解除する (通知しない)。
+        """
+        self._keeping_current = True
+        try:
+            update()
+            if self._current_code and not self.list_model.contains(self._current_code):
+                self._current_code = ""
+            index = self._view_index(self._current_code) if self._current_code else None
+            if index is not None and index.isValid():
+                if index != self.currentIndex():
+                    self.selectionModel().setCurrentIndex(index, QItemSelectionModel.Select)
+            elif self.currentIndex().isValid():
+                self.selectionModel().clearCurrentIndex()
+        finally:
+            self._keeping_current = False
+
+    # --- 一覧の更新 ---
+    def set_entries(self, entries) -> None:
+        """一覧を (商品コード, 商品名, コントロールカラム値) の並びに合わせる (変わった行だけを更新する)"""
+        self._update_keeping_current(lambda: self.list_model.set_entries(entries))
+
+    def set_control(self, codes, control: str) -> None:
+        self._update_keeping_current(lambda: self.list_model.set_control(codes, control))
+
+    def set_filter_text(self, text: str) -> None:
+        """検索語を含む商品だけを表示する"""
+        self._update_keeping_current(lambda: self.filter_model.set_filter_text(text))
+
+    # --- 商品コードによる参照・選択 ---
+    def count(self) -> int:
+        """一覧の商品数 (絞り込みで表示されていない商品を含む)"""
+        return self.list_model.rowCount()
+
+    def contains(self, code: str) -> bool:
+        return self.list_model.contains(code)
+
+    def current_code(self) -> str:
+        return self._current_code
+
+    def set_current_code(self, code: str) -> bool:
+        """
+        商品を選択する (一覧に無い場合は False を返す)。
+        絞り込みで表示されていない商品も選択中として扱う。
+        """
+        if not code or not self.list_model.contains(code):
+            return False
+        index = self._view_index(code)
+        if index.isValid():
+            self.setCurrentIndex(index)  # currentChanged から通知される
+            self.scrollTo(index)
+        else:
+            self._keeping_current = True
+            try:
+                self.clearSelection()
+                self.selectionModel().clearCurrentIndex()
+            finally:
+                self._keeping_current = False
+            self._set_current_code(code)
+        return True
+
+    def clear_current(self) -> None:
+        """選択を解除する"""
+        self._keeping_current = True
+        try:
+            self.clearSelection()
+            self.selectionModel().clearCurrentIndex()
+        finally:
+            self._keeping_current = False
+        self._set_current_code("")
+
+    def code_at(self, pos) -> str:
+        """ビュー内の位置にある商品コード (無い場合は空文字列)"""
+        return self._code_of(self.indexAt(pos))
+
+    def selected_codes(self):
+        """選択されている商品コードを一覧の順で返す"""
+        indexes = sorted(self.selectionModel().selectedIndexes(), key=lambda index: index.row())
+        return [index.data(PRODUCT_LIST_CODE_ROLE) for index in indexes]
+
+    def select_codes(self, codes) -> None:
+        """商品を選択に加える (絞り込みで表示されていない商品は選択しない)"""
+        selection = QItemSelection()
+        for code in codes:
+            index = self._view_index(code)
+            if index.isValid():
+                selection.select(index, index)
+        self.selectionModel().select(selection, QItemSelectionModel.Select)
@@ -0,0 +1,402 @@
+"""
+商品登録入力ツール - シート XML 直接書き換えモジュール
+
+管理ファイル (.xlsm) の保存で openpyxl の load_workbook(keep_vba=True) → save() による
+パッケージ全体の読み込み・再出力を避けるため、変更のあったシートの
+xl/worksheets/sheetN.xml だけを書き換え、vbaProject.bin・styles.xml などの他の部品は
+内容を変えずにそのまま新しい zip へコピーする。
+
+PatchWorkbook / PatchWorksheet は manage_writer.py のジョブ処理が使う openpyxl の
+ワークブック・ワークシート API の一部 (wb[シート名], ws.cell(), ws.insert_rows(),
+ws.delete_rows(), ws.max_row, ws.iter_rows(values_only=True), wb.save()) を提供する。
+書き換えたセルは openpyxl 3.1 の保存結果と同じく inlineStr で出力するため、
+sharedStrings.xml は変更しない。扱えない形式の場合は UnsupportedPatchError を送出するので、
+呼び出し元は openpyxl での保存に切り替えること。
+"""
+import re
+import logging
+import zipfile
+from xml.etree.ElementTree import fromstring, ParseError
+from xml.sax.saxutils import escape
+from typing import Optional, List, Dict, Iterator, Tuple
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE, ERROR_CODES
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+
+from utils import atomic_write
+from xlsx_reader import StreamingWorkbook, StreamingWorksheet, _split_reference, _SHEET_DATA
+
+
+class UnsupportedPatchError(Exception):
+    """シート XML の直接書き換えに対応していない内容・操作"""
+
+
+_ROOT_START_RE = re.compile(rb"<worksheet\b[^>]*>")
+_SHEET_DATA_START_RE = re.compile(rb"<sheetData\s*(/?)>")
+_SHEET_DATA_END = b"</sheetData>"
+_DIMENSION_RE = re.compile(rb'<dimension\s+ref="([^"]*)"\s*/>')
+_ROW_RE = re.compile(rb"<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+_ROW_START_RE = re.compile(rb"<row\b[^>]*?(/?)>")
+_ROW_NUMBER_ATTR_RE = re.compile(rb'(\sr=")(\d+)(")')
+_SPANS_ATTR_RE = re.compile(rb'\sspans="[^"]*"')
+_CELL_RE = re.compile(rb"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+_CELL_REF_RE = re.compile(rb'(<c\b[^>]*?\sr="[A-Z]+)(\d+)(")')
+_CELL_REF_ATTR_RE = re.compile(rb'\sr="([A-Z]+\d+)"')
+_STYLE_ATTR_RE = re.compile(rb'\ss="(\d+)"')
+_FORMULA_RE = re.compile(rb"<f[\s>/]")
+
+
+def _render_cell(ref: str, value, style: Optional[bytes]) -> bytes:
+    """セル1つ分の XML を openpyxl 3.1 の保存結果と同じ形式で作る"""
+    attrs = f' r="{ref}"'
+    if style:
+        attrs += f' s="{style.decode()}"'
+    if value is None or value == "":
+        return f"<c{attrs}/>".encode("utf-8")
+    if isinstance(value, bool):
+        return f'<c{attrs} t="b"><v>{int(value)}</v></c>'.encode("utf-8")
+    if isinstance(value, int):
+        return f'<c{attrs} t="n"><v>{value}</v></c>'.encode("utf-8")
+    if isinstance(value, float):
+        text = "%.16g" % value if value == value and value not in (float("inf"), float("-inf")) else ""
+        return f'<c{attrs} t="n"><v>{text}</v></c>'.encode("utf-8")
+    if not isinstance(value, str):
+        raise UnsupportedPatchError(f"セル {ref} の値の型 {type(value).__name__} は直接書き換えに対応していません。")
+    value = value[:32767]
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise UnsupportedPatchError(f"セル {ref} の値に使用できない制御文字が含まれています。")
+    if len(value) > 1 and value.startswith("="):
+        return f"<c{attrs}><f>{escape(value[1:])}</f><v/></c>".encode("utf-8")
+    if value in ERROR_CODES:
+        return f'<c{attrs} t="e"><v>{escape(value)}</v></c>'.encode("utf-8")
+    stripped = value.strip()
+    space = ' xml:space="preserve"' if stripped and stripped != value else ""
+    return f'<c{attrs} t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>'.encode("utf-8")
+
+
+class _PatchCell:
+    """PatchWorksheet.cell() が返すセル (value の読み書きのみ)"""
+
+    __slots__ = ("_sheet", "row", "column")
+
+    def __init__(self, sheet: "PatchWorksheet", row: int, column: int):
+        self._sheet = sheet
+        self.row = row
+        self.column = column
+
+    @property
+    def value(self):
+        return self._sheet._get_value(self.row, self.column)
+
+    @value.setter
+    def value(self, value):
+        self._sheet._set_value(self.row, self.column, value)
+
+
+class PatchWorksheet:
+    """
+    シート1枚分の変更を記録し、保存時に変更行だけを書き換えた sheet XML を作るワークシート。
+    行は元のシートの行番号 (正の整数) または新しく追加した行 (負の整数) のキーで管理し、
+    行の挿入・削除はキーのリストの操作だけで行う。変更のない行は元の XML をそのままコピーする。
+    """
+
+    def __init__(self, workbook: "PatchWorkbook", title: str, member_path: str):
+        self.parent = workbook
+        self.title = title
+        self._member_path = member_path
+        self._xml = workbook._reader._zip.read(member_path)
+        self._parse_layout()
+        self._rows: List[int] = list(range(1, self._original_max_row + 1))
+        self._edits: Dict[int, Dict[int, object]] = {}
+        self._next_new_key = -1
+        self._value_cache: Dict[int, Dict[int, object]] = {}
+        self._modified = False
+
+    def _parse_layout(self) -> None:
+        xml = self._xml
+        root = _ROOT_START_RE.search(xml)
+        sheet_data = _SHEET_DATA_START_RE.search(xml)
+        if root is None or sheet_data is None:
+            raise UnsupportedPatchError(f"シート '{self.title}' の XML 構造に対応していません。")
+        self._root_start_tag = root.group(0)
+        self._prefix_end = sheet_data.start()
+        if sheet_data.group(1):  # <sheetData/>
+            self._rows_start = self._rows_end = sheet_data.end()
+            self._suffix_start = sheet_data.end()
+        else:
+            self._rows_start = sheet_data.end()
+            self._rows_end = xml.find(_SHEET_DATA_END, self._rows_start)
+            if self._rows_end < 0:
+                raise UnsupportedPatchError(f"シート '{self.title}' の sheetData が閉じられていません。")
+            self._suffix_start = self._rows_end + len(_SHEET_DATA_END)
+
+        # 元のシートの各行の XML 上の位置 {行番号: (開始, 終了)}
+        self._spans: Dict[int, Tuple[int, int]] = {}
+        last_row = 0
+        for match in _ROW_RE.finditer(xml, self._rows_start, self._rows_end):
+            start_tag = _ROW_START_RE.match(xml, match.start())
+            number = _ROW_NUMBER_ATTR_RE.search(start_tag.group(0)) if start_tag else None
+            if number is None:
+                raise UnsupportedPatchError(f"シート '{self.title}' に行番号のない行があります。")
+            row_number = int(number.group(2))
+            if row_number <= last_row:
+                raise UnsupportedPatchError(f"シート '{self.title}' の行が昇順に並んでいません。")
+            self._spans[row_number] = match.span()
+            last_row = row_number
+        self._original_max_row = last_row
+
+    # --- openpyxl 互換 API ---
+    @property
+    def max_row(self) -> int:
+        return max(len(self._rows), 1)
+
+    def cell(self, row: int, column: int, value=None) -> _PatchCell:
+        if row < 1 or column < 1:
+            raise ValueError("Row or column values must be at least 1")
+        if value is not None:
+            self._set_value(row, column, value)
+        return _PatchCell(self, row, column)
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None,
+                  min_col: Optional[int] = None, max_col: Optional[int] = None,
+                  values_only: bool = True) -> Iterator[tuple]:
+        if not values_only:
+            raise NotImplementedError("PatchWorksheet は values_only=True のみ対応しています。")
+        min_col = min_col or 1
+        for row in range(min_row or 1, (max_row or self.max_row) + 1):
+            values = self._row_values(row)
+            last_col = max_col or max(values, default=0)
+            yield tuple(values.get(col) for col in range(min_col, last_col + 1))
+
+    def append(self, values) -> None:
+        row = len(self._rows) + 1
+        for column, value in enumerate(values, start=1):
+            self._set_value(row, column, value)
+
+    def insert_rows(self, idx: int, amount: int = 1) -> None:
+        self._pad_rows(idx - 1)
+        self._rows[idx - 1:idx - 1] = [self._new_key() for _ in range(amount)]
+        self._modified = True
+
+    def delete_rows(self, idx: int, amount: int = 1) -> None:
+        if idx > len(self._rows):
+            return
+        for key in self._rows[idx - 1:idx - 1 + amount]:
+            self._edits.pop(key, None)
+        del self._rows[idx - 1:idx - 1 + amount]
+        self._modified = True
+
+    # --- セル値の読み書き ---
+    def _new_key(self) -> int:
+        key = self._next_new_key
+        self._next_new_key -= 1
+        return key
+
+    def _pad_rows(self, count: int) -> None:
+        while len(self._rows) < count:
+            self._rows.append(self._new_key())
+
+    def _row_values(self, row: int) -> Dict[int, object]:
+        """現在の行番号 row の {列番号: 値} (変更内容を反映済み)"""
+        if row > len(self._rows):
+            return {}
+        key = self._rows[row - 1]
+        values = dict(self._original_values(key)) if key > 0 else {}
+        values.update(self._edits.get(key, {}))
+        return values
+
+    def _get_value(self, row: int, column: int):
+        if row > len(self._rows):
+            return None
+        key = self._rows[row - 1]
+        edits = self._edits.get(key)
+        if edits and column in edits:
+            return edits[column]
+        if key < 0:
+            return None
+        return self._original_values(key).get(column)
+
+    def _set_value(self, row: int, column: int, value) -> None:
+        self._pad_rows(row)
+        self._edits.setdefault(self._rows[row - 1], {})[column] = value
+        self._modified = True
+
+    def _original_values(self, original_row: int) -> Dict[int, object]:
+        """元のシートの行を解析した {列番号: 値} (行ごとに一度だけ解析する)"""
+        values = self._value_cache.get(original_row)
+        if values is None:
+            values = {}
+            span = self._spans.get(original_row)
+            if span is not None:
+                reader = self.parent._reader
+                document = (self._root_start_tag + b"<sheetData>" + self._xml[span[0]:span[1]]
+                            + b"</sheetData></worksheet>")
+                try:
+                    row_element = fromstring(document).find(_SHEET_DATA)[0]
+                except ParseError as e:
+                    raise UnsupportedPatchError(f"シート '{self.title}' の{original_row}行目を解析できません: {e}")
+                date_formats, timedelta_formats = reader.date_formats
+                sheet = StreamingWorksheet(reader, self.title, self._member_path)
+                values = dict(sheet._parse_cells(row_element, reader.shared_strings, date_formats,
+                                                 timedelta_formats, {}))
+            self._value_cache[original_row] = values
+        return values
+
+    # --- XML の生成 ---
+    @property
+    def is_modified(self) -> bool:
+        return self._modified
+
+    def _render_row(self, row_number: int, original_xml: Optional[bytes], edits: Dict[int, object]) -> bytes:
+        """変更のある行の XML を作る。元の行の属性・未変更セル・セルの書式番号は引き継ぐ"""
+        cells: Dict[int, bytes] = {}
+        styles: Dict[int, bytes] = {}
+        start_tag = b'<row r="%d">' % row_number
+        if original_xml is not None:
+            start = _ROW_START_RE.match(original_xml)
+            start_tag = _SPANS_ATTR_RE.sub(b"", start.group(0))
+            start_tag = _ROW_NUMBER_ATTR_RE.sub(lambda m: m.group(1) + b"%d" % row_number + m.group(3), start_tag, count=1)
+            if start.group(1):  # <row .../> を <row ...> にする
+                start_tag = start_tag[:-2].rstrip() + b">"
+            for match in _CELL_RE.finditer(original_xml, start.end()):
+                cell_xml = match.group(0)
+                ref = _CELL_REF_ATTR_RE.search(cell_xml[:cell_xml.find(b">") + 1])
+                if ref is None:
+                    raise UnsupportedPatchError(f"シート '{self.title}' にセル番地のないセルがあります。")
+                _row, column = _split_reference(ref.group(1).decode())
+                style = _STYLE_ATTR_RE.search(cell_xml[:cell_xml.find(b">") + 1])
+                styles[column] = style.group(1) if style else None
+                if column not in edits:
+                    if _FORMULA_RE.search(cell_xml) and _row != row_number:
+                        raise UnsupportedPatchError(f"シート '{self.title}' の数式を含む行は移動できません。")
+                    cells[column] = _CELL_REF_RE.sub(lambda m: m.group(1) + b"%d" % row_number + m.group(3), cell_xml)
+        for column, value in edits.items():
+            ref = f"{get_column_letter(column)}{row_number}"
+            cells[column] = _render_cell(ref, value, styles.get(column))
+        return start_tag + b"".join(cells[c] for c in sorted(cells)) + b"</row>"
+
+    def _shift_rows(self, chunk: bytes, delta: int) -> bytes:
+        """変更のない連続した行の行番号を delta だけずらす"""
+        if _FORMULA_RE.search(chunk):
+            raise UnsupportedPatchError(f"シート '{self.title}' の数式を含む行は移動できません。")
+        shift = lambda m: m.group(1) + b"%d" % (int(m.group(2)) + delta) + m.group(3)
+        chunk = _CELL_REF_RE.sub(shift, chunk)
+        return re.sub(rb'(<row\b[^>]*?\sr=")(\d+)(")', shift, chunk)
+
+    def _render_dimension(self, prefix: bytes) -> bytes:
+        match = _DIMENSION_RE.search(prefix)
+        if match is None:
+            return prefix
+        max_col = 1
+        ref = match.group(1).decode()
+        if ref:
+            try:
+                _min_col, _min_row, ref_max_col, _max_row = range_boundaries(ref)
+                max_col = ref_max_col or 1
+            except ValueError:
+                pass
+        for edits in self._edits.values():
+            if edits:
+                max_col = max(max_col, max(edits))
+        new_ref = f"A1:{get_column_letter(max_col)}{self.max_row}".encode()
+        return prefix[:match.start(1)] + new_ref + prefix[match.end(1):]
+
+    def render(self) -> bytes:
+        """変更内容を反映した sheet XML を返す"""
+        xml = self._xml
+        parts = [self._render_dimension(xml[:self._prefix_end]), b"<sheetData>"]
+        run_start = run_end = None  # 同じずれ幅で続く未変更行の範囲 (XML 上の位置)
+        run_delta = 0
+
+        def flush_run():
+            if run_start is not None:
+                chunk = xml[run_start:run_end]
+                parts.append(self._shift_rows(chunk, run_delta) if run_delta else chunk)
+
+        for row_number, key in enumerate(self._rows, start=1):
+            edits = self._edits.get(key)
+            span = self._spans.get(key) if key > 0 else None
+            if not edits:
+                if span is None:
+                    continue
+                delta = row_number - key
+                if run_start is not None and run_end == span[0] and run_delta == delta:
+                    run_end = span[1]
+                    continue
+                flush_run()
+                run_start, run_end, run_delta = span[0], span[1], delta
+                continue
+            flush_run()
+            run_start = None
+            original_xml = xml[span[0]:span[1]] if span else None
+            parts.append(self._render_row(row_number, original_xml, edits))
+        flush_run()
+        parts.append(_SHEET_DATA_END)
+        parts.append(xml[self._suffix_start:])
+        return b"".join(parts)
+
+
+class PatchWorkbook:
+    """
+    変更のあったシートの XML だけを書き換えて保存するワークブック。
+    load_workbook(path, keep_vba=True) の代わりに manage_writer.apply_jobs() へ渡して使う。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self._reader = StreamingWorkbook(path)
+        except (zipfile.BadZipFile, KeyError, ParseError) as e:
+            raise UnsupportedPatchError(f"'{path}' をシート XML の直接書き換えで開けません: {e}")
+        self._sheets: Dict[str, PatchWorksheet] = {}
+        self._closed = False
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self._reader.sheetnames
+
+    def __getitem__(self, name: str) -> PatchWorksheet:
+        sheet = self._sheets.get(name)
+        if sheet is None:
+            if name not in self._reader:
+                raise KeyError(f"Worksheet {name} does not exist.")
+            sheet = PatchWorksheet(self, name, self._reader._sheet_paths[name])
+            self._sheets[name] = sheet
+        return sheet
+
+    def create_sheet(self, title: str):
+        raise UnsupportedPatchError(f"シート '{title}' の追加は直接書き換えに対応していません。")
+
+    def save(self, path: str) -> None:
+        """
+        変更のあったシートの XML を差し替えた zip を一時ファイルに書き出し、path と置き換える。
+        その他の部品 (vbaProject.bin など) は内容を変えずにコピーする。変更がなければ何もしない。
+        """
+        if self._closed:
+            raise ValueError("閉じたワークブックは保存できません。")
+        replaced = {sheet._member_path: sheet.render() for sheet in self._sheets.values() if sheet.is_modified}
+        if not replaced:
+            self.close()
+            return
+        source = self._reader._zip
+        with atomic_write(path, prefix=".~") as f:
+            with zipfile.ZipFile(f, "w") as out:
+                for info in source.infolist():
+                    new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                    new_info.compress_type = info.compress_type
+                    new_info.external_attr = info.external_attr
+                    data = replaced.get(info.filename)
+                    out.writestr(new_info, data if data is not None else source.read(info.filename))
+            # 置き換える前に元ファイルを閉じる (Windows では開いたままのファイルは置き換えられない)
+            self.close()
+        logging.debug(f"シート XML を直接書き換えて保存しました: '{path}' ({', '.join(replaced)})")
+
+    def close(self) -> None:
+        if not self._closed:
+            self._reader.close()
+            self._closed = True
+
+
+def open_patch_workbook(path: str) -> PatchWorkbook:
+    """シート XML の直接書き換えで保存するワークブックを開く"""
+    return PatchWorkbook(path)
@@ -0,0 +1,308 @@
+"""
+商品登録入力ツール - 軽量 xlsx/xlsm 読み込みモジュール
+
+セルの値だけが必要な読み込み処理のために、.xlsm (zip) を直接開いて
+sharedStrings を一度だけ解決し、xl/worksheets/sheetN.xml を iterparse で
+逐次読み込んで値のタプルを返す。openpyxl の load_workbook(read_only=True) と
+ws.iter_rows(values_only=True) の置き換えとして使えるよう、行・列の補完規則や
+数値・日付・真偽値・数式の変換は openpyxl 3.1 と同じ結果になるようにしている。
+書式や VBA は解析しないため、書き込みには引き続き openpyxl を使用すること。
+"""
+import posixpath
+import zipfile
+from xml.etree.ElementTree import iterparse
+from typing import Optional, List, Dict, Iterator, Tuple
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.utils.datetime import from_excel, from_ISO8601, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = _MAIN_NS + "row"
+_CELL = _MAIN_NS + "c"
+_VALUE = _MAIN_NS + "v"
+_FORMULA = _MAIN_NS + "f"
+_INLINE_STRING = _MAIN_NS + "is"
+_TEXT = _MAIN_NS + "t"
+_RICH_RUN = _MAIN_NS + "r"
+_SHARED_ITEM = _MAIN_NS + "si"
+_DIMENSION = _MAIN_NS + "dimension"
+_SHEET_DATA = _MAIN_NS + "sheetData"
+
+
+def _text_content(node) -> str:
+    """<si> / <is> 要素の文字列 (ふりがな <rPh> は除く)"""
+    parts = []
+    for child in node:
+        if child.tag == _TEXT:
+            parts.append(child.text or "")
+        elif child.tag == _RICH_RUN:
+            t = child.find(_TEXT)
+            if t is not None and t.text is not None:
+                parts.append(t.text)
+    return "".join(parts)
+
+
+def _cast_number(value: str):
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+_column_cache: Dict[str, int] = {}
+
+
+def _split_reference(ref: str) -> Tuple[int, int]:
+    """'AB12' -> (行番号, 列番号)"""
+    for i, ch in enumerate(ref):
+        if ch.isdigit():
+            letters = ref[:i]
+            column = _column_cache.get(letters)
+            if column is None:
+                column = 0
+                for letter in letters:
+                    column = column * 26 + (ord(letter) - 64)
+                _column_cache[letters] = column
+            return int(ref[i:]), column
+    raise ValueError(f"不正なセル参照です: {ref}")
+
+
+class StreamingWorksheet:
+    """シート1枚分の値を逐次読み込むワークシート (読み取り専用)"""
+
+    def __init__(self, workbook: "StreamingWorkbook", title: str, member_path: str):
+        self.parent = workbook
+        self.title = title
+        self._member_path = member_path
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None,
+                  min_col: Optional[int] = None, max_col: Optional[int] = None,
+                  values_only: bool = True) -> Iterator[tuple]:
+        """
+        openpyxl の ReadOnlyWorksheet.iter_rows(values_only=True) と同じ形で行を返す。
+        途中の欠けた行は空行で補完し、各行は <dimension> の列数 (なければその行の最終列) に揃える。
+        """
+        if not values_only:
+            raise NotImplementedError("StreamingWorksheet は values_only=True のみ対応しています。")
+        min_col = min_col or 1
+        counter = min_row or 1
+        empty_row: tuple = ()
+        if max_col is not None:
+            empty_row = (None,) * (max_col + 1 - min_col)
+
+        workbook = self.parent
+        shared_strings = workbook.shared_strings
+        date_formats, timedelta_formats = workbook.date_formats
+        shared_formulae: Dict[str, object] = {}
+
+        with workbook._zip.open(self._member_path) as src:
+            for _event, element in iterparse(src):
+                tag = element.tag
+                if tag == _ROW:
+                    row_ref = element.get("r")
+                    row_idx = int(float(row_ref)) if row_ref else counter
+                    if max_row is not None and row_idx > max_row:
+                        break
+                    cells = self._parse_cells(element, shared_strings, date_formats,
+                                              timedelta_formats, shared_formulae)
+                    element.clear()
+                    while counter < row_idx:
+                        counter += 1
+                        yield empty_row
+                    if counter <= row_idx:
+                        counter += 1
+                        yield self._fit_row(cells, min_col, max_col)
+                elif tag == _DIMENSION:
+                    ref = element.get("ref")
+                    if ref:
+                        _min_c, _min_r, dim_max_col, dim_max_row = range_boundaries(ref)
+                        if max_col is None and dim_max_col is not None:
+                            max_col = dim_max_col
+                            empty_row = (None,) * (max_col + 1 - min_col)
+                        if max_row is None:
+                            max_row = dim_max_row
+                elif tag == _SHEET_DATA:
+                    break
+
+    @staticmethod
+    def _fit_row(cells: List[Tuple[int, object]], min_col: int, max_col: Optional[int]) -> tuple:
+        if not cells and not max_col:
+            return ()
+        last_col = max_col or cells[-1][0]
+        new_row = [None] * (last_col + 1 - min_col)
+        for column, value in cells:
+            if min_col <= column <= last_col:
+                new_row[column - min_col] = value
+        return tuple(new_row)
+
+    def _parse_cells(self, row_element, shared_strings, date_formats, timedelta_formats, shared_formulae):
+        cells = []
+        col_counter = 0
+        epoch = self.parent.epoch
+        for cell in row_element:
+            if cell.tag != _CELL:
+                continue
+            ref = cell.get("r")
+            if ref:
+                _row, col_counter = _split_reference(ref)
+            else:
+                col_counter += 1
+            data_type = cell.get("t", "n")
+
+            formula = cell.find(_FORMULA)
+            if formula is not None:
+                value = self._formula_value(formula, ref, shared_formulae)
+            elif data_type == "inlineStr":
+                child = cell.find(_INLINE_STRING)
+                value = _text_content(child) if child is not None else None
+            else:
+                value = cell.findtext(_VALUE) or None
+                if value is not None:
+                    if data_type == "n":
+                        value = _cast_number(value)
+                        style_id = int(cell.get("s", 0) or 0)
+                        if style_id in date_formats:
+                            try:
+                                value = from_excel(value, epoch, timedelta=style_id in timedelta_formats)
+                            except (OverflowError, ValueError):
+                                value = "#VALUE!"
+                    elif data_type == "s":
+                        value = shared_strings[int(value)]
+                    elif data_type == "b":
+                        value = bool(int(value))
+                    elif data_type == "d":
+                        value = from_ISO8601(value)
+            cells.append((col_counter, value))
+        return cells
+
+    @staticmethod
+    def _formula_value(formula, ref, shared_formulae):
+        """数式セルは openpyxl (data_only=False) と同じく '=' で始まる文字列を返す"""
+        value = "="
+        if formula.text is not None:
+            value += formula.text
+        if formula.get("t") == "shared":
+            idx = formula.get("si")
+            if idx in shared_formulae:
+                value = shared_formulae[idx].translate_formula(ref)
+            elif value != "=":
+                from openpyxl.formula.translate import Translator
+                shared_formulae[idx] = Translator(value, ref)
+        return value
+
+
+class StreamingWorkbook:
+    """
+    .xlsx / .xlsm をセルの値だけ読むために開くワークブック (読み取り専用)。
+    load_workbook(path, read_only=True) と同じく sheetnames / wb[シート名] / close() を提供する。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._shared_strings: Optional[List[str]] = None
+        self._date_formats: Optional[Tuple[set, set]] = None
+        self._sheet_paths: Dict[str, str] = {}
+        self.epoch = CALENDAR_WINDOWS_1900
+        try:
+            self._read_workbook()
+        except Exception:
+            self._zip.close()
+            raise
+
+    def _read_workbook(self) -> None:
+        rels = {}
+        with self._zip.open("xl/_rels/workbook.xml.rels") as src:
+            for _event, element in iterparse(src):
+                if element.tag == _PKG_REL_NS + "Relationship":
+                    target = element.get("Target", "")
+                    if target.startswith("/"):
+                        target = target.lstrip("/")
+                    else:
+                        target = posixpath.normpath(posixpath.join("xl", target))
+                    rels[element.get("Id")] = target
+        with self._zip.open("xl/workbook.xml") as src:
+            for _event, element in iterparse(src):
+                if element.tag == _MAIN_NS + "sheet":
+                    self._sheet_paths[element.get("name")] = rels[element.get(_REL_NS + "id")]
+                elif element.tag == _MAIN_NS + "workbookPr":
+                    if element.get("date1904") in ("1", "true"):
+                        self.epoch = CALENDAR_MAC_1904
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheet_paths.keys())
+
+    def __getitem__(self, name: str) -> StreamingWorksheet:
+        if name not in self._sheet_paths:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return StreamingWorksheet(self, name, self._sheet_paths[name])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sheet_paths
+
+    @property
+    def shared_strings(self) -> List[str]:
+        """sharedStrings.xml を最初の参照時に一度だけ読み込む"""
+        if self._shared_strings is None:
+            strings = []
+            if "xl/sharedStrings.xml" in self._zip.namelist():
+                with self._zip.open("xl/sharedStrings.xml") as src:
+                    for _event, element in iterparse(src):
+                        if element.tag == _SHARED_ITEM:
+                            strings.append(_text_content(element).replace("x005F_", ""))
+                            element.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    @property
+    def date_formats(self) -> Tuple[set, set]:
+        """日付書式・時間書式が設定されたセルスタイル番号の集合 (styles.xml から一度だけ求める)"""
+        if self._date_formats is None:
+            date_ids, timedelta_ids = set(), set()
+            if "xl/styles.xml" in self._zip.namelist():
+                custom_formats = {}
+                in_num_fmts = in_cell_xfs = False
+                xf_index = 0
+                with self._zip.open("xl/styles.xml") as src:
+                    for event, element in iterparse(src, events=("start", "end")):
+                        tag = element.tag
+                        if event == "start":
+                            if tag == _MAIN_NS + "numFmts":
+                                in_num_fmts = True
+                            elif tag == _MAIN_NS + "cellXfs":
+                                in_cell_xfs = True
+                            continue
+                        if tag == _MAIN_NS + "numFmt" and in_num_fmts:
+                            custom_formats[int(element.get("numFmtId"))] = element.get("formatCode", "")
+                        elif tag == _MAIN_NS + "numFmts":
+                            in_num_fmts = False
+                        elif tag == _MAIN_NS + "cellXfs":
+                            in_cell_xfs = False
+                        elif tag == _MAIN_NS + "xf" and in_cell_xfs:
+                            fmt_id = int(element.get("numFmtId", 0))
+                            fmt = custom_formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id, "General"))
+                            if is_date_format(fmt):
+                                date_ids.add(xf_index)
+                            if is_timedelta_format(fmt):
+                                timedelta_ids.add(xf_index)
+                            xf_index += 1
+            self._date_formats = (date_ids, timedelta_ids)
+        return self._date_formats
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "StreamingWorkbook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_workbook(path: str) -> StreamingWorkbook:
+    """load_workbook(path, read_only=True) の代わりに使う値読み込み専用のワークブックを開く"""
+    return StreamingWorkbook(path)